@@ -0,0 +1,126 @@
+"""
+Cold-start benchmark: joblib + pickle + JSON triple load vs the model bundle.
+
+Each path runs in a fresh interpreter and reports the import time of the
+modules it needs and the time to first prediction (imports + load + one
+20-driver score), measured from interpreter start of the snippet.
+
+Usage:
+    python -m benchmarks.cold_start --runs 5
+"""
+
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+
+from benchmarks.fixtures import make_feature_frame, make_model_and_scalers
+from src.model_bundle import export_bundle
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LEGACY = """
+import time
+start = time.perf_counter()
+import json, pickle
+import joblib
+from src.predict_winner import predict_race_winner
+from src.scoring import compile_scoring_engine
+imported = time.perf_counter()
+model = joblib.load(os.path.join(artifacts, "model.joblib"))
+with open(os.path.join(artifacts, "scalers.pkl"), "rb") as f:
+    scalers = pickle.load(f)
+with open(os.path.join(artifacts, "metadata.json")) as f:
+    feature_names = json.load(f)["feature_names"]
+engine = compile_scoring_engine(model, scalers, feature_names)
+engine.score(race)
+"""
+
+BUNDLE = """
+import time
+start = time.perf_counter()
+from src.model_bundle import load_model_bundle
+imported = time.perf_counter()
+engine = load_model_bundle(os.path.join(artifacts, "model.bundle"))
+engine.score(race)
+"""
+
+HARNESS = """
+import json, os, sys
+artifacts = sys.argv[1]
+race = [[0.5] * {n_features}] * 20
+{body}
+done = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000,
+                  "first_prediction_ms": (done - start) * 1000}}))
+"""
+
+
+def write_artifacts(directory):
+    """
+    Write both artifact formats for a synthetic model.
+    """
+    model, scalers, feature_names = make_model_and_scalers()
+    joblib.dump(model, os.path.join(directory, "model.joblib"))
+    with open(os.path.join(directory, "scalers.pkl"), "wb") as f:
+        pickle.dump(scalers, f)
+    with open(os.path.join(directory, "metadata.json"), "w") as f:
+        json.dump({"feature_names": feature_names}, f)
+    export_bundle(
+        model, scalers, feature_names, os.path.join(directory, "model.bundle")
+    )
+    return len(feature_names)
+
+
+def run_path(body, artifacts, n_features, runs):
+    """
+    Run one load path ``runs`` times in fresh interpreters.
+    """
+    code = HARNESS.format(n_features=n_features, body=body)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code, artifacts],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=PROJECT_ROOT,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        key: float(np.median([sample[key] for sample in samples])) for key in samples[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    make_feature_frame(1)  # warm the page cache for sklearn/pandas
+
+    with tempfile.TemporaryDirectory() as artifacts:
+        n_features = write_artifacts(artifacts)
+        results = {
+            "joblib + pickle + JSON": run_path(
+                LEGACY, artifacts, n_features, args.runs
+            ),
+            "model bundle": run_path(BUNDLE, artifacts, n_features, args.runs),
+        }
+
+    print(f"Cold start, median of {args.runs} fresh interpreters")
+    for name, result in results.items():
+        print(
+            f"  {name:<24} import {result['import_ms']:8.1f} ms   "
+            f"first prediction {result['first_prediction_ms']:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
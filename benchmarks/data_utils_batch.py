@@ -0,0 +1,130 @@
+"""
+Multi-race data_utils benchmark: per-race loop vs the batch functions.
+
+Validates, names and summarizes a frame of many races (20 drivers each, a few
+rows with NaN or out-of-range features):
+
+    per race   groupby loop calling validate_race_data plus per-race NaN and
+               range checks, format_driver_name per row and
+               calculate_win_probability_stats per race
+    batch      validate_races, format_driver_names and
+               calculate_race_win_probability_stats over the whole frame
+
+Both paths are checked for identical results before timings are reported.
+
+Usage:
+    python -m benchmarks.data_utils_batch --rows 100000 --runs 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import FEATURE_NAMES, make_feature_frame
+from src.data_utils import (
+    FEATURE_RANGES,
+    calculate_race_win_probability_stats,
+    calculate_win_probability_stats,
+    format_driver_name,
+    format_driver_names,
+    validate_race_data,
+    validate_races,
+)
+
+DRIVERS_PER_RACE = 20
+
+
+def make_race_frame(n_rows, seed=0):
+    """Feature rows grouped into races, with names and win probabilities."""
+    rng = np.random.default_rng(seed)
+    frame = make_feature_frame(n_rows, seed)
+    frame.insert(0, "race_id", np.arange(n_rows) // DRIVERS_PER_RACE)
+    frame["forename"] = [f"Driver{i % 40}" for i in range(n_rows)]
+    frame["surname"] = np.where(rng.random(n_rows) < 0.01, "", "Surname")
+    frame["win_probability"] = rng.random(n_rows)
+    bad = rng.choice(n_rows, size=max(1, n_rows // 1000), replace=False)
+    frame.loc[bad[::2], "driver_win_rate"] = np.nan
+    frame.loc[bad[1::2], "grid"] = -1.0
+    return frame
+
+
+def per_race(frame):
+    """One race at a time with the single-race helpers."""
+    bounds = [FEATURE_RANGES.get(f) or (None, None) for f in FEATURE_NAMES]
+    low = np.array([-np.inf if lo is None else lo for lo, _ in bounds])
+    high = np.array([np.inf if hi is None else hi for _, hi in bounds])
+
+    invalid, names, stats = set(), [], {}
+    for race_id, race in frame.groupby("race_id", sort=False):
+        validate_race_data(race, FEATURE_NAMES)
+        values = race[FEATURE_NAMES].to_numpy()
+        if not np.isfinite(values).all() or ((values < low) | (values > high)).any():
+            invalid.add(race_id)
+        names.extend(
+            format_driver_name(driver)
+            for driver in race[["forename", "surname"]].to_dict("records")
+        )
+        stats[race_id] = calculate_win_probability_stats(race)
+    return invalid, names, pd.DataFrame.from_dict(stats, orient="index")
+
+
+def batch(frame):
+    """The whole frame at once with the batch helpers."""
+    _, errors = validate_races(frame, FEATURE_NAMES, frame["race_id"])
+    names = format_driver_names(frame["forename"], frame["surname"])
+    stats = calculate_race_win_probability_stats(frame)
+    return set(errors), names.tolist(), stats
+
+
+def best_time(fn, runs, *args):
+    """Best wall time of ``fn(*args)`` over ``runs`` calls."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = make_race_frame(args.rows)
+    expected, actual = per_race(frame), batch(frame)
+    if expected[:2] != actual[:2]:
+        raise AssertionError("Per-race and batch validation or names differ")
+    pd.testing.assert_frame_equal(
+        expected[2], actual[2], check_names=False, check_dtype=False
+    )
+
+    before = best_time(per_race, max(1, args.runs // 2), frame)
+    after = best_time(batch, args.runs, frame)
+    print(
+        f"{args.rows} rows, {frame['race_id'].nunique()} races, "
+        f"{len(actual[0])} invalid"
+    )
+    print(f"  per race  {before * 1000:9.1f} ms")
+    print(f"  batch     {after * 1000:9.1f} ms   ({before / after:.0f}x)")
+    steps = {
+        "validate_races": (validate_races, frame, FEATURE_NAMES, frame["race_id"]),
+        "format_driver_names": (
+            format_driver_names,
+            frame["forename"],
+            frame["surname"],
+        ),
+        "calculate_race_win_probability_stats": (
+            calculate_race_win_probability_stats,
+            frame,
+        ),
+    }
+    for name, (fn, *fn_args) in steps.items():
+        print(f"    {name:<38} {best_time(fn, args.runs, *fn_args) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
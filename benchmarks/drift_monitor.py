@@ -0,0 +1,59 @@
+"""
+Microbenchmark for the drift monitor's per-request cost.
+
+Counts 20-driver races into a ``DriftMonitor`` built from a synthetic training
+reference and reports the update time per race after increasing amounts of
+traffic (it should not grow), the time to compute the drift scores and the
+memory held by the live counts.
+
+Usage:
+    python -m benchmarks.drift_monitor --races 100000
+"""
+
+import argparse
+import time
+
+from benchmarks.fixtures import FEATURE_NAMES, make_feature_frame
+from src.drift import DriftMonitor, reference_histograms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--races", type=int, default=100_000)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--window", type=int, default=None)
+    args = parser.parse_args()
+
+    reference = reference_histograms(
+        make_feature_frame(50_000).to_numpy(), FEATURE_NAMES
+    )
+    races = make_feature_frame(1000 * args.drivers, seed=1).to_numpy()
+    races = races.reshape(1000, args.drivers, len(FEATURE_NAMES))
+    monitor = DriftMonitor(window=args.window)
+    monitor.set_reference(reference, FEATURE_NAMES)
+
+    print(
+        f"DriftMonitor.update, {args.drivers} drivers x {len(FEATURE_NAMES)} "
+        f"features per race"
+    )
+    checkpoints = {10**k for k in range(3, 9) if 10**k <= args.races}
+    start, done = time.perf_counter(), 0
+    for i in range(1, args.races + 1):
+        monitor.update(races[i % 1000], FEATURE_NAMES)
+        if i in checkpoints:
+            per_race = (time.perf_counter() - start) / (i - done)
+            print(f"  after {i:>9} races   {per_race * 1e6:6.1f} us per race")
+            start, done = time.perf_counter(), i
+
+    start = time.perf_counter()
+    stats = monitor.stats()
+    seconds = time.perf_counter() - start
+    counts_bytes = monitor._current.nbytes + monitor._previous.nbytes
+    print(
+        f"  stats()              {seconds * 1000:6.2f} ms, max psi {stats['max_psi']:.4f}"
+    )
+    print(f"  live counts          {counts_bytes / 1024:6.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
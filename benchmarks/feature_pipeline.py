@@ -0,0 +1,108 @@
+"""
+Feature engineering benchmark: notebook ``groupby().transform(lambda ...)``
+rolling features vs the vectorized ``src.features`` pipeline.
+
+Runs on the real Kaggle CSVs when ``--raw-dir`` is given (all seasons from
+``--from-year``), otherwise on synthetic tables of the same size. Both paths
+are checked for identical output before timings are reported.
+
+Usage:
+    python -m benchmarks.feature_pipeline --raw-dir data/raw --from-year 1950
+    python -m benchmarks.feature_pipeline --runs 3
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.fixtures import make_full_size_raw_tables
+from src.features import (
+    FEATURE_COLUMNS,
+    RACE_WINDOW_SIZE,
+    add_race_features,
+    build_features,
+    load_raw_tables,
+    merge_race_data,
+)
+
+
+def notebook_features(tables, from_year, window_size=RACE_WINDOW_SIZE):
+    """
+    Feature engineering as written in ``02_data_preprocessing.ipynb``.
+    """
+    df = merge_race_data(tables, from_year)
+    df["position_num"] = pd.to_numeric(df["position"], errors="coerce")
+    df["is_winner"] = (df["position_num"] == 1).astype(int)
+    df = df.sort_values(["year", "round"]).copy()
+
+    df["driver_win_rate"] = df.groupby("driverId")["is_winner"].transform(
+        lambda x: x.rolling(window_size, min_periods=1).mean().shift(1)
+    )
+    df["constructor_win_rate"] = df.groupby("constructorId")["is_winner"].transform(
+        lambda x: x.rolling(window_size, min_periods=1).mean().shift(1)
+    )
+    df["driver_season_points"] = df.groupby(["driverId", "year"])["points"].transform(
+        lambda x: x.expanding().sum().shift(1)
+    )
+
+    df = add_race_features(df, tables["qualifying"], tables["pit_stops"])
+    df["recent_avg_position"] = (
+        df.groupby("driverId")["position_num"]
+        .rolling(5, min_periods=1)
+        .mean()
+        .reset_index(0, drop=True)
+    )
+    df["constructor_recent_wins"] = (
+        df.groupby("constructorId")["is_winner"]
+        .rolling(5, min_periods=1)
+        .sum()
+        .reset_index(0, drop=True)
+    )
+    return df
+
+
+def time_runs(fn, runs):
+    """Return the best wall time in seconds and the last result."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--raw-dir", default=None, help="Kaggle CSV directory")
+    parser.add_argument("--from-year", type=int, default=1950)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.raw_dir:
+        tables = load_raw_tables(args.raw_dir)
+        source = args.raw_dir
+    else:
+        tables = make_full_size_raw_tables()
+        source = "synthetic Kaggle-shaped tables"
+
+    before, expected = time_runs(
+        lambda: notebook_features(tables, args.from_year), args.runs
+    )
+    after, actual = time_runs(lambda: build_features(tables, args.from_year), args.runs)
+
+    pd.testing.assert_frame_equal(
+        actual[FEATURE_COLUMNS].reset_index(drop=True),
+        expected[FEATURE_COLUMNS].reset_index(drop=True),
+        check_exact=False,
+        rtol=1e-12,
+    )
+
+    print(f"Source: {source} ({len(actual)} results from {args.from_year})")
+    print(f"notebook lambdas: {before * 1000:8.1f} ms")
+    print(f"vectorized:       {after * 1000:8.1f} ms  ({before / after:.1f}x)")
+    print(f"best of {args.runs} runs; engineered features identical")
+
+
+if __name__ == "__main__":
+    main()
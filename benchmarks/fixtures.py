@@ -0,0 +1,185 @@
+"""
+Synthetic fixtures shared by the benchmarks.
+
+Everything here is generated in-process so the benchmarks run offline, without
+the Kaggle dataset or a trained model on disk.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+
+FEATURE_NAMES = [
+    "driver_win_rate",
+    "constructor_win_rate",
+    "qualifying_position",
+    "num_pit_stops",
+    "grid",
+    "year",
+    "driver_constructor_interaction",
+    "points_per_race",
+    "recent_avg_position",
+    "constructor_recent_wins",
+]
+
+SCALING_STRATEGY = {
+    "qualifying_position": MinMaxScaler,
+    "grid": MinMaxScaler,
+    "year": StandardScaler,
+    "num_pit_stops": MinMaxScaler,
+    "points_per_race": RobustScaler,
+    "recent_avg_position": RobustScaler,
+    "constructor_recent_wins": MinMaxScaler,
+}
+
+
+def make_feature_frame(n_rows, seed=0):
+    """
+    Build a frame of engineered features with realistic ranges.
+    """
+    rng = np.random.default_rng(seed)
+    driver_win_rate = rng.uniform(0, 0.5, n_rows)
+    constructor_win_rate = rng.uniform(0, 0.5, n_rows)
+    return pd.DataFrame(
+        {
+            "driver_win_rate": driver_win_rate,
+            "constructor_win_rate": constructor_win_rate,
+            "qualifying_position": rng.integers(1, 21, n_rows).astype(float),
+            "num_pit_stops": rng.integers(0, 4, n_rows).astype(float),
+            "grid": rng.integers(1, 21, n_rows).astype(float),
+            "year": rng.integers(2010, 2025, n_rows).astype(float),
+            "driver_constructor_interaction": driver_win_rate * constructor_win_rate,
+            "points_per_race": rng.uniform(0, 25, n_rows),
+            "recent_avg_position": rng.uniform(1, 20, n_rows),
+            "constructor_recent_wins": rng.integers(0, 6, n_rows).astype(float),
+        }
+    )[FEATURE_NAMES]
+
+
+def make_model_and_scalers(n_rows=2000, seed=0):
+    """
+    Fit the mixed scaling strategy and a ``LinearRegression`` on synthetic rows.
+
+    Returns ``(model, scalers, feature_names)`` like ``load_model_and_scalers``.
+    """
+    train = make_feature_frame(n_rows, seed)
+    scaled = train.copy()
+    scalers = {}
+    for feature, scaler_cls in SCALING_STRATEGY.items():
+        scaler = scaler_cls()
+        scaled[feature] = scaler.fit_transform(train[[feature]])
+        scalers[feature] = scaler
+
+    target = pd.DataFrame(
+        {"is_winner": (np.random.default_rng(seed + 1).random(n_rows) < 0.05)}
+    ).astype(int)
+    model = LinearRegression().fit(scaled, target)
+    return model, scalers, list(FEATURE_NAMES)
+
+
+def make_race_payload(n_drivers=20, seed=0):
+    """
+    Build a ``/predict`` request body for one race.
+    """
+    features = make_feature_frame(n_drivers, seed)
+    drivers = features.to_dict(orient="records")
+    for i, driver in enumerate(drivers):
+        driver["forename"] = f"Driver{i}"
+        driver["surname"] = f"Surname{i}"
+    return {"drivers": drivers}
+
+
+POINTS_TABLE = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+
+def make_full_size_raw_tables(
+    first_year=1950,
+    last_year=2024,
+    races_per_season=16,
+    drivers_per_race=24,
+    seed=0,
+):
+    """
+    Build Kaggle-shaped raw tables (races, results, drivers, ...) in memory.
+
+    Defaults approximate the size of the full 1950-present dataset: about 1,200
+    races and 29,000 results, qualifying from 1994 and pit stops from 2011.
+    For small tables with edge cases (out-of-order rounds, shuffled results)
+    see ``tests.fixtures.make_raw_tables``.
+    """
+    rng = np.random.default_rng(seed)
+    n_constructors = drivers_per_race // 2
+    races, results, qualifying, pit_stops = [], [], [], []
+
+    race_id = 0
+    for season, year in enumerate(range(first_year, last_year + 1)):
+        # A few drivers leave the grid every season
+        driver_ids = season * 4 + np.arange(1, drivers_per_race + 1)
+        constructor_ids = 1 + (season + rng.permutation(drivers_per_race) // 2) % (
+            n_constructors * 3
+        )
+        for round_num in range(1, races_per_season + 1):
+            race_id += 1
+            races.append((race_id, year, round_num, int(rng.integers(1, 78))))
+
+            finish = rng.permutation(drivers_per_race) + 1
+            grid = rng.permutation(drivers_per_race) + 1
+            finished = rng.random(drivers_per_race) > 0.2
+            for i, driver_id in enumerate(driver_ids):
+                position = float(finish[i]) if finished[i] else np.nan
+                points = (
+                    POINTS_TABLE[finish[i] - 1]
+                    if finished[i] and finish[i] <= 10
+                    else 0.0
+                )
+                results.append(
+                    (
+                        race_id,
+                        int(driver_id),
+                        int(constructor_ids[i]),
+                        int(grid[i]),
+                        position,
+                        float(points),
+                    )
+                )
+                if year >= 1994:
+                    qualifying.append((race_id, int(driver_id), int(grid[i])))
+                if year >= 2011:
+                    for stop in range(1, int(rng.integers(1, 4)) + 1):
+                        pit_stops.append(
+                            (race_id, int(driver_id), stop, int(rng.normal(24e3, 3e3)))
+                        )
+
+    n_drivers = int(driver_ids[-1])
+    return {
+        "races": pd.DataFrame(races, columns=["raceId", "year", "round", "circuitId"]),
+        "results": pd.DataFrame(
+            results,
+            columns=[
+                "raceId",
+                "driverId",
+                "constructorId",
+                "grid",
+                "position",
+                "points",
+            ],
+        ),
+        "drivers": pd.DataFrame(
+            {
+                "driverId": np.arange(1, n_drivers + 1),
+                "forename": [f"Driver{i}" for i in range(1, n_drivers + 1)],
+                "surname": [f"Surname{i}" for i in range(1, n_drivers + 1)],
+            }
+        ),
+        "constructors": pd.DataFrame(
+            {"constructorId": np.arange(1, n_constructors * 3 + 1)}
+        ),
+        "circuits": pd.DataFrame({"circuitId": np.arange(1, 78)}),
+        "qualifying": pd.DataFrame(
+            qualifying, columns=["raceId", "driverId", "position"]
+        ),
+        "pit_stops": pd.DataFrame(
+            pit_stops, columns=["raceId", "driverId", "stop", "milliseconds"]
+        ),
+    }
@@ -0,0 +1,115 @@
+"""
+Microbenchmark for ``/predict`` latency on a single race.
+
+Compares the original DataFrame + ``predict_race_winner`` + ``iterrows`` handler
+against the array-based handler, both through the Flask test client.
+
+Usage:
+    python -m benchmarks.predict_latency --drivers 20 --iterations 2000
+"""
+
+import argparse
+import time
+import unittest.mock as mock
+
+import numpy as np
+import pandas as pd
+from flask import jsonify, request
+
+from benchmarks.fixtures import make_model_and_scalers, make_race_payload
+from src import api
+from src.predict_winner import predict_race_winner
+from src.registry import ModelHandle
+from src.scoring import compile_scoring_engine
+
+
+def make_legacy_view(model, scalers, feature_names):
+    """
+    Recreate the DataFrame-based ``/predict`` handler for comparison.
+    """
+
+    def legacy_predict():
+        data = request.get_json(force=True, silent=True)
+        race_data = pd.DataFrame(data["drivers"])
+        missing_features = [f for f in feature_names if f not in race_data.columns]
+        if missing_features:
+            return jsonify({"error": f"Missing features: {missing_features}"}), 400
+
+        predictions, winner = predict_race_winner(
+            race_data[feature_names], model, scalers, race_data
+        )
+        return jsonify(
+            {
+                "predicted_winner": {
+                    "full_name": winner.get("forename", "Unknown")
+                    + winner.get("surname", "Unknown"),
+                    "win_probability": float(winner["win_probability"]),
+                },
+                "all_predictions": [
+                    {
+                        "full_name": row.get("forename", "Unknown")
+                        + row.get("surname", "Unknown"),
+                        "win_probability": float(row["win_probability"]),
+                    }
+                    for _, row in predictions.iterrows()
+                ],
+            }
+        )
+
+    return legacy_predict
+
+
+def measure(client, path, payload, iterations, warmup):
+    """
+    Return per-request latencies in milliseconds.
+    """
+    for _ in range(warmup):
+        client.post(path, json=payload)
+
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        response = client.post(path, json=payload)
+        latencies[i] = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    model, scalers, feature_names = make_model_and_scalers()
+    engine = compile_scoring_engine(model, scalers, feature_names)
+    payload = make_race_payload(args.drivers)
+
+    api.app.add_url_rule(
+        "/_legacy_predict",
+        "legacy_predict",
+        make_legacy_view(model, scalers, feature_names),
+        methods=["POST"],
+    )
+    client = api.app.test_client()
+
+    with mock.patch.object(api, "model_handle", ModelHandle.for_engine(engine)):
+        results = {
+            "before (DataFrame + iterrows)": measure(
+                client, "/_legacy_predict", payload, args.iterations, args.warmup
+            ),
+            "after (NumPy + argsort)": measure(
+                client, "/predict", payload, args.iterations, args.warmup
+            ),
+        }
+
+    print(f"/predict latency, {args.drivers} drivers, {args.iterations} requests")
+    for name, latencies in results.items():
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"  {name:<30} p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Raw-data load benchmark: ``pd.read_csv`` of the Kaggle dump vs the typed
+Arrow cache from ``src.raw_cache``.
+
+Each mode loads the seven pipeline tables in a fresh interpreter and reports
+wall time, peak RSS (``ru_maxrss``, including the pandas/pyarrow imports) and
+the peak RSS growth during the load itself (Linux ``VmHWM`` after a reset):
+
+    notebook   full ``pd.read_csv`` per table with inferred dtypes
+    csv        ``load_raw_tables`` column-projected CSV parsing
+    cache      ``load_raw_tables`` memory-mapped, column-projected cache reads
+
+Uses ``--raw-dir`` when given, otherwise synthetic CSVs shaped like the full
+1950-present dump (all Kaggle columns, ``\\N`` nulls).
+
+Usage:
+    python -m benchmarks.raw_load --raw-dir data/raw
+    python -m benchmarks.raw_load --runs 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.fixtures import make_full_size_raw_tables
+from src.raw_cache import ingest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import json, os, resource, sys, time
+import pandas as pd
+from src.features import RAW_TABLES, load_raw_tables
+mode, raw_dir, cache_dir = sys.argv[1:4]
+import pyarrow
+def status_kb(field):
+    with open("/proc/self/status") as f:
+        return next(int(l.split()[1]) for l in f if l.startswith(field + ":"))
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")  # reset the peak RSS (VmHWM) to the current RSS
+rss_before = status_kb("VmRSS")
+start = time.perf_counter()
+if mode == "notebook":
+    tables = {{name: pd.read_csv(os.path.join(raw_dir, name + ".csv"))
+              for name in RAW_TABLES}}
+else:
+    tables = load_raw_tables(raw_dir, cache_dir=cache_dir if mode == "cache" else None)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "load_ms": elapsed * 1000,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "load_rss_mb": (status_kb("VmHWM") - rss_before) / 1024,
+    "frame_mb": sum(t.memory_usage(deep=True).sum() for t in tables.values()) / 2**20,
+}}))
+"""
+
+
+def add_kaggle_columns(tables, seed=0):
+    """
+    Pad the fixture tables with the remaining Kaggle columns, so CSV parsing
+    costs what it does on the real files.
+    """
+    rng = np.random.default_rng(seed)
+    races, results = tables["races"], tables["results"]
+    n_results = len(results)
+
+    races["name"] = [f"Grand Prix {c}" for c in races["circuitId"]]
+    races["date"] = [
+        f"{y}-05-{1 + r % 28:02d}"
+        for y, r in zip(races["year"], races["round"], strict=True)
+    ]
+    races["time"] = "\\N"
+    races["url"] = [
+        f"http://en.wikipedia.org/wiki/{y}_Grand_Prix_{r}"
+        for y, r in zip(races["year"], races["round"], strict=True)
+    ]
+    for session in ["fp1", "fp2", "fp3", "quali", "sprint"]:
+        races[f"{session}_date"] = "\\N"
+        races[f"{session}_time"] = "\\N"
+
+    results.insert(0, "resultId", np.arange(1, n_results + 1))
+    results["number"] = rng.integers(1, 99, n_results)
+    results["positionText"] = results["position"].fillna(-1).astype(int).astype(str)
+    results["positionOrder"] = rng.integers(1, 25, n_results)
+    results["laps"] = rng.integers(0, 78, n_results)
+    results["time"] = [f"+{s:.3f}" for s in rng.uniform(0, 90, n_results)]
+    results["milliseconds"] = rng.integers(5_000_000, 7_000_000, n_results)
+    results["fastestLap"] = rng.integers(1, 78, n_results)
+    results["rank"] = rng.integers(1, 25, n_results)
+    results["fastestLapTime"] = [f"1:{s:06.3f}" for s in rng.uniform(10, 40, n_results)]
+    results["fastestLapSpeed"] = rng.uniform(180, 250, n_results).round(3)
+    results["statusId"] = rng.integers(1, 140, n_results)
+
+    drivers = tables["drivers"]
+    drivers["driverRef"] = drivers["surname"].str.lower()
+    drivers["url"] = "http://en.wikipedia.org/wiki/" + drivers["surname"]
+    drivers["nationality"] = rng.choice(["British", "German", "Italian"], len(drivers))
+
+    qualifying = tables["qualifying"]
+    qualifying.insert(0, "qualifyId", np.arange(1, len(qualifying) + 1))
+    for session in ["q1", "q2", "q3"]:
+        qualifying[session] = [
+            f"1:{s:06.3f}" for s in rng.uniform(10, 40, len(qualifying))
+        ]
+
+    pit_stops = tables["pit_stops"]
+    pit_stops["lap"] = rng.integers(1, 78, len(pit_stops))
+    pit_stops["time"] = "14:05:27"
+    pit_stops["duration"] = (pit_stops["milliseconds"] / 1000).round(3).astype(str)
+    return tables
+
+
+def run_mode(mode, raw_dir, cache_dir):
+    """Load the tables in a fresh interpreter and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(), mode, raw_dir, cache_dir],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw CSV vs typed cache loading")
+    parser.add_argument("--raw-dir", default=None, help="Kaggle CSV directory")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_dir = args.raw_dir
+        if raw_dir is None:
+            raw_dir = os.path.join(tmp_dir, "raw")
+            os.makedirs(raw_dir)
+            for name, table in add_kaggle_columns(make_full_size_raw_tables()).items():
+                table.to_csv(
+                    os.path.join(raw_dir, f"{name}.csv"), index=False, na_rep="\\N"
+                )
+        cache_dir = os.path.join(tmp_dir, "cache")
+        ingest(raw_dir, cache_dir)
+
+        csv_mb = (
+            sum(os.path.getsize(os.path.join(raw_dir, f)) for f in os.listdir(raw_dir))
+            / 2**20
+        )
+        cache_mb = (
+            sum(
+                os.path.getsize(os.path.join(cache_dir, f))
+                for f in os.listdir(cache_dir)
+            )
+            / 2**20
+        )
+        print(f"Source: {args.raw_dir or 'synthetic Kaggle-shaped CSVs'}")
+        print(f"CSV {csv_mb:.1f} MB, cache {cache_mb:.1f} MB\n")
+        print(
+            f"{'mode':<10}{'load ms':>10}{'peak RSS MB':>14}"
+            f"{'load RSS MB':>14}{'frames MB':>12}"
+        )
+        for mode in ("notebook", "csv", "cache"):
+            runs = [run_mode(mode, raw_dir, cache_dir) for _ in range(args.runs)]
+            best = min(runs, key=lambda run: run["load_ms"])
+            print(
+                f"{mode:<10}{best['load_ms']:>10.1f}"
+                f"{max(run['peak_rss_mb'] for run in runs):>14.1f}"
+                f"{max(run['load_rss_mb'] for run in runs):>14.1f}"
+                f"{best['frame_mb']:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
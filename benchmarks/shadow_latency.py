@@ -0,0 +1,101 @@
+"""
+Benchmark for the primary-path cost of shadow scoring.
+
+Measures ``/predict`` latency through the Flask test client with shadowing off
+and with shadow models scoring every request in the background. The two modes
+run in alternating blocks so drift in machine load affects both equally. Each
+response is closed, as a WSGI server does, which is when the shadow work is
+queued.
+
+Usage:
+    python -m benchmarks.shadow_latency --drivers 20 --iterations 5000 --shadows 2
+"""
+
+import argparse
+import time
+import unittest.mock as mock
+
+import numpy as np
+
+from benchmarks.fixtures import make_model_and_scalers, make_race_payload
+from src import api
+from src.registry import ModelHandle
+from src.scoring import ScoringEngine, compile_scoring_engine
+from src.shadow import ShadowScorer
+
+BLOCK = 250
+
+
+def shadow_handles(engine, count):
+    """Return ``count`` candidate models with perturbed weights."""
+    rng = np.random.default_rng(0)
+    return [
+        ModelHandle.for_engine(
+            ScoringEngine(
+                engine.weights * rng.normal(1.0, 0.2, engine.n_features),
+                engine.intercept,
+                engine.feature_names,
+            ),
+            version=f"shadow-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def measure(client, payload, iterations):
+    """Return per-request latencies in milliseconds."""
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        response = client.post("/predict", json=payload)
+        response.close()
+        latencies[i] = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shadow scoring latency benchmark")
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--shadows", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = compile_scoring_engine(*make_model_and_scalers())
+    payload = make_race_payload(args.drivers)
+    client = api.app.test_client()
+    shadow = ShadowScorer()
+    handles = shadow_handles(engine, args.shadows)
+    results = {"off": [], f"on ({args.shadows} shadows)": []}
+
+    # Disable the response cache so every request scores the race
+    with mock.patch.object(api, "model_handle", ModelHandle.for_engine(engine)):
+        with mock.patch.object(api, "shadow", shadow):
+            with mock.patch.object(api.prediction_cache, "max_entries", 0):
+                for handles_on in ([], handles):
+                    shadow.set_shadows(handles_on)
+                    measure(client, payload, args.warmup)
+                for _ in range(max(1, args.iterations // BLOCK)):
+                    for name, handles_on in zip(results, ([], handles), strict=True):
+                        shadow.set_shadows(handles_on)
+                        results[name].append(measure(client, payload, BLOCK))
+                shadow.join()
+
+    print(f"/predict latency, {args.drivers} drivers, {args.iterations} requests")
+    for name, blocks in results.items():
+        p50, p99 = np.percentile(np.concatenate(blocks), [50, 99])
+        print(f"  shadow {name:<16} p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+    stats = shadow.stats()
+    print(f"  shadow submitted {stats['submitted']}, dropped {stats['dropped']}")
+    for row in stats["agreement"]:
+        print(
+            f"  {row['shadow_version']}: {row['races']} races, "
+            f"winner match {row['winner_match_rate']:.1%}, "
+            f"{row['shadow_ms_per_race']:.4f} ms/race"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Benchmark suite for the prediction and preprocessing hot paths.
+
+Runs every case on synthetic fixtures (offline, no Kaggle data or trained
+model needed), writes machine-readable results and optionally compares them
+against a stored baseline:
+
+    predict_race_winner[20|1k|100k]   DataFrame scaling + model.predict
+    api_predict[20]                   POST /predict through the Flask test client
+    load_model_and_scalers[cold]      fresh interpreter: imports + artifact load
+    calculate_win_probability_stats   summary stats over 20 predictions
+    data_utils_batch[100k]            batch validation, names and race stats
+    feature_pipeline                  build_features on Kaggle-shaped tables
+
+Each case reports the best and median time per call over repeated runs.
+With ``--baseline``, a case whose best time exceeds the baseline's by more
+than ``--tolerance`` (relative) is a regression and the exit code is 1.
+Baselines are machine-specific: record them on the machine that checks them.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.25
+    python -m benchmarks.suite --only predict_race_winner --quick
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import unittest.mock as mock
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from src.predict_winner import load_model_and_scalers
+load_model_and_scalers(sys.argv[1])
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+
+def time_calls(fn, repeat, number):
+    """Return the mean seconds per call of ``fn`` for each of ``repeat`` runs."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def bench_predict_race_winner(n_rows, quick):
+    from benchmarks.fixtures import (
+        make_feature_frame,
+        make_model_and_scalers,
+        make_race_payload,
+    )
+    from src.predict_winner import predict_race_winner
+
+    model, scalers, feature_names = make_model_and_scalers()
+    race = make_feature_frame(n_rows, seed=1)
+    names = make_race_payload(1)["drivers"][0]
+    original = race.assign(forename=names["forename"], surname=names["surname"])
+    number = max(1, 2000 // n_rows) if n_rows < 100_000 else 1
+    return time_calls(
+        lambda: predict_race_winner(race, model, scalers, original),
+        3 if quick else 7,
+        number,
+    )
+
+
+def bench_api_predict(n_drivers, quick):
+    from benchmarks.fixtures import make_model_and_scalers, make_race_payload
+    from src import api
+    from src.registry import ModelHandle
+    from src.scoring import compile_scoring_engine
+
+    engine = compile_scoring_engine(*make_model_and_scalers())
+    payload = make_race_payload(n_drivers)
+    client = api.app.test_client()
+
+    def request():
+        response = client.post("/predict", json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code}")
+
+    # Disable the response cache so every request scores the race
+    with mock.patch.object(api, "model_handle", ModelHandle.for_engine(engine)):
+        with mock.patch.object(api.prediction_cache, "max_entries", 0):
+            return time_calls(request, 3 if quick else 7, 100 if quick else 500)
+
+
+def write_legacy_artifacts(project_root):
+    """Write the joblib model, scalers and metadata ``load_model_and_scalers`` reads."""
+    import joblib
+
+    from benchmarks.fixtures import make_model_and_scalers
+
+    model, scalers, feature_names = make_model_and_scalers()
+    models_dir = os.path.join(project_root, "models")
+    processed_dir = os.path.join(project_root, "data", "processed")
+    os.makedirs(models_dir)
+    os.makedirs(processed_dir)
+    joblib.dump(model, os.path.join(models_dir, "f1_winner_linear_regression.joblib"))
+    with open(os.path.join(processed_dir, "scalers.pkl"), "wb") as f:
+        pickle.dump(scalers, f)
+    with open(os.path.join(processed_dir, "metadata.json"), "w") as f:
+        json.dump({"feature_names": feature_names}, f)
+
+
+def bench_cold_start(quick):
+    with tempfile.TemporaryDirectory() as artifacts:
+        write_legacy_artifacts(artifacts)
+        samples = []
+        for _ in range(3 if quick else 5):
+            output = subprocess.run(
+                [sys.executable, "-c", COLD_START, artifacts],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=PROJECT_ROOT,
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1])["seconds"])
+    return samples
+
+
+def bench_win_probability_stats(quick):
+    from benchmarks.fixtures import make_feature_frame
+    from src.data_utils import calculate_win_probability_stats
+
+    predictions = make_feature_frame(20).rename(
+        columns={"driver_win_rate": "win_probability"}
+    )
+    return time_calls(
+        lambda: calculate_win_probability_stats(predictions),
+        3 if quick else 7,
+        200 if quick else 1000,
+    )
+
+
+def bench_data_utils_batch(quick):
+    from benchmarks.data_utils_batch import batch, make_race_frame
+
+    frame = make_race_frame(100_000)
+    return time_calls(lambda: batch(frame), 3 if quick else 5, 1)
+
+
+def bench_feature_pipeline(quick):
+    from benchmarks.fixtures import make_full_size_raw_tables
+    from src.features import build_features
+
+    tables = make_full_size_raw_tables(first_year=2000 if quick else 1950)
+    return time_calls(lambda: build_features(tables, 1950), 3, 1)
+
+
+CASES = {
+    "predict_race_winner[20]": lambda quick: bench_predict_race_winner(20, quick),
+    "predict_race_winner[1k]": lambda quick: bench_predict_race_winner(1000, quick),
+    "predict_race_winner[100k]": lambda quick: bench_predict_race_winner(
+        100_000, quick
+    ),
+    "api_predict[20]": lambda quick: bench_api_predict(20, quick),
+    "load_model_and_scalers[cold]": bench_cold_start,
+    "calculate_win_probability_stats": bench_win_probability_stats,
+    "data_utils_batch[100k]": bench_data_utils_batch,
+    "feature_pipeline": bench_feature_pipeline,
+}
+
+
+def run_suite(only=None, quick=False, log=None):
+    """
+    Run the cases whose name matches the ``only`` regex (all by default).
+
+    Returns the results document written by ``--output``.
+    """
+    benchmarks = {}
+    for name, case in CASES.items():
+        if only and not re.search(only, name):
+            continue
+        samples = case(quick)
+        benchmarks[name] = {
+            "best_ms": min(samples) * 1000,
+            "median_ms": statistics.median(samples) * 1000,
+            "runs": len(samples),
+        }
+        if log is not None:
+            log(f"{name:<34} best {benchmarks[name]['best_ms']:10.3f} ms")
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "quick": quick,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare best times against a baseline results document.
+
+    Returns one row per benchmark in ``results``: ``(name, baseline_ms,
+    current_ms, ratio, status)`` with status ``ok``, ``faster``, ``regression``
+    or ``new`` (no baseline entry).
+    """
+    rows = []
+    for name, current in results["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            rows.append((name, None, current["best_ms"], None, "new"))
+            continue
+        ratio = current["best_ms"] / reference["best_ms"]
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, reference["best_ms"], current["best_ms"], ratio, status))
+    return rows
+
+
+def load_results(path):
+    """Read a results document and check its version."""
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(
+            f"{path}: unsupported results version {results.get('version')}"
+        )
+    return results
+
+
+def write_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Write results as the new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown before a case fails (default 0.25)",
+    )
+    parser.add_argument("--only", help="Regex selecting benchmark names")
+    parser.add_argument(
+        "--quick", action="store_true", help="Fewer runs and smaller fixtures"
+    )
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline) if args.baseline else None
+    if baseline is not None and baseline.get("quick") != args.quick:
+        parser.error("--quick must match the baseline's mode")
+    results = run_suite(
+        args.only, args.quick, log=lambda line: print(line, file=sys.stderr)
+    )
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            write_results(results, path)
+    if args.output is None and args.save_baseline is None:
+        print(json.dumps(results, indent=2))
+    if baseline is None:
+        return 0
+
+    rows = compare(results, baseline, args.tolerance)
+    print(
+        f"Baseline {args.baseline} ({baseline['created']}), tolerance {args.tolerance:.0%}"
+    )
+    for name, reference, current, ratio, status in rows:
+        if reference is None:
+            print(f"  {name:<34} {'':>12} {current:10.3f} ms  {'':>6}  {status}")
+        else:
+            print(
+                f"  {name:<34} {reference:10.3f} ms {current:10.3f} ms  "
+                f"{ratio:5.2f}x  {status}"
+            )
+    return 1 if any(row[4] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Microbenchmark for ``/predict`` request validation.
+
+Sends valid, malformed and oversized requests through the Flask test client,
+with the schema-compiled validator and body cap (after) and with the previous
+coerce-and-hope ``feature_matrix`` and no body cap (before). The status column
+shows what each request got back; before, string and NaN features were
+silently accepted.
+
+Usage:
+    python -m benchmarks.validation_latency --iterations 500
+"""
+
+import argparse
+import copy
+import json
+import time
+import unittest.mock as mock
+
+import numpy as np
+
+from benchmarks.fixtures import make_model_and_scalers, make_race_payload
+from src import api
+from src.registry import ModelHandle
+from src.scoring import compile_scoring_engine
+
+
+def legacy_feature_matrix(drivers, feature_names):
+    """The ``feature_matrix`` that predates the validator."""
+    if not isinstance(drivers, list):
+        return None, "Invalid input: 'drivers' field required"
+    if not drivers:
+        return None, "Invalid input: 'drivers' must not be empty"
+    try:
+        features = np.array(
+            [[driver[f] for f in feature_names] for driver in drivers],
+            dtype=np.float64,
+        )
+    except KeyError:
+        missing_features = [
+            f for f in feature_names if not all(f in driver for driver in drivers)
+        ]
+        return None, f"Missing features: {missing_features}"
+    except (TypeError, ValueError):
+        return None, "Invalid input: features must be numeric"
+    return features, None
+
+
+def make_cases(feature_names):
+    """Request bodies keyed by case name."""
+    valid = make_race_payload(20)
+    string = copy.deepcopy(valid)
+    string["drivers"][-1][feature_names[0]] = "0.2"
+    nan = copy.deepcopy(valid)
+    nan["drivers"][-1][feature_names[0]] = float("nan")
+    many = make_race_payload(2000)
+    huge = make_race_payload(8000)
+    return {
+        "valid[20]": valid,
+        "string feature": string,
+        "NaN feature": nan,
+        "drivers[2000]": many,
+        "body[8000]": huge,
+    }
+
+
+def measure(client, body, iterations):
+    """Return (status, per-request latencies in ms) for one request body."""
+    latencies = np.empty(iterations)
+    status = None
+    for i in range(iterations):
+        start = time.perf_counter()
+        response = client.post("/predict", data=body, content_type="application/json")
+        latencies[i] = (time.perf_counter() - start) * 1000
+        status = response.status_code
+    return status, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    model, scalers, feature_names = make_model_and_scalers()
+    engine = compile_scoring_engine(model, scalers, feature_names)
+    bodies = {
+        name: json.dumps(payload) for name, payload in make_cases(feature_names).items()
+    }
+    client = api.app.test_client()
+
+    modes = {
+        "before": [
+            mock.patch.object(api, "feature_matrix", legacy_feature_matrix),
+            mock.patch.dict(api.app.config, {"MAX_CONTENT_LENGTH": None}),
+        ],
+        "after": [],
+    }
+    with mock.patch.object(api, "model_handle", ModelHandle.for_engine(engine)):
+        api.validator_for(feature_names)
+        print(f"/predict validation, {args.iterations} requests per case")
+        for name, body in bodies.items():
+            line = f"  {name:<16} {len(body) / 1024:7.0f} KiB"
+            for mode, patches in modes.items():
+                for patch in patches:
+                    patch.start()
+                try:
+                    measure(client, body, max(1, args.iterations // 10))
+                    status, latencies = measure(client, body, args.iterations)
+                finally:
+                    for patch in patches:
+                        patch.stop()
+                line += f"   {mode} {status} p50 {np.median(latencies):8.3f} ms"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
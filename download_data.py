@@ -5,9 +5,11 @@ Download data from Kaggle
 This is a utility function to download dataset from Kaggle
 """
 
+import argparse
 import os
 
-from kaggle.api.kaggle_api_extended import KaggleApi
+from src.data_sync import kaggle_auth, sync
+from src.raw_cache import ingest
 
 
 def download_data():
@@ -21,6 +23,8 @@ def download_data():
         print("Please set KAGGLE_USERNAME and KAGGLE_KEY environment variables")
         return False
 
+    from kaggle.api.kaggle_api_extended import KaggleApi
+
     # Initialize Kaggle API
     api = KaggleApi()
 
@@ -42,11 +46,43 @@ def download_data():
     raw_files = os.listdir("data/raw")
     print(f"Downloaded files: {raw_files}")
 
+    # Convert the CSVs once into the typed columnar cache the pipeline reads
+    converted = ingest("data/raw", "data/cache")
+    print(f"Cached tables in data/cache/: {converted or 'unchanged'}")
+
+    return True
+
+
+def sync_data():
+    """
+    Incremental refresh: downloads the archive only if it changed (resuming
+    interrupted transfers), extracts and converts only the changed tables.
+    """
+    auth = kaggle_auth()
+    if auth is None:
+        print("Please set KAGGLE_USERNAME and KAGGLE_KEY environment variables")
+        return False
+
+    summary = sync(raw_dir="data/raw", cache_dir="data/cache", auth=auth)
+    if not summary["downloaded"]:
+        print("Dataset unchanged, nothing to do")
+    else:
+        print(f"Changed files: {summary['changed'] or 'none'}")
+        print(f"Converted tables: {summary['converted'] or 'none'}")
+
     return True
 
 
 if __name__ == "__main__":
-    success = download_data()
+    parser = argparse.ArgumentParser(description="Download the Kaggle F1 dataset")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="only fetch and convert what changed since the last run",
+    )
+    args = parser.parse_args()
+
+    success = sync_data() if args.sync else download_data()
 
     if success:
         print("\nData download complete!")
@@ -3,86 +3,832 @@ REST API for F1 winner predictions.
 """
 
 import logging
+import os
+import threading
+import time
 
-import pandas as pd
-from flask import Flask, jsonify, request
+import numpy as np
+from flask import Flask, g, jsonify, request
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 
 try:
-    from .predict_winner import load_model_and_scalers, predict_race_winner
+    from .cache import PredictionCache, canonical_key
+    from .calibration import (
+        DEFAULT_SAMPLES,
+        METHODS,
+        Calibration,
+        default_calibration_path,
+    )
+    from .data_utils import format_driver_name
+    from .drift import (
+        DEFAULT_WINDOW,
+        DRIFT_FILE,
+        DriftMonitor,
+        default_reference_path,
+        load_reference,
+    )
+    from .feature_table import FeatureTableLoader, default_table_path
+    from .metrics import (
+        CONTENT_TYPE,
+        REGISTRY,
+        observe_races,
+        observe_request,
+        stage_timer,
+    )
+    from .model_bundle import default_bundle_path, load_model_bundle
+    from .registry import ModelHandle, ModelRegistry, load_version
+    from .scoring import compile_scoring_engine, segment_order
+    from .shadow import ShadowScorer
+    from .validation import MAX_BODY_BYTES, validator_for
 except ImportError:
-    from predict_winner import load_model_and_scalers, predict_race_winner
+    from cache import PredictionCache, canonical_key
+    from calibration import (
+        DEFAULT_SAMPLES,
+        METHODS,
+        Calibration,
+        default_calibration_path,
+    )
+    from data_utils import format_driver_name
+    from drift import (
+        DEFAULT_WINDOW,
+        DRIFT_FILE,
+        DriftMonitor,
+        default_reference_path,
+        load_reference,
+    )
+    from feature_table import FeatureTableLoader, default_table_path
+    from metrics import (
+        CONTENT_TYPE,
+        REGISTRY,
+        observe_races,
+        observe_request,
+        stage_timer,
+    )
+    from model_bundle import default_bundle_path, load_model_bundle
+    from registry import ModelHandle, ModelRegistry, load_version
+    from scoring import compile_scoring_engine, segment_order
+    from shadow import ShadowScorer
+    from validation import MAX_BODY_BYTES, validator_for
 
 app = Flask(__name__)
+# Oversized bodies are rejected from Content-Length before they are read
+app.config["MAX_CONTENT_LENGTH"] = MAX_BODY_BYTES
 logging.basicConfig(level=logging.INFO)
 
-# Load model once at startup
-try:
-    model, scalers, feature_names = load_model_and_scalers()
+# The model serving new requests: one immutable ModelHandle (engine,
+# calibration, version), replaced by a single assignment on reload or hot-swap.
+# Handlers read it once per request (``request_model``), so a swap never mixes
+# two versions within one request.
+model_handle = None
+model_state, model_load_seconds = "not loaded", None
+_warmup_thread, _warmup_lock = None, threading.Lock()
+
+# Repeated payloads (dashboards polling between sessions) are served from here.
+# Set F1_CACHE_SIZE=0 to disable.
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get("F1_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.environ.get("F1_CACHE_TTL", "60")),
+)
+
+# Upper bound on Monte Carlo samples a request may ask for
+MAX_CALIBRATION_SAMPLES = 100_000
+# Upper bound on Plackett-Luce draws (samples x drivers, over all races) per
+# request, so one request cannot hold a worker for seconds
+MAX_CALIBRATION_DRAWS = int(os.environ.get("F1_MAX_CALIBRATION_DRAWS", "2000000"))
+
+# Precomputed per-race features for /predict/race, reloaded when republished
+feature_table = FeatureTableLoader(
+    os.environ.get("F1_FEATURE_TABLE") or default_table_path(),
+    check_interval=float(os.environ.get("F1_FEATURE_TABLE_CHECK", "5")),
+)
+
+# Versioned models directory watched for new versions (see src/registry.py)
+model_registry = (
+    ModelRegistry(
+        os.environ["F1_MODEL_REGISTRY"],
+        on_swap=lambda handle: activate_model(handle),
+        check_interval=float(os.environ.get("F1_MODEL_REGISTRY_CHECK", "10")),
+    )
+    if os.environ.get("F1_MODEL_REGISTRY")
+    else None
+)
+
+# Candidate versions scored alongside the primary model, off the request path.
+# F1_SHADOW_VERSIONS lists registry versions (comma separated).
+shadow = ShadowScorer()
+
+# Live feature histograms compared with the model's training reference (see
+# src/drift.py). F1_DRIFT=0 turns it off.
+DRIFT_ENABLED = os.environ.get("F1_DRIFT", "1") != "0"
+drift = DriftMonitor(window=int(os.environ.get("F1_DRIFT_WINDOW", str(DEFAULT_WINDOW))))
+
+REGISTRY.gauge(
+    "f1_model_load_seconds",
+    "Seconds the last successful model load took.",
+    lambda: model_load_seconds,
+)
+REGISTRY.gauge(
+    "f1_model_loaded",
+    "1 once a scoring engine is loaded.",
+    lambda: model_handle is not None,
+)
+REGISTRY.gauge(
+    "f1_drift_max_psi",
+    "Largest population stability index of the live features.",
+    lambda: drift.stats()["max_psi"] if drift.enabled else None,
+)
+REGISTRY.gauge(
+    "f1_prediction_cache_hits",
+    "Prediction cache hits.",
+    lambda: prediction_cache.stats()["hits"],
+)
+REGISTRY.gauge(
+    "f1_prediction_cache_misses",
+    "Prediction cache misses.",
+    lambda: prediction_cache.stats()["misses"],
+)
+REGISTRY.gauge(
+    "f1_prediction_cache_entries",
+    "Entries in the prediction cache.",
+    lambda: prediction_cache.stats()["size"],
+)
+
+
+def _load_legacy_artifacts():
+    """Load the joblib model, pickled scalers and metadata (imports sklearn)."""
+    try:
+        from .predict_winner import load_model_and_scalers
+    except ImportError:
+        from predict_winner import load_model_and_scalers
+
+    return load_model_and_scalers()
+
+
+def _load_engine():
+    """
+    Return ``(model, scalers, feature_names, engine)`` from the fixed paths.
+
+    Prefers the single-file model bundle (``F1_MODEL_BUNDLE`` or
+    ``models/f1_winner_model.bundle``), which needs only NumPy, and falls back
+    to the joblib model + pickled scalers.
+    """
+    bundle_path = os.environ.get("F1_MODEL_BUNDLE") or default_bundle_path()
+    if os.path.exists(bundle_path):
+        try:
+            compiled = load_model_bundle(bundle_path)
+        except Exception as e:
+            app.logger.error(f"Failed to load model bundle: {e}")
+        else:
+            app.logger.info(f"Model bundle loaded from {bundle_path}")
+            return None, None, compiled.feature_names, compiled
+
+    loaded = _load_legacy_artifacts()
     app.logger.info("Model loaded successfully")
-except Exception as e:
-    app.logger.error(f"Failed to load model: {e}")
-    model, scalers, feature_names = None, None, None
+    return (*loaded, compile_scoring_engine(*loaded))
+
+
+def activate_model(handle):
+    """Make ``handle`` serve new requests; running requests keep theirs."""
+    global model_handle, model_state, model_load_seconds
+
+    # Compile the request validator before the model takes traffic
+    validator_for(handle.engine.feature_names)
+    load_drift_reference(handle)
+    model_load_seconds = handle.load_seconds
+    model_handle = handle
+    model_state = "ready"
+    app.logger.info(f"Serving model version {handle.version}")
+
+
+def load_drift_reference(handle):
+    """
+    Point the drift monitor at ``handle``'s training reference: the registry
+    version's ``drift_reference.json``, else ``F1_DRIFT_REFERENCE`` or the one
+    in ``models/``. Without a reference the monitor is off.
+    """
+    reference = None
+    if DRIFT_ENABLED:
+        if handle.source:
+            path = os.path.join(handle.source, DRIFT_FILE)
+        else:
+            path = os.environ.get("F1_DRIFT_REFERENCE") or default_reference_path()
+        try:
+            reference = load_reference(path)
+        except FileNotFoundError:
+            app.logger.info(f"No drift reference at {path}, drift monitor off")
+        except (OSError, ValueError) as e:
+            app.logger.error(f"Failed to load drift reference: {e}")
+    drift.set_reference(reference, handle.engine.feature_names)
+
+
+def load_model():
+    """
+    Load the model and compile the scoring engine into ``model_handle``.
+
+    Nothing is loaded at import time: the servers call this (directly or via
+    ``start_model_warmup``) at startup, and again in the master process on
+    graceful reload. With ``F1_MODEL_REGISTRY`` set the registry's current
+    version is loaded; without a registry, or while it has no servable
+    version (the watcher keeps polling it), the bundle or joblib artifacts.
+    A failed load keeps the previously loaded model.
+    """
+    global model_state
+
+    if model_handle is None:
+        model_state = "loading"
+    if model_registry is not None:
+        model_registry.poll()
+        if model_registry.active_version is not None:
+            load_shadow_models()
+            feature_table.poll()
+            return True
+        app.logger.warning(
+            f"No servable registry version ({model_registry.last_error}); "
+            "loading the packaged model"
+        )
+
+    start = time.perf_counter()
+    try:
+        _, _, _, engine = _load_engine()
+        # Warm the scoring path before the engine takes traffic
+        engine.score(np.zeros((1, engine.n_features)))
+    except Exception as e:
+        app.logger.error(f"Failed to load model: {e}")
+        if model_handle is None:
+            model_state = "failed"
+        return False
+
+    try:
+        calibration = Calibration.load(
+            os.environ.get("F1_CALIBRATION") or default_calibration_path()
+        )
+    except (OSError, ValueError, KeyError) as e:
+        app.logger.error(f"Failed to load calibration, using temperature 1: {e}")
+        calibration = Calibration()
+    activate_model(
+        ModelHandle.for_engine(
+            engine, calibration, load_seconds=time.perf_counter() - start
+        )
+    )
+    feature_table.poll()
+    return True
+
+
+def load_shadow_models(versions=None):
+    """
+    Load the shadow versions (default: ``F1_SHADOW_VERSIONS``) from the registry.
+
+    Versions that fail to load are logged and left out. Returns the number of
+    shadow models now active.
+    """
+    if versions is None:
+        versions = [
+            v.strip() for v in os.environ.get("F1_SHADOW_VERSIONS", "").split(",")
+        ]
+    versions = [v for v in versions if v]
+    if versions and model_registry is None:
+        app.logger.error("F1_SHADOW_VERSIONS needs F1_MODEL_REGISTRY")
+        return 0
+
+    handles = []
+    for version in versions:
+        try:
+            handles.append(load_version(model_registry.root, version))
+        except Exception as e:
+            app.logger.error(f"Failed to load shadow version {version}: {e}")
+    shadow.set_shadows(handles)
+    return len(handles)
+
+
+def start_registry_watcher():
+    """
+    Poll ``F1_MODEL_REGISTRY`` for new versions in a background thread.
+
+    Call in every serving process (gunicorn workers after the fork); returns
+    None when no registry is configured.
+    """
+    if model_registry is None:
+        return None
+    return model_registry.start()
+
+
+def start_feature_table_watcher():
+    """
+    Check the feature table for republished snapshots in a background thread.
+
+    Call in every serving process (gunicorn workers after the fork); the
+    first snapshot is loaded with the model (``load_model``).
+    """
+    return feature_table.start()
+
+
+def request_model():
+    """
+    Return the ``ModelHandle`` for the current request (None if not loaded).
+
+    The first call in a request pins the handle, so every later read in the
+    same request, including the response's version header, sees the same
+    model even if a new version is activated meanwhile.
+    """
+    if "model_handle" not in g:
+        g.model_handle = model_handle
+    return g.model_handle
+
+
+def start_model_warmup():
+    """
+    Load the model in a background thread so ``/health`` answers immediately.
+
+    Returns the warm-up thread; repeated calls reuse the first one.
+    """
+    global _warmup_thread
+
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=load_model, name="model-warmup", daemon=True
+            )
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+def feature_matrix(drivers, feature_names):
+    """
+    Validate the JSON driver rows and build the ``(n_drivers, n_features)`` matrix.
+
+    Types and the driver count are checked against ``openapi.yaml`` and ranges
+    against ``FEATURE_RANGES`` (see ``src/validation.py``). Returns
+    ``(features, error)`` where ``error`` is None for a valid race.
+    """
+    return validator_for(feature_names).drivers(drivers)
+
+
+def ranked_predictions(drivers, probabilities, order, calibrated=None):
+    """
+    Format drivers in ranked order with their predicted scores.
+
+    With ``calibrated`` outputs (see ``calibrated_outputs``) the raw score moves
+    to ``score`` and the calibrated fields are added per driver.
+    """
+    predictions = []
+    for i in order:
+        prediction = {
+            "full_name": format_driver_name(drivers[i]),
+            "win_probability": probabilities[i],
+        }
+        if calibrated is not None:
+            prediction["score"] = probabilities[i]
+            for name, values in calibrated.items():
+                prediction[name] = values[i]
+        predictions.append(prediction)
+    return predictions
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def calibration_options(data):
+    """
+    Parse the optional ``calibrate``, ``samples`` and ``seed`` request fields.
+
+    Returns ``(options, error)``; ``options`` is None when no calibration was
+    requested.
+    """
+    method = data.get("calibrate")
+    if method is None:
+        return None, None
+    if method not in METHODS:
+        return None, f"Invalid input: 'calibrate' must be one of {list(METHODS)}"
+
+    samples = data.get("samples", DEFAULT_SAMPLES)
+    if not _is_int(samples) or not 0 < samples <= MAX_CALIBRATION_SAMPLES:
+        return None, (
+            "Invalid input: 'samples' must be an int between 1 and "
+            f"{MAX_CALIBRATION_SAMPLES}"
+        )
+    seed = data.get("seed")
+    if seed is not None and not (_is_int(seed) and seed >= 0):
+        return None, "Invalid input: 'seed' must be a non-negative int"
+    return {"method": method, "n_samples": samples, "seed": seed}, None
+
+
+def sampling_error(options, n_rows):
+    """
+    Return an error when ``plackett_luce`` sampling of ``n_rows`` drivers would
+    exceed ``MAX_CALIBRATION_DRAWS``, else None.
+    """
+    if options is None or options["method"] != "plackett_luce":
+        return None
+    if options["n_samples"] * n_rows > MAX_CALIBRATION_DRAWS:
+        return (
+            f"Invalid input: {options['n_samples']} samples over {n_rows} drivers "
+            f"exceeds {MAX_CALIBRATION_DRAWS} plackett_luce draws per request"
+        )
+    return None
+
+
+def calibrated_outputs(scores, offsets, options, calibration):
+    """
+    Calibrate the scores of one or more races in a single vectorized pass.
+
+    Returns one ``{name: per-driver list}`` dict per race, or None without
+    ``options``. Finishing-position distributions are trimmed to race size.
+    """
+    if options is None:
+        return None
+    outputs = calibration.calibrate(scores, offsets, **options)
+
+    races = []
+    for start, stop in zip(offsets[:-1], offsets[1:], strict=True):
+        race = {name: values[start:stop] for name, values in outputs.items()}
+        if "position_probabilities" in race:
+            race["position_probabilities"] = race["position_probabilities"][
+                :, : stop - start
+            ]
+        races.append({name: values.tolist() for name, values in race.items()})
+    return races
+
+
+def cached_scores(engine, features):
+    """
+    Score a race, reusing cached scores for an identical set of drivers.
+
+    Scores are cached in canonical row order under the engine fingerprint, so
+    reordered payloads hit and a reloaded model never sees stale entries.
+    """
+    if not prediction_cache.enabled:
+        return engine.score(features)
+
+    key, order = canonical_key(features)
+    canonical_scores = prediction_cache.get(key, engine.fingerprint)
+    if canonical_scores is None:
+        scores = engine.score(features)
+        prediction_cache.put(key, engine.fingerprint, scores[order])
+        return scores
+
+    scores = np.empty_like(canonical_scores)
+    scores[order] = canonical_scores
+    return scores
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    handle = g.get("model_handle", model_handle)
+    if handle is not None and handle.version is not None:
+        response.headers["X-Model-Version"] = str(handle.version)
+    start = g.get("request_start")
+    if start is not None:
+        rule = request.url_rule.rule if request.url_rule else "unmatched"
+        observe_request(rule, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def _serialize(timer, payload, status=200):
+    """``jsonify`` the payload and record the time as the serialize stage."""
+    response = jsonify(payload)
+    response.status_code = status
+    timer.stage("serialize")
+    return response
+
+
+def _with_monitors(response, handle, features, offsets, scores):
+    """
+    Queue shadow scoring of this request and count its features in the drift
+    histograms once the response has been sent.
+    """
+    if shadow.enabled:
+        response.call_on_close(lambda: shadow.submit(handle, features, offsets, scores))
+    if drift.enabled:
+        response.call_on_close(
+            lambda: drift.update(features, handle.engine.feature_names)
+        )
+    return response
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def body_too_large(e):
+    """Answer oversized request bodies (``F1_MAX_BODY_BYTES``) in JSON."""
+    return (
+        jsonify(
+            {"error": f"Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes"}
+        ),
+        413,
+    )
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return REGISTRY.expose(), 200, {"Content-Type": CONTENT_TYPE}
 
 
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint."""
-    return jsonify({"status": "healthy", "model_loaded": model is not None})
+    handle = request_model()
+    return jsonify(
+        {
+            "status": "healthy",
+            "model_loaded": handle is not None,
+            "model_state": model_state,
+            "model_version": handle and handle.version,
+            "model": handle and handle.describe(),
+            "registry": model_registry and model_registry.stats(),
+            "cache": prediction_cache.stats(),
+            "feature_table": feature_table.stats(),
+            "calibration": (handle.calibration if handle else Calibration()).to_dict(),
+        }
+    )
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness endpoint: 200 once the scoring engine can serve predictions."""
+    handle = request_model()
+    if handle is None:
+        return (
+            jsonify(
+                {
+                    "status": "not ready",
+                    "model_loaded": False,
+                    "model_state": model_state,
+                }
+            ),
+            503,
+        )
+    return jsonify(
+        {
+            "status": "ready",
+            "model_loaded": True,
+            "model_state": "ready",
+            "model_version": handle.version,
+        }
+    )
 
 
 @app.route("/predict", methods=["POST"])
 def predict():
     """Predict race winner from JSON data."""
     try:
-        if model is None:
+        handle = request_model()
+        if handle is None:
             return jsonify({"error": "Model not loaded"}), 500
+        engine = handle.engine
 
+        timer = stage_timer("/predict")
         data = request.get_json(force=True, silent=True)
+        timer.stage("parse")
         if data is None:
             return jsonify({"error": "Invalid JSON data"}), 400
         if not data or "drivers" not in data:
             return jsonify({"error": "Invalid input: 'drivers' field required"}), 400
 
-        # Convert to DataFrame
-        race_data = pd.DataFrame(data["drivers"])
+        drivers = data["drivers"]
+        features, error = feature_matrix(drivers, engine.feature_names)
+        if error is None:
+            options, error = calibration_options(data)
+        if error is None:
+            error = sampling_error(options, len(features))
+        if error is not None:
+            return jsonify({"error": error}), 400
+        timer.stage("features")
+        observe_races([len(features)])
 
-        # Validate required features
-        missing_features = [f for f in feature_names if f not in race_data.columns]
-        if missing_features:
-            return jsonify({"error": f"Missing features: {missing_features}"}), 400
+        scores = cached_scores(engine, features)
+        timer.stage("score")
+        calibrated = calibrated_outputs(
+            scores, [0, len(scores)], options, handle.calibration
+        )
+        timer.stage("calibrate")
 
-        # Make prediction
-        predictions, winner = predict_race_winner(
-            race_data[feature_names], model, scalers, race_data
+        # Stable descending order keeps the first maximum as the winner
+        order = np.argsort(-scores, kind="stable").tolist()
+        all_predictions = ranked_predictions(
+            drivers, scores.tolist(), order, calibrated and calibrated[0]
         )
+        timer.stage("rank")
 
-        # Format response
         result = {
-            "predicted_winner": {
-                "full_name": winner.get("forename", "Unknown")
-                + winner.get("surname", "Unknown"),
-                "win_probability": float(winner["win_probability"]),
-            },
-            "all_predictions": [
-                {
-                    "full_name": row.get("forename", "Unknown")
-                    + row.get("surname", "Unknown"),
-                    "win_probability": float(row["win_probability"]),
-                }
-                for _, row in predictions.iterrows()
-            ],
+            "predicted_winner": dict(all_predictions[0]),
+            "all_predictions": all_predictions,
+            "model_version": handle.version,
         }
 
-        return jsonify(result)
+        return _with_monitors(
+            _serialize(timer, result), handle, features, [0, len(scores)], scores
+        )
 
+    except HTTPException:
+        # e.g. 413 for an oversized body, answered by its error handler
+        raise
     except Exception as e:
         app.logger.error(f"Prediction error: {e}")
-        # Check if it's a request parsing error
-        if "400 Bad Request" in str(e) or "JSON" in str(e):
-            return jsonify({"error": "Invalid request format"}), 400
         return jsonify({"error": str(e)}), 500
 
 
+def _id_list(values):
+    """Return ``values`` as a list of ints, or None if it is not one."""
+    if not isinstance(values, list) or not values:
+        return None
+    if not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return None
+    return values
+
+
+@app.route("/predict/race", methods=["POST"])
+def predict_race():
+    """Predict a race winner from driver IDs using server-side features."""
+    handle = request_model()
+    if handle is None:
+        return jsonify({"error": "Model not loaded"}), 500
+    engine = handle.engine
+    table = feature_table.get()
+    if table is None:
+        return jsonify({"error": "Feature table not available"}), 503
+
+    timer = stage_timer("/predict/race")
+    data = request.get_json(force=True, silent=True)
+    timer.stage("parse")
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid JSON data"}), 400
+
+    options, error = calibration_options(data)
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    race_id = data.get("race_id")
+    driver_ids = data.get("driver_ids")
+    if driver_ids is not None and _id_list(driver_ids) is None:
+        return (
+            jsonify({"error": "Invalid input: 'driver_ids' must be a list of ints"}),
+            400,
+        )
+
+    if race_id is None:
+        if driver_ids is None:
+            return (
+                jsonify({"error": "Invalid input: 'race_id' or 'driver_ids' required"}),
+                400,
+            )
+        # No race given: score each driver's latest known features
+        rows, missing = table.latest_rows(driver_ids)
+    elif isinstance(race_id, int) and not isinstance(race_id, bool):
+        try:
+            rows, missing = table.race_rows(race_id, driver_ids)
+        except KeyError:
+            return jsonify({"error": f"Unknown race_id: {race_id}"}), 404
+    else:
+        return jsonify({"error": "Invalid input: 'race_id' must be an int"}), 400
+
+    if missing:
+        return jsonify({"error": f"Unknown driver_ids: {missing}"}), 404
+
+    try:
+        features = table.matrix(rows, engine.feature_names)
+    except KeyError as e:
+        return jsonify({"error": f"Feature table lacks feature {e}"}), 500
+    error = sampling_error(options, len(features))
+    if error is not None:
+        return jsonify({"error": error}), 400
+    timer.stage("features")
+    observe_races([len(features)])
+
+    scores = cached_scores(engine, features)
+    timer.stage("score")
+    calibrated = calibrated_outputs(
+        scores, [0, len(scores)], options, handle.calibration
+    )
+    timer.stage("calibrate")
+    order = np.argsort(-scores, kind="stable").tolist()
+    drivers = [table.names[row] for row in rows]
+    all_predictions = ranked_predictions(
+        drivers, scores.tolist(), order, calibrated and calibrated[0]
+    )
+    for prediction, i in zip(all_predictions, order, strict=True):
+        prediction["driver_id"] = table.driver_ids[rows[i]]
+    timer.stage("rank")
+
+    response = _serialize(
+        timer,
+        {
+            "race_id": race_id,
+            "predicted_winner": dict(all_predictions[0]),
+            "all_predictions": all_predictions,
+            "model_version": handle.version,
+        },
+    )
+    return _with_monitors(response, handle, features, [0, len(scores)], scores)
+
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """Predict winners for many races in one vectorized pass."""
+    handle = request_model()
+    if handle is None:
+        return jsonify({"error": "Model not loaded"}), 500
+    engine = handle.engine
+
+    timer = stage_timer("/predict/batch")
+    data = request.get_json(force=True, silent=True)
+    timer.stage("parse")
+    if data is None:
+        return jsonify({"error": "Invalid JSON data"}), 400
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid input: 'races' field required"}), 400
+    error = validator_for(engine.feature_names).races(data.get("races"))
+    if error is None:
+        options, error = calibration_options(data)
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    races = data["races"]
+    results = [None] * len(races)
+    valid_races, matrices, offsets = [], [], [0]
+
+    for i, race in enumerate(races):
+        if not isinstance(race, dict):
+            results[i] = {
+                "race_id": i,
+                "error": "Invalid input: race must be an object",
+            }
+            continue
+        race_id = race.get("race_id", i)
+        features, error = feature_matrix(race.get("drivers"), engine.feature_names)
+        if error is not None:
+            results[i] = {"race_id": race_id, "error": error}
+            continue
+        valid_races.append((i, race_id, race["drivers"]))
+        matrices.append(features)
+        offsets.append(offsets[-1] + len(features))
+    error = sampling_error(options, offsets[-1])
+    if error is not None:
+        return jsonify({"error": error}), 400
+    timer.stage("features")
+    observe_races([len(features) for features in matrices], batch=True)
+
+    if valid_races:
+        offsets = np.asarray(offsets)
+        features = np.concatenate(matrices)
+        scores = engine.score(features)
+        timer.stage("score")
+        # One calibration pass over every race in the batch
+        calibrated = calibrated_outputs(scores, offsets, options, handle.calibration)
+        timer.stage("calibrate")
+        order = segment_order(scores, offsets)
+        probabilities = scores.tolist()
+
+        for race_num, (i, race_id, drivers) in enumerate(valid_races):
+            start, stop = offsets[race_num], offsets[race_num + 1]
+            all_predictions = ranked_predictions(
+                drivers,
+                probabilities[start:stop],
+                (order[start:stop] - start).tolist(),
+                calibrated and calibrated[race_num],
+            )
+            results[i] = {
+                "race_id": race_id,
+                "predicted_winner": dict(all_predictions[0]),
+                "all_predictions": all_predictions,
+            }
+        timer.stage("rank")
+
+    response = _serialize(
+        timer,
+        {
+            "results": results,
+            "races_scored": len(valid_races),
+            "races_failed": len(races) - len(valid_races),
+            "model_version": handle.version,
+        },
+    )
+    if valid_races:
+        _with_monitors(response, handle, features, offsets, scores)
+    return response
+
+
+@app.route("/shadow", methods=["GET"])
+def shadow_stats():
+    """Agreement between the shadow models and the primary model."""
+    handle = request_model()
+    return jsonify({"primary_version": handle and handle.version, **shadow.stats()})
+
+
+@app.route("/drift", methods=["GET"])
+def drift_stats():
+    """Drift of the live feature distributions from the training reference."""
+    handle = request_model()
+    return jsonify({"model_version": handle and handle.version, **drift.stats()})
+
+
 if __name__ == "__main__":
+    start_model_warmup()
+    start_registry_watcher()
+    start_feature_table_watcher()
     app.run(host="0.0.0.0", port=9010)
     # app.run(host='127.0.0.1', port=9010)   # Local only
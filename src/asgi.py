@@ -0,0 +1,283 @@
+"""
+Async serving mode for the F1 prediction API.
+
+A minimal ASGI app whose ``/predict`` coalesces concurrent single-race requests
+into micro-batches (see ``microbatch.MicroBatcher``). Useful for bursty traffic
+such as a qualifying session, where many small requests land together.
+
+Usage:
+    python -m src.asgi --max-batch-size 64 --max-wait-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+try:
+    from . import api
+    from .metrics import (
+        CONTENT_TYPE,
+        REGISTRY,
+        observe_races,
+        observe_request,
+        stage_timer,
+    )
+    from .microbatch import MicroBatcher
+    from .validation import MAX_BODY_BYTES
+except ImportError:
+    import api
+    from metrics import (
+        CONTENT_TYPE,
+        REGISTRY,
+        observe_races,
+        observe_request,
+        stage_timer,
+    )
+    from microbatch import MicroBatcher
+    from validation import MAX_BODY_BYTES
+
+MAX_BATCH_SIZE = int(os.environ.get("F1_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.environ.get("F1_MAX_WAIT_MS", "2.0"))
+
+
+def _score(features):
+    return api.model_handle.engine.score(features)
+
+
+batcher = MicroBatcher(_score, MAX_BATCH_SIZE, MAX_WAIT_MS)
+REGISTRY.add_histogram(
+    "f1_microbatch_races", "Races per coalesced micro-batch.", batcher.batch_sizes
+)
+REGISTRY.add_histogram(
+    "f1_microbatch_queue_depth",
+    "Races already queued when a request arrives.",
+    batcher.queue_depths,
+)
+
+
+async def health(body):
+    """Health check endpoint."""
+    handle = api.model_handle
+    return {
+        "status": "healthy",
+        "model_loaded": handle is not None,
+        "model_state": api.model_state,
+        "model_version": handle and handle.version,
+        "registry": api.model_registry and api.model_registry.stats(),
+    }, 200
+
+
+async def ready(body):
+    """Readiness endpoint: 200 once the scoring engine can serve predictions."""
+    handle = api.model_handle
+    if handle is None:
+        return {
+            "status": "not ready",
+            "model_loaded": False,
+            "model_state": api.model_state,
+        }, 503
+    return {
+        "status": "ready",
+        "model_loaded": True,
+        "model_state": "ready",
+        "model_version": handle.version,
+    }, 200
+
+
+async def predict(body):
+    """Predict race winner, scored together with concurrent requests."""
+    # Read once: the whole request uses this version even across a hot-swap
+    handle = api.model_handle
+    if handle is None:
+        return {"error": "Model not loaded"}, 500
+
+    timer = stage_timer("/predict")
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return {"error": "Invalid JSON data"}, 400
+    timer.stage("parse")
+    if not isinstance(data, dict) or "drivers" not in data:
+        return {"error": "Invalid input: 'drivers' field required"}, 400
+
+    drivers = data["drivers"]
+    features, error = api.feature_matrix(drivers, handle.engine.feature_names)
+    if error is None:
+        options, error = api.calibration_options(data)
+    if error is None:
+        error = api.sampling_error(options, len(features))
+    if error is not None:
+        return {"error": error}, 400
+    timer.stage("features")
+    observe_races([len(features)])
+
+    # Includes the wait for the micro-batch window
+    scores, order = await batcher.submit(features, handle.engine)
+    timer.stage("score")
+    args = (scores, [0, len(scores)], options, handle.calibration)
+    if options is not None and options["method"] == "plackett_luce":
+        # Sampling can take a while: keep it off the event loop so the
+        # coalesced requests behind it are not stalled
+        calibrated = await asyncio.get_running_loop().run_in_executor(
+            None, api.calibrated_outputs, *args
+        )
+    else:
+        calibrated = api.calibrated_outputs(*args)
+    timer.stage("calibrate")
+    all_predictions = api.ranked_predictions(
+        drivers, scores.tolist(), order.tolist(), calibrated and calibrated[0]
+    )
+    timer.stage("rank")
+    if api.drift.enabled:
+        api.drift.update(features, handle.engine.feature_names)
+
+    return {
+        "predicted_winner": dict(all_predictions[0]),
+        "all_predictions": all_predictions,
+        "model_version": handle.version,
+    }, 200
+
+
+async def batching_metrics(body):
+    """Queue depth and batch-size histograms for tuning the batching window."""
+    return batcher.stats(), 200
+
+
+async def drift(body):
+    """Drift of the live feature distributions from the training reference."""
+    handle = api.model_handle
+    return {"model_version": handle and handle.version, **api.drift.stats()}, 200
+
+
+async def metrics(body):
+    """Prometheus text exposition of this process's metrics."""
+    return REGISTRY.expose(), 200
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/ready"): ready,
+    ("POST", "/predict"): predict,
+    ("GET", "/metrics"): metrics,
+    ("GET", "/metrics/batching"): batching_metrics,
+    ("GET", "/drift"): drift,
+}
+
+
+def _declared_length(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _read_body(receive, limit):
+    """Read the request body; None once it grows past ``limit`` bytes."""
+    chunks, size = [], 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def _send_json(send, payload, status, path=None):
+    # str payloads (the metrics exposition) are sent as plain text
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), CONTENT_TYPE.encode()
+    else:
+        timer = stage_timer(path) if path else None
+        body, content_type = json.dumps(payload).encode(), b"application/json"
+        if timer is not None:
+            timer.stage("serialize")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            api.start_model_warmup()
+            api.start_registry_watcher()
+            api.start_feature_table_watcher()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await batcher.stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    start = time.perf_counter()
+    path = scope["path"]
+    handler = ROUTES.get((scope["method"], path))
+    if handler is None:
+        await _send_json(send, {"error": "Not found"}, 404)
+        observe_request("unmatched", 404, time.perf_counter() - start)
+        return
+
+    # Oversized bodies are refused before (or while) they are read
+    declared = _declared_length(scope)
+    body = None
+    if declared is None or declared <= MAX_BODY_BYTES:
+        body = await _read_body(receive, MAX_BODY_BYTES)
+    if body is None:
+        await _send_json(
+            send, {"error": f"Request body exceeds {MAX_BODY_BYTES} bytes"}, 413
+        )
+        observe_request(path, 413, time.perf_counter() - start)
+        return
+
+    try:
+        payload, status = await handler(body)
+    except Exception as e:
+        api.app.logger.error(f"Prediction error: {e}")
+        payload, status = {"error": str(e)}, 500
+    await _send_json(send, payload, status, path if status == 200 else None)
+    observe_request(path, status, time.perf_counter() - start)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the async F1 prediction API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 9010)))
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    batcher.max_batch_size = args.max_batch_size
+    batcher.max_wait = args.max_wait_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
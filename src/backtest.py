@@ -0,0 +1,342 @@
+"""
+Walk-forward backtest of the winner model over historical seasons.
+
+Replays every race in chronological order. The model that scores a race is
+fitted only on the races before it (imputation medians included), then the race
+is scored and its top-1 / top-3 hit and log-loss are recorded. With
+``refit="season"`` the model is refitted once per season instead, which matches
+the notebook's train-on-earlier-seasons split.
+
+By default the features are built with ``pre_race=True``, so the recent form
+windows do not see the race being predicted. ``num_pit_stops`` is still the
+race-day value, as in the trained model.
+
+Seasons are independent folds and run in a process pool. The feature matrix,
+targets and race boundaries are placed in shared memory once, and every worker
+maps the same pages instead of unpickling its own copy.
+
+Usage:
+    python -m src.backtest --raw-dir data/raw --workers 4
+    python -m src.backtest --refit season --first-season 2014
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+try:
+    from .features import (
+        FEATURE_COLUMNS,
+        FROM_YEAR,
+        LOW_IMPACT_FEATURES,
+        RACE_WINDOW_SIZE,
+        build_features,
+        load_raw_tables,
+    )
+    from .scoring import compile_scoring_engine, segment_normalize, segment_order
+except ImportError:
+    from features import (
+        FEATURE_COLUMNS,
+        FROM_YEAR,
+        LOW_IMPACT_FEATURES,
+        RACE_WINDOW_SIZE,
+        build_features,
+        load_raw_tables,
+    )
+    from scoring import compile_scoring_engine, segment_normalize, segment_order
+
+MODEL_FEATURES = [f for f in FEATURE_COLUMNS if f not in LOW_IMPACT_FEATURES]
+REFIT_MODES = ("race", "season")
+# Regression outputs below this are treated as this share before normalizing
+PROBABILITY_FLOOR = 1e-3
+
+
+def backtest_arrays(race_data, feature_names=MODEL_FEATURES):
+    """
+    Pack the race rows into the flat arrays the folds read.
+
+    Rows are ordered chronologically and each race is contiguous, so the
+    training rows for a race are always a prefix of the arrays.
+    """
+    order = np.lexsort(
+        (
+            race_data["raceId"].to_numpy(),
+            race_data["round"].to_numpy(),
+            race_data["year"].to_numpy(),
+        )
+    )
+    race_ids = race_data["raceId"].to_numpy()[order]
+    starts = np.flatnonzero(np.r_[True, race_ids[1:] != race_ids[:-1]])
+
+    return {
+        "features": np.ascontiguousarray(
+            race_data[feature_names].to_numpy(dtype=np.float64)[order]
+        ),
+        "is_winner": race_data["is_winner"].to_numpy(dtype=np.int8)[order],
+        "offsets": np.append(starts, len(order)).astype(np.int64),
+        "race_id": race_ids[starts].astype(np.int64),
+        "year": race_data["year"].to_numpy()[order][starts].astype(np.int64),
+        "round": race_data["round"].to_numpy()[order][starts].astype(np.int64),
+    }
+
+
+class SharedArrays:
+    """
+    Copies named arrays into shared memory blocks for the pool workers.
+
+    ``specs`` describes the blocks and is all a worker needs to attach. The
+    blocks are unlinked when the context exits.
+    """
+
+    def __init__(self, arrays):
+        self.blocks = []
+        self.specs = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    @staticmethod
+    def attach(specs):
+        """
+        Map blocks described by ``specs`` as read-only arrays.
+
+        Returns ``(blocks, arrays)``; keep ``blocks`` alive while the arrays
+        are in use.
+        """
+        blocks, arrays = [], {}
+        for name, (block_name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+            array.setflags(write=False)
+            blocks.append(block)
+            arrays[name] = array
+        return blocks, arrays
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+_worker_blocks = []
+_worker_arrays = {}
+
+
+def _attach(specs):
+    """Pool initializer: map the shared blocks in this worker."""
+    blocks, arrays = SharedArrays.attach(specs)
+    _worker_blocks.extend(blocks)
+    _worker_arrays.update(arrays)
+
+
+def _run_shared_fold(args):
+    return evaluate_season(_worker_arrays, *args)
+
+
+def column_medians(features):
+    """
+    Per-column medians ignoring NaN, the fold's imputation values.
+
+    Columns with no values yet (e.g. pit stops before 2011) get 0.
+    """
+    medians = np.zeros(features.shape[1])
+    observed = (~np.isnan(features)).any(axis=0)
+    if observed.any():
+        medians[observed] = np.nanmedian(features[:, observed], axis=0)
+    return medians
+
+
+def fit_fold(features, is_winner, feature_names=MODEL_FEATURES):
+    """
+    Fit the linear model on one fold's training rows.
+
+    Returns ``(engine, medians)``. The mixed scalers are affine and an OLS fit
+    with an intercept makes the same predictions on affinely rescaled features,
+    so the fold fits on the imputed, unscaled features directly.
+    """
+    medians = column_medians(features)
+    imputed = np.where(np.isnan(features), medians, features)
+
+    model = LinearRegression().fit(imputed, is_winner)
+    return compile_scoring_engine(model, {}, feature_names), medians
+
+
+def race_metrics(scores, is_winner, offsets, probabilities=None):
+    """
+    Per-race winner rank, top-1 / top-3 hits and log-loss.
+
+    Without ``probabilities``, scores are turned into win probabilities by
+    clipping at ``PROBABILITY_FLOOR`` and normalizing within each race. Races
+    without a recorded winner get a rank of -1 and NaN metrics.
+    """
+    offsets = np.asarray(offsets)
+    lengths = np.diff(offsets)
+    order = segment_order(scores, offsets)
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[order] = np.arange(len(scores)) - np.repeat(offsets[:-1], lengths)
+    if probabilities is None:
+        probabilities = segment_normalize(scores, offsets, floor=PROBABILITY_FLOOR)
+
+    winners = is_winner.astype(bool)
+    race_of_row = np.repeat(np.arange(len(lengths)), lengths)
+    has_winner = np.zeros(len(lengths), dtype=bool)
+    has_winner[race_of_row[winners]] = True
+
+    winner_rank = np.full(len(lengths), -1, dtype=np.int64)
+    winner_rank[race_of_row[winners]] = ranks[winners]
+    log_loss = np.full(len(lengths), np.nan)
+    log_loss[race_of_row[winners]] = -np.log(probabilities[winners])
+
+    return {
+        "drivers": lengths,
+        "winner_rank": winner_rank,
+        "top1": np.where(has_winner, winner_rank == 0, np.nan),
+        "top3": np.where(has_winner, (winner_rank >= 0) & (winner_rank < 3), np.nan),
+        "log_loss": log_loss,
+    }
+
+
+def evaluate_season(arrays, season, refit="race"):
+    """
+    Replay one season and return its per-race results as a dict of arrays.
+
+    Every race is scored by a model fitted on the rows before it (or before
+    the season's first race with ``refit="season"``).
+    """
+    offsets = arrays["offsets"]
+    races = np.flatnonzero(arrays["year"] == season)
+    if refit == "season":
+        folds = [races]
+    else:
+        folds = [races[i : i + 1] for i in range(len(races))]
+
+    scores = []
+    train_rows = []
+    for fold in folds:
+        first, last = offsets[fold[0]], offsets[fold[-1] + 1]
+        engine, medians = fit_fold(
+            arrays["features"][:first], arrays["is_winner"][:first]
+        )
+        features = arrays["features"][first:last]
+        scores.append(engine.score(np.where(np.isnan(features), medians, features)))
+        train_rows.extend([first] * len(fold))
+
+    race_offsets = offsets[races[0] : races[-1] + 2] - offsets[races[0]]
+    winners = arrays["is_winner"][offsets[races[0]] : offsets[races[-1] + 1]]
+    results = race_metrics(np.concatenate(scores), winners, race_offsets)
+    results.update(
+        {
+            "race_id": arrays["race_id"][races],
+            "year": arrays["year"][races],
+            "round": arrays["round"][races],
+            "train_rows": np.asarray(train_rows, dtype=np.int64),
+        }
+    )
+    return results
+
+
+def run_backtest(race_data, first_season=None, refit="race", workers=None):
+    """
+    Walk forward over every season from ``first_season`` and return a frame with
+    one row per race.
+
+    Seasons before ``first_season`` are history only; the first season in
+    ``race_data`` is never scored. ``workers=1`` runs in-process.
+    """
+    if refit not in REFIT_MODES:
+        raise ValueError(f"refit must be one of {REFIT_MODES}, got {refit!r}")
+
+    arrays = backtest_arrays(race_data)
+    # The first season has no earlier history to train on
+    seasons = np.unique(arrays["year"])[1:]
+    if first_season is not None:
+        seasons = seasons[seasons >= first_season]
+    seasons = [int(season) for season in seasons]
+    if not seasons:
+        raise ValueError("No seasons with earlier history to backtest")
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [(season, refit) for season in seasons]
+    if workers == 1 or len(tasks) == 1:
+        folds = [evaluate_season(arrays, *task) for task in tasks]
+    else:
+        with (
+            SharedArrays(arrays) as shared,
+            ProcessPoolExecutor(
+                max_workers=min(workers, len(tasks)),
+                initializer=_attach,
+                initargs=(shared.specs,),
+            ) as pool,
+        ):
+            folds = list(pool.map(_run_shared_fold, tasks))
+
+    results = pd.concat([pd.DataFrame(fold) for fold in folds], ignore_index=True)
+    columns = ["year", "round", "race_id", "drivers", "train_rows", "winner_rank"]
+    return results[columns + ["top1", "top3", "log_loss"]]
+
+
+def season_report(results):
+    """
+    Aggregate per-race results by season, with an ``all`` row at the end.
+
+    Races without a recorded winner are counted but left out of the metrics.
+    """
+    scored = results[results["winner_rank"] >= 0]
+    metrics = ["top1", "top3", "log_loss"]
+    report = scored.groupby("year")[metrics].mean()
+    report.insert(0, "races", results.groupby("year").size())
+    report.index = report.index.astype(str)
+
+    overall = scored[metrics].mean()
+    report.loc["all"] = [len(results), *overall]
+    report["races"] = report["races"].astype(int)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest by season")
+    parser.add_argument("--raw-dir", default="data/raw")
+    parser.add_argument("--cache-dir", default="data/cache")
+    parser.add_argument("--from-year", type=int, default=FROM_YEAR)
+    parser.add_argument("--window-size", type=int, default=RACE_WINDOW_SIZE)
+    parser.add_argument("--first-season", type=int, default=None)
+    parser.add_argument("--refit", choices=REFIT_MODES, default="race")
+    parser.add_argument(
+        "--notebook-features",
+        action="store_true",
+        help="keep the notebook's recent form windows, which include the race",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="write per-race results (CSV)")
+    args = parser.parse_args()
+
+    tables = load_raw_tables(args.raw_dir, cache_dir=args.cache_dir)
+    race_data = build_features(
+        tables, args.from_year, args.window_size, pre_race=not args.notebook_features
+    )
+
+    start = time.perf_counter()
+    results = run_backtest(race_data, args.first_season, args.refit, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(season_report(results).to_string(float_format=lambda v: f"{v:.3f}"))
+    print(
+        f"\nBacktested {len(results)} races in {elapsed:.2f}s (refit per {args.refit})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,541 @@
+"""
+Offline batch scoring of archived race requests.
+
+Streams JSONL or Parquet race inputs in chunks, scores every chunk with the
+served scoring engine (model bundle, or the joblib model with its scalers) and
+appends the predictions to a JSONL or Parquet output as it goes, so memory
+stays bounded by the chunk size rather than the input size.
+
+Inputs:
+    JSONL     one request body per line, as sent to the API: a ``/predict``
+              payload (``{"drivers": [...]}``, optionally with ``race_id``) or a
+              ``/predict/batch`` payload (``{"races": [...]}``). Races without a
+              ``race_id`` are identified by line number (``"12"``, or
+              ``"12:3"`` for the fourth race of a batch line).
+    Parquet   one row per driver with a race ID column (``--race-column``) and
+              the feature columns; rows of a race must be contiguous.
+
+Outputs:
+    JSONL     one line per race, shaped like a ``/predict/batch`` result
+    Parquet   one row per driver: ``race_id``, ``full_name``,
+              ``win_probability`` and ``rank`` (1 = predicted winner)
+    --stats   optional CSV, one row per race: ``total_drivers`` and the
+              average, max and min ``win_probability``
+
+Races whose features are NaN, infinite or outside ``FEATURE_RANGES`` fail with
+an error instead of being scored.
+
+Usage:
+    python -m src.batch_score requests.jsonl predictions.jsonl
+    python -m src.batch_score races.parquet predictions.parquet --workers 4
+    python -m src.batch_score races.parquet predictions.parquet --stats races.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from .data_utils import (
+        calculate_race_win_probability_stats,
+        format_driver_names,
+        validate_races,
+    )
+    from .scoring import segment_order
+    from .validation import validator_for
+except ImportError:
+    from data_utils import (
+        calculate_race_win_probability_stats,
+        format_driver_names,
+        validate_races,
+    )
+    from scoring import segment_order
+    from validation import validator_for
+
+FORMATS = ("jsonl", "parquet")
+# Records per chunk: request lines for JSONL, driver rows for Parquet
+CHUNK_LINES = 1000
+CHUNK_ROWS = 50_000
+NAME_COLUMNS = ("forename", "surname")
+
+# Set in each worker process by _init_worker
+_engine, _output_format, _race_column, _race_stats = None, None, None, False
+
+
+def detect_format(path, fmt=None):
+    """Format from ``fmt`` or the file extension; ``-`` is JSONL."""
+    if fmt is not None:
+        return fmt
+    if path == "-" or path.endswith((".jsonl", ".json", ".ndjson")):
+        return "jsonl"
+    if path.endswith((".parquet", ".pq")):
+        return "parquet"
+    raise ValueError(
+        f"Cannot tell the format of {path!r}; pass --input/--output-format"
+    )
+
+
+def read_jsonl_chunks(path, chunk_lines=CHUNK_LINES):
+    """Yield ``("jsonl", lines, first_line_number)`` chunks of raw lines."""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        lines, first = [], 1
+        for number, line in enumerate(f, 1):
+            lines.append(line)
+            if len(lines) == chunk_lines:
+                yield "jsonl", lines, first
+                lines, first = [], number + 1
+        if lines:
+            yield "jsonl", lines, first
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def read_parquet_chunks(path, feature_names, race_column, chunk_rows=CHUNK_ROWS):
+    """
+    Yield ``("parquet", table)`` chunks that never split a race.
+
+    Only the race, feature and name columns are read. The trailing race of a
+    record batch is carried over to the next chunk, since it may continue there.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # pre_buffer keeps every row group read so far alive; memory would grow
+    # with the file size
+    parquet = pq.ParquetFile(path, pre_buffer=False)
+    available = set(parquet.schema_arrow.names)
+    missing = [c for c in [race_column, *feature_names] if c not in available]
+    if missing:
+        raise ValueError(f"Missing columns in {path}: {missing}")
+    columns = [race_column, *feature_names]
+    columns += [c for c in ("full_name", *NAME_COLUMNS) if c in available]
+
+    pending = None
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        table = pa.Table.from_batches([batch])
+        if pending is not None:
+            table = pa.concat_tables([pending, table])
+        race_ids = table.column(race_column).to_numpy(zero_copy_only=False)
+        starts = np.flatnonzero(race_ids[1:] != race_ids[:-1]) + 1
+        if len(starts) == 0:
+            pending = table
+            continue
+        yield "parquet", table.slice(0, starts[-1])
+        pending = table.slice(starts[-1])
+    if pending is not None and len(pending):
+        yield "parquet", pending
+
+
+def _jsonl_races(lines, first_line, feature_names):
+    """
+    Parse request lines into ``(race_id, names, features, error)`` races.
+    """
+    validator = validator_for(feature_names)
+    races, forenames, surnames = [], [], []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            races.append((str(number), None, None, "Invalid JSON data"))
+            continue
+
+        batch = isinstance(data, dict) and isinstance(data.get("races"), list)
+        for i, race in enumerate(data["races"] if batch else [data]):
+            race_id = f"{number}:{i}" if batch else str(number)
+            if not isinstance(race, dict):
+                races.append(
+                    (race_id, None, None, "Invalid input: race must be an object")
+                )
+                continue
+            race_id = race.get("race_id", race_id)
+            drivers = race.get("drivers")
+            features, error = validator.drivers(drivers)
+            if error is None:
+                forenames.extend(driver.get("forename") for driver in drivers)
+                surnames.extend(driver.get("surname") for driver in drivers)
+            races.append((race_id, None, features, error))
+
+    # Format every name of the chunk in one pass, then hand each race its slice
+    names, start = format_driver_names(forenames, surnames), 0
+    for i, (race_id, _, features, error) in enumerate(races):
+        if error is None:
+            races[i] = (race_id, names[start : start + len(features)], features, None)
+            start += len(features)
+    return races
+
+
+def _parquet_races(table, feature_names, race_column):
+    """
+    Split a Parquet chunk into ``(race_id, names, features, None)`` races.
+    """
+    features = np.column_stack(
+        [
+            table.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+            for name in feature_names
+        ]
+    )
+    if "full_name" in table.column_names:
+        names = table.column("full_name").to_pylist()
+    elif all(c in table.column_names for c in NAME_COLUMNS):
+        # Same display name as the API responses
+        names = format_driver_names(
+            *(table.column(c).to_numpy(zero_copy_only=False) for c in NAME_COLUMNS)
+        )
+    else:
+        names = [None] * len(table)
+
+    race_ids = table.column(race_column).to_numpy(zero_copy_only=False)
+    bounds = np.flatnonzero(race_ids[1:] != race_ids[:-1]) + 1
+    bounds = [0, *bounds.tolist(), len(table)]
+    races = []
+    for start, stop in zip(bounds[:-1], bounds[1:], strict=True):
+        race_id = race_ids[start]
+        if isinstance(race_id, np.generic):
+            race_id = race_id.item()
+        races.append((race_id, names[start:stop], features[start:stop], None))
+    return races
+
+
+def read_chunks(path, feature_names, fmt=None, race_column="race_id", chunk_size=None):
+    """Yield the input chunks of ``path`` (JSONL lines or Parquet tables)."""
+    if detect_format(path, fmt) == "jsonl":
+        return read_jsonl_chunks(path, chunk_size or CHUNK_LINES)
+    return read_parquet_chunks(
+        path, feature_names, race_column, chunk_size or CHUNK_ROWS
+    )
+
+
+def chunk_races(chunk, feature_names, race_column="race_id"):
+    """
+    Parse one input chunk into ``(race_id, names, features, error)`` races.
+
+    ``features`` is the race's ``(n_drivers, n_features)`` matrix; ``error`` is
+    None unless a JSONL race failed validation.
+    """
+    if chunk[0] == "jsonl":
+        return _jsonl_races(chunk[1], chunk[2], feature_names)
+    return _parquet_races(chunk[1], feature_names, race_column)
+
+
+def iter_races(path, feature_names, fmt=None, race_column="race_id"):
+    """
+    Stream the ``(race_id, names, features, error)`` races of a scoring input.
+    """
+    for chunk in read_chunks(path, feature_names, fmt, race_column):
+        yield from chunk_races(chunk, feature_names, race_column)
+
+
+def score_races(engine, races, check_ranges=True):
+    """
+    Validate and score every race of a chunk in one pass.
+
+    With ``check_ranges``, races with non-finite or out-of-range features
+    (``validate_races``) fail like malformed ones; JSONL races are already
+    range-checked by the request validator. Returns ``(results, stats)``; each
+    result is ``(race_id, names, scores, ranks, error)`` with ``ranks[i]`` the
+    1-based predicted position of row i.
+    """
+    parsed = [i for i, race in enumerate(races) if race[3] is None]
+    if parsed:
+        sizes = [len(races[i][2]) for i in parsed]
+        features = np.concatenate([races[i][2] for i in parsed])
+    if parsed and check_ranges:
+        _, errors = validate_races(
+            features, engine.feature_names, np.repeat(parsed, sizes)
+        )
+        if errors:
+            races = [
+                race if i not in errors else (race[0], None, None, errors[i])
+                for i, race in enumerate(races)
+            ]
+            keep = np.repeat([i not in errors for i in parsed], sizes)
+            features = features[keep]
+
+    valid = [race for race in races if race[3] is None]
+    results, rows = [], 0
+    if valid:
+        offsets = np.cumsum([0] + [len(race[2]) for race in valid])
+        scores = engine.score(features)
+        order = segment_order(scores, offsets)
+        ranks = np.empty(len(order), dtype=np.int32)
+        ranks[order] = np.arange(len(order)) - np.repeat(offsets[:-1], np.diff(offsets))
+        ranks += 1
+        rows = len(scores)
+
+    race_num = 0
+    for race_id, names, _, error in races:
+        if error is not None:
+            results.append((race_id, None, None, None, error))
+            continue
+        start, stop = offsets[race_num], offsets[race_num + 1]
+        results.append((race_id, names, scores[start:stop], ranks[start:stop], None))
+        race_num += 1
+    return results, {
+        "rows": rows,
+        "races": len(valid),
+        "failed": len(races) - len(valid),
+    }
+
+
+def race_stats_csv(results, header=False):
+    """
+    Per-race win probability stats of scored races, as CSV text.
+
+    Rows are keyed by race ID; see ``calculate_race_win_probability_stats``.
+    """
+    import pandas as pd
+
+    scored = [result for result in results if result[4] is None]
+    predictions = pd.DataFrame(
+        {
+            "race_id": np.repeat(
+                np.array([str(result[0]) for result in scored], dtype=object),
+                [len(result[2]) for result in scored],
+            ),
+            "win_probability": np.concatenate([result[2] for result in scored] or [[]]),
+        }
+    )
+    return calculate_race_win_probability_stats(predictions).to_csv(header=header)
+
+
+def jsonl_output(results):
+    """Serialize scored races as ``/predict/batch``-style JSON lines."""
+    lines = []
+    for race_id, names, scores, ranks, error in results:
+        if error is not None:
+            lines.append(json.dumps({"race_id": race_id, "error": error}))
+            continue
+        predictions = [
+            {"full_name": names[i], "win_probability": float(scores[i])}
+            for i in np.argsort(ranks)
+        ]
+        lines.append(
+            json.dumps(
+                {
+                    "race_id": race_id,
+                    "predicted_winner": predictions[0],
+                    "all_predictions": predictions,
+                }
+            )
+        )
+    return "".join(f"{line}\n" for line in lines)
+
+
+def parquet_output(results):
+    """Flatten scored races into a driver-per-row Arrow table."""
+    import pyarrow as pa
+
+    scored = [result for result in results if result[4] is None]
+    return pa.table(
+        {
+            "race_id": pa.array(
+                [str(race_id) for race_id, names, *_ in scored for _ in names],
+                pa.string(),
+            ),
+            "full_name": pa.array(
+                [name for result in scored for name in result[1]], pa.string()
+            ),
+            "win_probability": pa.array(
+                np.concatenate([result[2] for result in scored] or [[]]), pa.float64()
+            ),
+            "rank": pa.array(
+                np.concatenate([result[3] for result in scored] or [[]]), pa.int32()
+            ),
+        }
+    )
+
+
+def score_chunk(chunk, engine, output_format, race_column="race_id", race_stats=False):
+    """
+    Parse, score and serialize one input chunk.
+
+    Returns ``(output, stats)`` where ``output`` is JSONL text or an Arrow table.
+    With ``race_stats`` the stats also hold the chunk's per-race CSV rows.
+    """
+    races = chunk_races(chunk, engine.feature_names, race_column)
+    results, stats = score_races(engine, races, check_ranges=chunk[0] == "parquet")
+    if race_stats:
+        stats["race_stats"] = race_stats_csv(results)
+    if output_format == "jsonl":
+        return jsonl_output(results), stats
+    return parquet_output(results), stats
+
+
+def _init_worker(engine, output_format, race_column, race_stats):
+    global _engine, _output_format, _race_column, _race_stats
+    _engine, _output_format = engine, output_format
+    _race_column, _race_stats = race_column, race_stats
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, _engine, _output_format, _race_column, _race_stats)
+
+
+class OutputWriter:
+    """Append chunk outputs to a JSONL file/stdout or a Parquet file."""
+
+    def __init__(self, path, output_format):
+        self.path, self.format = path, output_format
+        self._file, self._parquet = None, None
+        if output_format == "jsonl":
+            self._file = sys.stdout if path == "-" else open(f"{path}.tmp", "w")
+
+    def write(self, output):
+        if self.format == "jsonl":
+            self._file.write(output)
+            return
+        import pyarrow.parquet as pq
+
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(f"{self.path}.tmp", output.schema)
+        self._parquet.write_table(output)
+
+    def close(self):
+        """Finish the output and move it into place."""
+        if self._file is sys.stdout:
+            self._file.flush()
+            return
+        if self._file is not None:
+            self._file.close()
+        elif self._parquet is None:
+            # No scored rows: still write an empty table with the schema
+            self.write(parquet_output([]))
+            self._parquet.close()
+        else:
+            self._parquet.close()
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+def run_batch(
+    engine,
+    input_path,
+    output_path,
+    input_format=None,
+    output_format=None,
+    workers=None,
+    chunk_size=None,
+    race_column="race_id",
+    stats_path=None,
+):
+    """
+    Stream ``input_path`` through the engine into ``output_path``.
+
+    With ``workers > 1`` chunks are scored in worker processes; at most two
+    chunks per worker are in flight and outputs are written in input order.
+    With ``stats_path`` per-race win probability stats are written there as
+    CSV. Returns throughput stats (rows, races, failed, seconds,
+    rows_per_second).
+    """
+    output_format = detect_format(output_path, output_format)
+    chunks = read_chunks(
+        input_path, engine.feature_names, input_format, race_column, chunk_size
+    )
+
+    totals = {"rows": 0, "races": 0, "failed": 0}
+    writer = OutputWriter(output_path, output_format)
+    race_stats = stats_path is not None
+    if race_stats:
+        stats_file = open(f"{stats_path}.tmp", "w")
+        stats_file.write(race_stats_csv([], header=True))
+    start = time.perf_counter()
+
+    def collect(result):
+        output, stats = result
+        writer.write(output)
+        if race_stats:
+            stats_file.write(stats["race_stats"])
+        for key in totals:
+            totals[key] += stats[key]
+
+    workers = workers or 1
+    if workers > 1:
+        with ProcessPoolExecutor(
+            workers,
+            initializer=_init_worker,
+            initargs=(engine, output_format, race_column, race_stats),
+        ) as executor:
+            in_flight = []
+            for chunk in chunks:
+                in_flight.append(executor.submit(_score_in_worker, chunk))
+                if len(in_flight) >= 2 * workers:
+                    collect(in_flight.pop(0).result())
+            for future in in_flight:
+                collect(future.result())
+    else:
+        for chunk in chunks:
+            collect(score_chunk(chunk, engine, output_format, race_column, race_stats))
+    writer.close()
+    if race_stats:
+        stats_file.close()
+        os.replace(f"{stats_path}.tmp", stats_path)
+
+    seconds = time.perf_counter() - start
+    totals["seconds"] = seconds
+    totals["rows_per_second"] = totals["rows"] / seconds if seconds else 0.0
+    return totals
+
+
+def main():
+    try:
+        from .model_bundle import default_bundle_path, load_model_bundle
+        from .predict_winner import load_scoring_engine
+    except ImportError:
+        from model_bundle import default_bundle_path, load_model_bundle
+        from predict_winner import load_scoring_engine
+
+    parser = argparse.ArgumentParser(description="Score archived race requests")
+    parser.add_argument("input", help="JSONL or Parquet input ('-' for stdin)")
+    parser.add_argument("output", help="JSONL or Parquet output ('-' for stdout)")
+    parser.add_argument("--input-format", choices=FORMATS, default=None)
+    parser.add_argument("--output-format", choices=FORMATS, default=None)
+    parser.add_argument("--race-column", default="race_id")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help=f"JSONL lines (default {CHUNK_LINES}) or Parquet rows "
+        f"(default {CHUNK_ROWS}) per chunk",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--stats", default=None, help="write per-race win probability stats (CSV)"
+    )
+    parser.add_argument("--bundle", default=None, help="model bundle path")
+    args = parser.parse_args()
+
+    bundle_path = args.bundle or os.environ.get("F1_MODEL_BUNDLE")
+    if bundle_path or os.path.exists(default_bundle_path()):
+        engine = load_model_bundle(bundle_path)
+    else:
+        engine = load_scoring_engine()
+
+    stats = run_batch(
+        engine,
+        args.input,
+        args.output,
+        args.input_format,
+        args.output_format,
+        args.workers,
+        args.chunk_size,
+        args.race_column,
+        args.stats,
+    )
+    print(
+        f"Scored {stats['rows']} rows in {stats['races']} races "
+        f"({stats['failed']} failed) in {stats['seconds']:.2f}s: "
+        f"{stats['rows_per_second']:,.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Prediction cache for repeated ``/predict`` payloads.
+
+Dashboards poll with identical driver lists, so scores are cached under a hash
+of the canonicalized feature matrix: only the model's features, in model
+feature order, with the driver rows sorted so the payload order does not matter.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def canonical_key(features):
+    """
+    Return ``(key, order)`` for a feature matrix.
+
+    ``order`` sorts the driver rows into canonical order; the key hashes the
+    sorted matrix, so any permutation of the same drivers maps to one entry.
+    """
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    order = np.lexsort(features.T[::-1])
+    digest = hashlib.blake2b(features[order].tobytes(), digest_size=16)
+    digest.update(np.asarray(features.shape, dtype=np.int64).tobytes())
+    return digest.hexdigest(), order
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+
+    Entries belong to one model version; a lookup under a different version
+    drops everything, so a model reload invalidates the cache automatically.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """Return the cached value for ``key`` or None."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        """Store ``value`` under ``key``, evicting the least recently used entry."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, self.clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
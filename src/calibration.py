@@ -0,0 +1,291 @@
+"""
+Race-aware win probabilities for the raw model scores.
+
+The model outputs a linear score per driver, which can be negative and does not
+sum to one within a race. Calibration turns the scores of each race into a
+distribution in one vectorized pass over many races:
+
+    softmax         ``softmax(score / temperature)`` within each race
+    plackett_luce   the same win probabilities, plus the finishing-order
+                    distribution of the Plackett-Luce model, estimated by
+                    Monte Carlo: a race order is the descending sort of
+                    ``score / temperature + Gumbel noise``
+
+The temperature is fitted by maximum likelihood on the training races and
+stored in ``models/calibration.json``; without that file it is 1.
+
+Usage:
+    python -m src.calibration fit --raw-dir data/raw
+    python -m src.calibration show
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+try:
+    from .scoring import segment_softmax
+except ImportError:
+    from scoring import segment_softmax
+
+CALIBRATION_FILE = "calibration.json"
+METHODS = ("softmax", "plackett_luce")
+DEFAULT_SAMPLES = 10000
+PODIUM_SIZE = 3
+# Upper bound on Gumbel draws held in memory at once (samples x races x slots)
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def default_calibration_path():
+    """
+    Return the calibration path next to the model in ``models/``.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "models", CALIBRATION_FILE)
+
+
+def segment_log_likelihood(scores, is_winner, offsets, temperature):
+    """
+    Log-likelihood of the recorded winners under the per-race softmax.
+
+    Races without a recorded winner are skipped.
+    """
+    scaled = np.asarray(scores, dtype=np.float64) / temperature
+    starts = np.asarray(offsets[:-1], dtype=np.intp)
+    lengths = np.diff(offsets)
+
+    maxima = np.maximum.reduceat(scaled, starts)
+    exp_sums = np.add.reduceat(np.exp(scaled - np.repeat(maxima, lengths)), starts)
+    log_norm = maxima + np.log(exp_sums)
+
+    winners = np.flatnonzero(is_winner)
+    race_of_winner = np.searchsorted(offsets, winners, side="right") - 1
+    return float(np.sum(scaled[winners] - log_norm[race_of_winner]))
+
+
+def fit_temperature(scores, is_winner, offsets, bounds=(1e-3, 1e3), tol=1e-6):
+    """
+    Maximum-likelihood softmax temperature for races with known winners.
+
+    Golden-section search on ``log(temperature)``; the likelihood is unimodal
+    in the temperature for a fixed score vector.
+    """
+    low, high = np.log(bounds[0]), np.log(bounds[1])
+    ratio = (np.sqrt(5) - 1) / 2
+
+    def loss(log_t):
+        return -segment_log_likelihood(scores, is_winner, offsets, np.exp(log_t))
+
+    a, b = high - ratio * (high - low), low + ratio * (high - low)
+    loss_a, loss_b = loss(a), loss(b)
+    while high - low > tol:
+        if loss_a < loss_b:
+            high, b, loss_b = b, a, loss_a
+            a = high - ratio * (high - low)
+            loss_a = loss(a)
+        else:
+            low, a, loss_a = a, b, loss_b
+            b = low + ratio * (high - low)
+            loss_b = loss(b)
+    return float(np.exp((low + high) / 2))
+
+
+def position_probabilities(
+    scores, offsets, temperature=1.0, n_samples=DEFAULT_SAMPLES, seed=None
+):
+    """
+    Monte Carlo finishing-order distribution under Plackett-Luce.
+
+    Returns an ``(n_rows, max_race_size)`` array whose column ``k`` is the
+    probability of finishing in position ``k + 1``. All races are sampled
+    together: they are padded to the largest race with ``-inf`` utilities,
+    which always sort last, and Gumbel draws are processed in chunks.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    lengths = np.diff(offsets)
+    n_races, slots = len(lengths), int(lengths.max())
+
+    race_of_row = np.repeat(np.arange(n_races), lengths)
+    slot_of_row = np.arange(len(scores)) - offsets[race_of_row]
+    utilities = np.full((n_races, slots), -np.inf)
+    utilities[race_of_row, slot_of_row] = scores / temperature
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(n_races * slots * slots, dtype=np.int64)
+    race_base = (np.arange(n_races) * slots)[:, None]
+    positions = np.arange(slots)
+    chunk = max(1, _CHUNK_ELEMENTS // (n_races * slots))
+
+    for done in range(0, n_samples, chunk):
+        size = min(chunk, n_samples - done)
+        keys = utilities + rng.gumbel(size=(size, n_races, slots))
+        finishing_order = np.argsort(-keys, axis=2)
+        # Flat (race, slot, position) index of every sampled placing
+        index = ((race_base + finishing_order) * slots + positions).ravel()
+        counts += np.bincount(index, minlength=counts.size)
+
+    probabilities = counts.reshape(n_races, slots, slots) / n_samples
+    return probabilities[race_of_row, slot_of_row]
+
+
+class Calibration:
+    """
+    Fitted softmax temperature and the probability transforms that use it.
+    """
+
+    def __init__(self, temperature=1.0, fitted=False, races=0):
+        if not temperature > 0:
+            raise ValueError(f"Temperature must be positive, got {temperature}")
+        self.temperature = float(temperature)
+        self.fitted = fitted
+        self.races = races
+
+    @classmethod
+    def fit(cls, scores, is_winner, offsets):
+        """Fit the temperature on scored races with recorded winners."""
+        races = int(np.count_nonzero(is_winner))
+        return cls(fit_temperature(scores, is_winner, offsets), True, races)
+
+    def win_probabilities(self, scores, offsets):
+        """Per-race softmax win probabilities (Plackett-Luce first place)."""
+        return segment_softmax(np.asarray(scores) / self.temperature, offsets)
+
+    def position_probabilities(
+        self, scores, offsets, n_samples=DEFAULT_SAMPLES, seed=None
+    ):
+        """Finishing-position distribution per driver; see module function."""
+        return position_probabilities(
+            scores, offsets, self.temperature, n_samples, seed
+        )
+
+    def calibrate(
+        self, scores, offsets, method="softmax", n_samples=DEFAULT_SAMPLES, seed=None
+    ):
+        """
+        Return ``{name: per-row array}`` with ``win_probability`` and, for
+        ``plackett_luce``, ``podium_probability`` and ``position_probabilities``.
+        """
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+        outputs = {"win_probability": self.win_probabilities(scores, offsets)}
+        if method == "plackett_luce":
+            positions = self.position_probabilities(scores, offsets, n_samples, seed)
+            outputs["podium_probability"] = positions[:, :PODIUM_SIZE].sum(axis=1)
+            outputs["position_probabilities"] = positions
+        return outputs
+
+    def to_dict(self):
+        return {
+            "temperature": self.temperature,
+            "fitted": self.fitted,
+            "races": self.races,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["temperature"], data.get("fitted", True), data.get("races", 0))
+
+    def save(self, path=None):
+        """Write the calibration as JSON (atomically)."""
+        path = path or default_calibration_path()
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """Read a saved calibration, or return the unfitted default."""
+        path = path or default_calibration_path()
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def fit_from_raw(raw_dir, cache_dir=None, processed_dir="data/processed"):
+    """
+    Fit the temperature for the deployed model on its training seasons.
+
+    Rebuilds the features with the window size recorded in ``metadata.json``
+    and scores every training race with the served scoring engine.
+    """
+    try:
+        from .backtest import backtest_arrays
+        from .features import (
+            FROM_YEAR,
+            LAST_TRAIN_YEAR,
+            RACE_WINDOW_SIZE,
+            build_features,
+            load_raw_tables,
+        )
+        from .model_bundle import default_bundle_path, load_model_bundle
+        from .predict_winner import load_scoring_engine
+    except ImportError:
+        from backtest import backtest_arrays
+        from features import (
+            FROM_YEAR,
+            LAST_TRAIN_YEAR,
+            RACE_WINDOW_SIZE,
+            build_features,
+            load_raw_tables,
+        )
+        from model_bundle import default_bundle_path, load_model_bundle
+        from predict_winner import load_scoring_engine
+
+    if os.path.exists(default_bundle_path()):
+        engine = load_model_bundle()
+    else:
+        engine = load_scoring_engine()
+
+    with open(os.path.join(processed_dir, "metadata.json")) as f:
+        metadata = json.load(f)
+    race_data = build_features(
+        load_raw_tables(raw_dir, cache_dir=cache_dir),
+        FROM_YEAR,
+        metadata.get("window_size", RACE_WINDOW_SIZE),
+        metadata.get("pre_race", False),
+    )
+    race_data = race_data[race_data["year"] <= LAST_TRAIN_YEAR]
+
+    arrays = backtest_arrays(race_data, engine.feature_names)
+    features = arrays["features"]
+    medians = np.nanmedian(features, axis=0)
+    features = np.where(np.isnan(features), np.nan_to_num(medians), features)
+    return Calibration.fit(
+        engine.score(features), arrays["is_winner"], arrays["offsets"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or show the win calibration")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit = commands.add_parser("fit", help="fit the temperature on training races")
+    fit.add_argument("--raw-dir", default="data/raw")
+    fit.add_argument("--cache-dir", default="data/cache")
+    fit.add_argument("--processed-dir", default="data/processed")
+    fit.add_argument(
+        "--output", default=None, help=f"default: models/{CALIBRATION_FILE}"
+    )
+
+    show = commands.add_parser("show", help="print the saved calibration")
+    show.add_argument("path", nargs="?", default=None)
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        calibration = fit_from_raw(args.raw_dir, args.cache_dir, args.processed_dir)
+        path = calibration.save(args.output)
+        print(
+            f"Temperature {calibration.temperature:.4f} fitted on "
+            f"{calibration.races} races, written to {path}"
+        )
+    else:
+        print(json.dumps(Calibration.load(args.path).to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,488 @@
+"""
+Monte Carlo championship simulator built on the race scoring engine.
+
+Samples every remaining race of a season for many simulated seasons at once.
+Each race is scored with the served linear model, finishing orders are drawn
+from the calibrated Plackett-Luce race model (``score / temperature + Gumbel
+noise``), F1 points are awarded and the results are fed back into the rolling
+features of the following races: driver and constructor win rates, season
+points, points per race, recent average position and constructor recent wins
+evolve per simulation exactly as ``FeatureStore.ingest_race`` would update
+them.
+
+The model is linear, so the race-day features (grid, qualifying, ...) are
+scored once per race and only the store features are rescored per simulation.
+Simulations run in fixed-size chunks, optionally spread over worker processes;
+chunk ``i`` always uses the ``i``-th spawned seed, so results do not depend on
+the number of workers.
+
+Usage:
+    python -m src.championship calendar.csv --sims 100000 --workers 4
+
+``calendar.csv`` lists the entries of every remaining race (``year``,
+``round``, ``driverId``, ``constructorId`` and any race-day features); the
+current standings come from the feature store written by
+``python -m src.feature_store bootstrap``.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from .calibration import Calibration
+    from .feature_store import STORE_FEATURES, STORE_FILE
+except ImportError:
+    from calibration import Calibration
+    from feature_store import STORE_FEATURES, STORE_FILE
+
+# Points for P1..P10 (2010- rules, no fastest-lap point)
+POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+DEFAULT_SIMULATIONS = 100_000
+CHUNK_SIZE = 10_000
+
+
+def _fill_value(values):
+    """Median of the observed values, 0 when there are none."""
+    values = np.asarray(values, dtype=np.float64)
+    observed = values[~np.isnan(values)]
+    return float(np.median(observed)) if len(observed) else 0.0
+
+
+def _occurrence_groups(keys):
+    """
+    Split row indices into groups holding the first row of every key, then the
+    second row of every key, ... so each group has unique keys and pushing the
+    groups in turn keeps the per-key row order.
+    """
+    seen = {}
+    groups = []
+    for row, key in enumerate(keys):
+        occurrence = seen[key] = seen.get(key, -1) + 1
+        if occurrence == len(groups):
+            groups.append([])
+        groups[occurrence].append(row)
+    return [np.array(group) for group in groups]
+
+
+def season_plan(engine, store, races, calibration=None, points=POINTS):
+    """
+    Collect everything the simulation needs into plain arrays.
+
+    ``races`` is a list of ``(year, round, entries)`` in calendar order, where
+    ``entries`` is a DataFrame with ``driverId``, ``constructorId`` and the
+    race-day features; race-day features missing from ``entries`` are imputed
+    with their median over all remaining entries. All races must be in one
+    season after ``store.last_race``. Drivers and constructors who already
+    scored points that season take part in the standings even without
+    remaining entries.
+    """
+    calibration = calibration or Calibration()
+    races = sorted(races, key=lambda race: (int(race[0]), int(race[1])))
+    if not races:
+        raise ValueError("No remaining races to simulate")
+    year = int(races[0][0])
+    if any(int(race_year) != year for race_year, _, _ in races):
+        raise ValueError("All remaining races must be in the same season")
+    if store.last_race is not None and (year, int(races[0][1])) <= store.last_race:
+        raise ValueError(
+            f"Race {(year, int(races[0][1]))} is not after the last ingested "
+            f"race {store.last_race}"
+        )
+
+    scored = [
+        driver_id
+        for driver_id, state in store.drivers.items()
+        if state.season == year and state.season_races
+    ]
+    drivers = list(
+        dict.fromkeys(
+            scored + [int(d) for _, _, entries in races for d in entries["driverId"]]
+        )
+    )
+    scored_constructors = [
+        constructor_id
+        for constructor_id, state in store.constructors.items()
+        if state.season == year
+    ]
+    constructors = list(
+        dict.fromkeys(
+            scored_constructors
+            + [int(c) for _, _, entries in races for c in entries["constructorId"]]
+        )
+    )
+    driver_index = {driver_id: i for i, driver_id in enumerate(drivers)}
+    constructor_index = {c: i for i, c in enumerate(constructors)}
+
+    names, weights = engine.feature_names, engine.weights
+    static = [i for i, name in enumerate(names) if name not in STORE_FEATURES]
+    dynamic = {
+        name: weights[engine.feature_index[name]] if name in names else 0.0
+        for name in STORE_FEATURES
+    }
+
+    # Race-day features, one matrix per race
+    race_features = []
+    for race_year, round_num, entries in races:
+        matrix = np.full((len(entries), len(static)), np.nan)
+        for column, i in enumerate(static):
+            if names[i] == "year":
+                matrix[:, column] = race_year
+            elif names[i] == "round":
+                matrix[:, column] = round_num
+            elif names[i] in entries:
+                matrix[:, column] = entries[names[i]].to_numpy(dtype=np.float64)
+        race_features.append(matrix)
+    stacked = np.vstack(race_features)
+    static_fill = np.array([_fill_value(stacked[:, j]) for j in range(len(static))])
+
+    # Store features of the next race fill NaNs of rookies and new teams
+    first_year, first_round, first_entries = races[0]
+    first = store.features_for_race(first_year, first_round, first_entries)
+    dynamic_fill = {name: _fill_value(first[name]) for name in STORE_FEATURES}
+
+    plan_races = []
+    for (_, round_num, entries), matrix in zip(races, race_features, strict=True):
+        matrix = np.where(np.isnan(matrix), static_fill, matrix)
+        plan_races.append(
+            {
+                "round": int(round_num),
+                "drivers": np.array(
+                    [driver_index[int(d)] for d in entries["driverId"]]
+                ),
+                "constructors": np.array(
+                    [constructor_index[int(c)] for c in entries["constructorId"]]
+                ),
+                "base_scores": engine.intercept + matrix @ weights[static],
+                "constructor_rounds": _occurrence_groups(entries["constructorId"]),
+            }
+        )
+
+    def driver_state(driver_id, field):
+        state = store.drivers.get(driver_id)
+        return list(getattr(state, field).values) if state else []
+
+    def constructor_state(constructor_id, field):
+        state = store.constructors.get(constructor_id)
+        return list(getattr(state, field).values) if state else []
+
+    def season_value(driver_id, field):
+        state = store.drivers.get(driver_id)
+        return getattr(state, field) if state and state.season == year else 0
+
+    def constructor_season_points(constructor_id):
+        state = store.constructors.get(constructor_id)
+        return state.season_points if state and state.season == year else 0.0
+
+    return {
+        "year": year,
+        "drivers": drivers,
+        "constructors": constructors,
+        "races": plan_races,
+        "dynamic_weights": dynamic,
+        "dynamic_fill": dynamic_fill,
+        "temperature": calibration.temperature,
+        "points": np.asarray(points, dtype=np.float64),
+        "window_size": store.window_size,
+        "recent_window_size": store.recent_window_size,
+        "driver_wins": [driver_state(d, "wins") for d in drivers],
+        "driver_positions": [driver_state(d, "positions") for d in drivers],
+        "constructor_wins": [constructor_state(c, "wins") for c in constructors],
+        "constructor_recent_wins": [
+            constructor_state(c, "recent_wins") for c in constructors
+        ],
+        "constructor_known": np.array([c in store.constructors for c in constructors]),
+        "season_points": np.array(
+            [season_value(d, "season_points") for d in drivers], dtype=np.float64
+        ),
+        "season_races": np.array(
+            [season_value(d, "season_races") for d in drivers], dtype=np.int64
+        ),
+        "constructor_season_points": np.array(
+            [constructor_season_points(c) for c in constructors], dtype=np.float64
+        ),
+    }
+
+
+class RollingWindows:
+    """
+    ``RollingWindow`` ring buffers for many keys, replicated per simulation.
+
+    Every simulation pushes to the same keys in the same order and simulated
+    values are never NaN, so the write slot, the NaN mask and the counts are
+    shared; only the values and running totals are per simulation, stored as
+    ``(n_keys, n_sims)`` rows so a push touches contiguous memory.
+    """
+
+    def __init__(self, n_sims, histories, size):
+        n_keys = len(histories)
+        self.values = np.zeros((size, n_keys, n_sims), dtype=np.float32)
+        self.observed = np.zeros((size, n_keys), dtype=bool)
+        self.slot = np.zeros(n_keys, dtype=np.intp)
+        total = np.zeros(n_keys)
+        for key, history in enumerate(histories):
+            history = np.asarray(history[-size:], dtype=np.float64)
+            observed = ~np.isnan(history)
+            self.values[: len(history), key] = np.where(observed, history, 0.0)[:, None]
+            self.observed[: len(history), key] = observed
+            self.slot[key] = len(history) % size
+            total[key] = history[observed].sum()
+        self.total = np.repeat(total[:, None], n_sims, axis=1)
+        self.count = self.observed.sum(axis=0)
+
+    def push(self, keys, values):
+        """Append ``values[i]`` to key ``keys[i]``; keys must be unique."""
+        slots = self.slot[keys]
+        self.total[keys] += values - self.values[slots, keys]
+        self.count[keys] += 1 - self.observed[slots, keys]
+        self.values[slots, keys] = values
+        self.observed[slots, keys] = True
+        self.slot[keys] = (slots + 1) % len(self.values)
+
+    def mean(self, keys, fill=np.nan):
+        """Mean of the non-NaN values per simulation, ``fill`` when there are none."""
+        count = self.count[keys]
+        means = self.total[keys] / np.maximum(count, 1)[:, None]
+        means[count == 0] = fill
+        return means
+
+
+def _standings(points, places):
+    """
+    Per simulation, competitor indices ordered by points, then by countback
+    (wins, second and third places); ``points`` is ``(competitors, sims)``.
+    """
+    return np.lexsort((-places[2].T, -places[1].T, -places[0].T, -points.T), axis=-1)
+
+
+def simulate_chunk(plan, n_sims, seed):
+    """
+    Simulate the rest of the season ``n_sims`` times.
+
+    Returns the per-driver and per-constructor sums the report aggregates:
+    title counts, final points and final championship positions.
+    """
+    rng = np.random.default_rng(seed)
+    n_drivers, n_constructors = len(plan["drivers"]), len(plan["constructors"])
+    weights, fill = plan["dynamic_weights"], plan["dynamic_fill"]
+
+    driver_wins = RollingWindows(n_sims, plan["driver_wins"], plan["window_size"])
+    positions = RollingWindows(
+        n_sims, plan["driver_positions"], plan["recent_window_size"]
+    )
+    constructor_wins = RollingWindows(
+        n_sims, plan["constructor_wins"], plan["window_size"]
+    )
+    recent_wins = RollingWindows(
+        n_sims, plan["constructor_recent_wins"], plan["recent_window_size"]
+    )
+    constructor_known = plan["constructor_known"].copy()
+    season_points = np.repeat(plan["season_points"][:, None], n_sims, axis=1)
+    season_races = plan["season_races"].copy()
+    constructor_points = np.repeat(
+        plan["constructor_season_points"][:, None], n_sims, axis=1
+    )
+    # Countback over the simulated races: wins, then second and third places
+    places = np.zeros((3, n_drivers, n_sims), dtype=np.int32)
+    constructor_places = np.zeros((3, n_constructors, n_sims), dtype=np.int32)
+    max_entries = max(len(race["drivers"]) for race in plan["races"])
+    positions_column = np.arange(1, max_entries + 1, dtype=np.int16)[:, None]
+
+    for race in plan["races"]:
+        drivers, constructors = race["drivers"], race["constructors"]
+        n_entries = len(drivers)
+
+        # NaNs (no history yet) are the same in every simulation: fill by row
+        driver_win_rate = driver_wins.mean(drivers, fill["driver_win_rate"])
+        constructor_win_rate = constructor_wins.mean(
+            constructors, fill["constructor_win_rate"]
+        )
+        interaction = driver_win_rate * constructor_win_rate
+        missing = (driver_wins.count[drivers] == 0) | (
+            constructor_wins.count[constructors] == 0
+        )
+        interaction[missing] = fill["driver_constructor_interaction"]
+        recent = recent_wins.total[constructors]
+        recent[~constructor_known[constructors]] = fill["constructor_recent_wins"]
+        raced = season_races[drivers] > 0
+        driver_points = season_points[drivers]
+        points_per_race = driver_points / race["round"]
+        driver_points[~raced] = fill["driver_season_points"]
+        points_per_race[~raced] = fill["points_per_race"]
+        features = {
+            "driver_win_rate": driver_win_rate,
+            "constructor_win_rate": constructor_win_rate,
+            "driver_season_points": driver_points,
+            "recent_avg_position": positions.mean(drivers, fill["recent_avg_position"]),
+            "constructor_recent_wins": recent,
+            "driver_constructor_interaction": interaction,
+            "points_per_race": points_per_race,
+        }
+        utilities = np.repeat(race["base_scores"][:, None], n_sims, axis=1)
+        for name, values in features.items():
+            if weights[name]:
+                utilities += weights[name] * values
+        utilities /= plan["temperature"]
+
+        # Plackett-Luce finishing order: descending score + Gumbel noise, with
+        # the Gumbel draws taken as -log(Exp(1)) (float32 is plenty for noise)
+        noise = rng.standard_exponential(size=utilities.shape, dtype=np.float32)
+        utilities -= np.log(np.maximum(noise, np.finfo(np.float32).tiny))
+        order = np.argsort(-utilities, axis=0)
+        finish = np.empty(order.shape, dtype=np.int16)
+        np.put_along_axis(finish, order, positions_column[:n_entries], axis=0)
+
+        won = (finish == 1).astype(np.float32)
+        points = np.zeros(n_entries + 1)
+        awarded = min(len(plan["points"]), n_entries)
+        points[1 : awarded + 1] = plan["points"][:awarded]
+        race_points = points[finish]
+
+        driver_wins.push(drivers, won)
+        positions.push(drivers, finish)
+        season_points[drivers] += race_points
+        season_races[drivers] += 1
+        for place in range(min(3, n_entries)):
+            places[place, drivers] += finish == place + 1
+        # Constructor windows take one value per entry, in entry order: push
+        # every team's first entry, then every team's second entry, ...
+        for entries in race["constructor_rounds"]:
+            constructor_wins.push(constructors[entries], won[entries])
+            recent_wins.push(constructors[entries], won[entries])
+            constructor_points[constructors[entries]] += race_points[entries]
+            for place in range(min(3, n_entries)):
+                constructor_places[place, constructors[entries]] += (
+                    finish[entries] == place + 1
+                )
+        constructor_known[constructors] = True
+
+    # Rank by points, then simulated wins, second and third places
+    ranking = _standings(season_points, places)
+    final_position = np.empty_like(ranking)
+    np.put_along_axis(final_position, ranking, np.arange(1, n_drivers + 1), axis=1)
+    constructor_ranking = _standings(constructor_points, constructor_places)
+
+    return {
+        "simulations": n_sims,
+        "titles": np.bincount(ranking[:, 0], minlength=n_drivers),
+        "points": season_points.sum(axis=1),
+        "positions": final_position.sum(axis=0),
+        "constructor_titles": np.bincount(
+            constructor_ranking[:, 0], minlength=n_constructors
+        ),
+        "constructor_points": constructor_points.sum(axis=1),
+    }
+
+
+def _simulate_task(task):
+    plan, n_sims, seed = task
+    return simulate_chunk(plan, n_sims, seed)
+
+
+def simulate_season(
+    plan, n_sims=DEFAULT_SIMULATIONS, workers=None, seed=None, chunk_size=CHUNK_SIZE
+):
+    """
+    Run ``n_sims`` simulated seasons in chunks, in worker processes when
+    ``workers > 1``, and return ``(drivers, constructors)`` report DataFrames.
+    """
+    import pandas as pd
+
+    sizes = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (plan, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds, strict=True)
+    ]
+
+    workers = min(workers or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_simulate_task, tasks))
+    else:
+        results = [_simulate_task(task) for task in tasks]
+
+    totals = {key: sum(result[key] for result in results) for key in results[0]}
+    n = totals["simulations"]
+    drivers = pd.DataFrame(
+        {
+            "driverId": plan["drivers"],
+            "current_points": plan["season_points"],
+            "expected_points": totals["points"] / n,
+            "expected_position": totals["positions"] / n,
+            "title_probability": totals["titles"] / n,
+        }
+    )
+    constructors = pd.DataFrame(
+        {
+            "constructorId": plan["constructors"],
+            "current_points": plan["constructor_season_points"],
+            "expected_points": totals["constructor_points"] / n,
+            "title_probability": totals["constructor_titles"] / n,
+        }
+    )
+    return (
+        drivers.sort_values("title_probability", ascending=False, kind="stable"),
+        constructors.sort_values("title_probability", ascending=False, kind="stable"),
+    )
+
+
+def load_calendar(path):
+    """Read the remaining races as ``[(year, round, entries), ...]``."""
+    import pandas as pd
+
+    calendar = pd.read_csv(path)
+    return [
+        (int(year), int(round_num), entries.reset_index(drop=True))
+        for (year, round_num), entries in calendar.groupby(["year", "round"])
+    ]
+
+
+def main():
+    try:
+        from .feature_store import FeatureStore
+        from .model_bundle import default_bundle_path, load_model_bundle
+        from .predict_winner import load_scoring_engine
+    except ImportError:
+        from feature_store import FeatureStore
+        from model_bundle import default_bundle_path, load_model_bundle
+        from predict_winner import load_scoring_engine
+
+    parser = argparse.ArgumentParser(description="Simulate the rest of a season")
+    parser.add_argument("calendar", help="CSV of remaining race entries")
+    parser.add_argument(
+        "--store", default=os.path.join("data", "processed", STORE_FILE)
+    )
+    parser.add_argument("--calibration", default=None)
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMULATIONS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="driver standings CSV")
+    args = parser.parse_args()
+
+    if os.path.exists(default_bundle_path()):
+        engine = load_model_bundle()
+    else:
+        engine = load_scoring_engine()
+    plan = season_plan(
+        engine,
+        FeatureStore.load(args.store),
+        load_calendar(args.calendar),
+        Calibration.load(args.calibration),
+    )
+
+    start = time.perf_counter()
+    drivers, constructors = simulate_season(plan, args.sims, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.sims} seasons of {len(plan['races'])} races in {elapsed:.2f}s")
+    print(drivers.head(10).to_string(index=False))
+    print(constructors.head(5).to_string(index=False))
+    if args.output:
+        drivers.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
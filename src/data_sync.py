@@ -0,0 +1,264 @@
+"""
+Incremental, resumable sync of the Kaggle dataset archive.
+
+``sync`` downloads the dataset zip only when it changed (``ETag`` /
+``If-None-Match``), resumes interrupted transfers with HTTP ``Range`` requests
+(guarded by ``If-Range``), extracts only the CSVs whose CRC differs from the
+manifest and converts just those tables into the typed cache
+(``src.raw_cache``). The manifest (``data/raw/sync_manifest.json``) records
+the archive and per-file checksums.
+
+Usage:
+    python -m src.data_sync
+    python -m src.data_sync --url http://localhost:8000/f1.zip
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zipfile
+
+try:
+    from .raw_cache import SCHEMAS, file_sha256, ingest, read_manifest
+except ImportError:
+    from raw_cache import SCHEMAS, file_sha256, ingest, read_manifest
+
+DATASET = "rohanrao/formula-1-world-championship-1950-2020"
+DATASET_URL = f"https://www.kaggle.com/api/v1/datasets/download/{DATASET}"
+MANIFEST_FILE = "sync_manifest.json"
+ARCHIVE_FILE = ".dataset.zip"
+CHUNK_SIZE = 1 << 20
+
+
+class SyncError(RuntimeError):
+    """Raised when the archive cannot be transferred or is invalid."""
+
+
+def kaggle_auth():
+    """Return a Basic auth header value from ``KAGGLE_USERNAME``/``KAGGLE_KEY``."""
+    username = os.environ.get("KAGGLE_USERNAME")
+    key = os.environ.get("KAGGLE_KEY")
+    if not username or not key:
+        return None
+    return "Basic " + base64.b64encode(f"{username}:{key}".encode()).decode()
+
+
+def load_manifest(raw_dir):
+    """Return the sync manifest, or an empty one."""
+    path = os.path.join(raw_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(raw_dir, manifest):
+    """Write the sync manifest atomically."""
+    path = os.path.join(raw_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def fetch(url, dest, etag=None, auth=None, timeout=60):
+    """
+    Download ``url`` to ``dest``, resuming a previous partial transfer.
+
+    Bytes are written to ``dest + ".part"``; the validator of the partial
+    transfer is kept next to it so a resumed request uses ``If-Range`` and the
+    server restarts from zero if the archive changed meanwhile. With ``etag``
+    set, an unchanged archive answers 304 and nothing is downloaded.
+
+    Returns the response headers, or None when the archive was not modified.
+    """
+    if urllib.parse.urlsplit(url).scheme not in ("http", "https"):
+        raise SyncError(f"Unsupported URL scheme: {url!r} (use http or https)")
+    part_path = f"{dest}.part"
+    state_path = f"{part_path}.json"
+    state = _read_json(state_path)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    request = urllib.request.Request(url)
+    if auth:
+        # Not forwarded on redirect (e.g. to a signed storage URL)
+        request.add_unredirected_header("Authorization", auth)
+    if offset and state.get("validator"):
+        request.add_header("Range", f"bytes={offset}-")
+        request.add_header("If-Range", state["validator"])
+    elif etag:
+        request.add_header("If-None-Match", etag)
+
+    try:
+        # The scheme was checked above
+        response = urllib.request.urlopen(request, timeout=timeout)  # nosec B310
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        if e.code == 416:
+            # Range beyond the end: the partial file is stale, start over
+            os.remove(part_path)
+            return fetch(url, dest, etag, auth, timeout)
+        raise SyncError(f"Download failed: HTTP {e.code} {e.reason}") from e
+
+    with response:
+        headers = response.headers
+        resumed = response.status == 206
+        validator = response.headers.get("ETag") or response.headers.get(
+            "Last-Modified"
+        )
+        with open(state_path, "w") as f:
+            json.dump({"validator": validator}, f)
+
+        if resumed:
+            expected = headers.get("Content-Range", "").rpartition("/")[2]
+        else:
+            expected = headers.get("Content-Length", "")
+
+        try:
+            with open(part_path, "ab" if resumed else "wb") as f:
+                while chunk := response.read(CHUNK_SIZE):
+                    f.write(chunk)
+        except (http.client.IncompleteRead, OSError) as e:
+            raise SyncError(
+                f"Transfer interrupted ({e}); run the sync again to resume"
+            ) from e
+
+    if expected.isdigit() and os.path.getsize(part_path) != int(expected):
+        raise SyncError("Transfer ended early; run the sync again to resume")
+
+    os.replace(part_path, dest)
+    os.remove(state_path)
+    return headers
+
+
+def extract_changed(archive_path, raw_dir, known_files):
+    """
+    Extract CSV members whose CRC or size differs from ``known_files``.
+
+    Returns ``(changed_names, files)`` where ``files`` is the updated per-file
+    checksum map.
+    """
+    files = dict(known_files)
+    changed = []
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except zipfile.BadZipFile as e:
+        raise SyncError(f"Downloaded archive is not a valid zip: {e}") from e
+
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name.endswith(".csv"):
+                continue
+            path = os.path.join(raw_dir, name)
+            known = files.get(name)
+            if (
+                known is not None
+                and known["crc32"] == info.CRC
+                and known["size"] == info.file_size
+                and os.path.exists(path)
+            ):
+                continue
+
+            with archive.open(info) as src, open(f"{path}.tmp", "wb") as dst:
+                while chunk := src.read(CHUNK_SIZE):
+                    dst.write(chunk)
+            os.replace(f"{path}.tmp", path)
+            files[name] = {
+                "crc32": info.CRC,
+                "size": info.file_size,
+                "sha256": file_sha256(path),
+            }
+            changed.append(name)
+    return changed, files
+
+
+def sync(url=DATASET_URL, raw_dir="data/raw", cache_dir=None, auth=None):
+    """
+    Bring ``raw_dir`` (and the typed cache) up to date with the remote archive.
+
+    Returns a summary dict with the changed files and converted tables.
+    """
+    os.makedirs(raw_dir, exist_ok=True)
+    manifest = load_manifest(raw_dir)
+    archive_path = os.path.join(raw_dir, ARCHIVE_FILE)
+    start = time.perf_counter()
+
+    all_present = bool(manifest["files"]) and all(
+        os.path.exists(os.path.join(raw_dir, name)) for name in manifest["files"]
+    )
+    headers = fetch(
+        url, archive_path, etag=manifest.get("etag") if all_present else None, auth=auth
+    )
+    summary = {"downloaded": headers is not None, "changed": [], "converted": []}
+
+    if headers is not None:
+        archive_sha256 = file_sha256(archive_path)
+        if archive_sha256 != manifest.get("archive_sha256") or not all_present:
+            changed, files = extract_changed(archive_path, raw_dir, manifest["files"])
+            manifest["files"] = files
+            summary["changed"] = changed
+        manifest.update(
+            {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "archive_sha256": archive_sha256,
+                "archive_bytes": os.path.getsize(archive_path),
+            }
+        )
+        os.remove(archive_path)
+
+    tables = [name[: -len(".csv")] for name in summary["changed"]]
+    tables = [name for name in tables if name in SCHEMAS]
+    if cache_dir is not None:
+        if read_manifest(cache_dir) is None:
+            tables = [name for name in SCHEMAS if name + ".csv" in manifest["files"]]
+        if tables:
+            summary["converted"] = ingest(raw_dir, cache_dir, tables=tables)
+
+    manifest["synced_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    save_manifest(raw_dir, manifest)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the Kaggle F1 dataset")
+    parser.add_argument("--url", default=DATASET_URL)
+    parser.add_argument("--raw-dir", default="data/raw")
+    parser.add_argument("--cache-dir", default="data/cache")
+    args = parser.parse_args()
+
+    auth = kaggle_auth()
+    if auth is None and args.url == DATASET_URL:
+        print("Please set KAGGLE_USERNAME and KAGGLE_KEY environment variables")
+        # Existing data stays usable when the sync cannot run
+        sys.exit(0 if load_manifest(args.raw_dir)["files"] else 1)
+
+    summary = sync(args.url, args.raw_dir, args.cache_dir, auth)
+    if not summary["downloaded"]:
+        print("Dataset unchanged (not modified)")
+    else:
+        print(f"Changed files: {summary['changed'] or 'none'}")
+        print(f"Converted tables: {summary['converted'] or 'none'}")
+    print(f"Sync finished in {summary['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
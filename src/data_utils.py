@@ -1,5 +1,25 @@
 """Utility functions for data processing and validation."""
 
+import numpy as np
+
+# Valid (low, high) bounds per engineered feature; None leaves a side open.
+# Features not listed are only checked for NaN and infinite values.
+FEATURE_RANGES = {
+    "driver_win_rate": (0.0, 1.0),
+    "constructor_win_rate": (0.0, 1.0),
+    "driver_constructor_interaction": (0.0, 1.0),
+    "driver_season_points": (0.0, None),
+    "qualifying_position": (0.0, None),
+    "num_pit_stops": (0.0, None),
+    "avg_pit_time": (0.0, None),
+    "total_pit_time": (0.0, None),
+    "grid": (0.0, None),
+    "year": (1950.0, None),
+    "points_per_race": (0.0, None),
+    "recent_avg_position": (0.0, None),
+    "constructor_recent_wins": (0.0, None),
+}
+
 
 def validate_race_data(race_data, required_features):
     """
@@ -14,12 +34,71 @@ def validate_race_data(race_data, required_features):
     return is_valid, missing_features
 
 
+def validate_races(race_data, required_features, race_ids, feature_ranges=None):
+    """
+    Validate many races at once, column by column.
+
+    ``race_data`` is a DataFrame with the feature columns, or an
+    ``(n_rows, n_features)`` array ordered like ``required_features``;
+    ``race_ids`` holds each row's race ID. Every feature is checked for NaN
+    and infinite values and against its bounds in ``feature_ranges``
+    (default ``FEATURE_RANGES``).
+
+    Returns ``(missing_features, errors)`` where ``errors`` maps the ID of
+    each invalid race to a message naming the offending features.
+    """
+    if hasattr(race_data, "columns"):
+        missing_features = [f for f in required_features if f not in race_data.columns]
+        if missing_features:
+            return missing_features, {}
+        race_data = race_data[required_features].to_numpy(dtype=np.float64)
+    values = np.asarray(race_data, dtype=np.float64)
+
+    ranges = FEATURE_RANGES if feature_ranges is None else feature_ranges
+    bounds = [ranges.get(f) or (None, None) for f in required_features]
+    low = np.array([-np.inf if lo is None else lo for lo, _ in bounds])
+    high = np.array([np.inf if hi is None else hi for _, hi in bounds])
+
+    non_finite = ~np.isfinite(values)
+    with np.errstate(invalid="ignore"):
+        out_of_range = (values < low) | (values > high)
+    bad_rows = np.flatnonzero((non_finite | out_of_range).any(axis=1))
+    if len(bad_rows) == 0:
+        return [], {}
+
+    # Only the offending rows are grouped by race
+    import pandas as pd
+
+    codes, bad_races = pd.factorize(np.asarray(race_ids, dtype=object)[bad_rows])
+    shape = (len(bad_races), len(required_features))
+    non_finite_counts = np.zeros(shape, dtype=np.intp)
+    out_of_range_counts = np.zeros(shape, dtype=np.intp)
+    np.add.at(non_finite_counts, codes, non_finite[bad_rows])
+    np.add.at(out_of_range_counts, codes, out_of_range[bad_rows])
+
+    names = np.array(required_features, dtype=object)
+    errors = {}
+    for i, race_id in enumerate(bad_races):
+        problems = []
+        if non_finite_counts[i].any():
+            problems.append(
+                f"Non-finite features: {names[non_finite_counts[i] > 0].tolist()}"
+            )
+        if out_of_range_counts[i].any():
+            problems.append(
+                "Features out of range: "
+                f"{names[out_of_range_counts[i] > 0].tolist()}"
+            )
+        errors[race_id] = "; ".join(problems)
+    return [], errors
+
+
 def format_driver_name(driver_data):
     """
     Format driver name from forename and surname.
     """
-    forename = driver_data.get("forename", "").strip()
-    surname = driver_data.get("surname", "").strip()
+    forename = (driver_data.get("forename") or "").strip()
+    surname = (driver_data.get("surname") or "").strip()
 
     if not forename:
         forename = "Unknown"
@@ -29,6 +108,22 @@ def format_driver_name(driver_data):
     return f"{forename} {surname}"
 
 
+def format_driver_names(forenames, surnames):
+    """
+    Format many driver names at once, like ``format_driver_name``.
+
+    Takes forename and surname arrays, Series or lists (missing values become
+    ``Unknown``) and returns an object array of display names.
+    """
+    import pandas as pd
+
+    parts = []
+    for names in (forenames, surnames):
+        names = pd.Series(np.asarray(names, dtype=object)).str.strip().fillna("")
+        parts.append(names.mask(names == "", "Unknown"))
+    return (parts[0] + " " + parts[1]).to_numpy(dtype=object)
+
+
 def calculate_win_probability_stats(predictions):
     """
     Calculate statistics for win probabilities.
@@ -49,3 +144,24 @@ def calculate_win_probability_stats(predictions):
         "max_probability": float(probabilities.max()),
         "min_probability": float(probabilities.min()),
     }
+
+
+def calculate_race_win_probability_stats(predictions, race_column="race_id"):
+    """
+    Calculate win probability statistics for every race of a multi-race frame.
+
+    Returns a DataFrame indexed by race ID (in order of first appearance) with
+    the ``calculate_win_probability_stats`` columns, computed in one grouped
+    pass.
+    """
+    import pandas as pd
+
+    columns = ["total_drivers", "avg_probability", "max_probability", "min_probability"]
+    if predictions.empty or "win_probability" not in predictions.columns:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name=race_column))
+
+    stats = predictions.groupby(race_column, sort=False)["win_probability"].agg(
+        ["size", "mean", "max", "min"]
+    )
+    stats.columns = columns
+    return stats
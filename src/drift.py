@@ -0,0 +1,367 @@
+"""
+Feature drift monitoring: do live inputs still look like the training data?
+
+The reference is exported at training time (``drift_reference.json`` next to
+the model, or in its registry version): per feature, the quantile bin edges of
+the unscaled training rows and the training counts in each bin. ``DriftMonitor``
+keeps the live counts in the same bins, so memory is fixed by the number of
+features and bins, and an update is a few vectorized comparisons per row,
+independent of how much traffic has been seen. Counts cover the last one to two
+``window``s of rows (the current window, plus the previous one once it has
+rolled over).
+
+Per feature, live counts are compared with the reference:
+
+    psi     population stability index over the bins; below 0.1 is stable,
+            0.1-0.25 moderate and above 0.25 a significant shift
+    ks      Kolmogorov-Smirnov statistic, the largest gap between the two
+            cumulative distributions at the bin edges
+
+Binning makes ``ks`` a lower bound of the exact statistic. Each serving process
+keeps its own counts.
+
+Usage:
+    python -m src.drift reference --processed-dir data/processed
+    python -m src.drift score requests.jsonl --reference models/drift_reference.json
+    python -m src.drift score races.parquet --json
+"""
+
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+DRIFT_FILE = "drift_reference.json"
+DEFAULT_BINS = 20
+DEFAULT_WINDOW = 10_000
+# Scores are reported with a status once this many live rows are counted. The
+# PSI of a sample from the reference distribution itself is about
+# (bins - 1) / rows, so fewer rows would look like moderate drift.
+MIN_ROWS = 1000
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Floor for empty bins, which would otherwise make the PSI infinite
+PSI_EPSILON = 1e-4
+# c(alpha) of the two-sample KS test at alpha = 0.05
+KS_C_ALPHA = 1.358
+
+
+def default_reference_path():
+    """
+    Return the drift reference path next to the model in ``models/``.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "models", DRIFT_FILE)
+
+
+def reference_histograms(features, feature_names, bins=DEFAULT_BINS):
+    """
+    Bin each column of the training matrix at its quantiles.
+
+    Returns the reference dict: per feature the interior bin ``edges`` (repeated
+    quantiles of discrete features collapse into one edge) and the training
+    ``counts``, where a value falls in the bin above every edge it is at least.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    features = features[np.isfinite(features).all(axis=1)]
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    histograms = {}
+    for name, column in zip(feature_names, features.T, strict=True):
+        edges = np.unique(np.quantile(column, quantiles))
+        counts = np.bincount(
+            np.searchsorted(edges, column, side="right"), minlength=len(edges) + 1
+        )
+        histograms[name] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    return {
+        "feature_names": list(feature_names),
+        "bins": bins,
+        "rows": len(features),
+        "features": histograms,
+    }
+
+
+def training_features(X_train, scalers):
+    """
+    Undo the per-feature scaling of a processed ``X_train`` frame.
+
+    Live requests carry unscaled features (scaling is folded into the scoring
+    engine), so the reference is built on the unscaled training rows.
+    """
+    X_train = X_train.copy()
+    for column, scaler in scalers.items():
+        if column in X_train.columns:
+            X_train[column] = scaler.inverse_transform(X_train[[column]]).ravel()
+    return X_train
+
+
+def write_reference(path, reference):
+    """Write a drift reference atomically; returns the path."""
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(reference, f)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def load_reference(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def psi(expected, actual):
+    """
+    Population stability index per row of two ``(features, bins)`` count arrays.
+    """
+    expected = _proportions(expected)
+    actual = _proportions(actual)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+
+
+def ks_statistic(expected, actual):
+    """
+    Largest CDF gap per row of two ``(features, bins)`` count arrays.
+    """
+    expected_cdf = np.cumsum(expected, axis=1) / expected.sum(axis=1, keepdims=True)
+    actual_cdf = np.cumsum(actual, axis=1) / actual.sum(axis=1, keepdims=True)
+    return np.abs(expected_cdf - actual_cdf).max(axis=1)
+
+
+def _proportions(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    return np.maximum(counts / counts.sum(axis=1, keepdims=True), PSI_EPSILON)
+
+
+def psi_status(value):
+    if value < PSI_MODERATE:
+        return "stable"
+    if value < PSI_SIGNIFICANT:
+        return "moderate"
+    return "drift"
+
+
+class DriftMonitor:
+    """
+    Streaming per-feature histograms of live inputs, scored against a reference.
+
+    ``set_reference`` compiles the reference for a model's ``feature_names``
+    (and resets the counts); ``update`` counts a feature matrix in that order;
+    ``stats`` returns the PSI and KS scores. ``window=None`` never rolls over,
+    for scoring a whole log offline.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.reference = None
+        self.feature_names = None
+        self._lock = threading.Lock()
+
+    def set_reference(self, reference, feature_names):
+        """Monitor the model's features that ``reference`` covers (None: off)."""
+        with self._lock:
+            self.feature_names = tuple(feature_names)
+            self.reference = reference
+            if reference is None:
+                return
+            histograms = reference["features"]
+            self.monitored = [f for f in feature_names if f in histograms]
+            self.unmonitored = [f for f in feature_names if f not in histograms]
+            self._columns = [feature_names.index(f) for f in self.monitored]
+            if self._columns == list(range(len(feature_names))):
+                self._columns = None
+
+            # Pad every feature to the same number of bins; the padding edges
+            # are infinite, so no live value lands past a feature's last bin
+            n_bins = max(
+                (len(histograms[f]["counts"]) for f in self.monitored), default=1
+            )
+            self._edges = np.full((len(self.monitored), n_bins - 1), np.inf)
+            self._expected = np.zeros((len(self.monitored), n_bins))
+            for i, name in enumerate(self.monitored):
+                edges = histograms[name]["edges"]
+                self._edges[i, : len(edges)] = edges
+                self._expected[i, : len(edges) + 1] = histograms[name]["counts"]
+            # Live counts of rows at or above each edge; the bin counts are
+            # their differences
+            self._current = np.zeros(self._edges.shape, dtype=np.int64)
+            self._previous = np.zeros(self._edges.shape, dtype=np.int64)
+            self._current_rows = self._previous_rows = self.rows_seen = 0
+
+    @property
+    def enabled(self):
+        return self.reference is not None
+
+    def update(self, features, feature_names):
+        """
+        Count a ``(rows, features)`` matrix whose columns are ``feature_names``.
+
+        Matrices for other feature lists (a request still running on the
+        previous model version) are ignored.
+        """
+        if self.reference is None or tuple(feature_names) != self.feature_names:
+            return
+        values = np.asarray(features, dtype=np.float64)
+        if self._columns is not None:
+            values = values[:, self._columns]
+        counts = (values[:, :, None] >= self._edges).sum(axis=0)
+        with self._lock:
+            # The reference may have been swapped while counting
+            if counts.shape != self._current.shape:
+                return
+            self._current += counts
+            self._current_rows += len(values)
+            self.rows_seen += len(values)
+            if self.window is not None and self._current_rows >= self.window:
+                self._previous, self._current = self._current, self._previous
+                self._previous_rows, self._current_rows = self._current_rows, 0
+                self._current[:] = 0
+
+    def stats(self):
+        """PSI and KS per monitored feature over the counted rows."""
+        if self.reference is None:
+            return {"enabled": False}
+        with self._lock:
+            at_or_above = self._current + self._previous
+            rows = self._current_rows + self._previous_rows
+            rows_seen = self.rows_seen
+        reference_rows = self.reference["rows"]
+        result = {
+            "enabled": True,
+            "reference_rows": reference_rows,
+            "window": self.window,
+            "rows": rows,
+            "rows_seen": rows_seen,
+            "unmonitored_features": self.unmonitored,
+            "max_psi": None,
+            "drifted_features": [],
+            "ks_critical": None,
+            "features": {},
+        }
+        if rows == 0 or not self.monitored:
+            return result
+
+        n_monitored = len(self.monitored)
+        cumulative = np.column_stack(
+            [
+                np.full(n_monitored, rows),
+                at_or_above,
+                np.zeros(n_monitored, dtype=np.int64),
+            ]
+        )
+        actual = cumulative[:, :-1] - cumulative[:, 1:]
+        psi_values = psi(self._expected, actual)
+        ks_values = ks_statistic(self._expected, actual)
+        scored = rows >= MIN_ROWS
+        for name, psi_value, ks_value in zip(
+            self.monitored, psi_values.tolist(), ks_values.tolist(), strict=True
+        ):
+            result["features"][name] = {
+                "psi": psi_value,
+                "ks": ks_value,
+                "status": psi_status(psi_value) if scored else None,
+            }
+        result["max_psi"] = max(psi_values.tolist())
+        if scored:
+            result["drifted_features"] = [
+                name
+                for name, scores in result["features"].items()
+                if scores["status"] == "drift"
+            ]
+        result["ks_critical"] = KS_C_ALPHA * float(
+            np.sqrt((reference_rows + rows) / (reference_rows * rows))
+        )
+        return result
+
+
+def score_log(path, reference, fmt=None, race_column="race_id"):
+    """
+    Score a scoring log (a ``batch_score`` input) against ``reference``.
+
+    JSONL races that fail validation and Parquet rows with non-finite features
+    are skipped. Returns ``(stats, skipped)``.
+    """
+    try:
+        from .batch_score import iter_races
+    except ImportError:
+        from batch_score import iter_races
+
+    feature_names = reference["feature_names"]
+    monitor = DriftMonitor(window=None)
+    monitor.set_reference(reference, feature_names)
+
+    skipped = 0
+    for _, _, features, error in iter_races(path, feature_names, fmt, race_column):
+        if error is not None:
+            skipped += 1
+            continue
+        finite = np.isfinite(features).all(axis=1)
+        skipped += int(np.count_nonzero(~finite))
+        monitor.update(features[finite], feature_names)
+    return monitor.stats(), skipped
+
+
+def processed_reference(processed_dir, bins=DEFAULT_BINS):
+    """Build the reference from ``save_processed`` output (``X_train`` is scaled)."""
+    import pickle
+
+    import pandas as pd
+
+    with open(os.path.join(processed_dir, "metadata.json")) as f:
+        feature_names = json.load(f)["feature_names"]
+    with open(os.path.join(processed_dir, "scalers.pkl"), "rb") as f:
+        scalers = pickle.load(f)
+    X_train = pd.read_parquet(os.path.join(processed_dir, "X_train.parquet"))
+    X_train = training_features(X_train[feature_names], scalers)
+    return reference_histograms(X_train.to_numpy(), feature_names, bins)
+
+
+def print_stats(stats, skipped):
+    print(
+        f"{stats['rows']} rows scored against {stats['reference_rows']} "
+        f"training rows ({skipped} skipped)"
+    )
+    for name, scores in stats["features"].items():
+        print(
+            f"  {name:<32} psi {scores['psi']:7.4f}   ks {scores['ks']:6.4f}"
+            f"   {scores['status'] or '-'}"
+        )
+    if stats["unmonitored_features"]:
+        print(f"  not in the reference: {stats['unmonitored_features']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature drift reference and scores")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser(
+        "reference", help="build the reference from the processed training data"
+    )
+    build.add_argument("--processed-dir", default="data/processed")
+    build.add_argument("--bins", type=int, default=DEFAULT_BINS)
+    build.add_argument("--output", default=None, help="default: models/")
+    score = commands.add_parser("score", help="score a scoring log")
+    score.add_argument("log", help="JSONL requests or Parquet driver rows")
+    score.add_argument("--reference", default=None, help="default: models/")
+    score.add_argument("--format", choices=("jsonl", "parquet"), default=None)
+    score.add_argument("--race-column", default="race_id")
+    score.add_argument("--json", action="store_true", help="print the JSON stats")
+    args = parser.parse_args()
+
+    if args.command == "reference":
+        reference = processed_reference(args.processed_dir, args.bins)
+        path = write_reference(args.output or default_reference_path(), reference)
+        print(
+            f"Wrote {path}: {len(reference['feature_names'])} features, "
+            f"{reference['rows']} training rows"
+        )
+        return
+
+    reference = load_reference(args.reference or default_reference_path())
+    stats, skipped = score_log(args.log, reference, args.format, args.race_column)
+    if args.json:
+        print(json.dumps({**stats, "skipped": skipped}, indent=2))
+    else:
+        print_stats(stats, skipped)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Incremental feature store for the rolling driver/constructor features.
+
+Keeps the state behind ``driver_win_rate``, ``constructor_win_rate``,
+``driver_season_points``, ``recent_avg_position`` and
+``constructor_recent_wins`` (ring buffers of recent results and per-season
+points) so a finished race is folded in with O(drivers) work instead of
+rerunning ``src.features`` over every race since ``FROM_YEAR``.
+
+Usage:
+    python -m src.feature_store bootstrap --raw-dir data/raw
+    python -m src.feature_store ingest results.csv --year 2024 --round 5
+    python -m src.feature_store features entries.csv --year 2024 --round 6
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import deque
+
+try:
+    from .features import FROM_YEAR, RACE_WINDOW_SIZE, RECENT_WINDOW_SIZE
+except ImportError:
+    from features import FROM_YEAR, RACE_WINDOW_SIZE, RECENT_WINDOW_SIZE
+
+STORE_FILE = "feature_store.json"
+STORE_FEATURES = [
+    "driver_win_rate",
+    "constructor_win_rate",
+    "driver_season_points",
+    "recent_avg_position",
+    "constructor_recent_wins",
+    "driver_constructor_interaction",
+    "points_per_race",
+]
+
+
+def _position(value):
+    """Finishing position as a float, NaN for DNF/``\\N``/missing."""
+    try:
+        position = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return position
+
+
+class RollingWindow:
+    """
+    Fixed-size window of recent values with a running sum of non-NaN entries.
+    """
+
+    __slots__ = ("values", "total", "count")
+
+    def __init__(self, size, values=()):
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+        for value in values:
+            self.push(value)
+
+    def push(self, value):
+        """Append a value, dropping the oldest one when the window is full."""
+        if len(self.values) == self.values.maxlen:
+            oldest = self.values[0]
+            if not math.isnan(oldest):
+                self.total -= oldest
+                self.count -= 1
+        self.values.append(value)
+        if not math.isnan(value):
+            self.total += value
+            self.count += 1
+
+    def mean(self):
+        """Mean of the non-NaN values, NaN when there are none."""
+        return self.total / self.count if self.count else math.nan
+
+
+class DriverState:
+    """Rolling state for one driver."""
+
+    __slots__ = ("wins", "positions", "season", "season_points", "season_races")
+
+    def __init__(self, window_size, recent_window_size):
+        self.wins = RollingWindow(window_size)
+        self.positions = RollingWindow(recent_window_size)
+        self.season = None
+        self.season_points = 0.0
+        self.season_races = 0
+
+
+class ConstructorState:
+    """Rolling state for one constructor."""
+
+    __slots__ = ("wins", "recent_wins", "season", "season_points")
+
+    def __init__(self, window_size, recent_window_size):
+        self.wins = RollingWindow(window_size)
+        self.recent_wins = RollingWindow(recent_window_size)
+        self.season = None
+        self.season_points = 0.0
+
+
+class FeatureStore:
+    """
+    Per-driver and per-constructor rolling state, updated one race at a time.
+
+    Races must be ingested in calendar order. ``features_for_race`` returns the
+    features for an upcoming race using only results known before it, which
+    matches ``src.features`` except for leaks in the notebook definitions
+    (recent-form windows that include the race itself, and teammates' results
+    from the same race in the constructor win rate).
+    """
+
+    def __init__(
+        self, window_size=RACE_WINDOW_SIZE, recent_window_size=RECENT_WINDOW_SIZE
+    ):
+        self.window_size = window_size
+        self.recent_window_size = recent_window_size
+        self.drivers = {}
+        self.constructors = {}
+        self.last_race = None
+
+    def _driver(self, driver_id):
+        state = self.drivers.get(driver_id)
+        if state is None:
+            state = DriverState(self.window_size, self.recent_window_size)
+            self.drivers[driver_id] = state
+        return state
+
+    def _constructor(self, constructor_id):
+        state = self.constructors.get(constructor_id)
+        if state is None:
+            state = ConstructorState(self.window_size, self.recent_window_size)
+            self.constructors[constructor_id] = state
+        return state
+
+    def ingest_race(self, year, round_num, results):
+        """
+        Fold one finished race into the store.
+
+        ``results`` is a DataFrame or iterable of mappings with ``driverId``,
+        ``constructorId``, ``position`` and ``points``, in results-file order.
+        """
+        race = (int(year), int(round_num))
+        if self.last_race is not None and race <= self.last_race:
+            raise ValueError(
+                f"Race {race} is not after the last ingested race {self.last_race}"
+            )
+
+        if hasattr(results, "to_dict"):
+            results = results.to_dict(orient="records")
+
+        for result in results:
+            position = _position(result["position"])
+            won = 1.0 if position == 1 else 0.0
+
+            driver = self._driver(int(result["driverId"]))
+            driver.wins.push(won)
+            driver.positions.push(position)
+            if driver.season != race[0]:
+                driver.season = race[0]
+                driver.season_points = 0.0
+                driver.season_races = 0
+            driver.season_points += float(result["points"])
+            driver.season_races += 1
+
+            constructor = self._constructor(int(result["constructorId"]))
+            constructor.wins.push(won)
+            constructor.recent_wins.push(won)
+            if constructor.season != race[0]:
+                constructor.season = race[0]
+                constructor.season_points = 0.0
+            constructor.season_points += float(result["points"])
+
+        self.last_race = race
+
+    def driver_features(self, driver_id, constructor_id, year, round_num):
+        """
+        Return the store features for one driver entering a race.
+        """
+        driver = self.drivers.get(int(driver_id))
+        constructor = self.constructors.get(int(constructor_id))
+
+        driver_win_rate = driver.wins.mean() if driver else math.nan
+        constructor_win_rate = constructor.wins.mean() if constructor else math.nan
+        season_points = math.nan
+        if driver and driver.season == int(year) and driver.season_races:
+            season_points = driver.season_points
+
+        return {
+            "driver_win_rate": driver_win_rate,
+            "constructor_win_rate": constructor_win_rate,
+            "driver_season_points": season_points,
+            "recent_avg_position": driver.positions.mean() if driver else math.nan,
+            "constructor_recent_wins": (
+                constructor.recent_wins.total if constructor else math.nan
+            ),
+            "driver_constructor_interaction": driver_win_rate * constructor_win_rate,
+            "points_per_race": season_points / int(round_num),
+        }
+
+    def features_for_race(self, year, round_num, entries):
+        """
+        Add the store features to an upcoming race's entry list.
+
+        ``entries`` is a DataFrame with ``driverId`` and ``constructorId`` plus
+        any race-day features (grid, qualifying position, ...). Returns a copy
+        with ``year``, ``round`` and the ``STORE_FEATURES`` columns added.
+        """
+        import pandas as pd
+
+        features = pd.DataFrame(
+            [
+                self.driver_features(driver_id, constructor_id, year, round_num)
+                for driver_id, constructor_id in zip(
+                    entries["driverId"], entries["constructorId"], strict=True
+                )
+            ],
+            columns=STORE_FEATURES,
+            index=entries.index,
+        )
+        frame = entries.copy()
+        frame["year"] = year
+        frame["round"] = round_num
+        for column in STORE_FEATURES:
+            frame[column] = features[column]
+        return frame
+
+    @classmethod
+    def from_race_data(cls, race_data, **kwargs):
+        """
+        Build a store by replaying merged race data (results joined with races).
+        """
+        store = cls(**kwargs)
+        race_data = race_data.sort_values(["year", "round"], kind="stable")
+        for (year, round_num), results in race_data.groupby(
+            ["year", "round"], sort=False
+        ):
+            store.ingest_race(year, round_num, results)
+        return store
+
+    def to_dict(self):
+        """Serialize the store state to plain Python types."""
+        return {
+            "window_size": self.window_size,
+            "recent_window_size": self.recent_window_size,
+            "last_race": list(self.last_race) if self.last_race else None,
+            "drivers": {
+                str(driver_id): {
+                    "wins": list(state.wins.values),
+                    "positions": list(state.positions.values),
+                    "season": state.season,
+                    "season_points": state.season_points,
+                    "season_races": state.season_races,
+                }
+                for driver_id, state in self.drivers.items()
+            },
+            "constructors": {
+                str(constructor_id): {
+                    "wins": list(state.wins.values),
+                    "recent_wins": list(state.recent_wins.values),
+                    "season": state.season,
+                    "season_points": state.season_points,
+                }
+                for constructor_id, state in self.constructors.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a store serialized with ``to_dict``."""
+        store = cls(data["window_size"], data["recent_window_size"])
+        store.last_race = tuple(data["last_race"]) if data["last_race"] else None
+        for driver_id, saved in data["drivers"].items():
+            state = store._driver(int(driver_id))
+            state.wins = RollingWindow(store.window_size, saved["wins"])
+            state.positions = RollingWindow(
+                store.recent_window_size, saved["positions"]
+            )
+            state.season = saved["season"]
+            state.season_points = saved["season_points"]
+            state.season_races = saved["season_races"]
+        for constructor_id, saved in data["constructors"].items():
+            state = store._constructor(int(constructor_id))
+            state.wins = RollingWindow(store.window_size, saved["wins"])
+            state.recent_wins = RollingWindow(
+                store.recent_window_size, saved["recent_wins"]
+            )
+            # Stores saved before constructor points were tracked lack them
+            state.season = saved.get("season")
+            state.season_points = saved.get("season_points", 0.0)
+        return store
+
+    def save(self, path):
+        """Write the store as JSON, atomically replacing ``path``."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a store written by ``save``."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def main():
+    import pandas as pd
+
+    try:
+        from .features import load_raw_tables
+    except ImportError:
+        from features import load_raw_tables
+
+    parser = argparse.ArgumentParser(description="Incremental F1 feature store")
+    parser.add_argument(
+        "--store", default=os.path.join("data", "processed", STORE_FILE)
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bootstrap = commands.add_parser("bootstrap", help="replay the raw Kaggle data")
+    bootstrap.add_argument("--raw-dir", default="data/raw")
+    bootstrap.add_argument("--cache-dir", default="data/cache")
+    bootstrap.add_argument("--from-year", type=int, default=FROM_YEAR)
+
+    ingest = commands.add_parser("ingest", help="add one finished race")
+    ingest.add_argument("results", help="CSV with driverId, constructorId, ...")
+    ingest.add_argument("--year", type=int, required=True)
+    ingest.add_argument("--round", type=int, required=True)
+
+    features = commands.add_parser("features", help="features for the next race")
+    features.add_argument("entries", help="CSV with driverId, constructorId, ...")
+    features.add_argument("--year", type=int, required=True)
+    features.add_argument("--round", type=int, required=True)
+    features.add_argument("--output", default=None, help="CSV path (default stdout)")
+    args = parser.parse_args()
+
+    if args.command == "bootstrap":
+        tables = load_raw_tables(args.raw_dir, ["races", "results"], args.cache_dir)
+        race_data = tables["results"].merge(tables["races"], on="raceId")
+        race_data = race_data[race_data["year"] >= args.from_year]
+        store = FeatureStore.from_race_data(race_data)
+        store.save(args.store)
+        print(f"Store written to {args.store} (last race {store.last_race})")
+    elif args.command == "ingest":
+        store = FeatureStore.load(args.store)
+        store.ingest_race(args.year, args.round, pd.read_csv(args.results))
+        store.save(args.store)
+        print(f"Ingested {args.year} round {args.round}")
+    else:
+        store = FeatureStore.load(args.store)
+        frame = store.features_for_race(
+            args.year, args.round, pd.read_csv(args.entries)
+        )
+        frame.to_csv(args.output or sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
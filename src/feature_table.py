@@ -0,0 +1,207 @@
+"""
+Indexed in-memory feature table for server-side feature assembly.
+
+``src.features`` publishes the imputed, unscaled model features of every race
+row to ``data/processed/race_features.parquet``. ``FeatureTable`` indexes a
+snapshot of that file by ``(raceId, driverId)`` and by each driver's latest
+race, so ``/predict/race`` builds a race's feature matrix with one dict lookup
+per driver. ``FeatureTableLoader`` swaps in a new snapshot, from a background
+thread, when the file is republished.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+TABLE_FILE = "race_features.parquet"
+# Identifier columns; every other column is a model feature (including ``year``)
+TABLE_COLUMNS = ["raceId", "driverId", "round", "forename", "surname"]
+
+
+def default_table_path():
+    """
+    Return the feature table path in ``data/processed``.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "processed", TABLE_FILE)
+
+
+class FeatureTable:
+    """
+    Immutable snapshot of per-race driver features.
+
+    Rows must be in chronological order; the last row of each driver is their
+    latest race.
+    """
+
+    def __init__(
+        self, race_ids, driver_ids, features, feature_names, names, version=None
+    ):
+        self.features = np.ascontiguousarray(features, dtype=np.float64)
+        self.features.setflags(write=False)
+        self.feature_names = list(feature_names)
+        self.column_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.names = list(names)
+        self.version = version
+
+        self.driver_ids = [int(driver_id) for driver_id in driver_ids]
+        self.rows = {}
+        self.latest = {}
+        self.races = {}
+        for row, (race_id, driver_id) in enumerate(
+            zip(race_ids, self.driver_ids, strict=True)
+        ):
+            race_id = int(race_id)
+            self.rows[(race_id, driver_id)] = row
+            self.latest[driver_id] = row
+            self.races.setdefault(race_id, []).append(row)
+
+    def __len__(self):
+        return len(self.driver_ids)
+
+    def race_rows(self, race_id, driver_ids=None):
+        """
+        Return ``(rows, missing_driver_ids)`` for drivers in a race.
+
+        All of the race's drivers are returned when ``driver_ids`` is None.
+        Raises ``KeyError`` for an unknown race.
+        """
+        if race_id not in self.races:
+            raise KeyError(race_id)
+        if driver_ids is None:
+            return list(self.races[race_id]), []
+
+        rows, missing = [], []
+        for driver_id in driver_ids:
+            row = self.rows.get((race_id, driver_id))
+            if row is None:
+                missing.append(driver_id)
+            else:
+                rows.append(row)
+        return rows, missing
+
+    def latest_rows(self, driver_ids):
+        """
+        Return ``(rows, missing_driver_ids)`` for each driver's latest race.
+        """
+        rows, missing = [], []
+        for driver_id in driver_ids:
+            row = self.latest.get(driver_id)
+            if row is None:
+                missing.append(driver_id)
+            else:
+                rows.append(row)
+        return rows, missing
+
+    def matrix(self, rows, feature_names):
+        """
+        Return the ``(len(rows), len(feature_names))`` feature matrix.
+
+        Raises ``KeyError`` if the table lacks a requested feature.
+        """
+        columns = [self.column_index[name] for name in feature_names]
+        return self.features[np.ix_(rows, columns)]
+
+    @classmethod
+    def from_frame(cls, frame, version=None):
+        """Build a table from a frame laid out like ``race_features.parquet``."""
+        feature_names = [c for c in frame.columns if c not in TABLE_COLUMNS]
+        names = [
+            {"forename": forename, "surname": surname}
+            for forename, surname in zip(
+                frame["forename"], frame["surname"], strict=True
+            )
+        ]
+        return cls(
+            frame["raceId"].to_numpy(),
+            frame["driverId"].to_numpy(),
+            frame[feature_names].to_numpy(dtype=np.float64),
+            feature_names,
+            names,
+            version,
+        )
+
+    @classmethod
+    def read(cls, path):
+        """Load a table from parquet, versioned by the file's mtime."""
+        import pandas as pd
+
+        version = os.stat(path).st_mtime_ns
+        return cls.from_frame(pd.read_parquet(path), version)
+
+
+class FeatureTableLoader:
+    """
+    Holds the current ``FeatureTable`` and reloads it when the file changes.
+
+    ``poll`` checks the file once; ``start`` runs it every ``check_interval``
+    seconds in a daemon thread, so ``get`` never touches the filesystem on the
+    request path. A new snapshot is built completely before it replaces the
+    old one, so readers always see a consistent table; a failed reload keeps
+    the previous one.
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.table = None
+        self.reloads = 0
+        self.last_error = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the current table (None if not loaded yet)."""
+        return self.table
+
+    def poll(self):
+        """Reload the table if the file changed; returns the current table."""
+        with self._lock:
+            self._reload_if_changed()
+        return self.table
+
+    def start(self):
+        """Start polling in a background thread (once per process)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="feature-table", daemon=True
+                )
+                self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.poll()
+
+    def _reload_if_changed(self):
+        try:
+            version = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if self.table is not None and self.table.version == version:
+            return
+        try:
+            table = FeatureTable.read(self.path)
+        except Exception as e:
+            self.last_error = str(e)
+            return
+        self.table = table
+        self.reloads += 1
+        self.last_error = None
+
+    def stats(self):
+        """Return the loaded snapshot's size and version."""
+        return {
+            "loaded": self.table is not None,
+            "rows": len(self.table) if self.table is not None else 0,
+            "version": self.table.version if self.table is not None else None,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
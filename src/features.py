@@ -0,0 +1,501 @@
+"""
+Feature engineering pipeline for the F1 winner model.
+
+Scripted version of ``notebooks/02_data_preprocessing.ipynb``: merges the raw
+Kaggle tables, builds the rolling driver/constructor features, adds qualifying
+and pit stop data, then imputes, scales and saves the processed artifacts.
+
+Rolling features use vectorized grouped cumulative sums instead of
+``groupby().transform(lambda ...)``: rows are sorted by group key once and every
+window becomes a difference of two prefix sums.
+
+Usage:
+    python -m src.features --raw-dir data/raw --output-dir data/processed
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .feature_table import TABLE_COLUMNS, TABLE_FILE
+    from .raw_cache import load_tables, read_manifest
+except ImportError:
+    from feature_table import TABLE_COLUMNS, TABLE_FILE
+    from raw_cache import load_tables, read_manifest
+
+FROM_YEAR = 2010
+RACE_WINDOW_SIZE = 25
+RECENT_WINDOW_SIZE = 5
+LAST_TRAIN_YEAR = 2020
+
+ID_COLUMNS = ["raceId", "driverId"]
+TARGET_COLUMNS = ["is_winner"]
+FEATURE_COLUMNS = [
+    "driver_win_rate",
+    "constructor_win_rate",
+    "driver_season_points",
+    "qualifying_position",
+    "num_pit_stops",
+    "avg_pit_time",
+    "total_pit_time",
+    "grid",
+    "year",
+    "driver_constructor_interaction",
+    "grid_qualifying_diff",
+    "points_per_race",
+    "recent_avg_position",
+    "constructor_recent_wins",
+]
+LOW_IMPACT_FEATURES = [
+    "avg_pit_time",
+    "total_pit_time",
+    "driver_season_points",
+    "grid_qualifying_diff",
+]
+
+# Scaler class per feature; None keeps the feature unscaled
+SCALING_STRATEGY = {
+    "qualifying_position": "MinMaxScaler",
+    "grid": "MinMaxScaler",
+    "driver_win_rate": None,
+    "constructor_win_rate": None,
+    "driver_season_points": "RobustScaler",
+    "year": "StandardScaler",
+    "num_pit_stops": "MinMaxScaler",
+    "avg_pit_time": "RobustScaler",
+    "total_pit_time": "RobustScaler",
+    "driver_constructor_interaction": None,
+    "points_per_race": "RobustScaler",
+    "recent_avg_position": "RobustScaler",
+    "constructor_recent_wins": "MinMaxScaler",
+}
+
+RAW_TABLES = {
+    "races": ["raceId", "year", "round", "circuitId"],
+    "results": ["raceId", "driverId", "constructorId", "grid", "position", "points"],
+    "drivers": ["driverId", "forename", "surname"],
+    "constructors": ["constructorId"],
+    "circuits": ["circuitId"],
+    "qualifying": ["raceId", "driverId", "position"],
+    "pit_stops": ["raceId", "driverId", "stop", "milliseconds"],
+}
+
+
+class GroupIndex:
+    """
+    Rows grouped by one or more keys, sorted once and reused by every window.
+
+    Rows keep their relative order inside each group (stable sort), so a frame
+    sorted by ``(year, round)`` yields chronological groups.
+    """
+
+    def __init__(self, *keys):
+        keys = [np.asarray(key) for key in keys]
+        self.size = len(keys[0])
+        self.order = np.lexsort(keys[::-1])
+
+        new_group = np.zeros(self.size, dtype=bool)
+        if self.size:
+            new_group[0] = True
+        for key in keys:
+            sorted_key = key[self.order]
+            new_group[1:] |= sorted_key[1:] != sorted_key[:-1]
+
+        starts = np.flatnonzero(new_group)
+        lengths = np.diff(np.append(starts, self.size))
+        self.group_start = np.repeat(starts, lengths)
+
+    def window_sum(self, values, window=None, include_current=True, block=None):
+        """
+        Return per-row ``(sum, count)`` of non-NaN values over a trailing window.
+
+        The window covers the last ``window`` rows of the row's group (all
+        earlier rows when ``window`` is None), ending at the current row or, with
+        ``include_current=False``, at the previous one. With ``block`` (e.g. the
+        race id) the window instead ends before the first group row sharing
+        the current row's block, so teammates in the same race are left out.
+        """
+        values = np.asarray(values, dtype=np.float64)[self.order]
+        valid = ~np.isnan(values)
+        value_sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+        valid_counts = np.concatenate(([0], np.cumsum(valid)))
+
+        positions = np.arange(self.size)
+        end = positions + (1 if include_current else 0)
+        if block is not None:
+            block = np.asarray(block)[self.order]
+            new_block = self.group_start == positions
+            new_block[1:] |= block[1:] != block[:-1]
+            end = np.maximum.accumulate(np.where(new_block, positions, 0))
+        begin = self.group_start
+        if window is not None:
+            begin = np.maximum(begin, end - window)
+
+        sums = np.empty(self.size)
+        counts = np.empty(self.size, dtype=np.int64)
+        sums[self.order] = value_sums[end] - value_sums[begin]
+        counts[self.order] = valid_counts[end] - valid_counts[begin]
+        return sums, counts
+
+    def window_mean(self, values, window=None, include_current=True, block=None):
+        """Trailing-window mean with ``min_periods=1`` semantics (NaN if empty)."""
+        sums, counts = self.window_sum(values, window, include_current, block)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+def load_raw_tables(raw_data_path, tables=None, cache_dir=None):
+    """
+    Load the raw Kaggle tables, reading only the columns the pipeline uses.
+
+    Reads the typed cache from ``src.raw_cache`` when ``cache_dir`` holds one,
+    otherwise parses the CSVs.
+    """
+    tables = tables or RAW_TABLES
+    if cache_dir is not None and read_manifest(cache_dir) is not None:
+        return load_tables(cache_dir, {name: RAW_TABLES[name] for name in tables})
+    return {
+        name: pd.read_csv(
+            os.path.join(raw_data_path, f"{name}.csv"),
+            usecols=RAW_TABLES[name],
+            na_values=["\\N"],
+        )
+        for name in tables
+    }
+
+
+def merge_race_data(tables, from_year=FROM_YEAR):
+    """
+    Merge results with races, drivers, constructors and circuits.
+    """
+    races = tables["races"][RAW_TABLES["races"]]
+    race_data = tables["results"][RAW_TABLES["results"]].merge(races, on="raceId")
+    race_data = race_data[race_data["year"] >= from_year]
+    race_data = race_data.merge(tables["drivers"][RAW_TABLES["drivers"]], on="driverId")
+    race_data = race_data.merge(
+        tables["constructors"][["constructorId"]], on="constructorId"
+    )
+    race_data = race_data.merge(tables["circuits"][["circuitId"]], on="circuitId")
+    return race_data.reset_index(drop=True)
+
+
+def add_historical_features(race_data, window_size=RACE_WINDOW_SIZE, pre_race=False):
+    """
+    Add the target and the win-rate / season-points history features.
+
+    Histories exclude the current row. As in the notebook, the recent form
+    windows include the current race and constructor windows see a teammate's
+    result in the same race. ``pre_race`` keeps every window before the race.
+    """
+    race_data = race_data.sort_values(["year", "round"], kind="stable")
+    race_data = race_data.reset_index(drop=True)
+
+    position_num = pd.to_numeric(race_data["position"], errors="coerce")
+    race_data["position_num"] = position_num
+    race_data["is_winner"] = (position_num == 1).astype(int)
+
+    by_driver = GroupIndex(race_data["driverId"].to_numpy())
+    by_constructor = GroupIndex(race_data["constructorId"].to_numpy())
+    by_driver_season = GroupIndex(
+        race_data["driverId"].to_numpy(), race_data["year"].to_numpy()
+    )
+    is_winner = race_data["is_winner"].to_numpy()
+    race_block = race_data["raceId"].to_numpy() if pre_race else None
+
+    race_data["driver_win_rate"] = by_driver.window_mean(
+        is_winner, window_size, include_current=False
+    )
+    race_data["constructor_win_rate"] = by_constructor.window_mean(
+        is_winner, window_size, include_current=False, block=race_block
+    )
+    season_points, season_races = by_driver_season.window_sum(
+        race_data["points"].to_numpy(), include_current=False
+    )
+    race_data["driver_season_points"] = np.where(
+        season_races > 0, season_points, np.nan
+    )
+
+    race_data["recent_avg_position"] = by_driver.window_mean(
+        position_num.to_numpy(), RECENT_WINDOW_SIZE, include_current=not pre_race
+    )
+    recent_wins, _ = by_constructor.window_sum(
+        is_winner, RECENT_WINDOW_SIZE, include_current=not pre_race, block=race_block
+    )
+    race_data["constructor_recent_wins"] = recent_wins
+    return race_data
+
+
+def qualifying_positions(qualifying):
+    """
+    First qualifying position per driver per race.
+    """
+    return (
+        qualifying.groupby(["raceId", "driverId"])["position"]
+        .first()
+        .reset_index()
+        .rename(columns={"position": "qualifying_position"})
+    )
+
+
+def pit_stop_stats(pit_stops):
+    """
+    Number of stops and mean/total stop time per driver per race.
+    """
+    stats = (
+        pit_stops.groupby(["raceId", "driverId"])
+        .agg({"stop": "count", "milliseconds": ["mean", "sum"]})
+        .reset_index()
+    )
+    stats.columns = [
+        "raceId",
+        "driverId",
+        "num_pit_stops",
+        "avg_pit_time",
+        "total_pit_time",
+    ]
+    return stats
+
+
+def add_race_features(race_data, qualifying, pit_stops):
+    """
+    Merge qualifying and pit stop data and add the derived features.
+    """
+    race_data = race_data.merge(
+        qualifying_positions(qualifying), on=ID_COLUMNS, how="left"
+    )
+    race_data["qualifying_position"] = race_data["qualifying_position"].fillna(
+        race_data["grid"]
+    )
+    race_data = race_data.merge(pit_stop_stats(pit_stops), on=ID_COLUMNS, how="left")
+
+    race_data["driver_constructor_interaction"] = (
+        race_data["driver_win_rate"] * race_data["constructor_win_rate"]
+    )
+    race_data["grid_qualifying_diff"] = (
+        race_data["grid"] - race_data["qualifying_position"]
+    )
+    race_data["points_per_race"] = (
+        race_data["driver_season_points"] / race_data["round"]
+    )
+    return race_data
+
+
+def build_features(
+    tables, from_year=FROM_YEAR, window_size=RACE_WINDOW_SIZE, pre_race=False
+):
+    """
+    Run the full feature engineering on the raw tables.
+
+    Returns the race-level frame with ids, driver names, every engineered
+    feature and the ``is_winner`` target.
+    """
+    race_data = merge_race_data(tables, from_year)
+    race_data = add_historical_features(race_data, window_size, pre_race)
+    return add_race_features(race_data, tables["qualifying"], tables["pit_stops"])
+
+
+def select_model_data(race_data):
+    """
+    Keep the id, feature and target columns used for modeling.
+    """
+    return race_data[ID_COLUMNS + FEATURE_COLUMNS + TARGET_COLUMNS].copy()
+
+
+def split_by_year(ml_data, last_train_year=LAST_TRAIN_YEAR):
+    """
+    Split into train (up to ``last_train_year``) and test (later seasons).
+    """
+    train = ml_data[ml_data["year"] <= last_train_year]
+    test = ml_data[ml_data["year"] > last_train_year]
+    return train, test
+
+
+def make_scaler(name):
+    """Instantiate a scaler from ``SCALING_STRATEGY`` by class name."""
+    from sklearn import preprocessing
+
+    return getattr(preprocessing, name)()
+
+
+def fit_mixed_scaling(X_train, feature_columns):
+    """
+    Fit the per-feature scalers from ``SCALING_STRATEGY`` on the training data.
+    """
+    scalers = {}
+    for column in feature_columns:
+        name = SCALING_STRATEGY.get(column)
+        if name is not None:
+            scalers[column] = make_scaler(name).fit(X_train[[column]])
+    return scalers
+
+
+def apply_scaling(X, scalers):
+    """
+    Apply fitted scalers to the matching columns of ``X``.
+    """
+    X = X.copy()
+    for column, scaler in scalers.items():
+        if column in X.columns:
+            X[column] = scaler.transform(X[[column]])
+    return X
+
+
+def prepare_training_data(ml_data, last_train_year=LAST_TRAIN_YEAR):
+    """
+    Drop low-impact features, impute medians and apply mixed scaling.
+
+    Returns a dict with the scaled splits, targets, scalers, the fitted
+    imputer, feature names, the unscaled test rows with their ids and the
+    imputed, unscaled training features (``train_features``).
+    """
+    from sklearn.impute import SimpleImputer
+
+    feature_columns = [f for f in FEATURE_COLUMNS if f not in LOW_IMPACT_FEATURES]
+    train, test = split_by_year(ml_data, last_train_year)
+
+    imputer = SimpleImputer(strategy="median")
+    X_train = pd.DataFrame(
+        imputer.fit_transform(train[feature_columns]),
+        columns=feature_columns,
+        index=train.index,
+    )
+    X_test = pd.DataFrame(
+        imputer.transform(test[feature_columns]),
+        columns=feature_columns,
+        index=test.index,
+    )
+
+    scalers = fit_mixed_scaling(X_train, feature_columns)
+    return {
+        "X_train": apply_scaling(X_train, scalers),
+        "X_test": apply_scaling(X_test, scalers),
+        "y_train": train[TARGET_COLUMNS],
+        "y_test": test[TARGET_COLUMNS],
+        "scalers": scalers,
+        "imputer": imputer,
+        "feature_names": feature_columns,
+        "test_data": test,
+        "train_features": X_train,
+    }
+
+
+def race_feature_table(race_data, prepared):
+    """
+    Imputed, unscaled model features for every race row, with ids and names.
+
+    This is the table ``/predict/race`` looks drivers up in; scaling is folded
+    into the scoring engine, so features are stored unscaled.
+    """
+    feature_names = prepared["feature_names"]
+    table = race_data[TABLE_COLUMNS].reset_index(drop=True)
+    imputed = prepared["imputer"].transform(race_data[feature_names])
+    return pd.concat([table, pd.DataFrame(imputed, columns=feature_names)], axis=1)
+
+
+def save_processed(prepared, output_dir):
+    """
+    Write the artifacts the model notebook and ``load_model_and_scalers`` read.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for name in ("X_train", "X_test", "y_train", "y_test"):
+        prepared[name].to_parquet(os.path.join(output_dir, f"{name}.parquet"))
+
+    metadata = {
+        "feature_names": prepared["feature_names"],
+        "train_samples": len(prepared["X_train"]),
+        "test_samples": len(prepared["X_test"]),
+        **prepared.get("metadata", {}),
+    }
+    with open(os.path.join(output_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f)
+    with open(os.path.join(output_dir, "scalers.pkl"), "wb") as f:
+        pickle.dump(prepared["scalers"], f)
+
+    prepared["test_data"].to_csv(
+        os.path.join(output_dir, "test_data_with_ids.csv"), index=False
+    )
+
+    if "race_features" in prepared:
+        # Replaced atomically: the API reloads it when the file changes
+        path = os.path.join(output_dir, TABLE_FILE)
+        prepared["race_features"].to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+
+def run_pipeline(
+    raw_dir,
+    output_dir,
+    from_year=FROM_YEAR,
+    window_size=RACE_WINDOW_SIZE,
+    last_train_year=LAST_TRAIN_YEAR,
+    cache_dir=None,
+    pre_race=False,
+):
+    """
+    Load, engineer, prepare and save. Returns per-stage timings in seconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+    tables = load_raw_tables(raw_dir, cache_dir=cache_dir)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    race_data = build_features(tables, from_year, window_size, pre_race)
+    timings["features"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prepared = prepare_training_data(select_model_data(race_data), last_train_year)
+    prepared["race_features"] = race_feature_table(race_data, prepared)
+    prepared["metadata"] = {"window_size": window_size, "pre_race": pre_race}
+    timings["prepare"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    save_processed(prepared, output_dir)
+    timings["save"] = time.perf_counter() - start
+
+    print(f"Processed {len(race_data)} records from {from_year} onwards")
+    print(f"Training samples: {len(prepared['X_train'])}")
+    print(f"Test samples: {len(prepared['X_test'])}")
+    print(f"Features: {prepared['feature_names']}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the processed F1 features")
+    parser.add_argument("--raw-dir", default="data/raw")
+    parser.add_argument(
+        "--cache-dir",
+        default="data/cache",
+        help="typed cache from src.raw_cache (CSVs are read if there is none)",
+    )
+    parser.add_argument("--output-dir", default="data/processed")
+    parser.add_argument("--from-year", type=int, default=FROM_YEAR)
+    parser.add_argument("--window-size", type=int, default=RACE_WINDOW_SIZE)
+    parser.add_argument("--last-train-year", type=int, default=LAST_TRAIN_YEAR)
+    parser.add_argument(
+        "--pre-race",
+        action="store_true",
+        help="end the recent form windows before each race (no same-race data)",
+    )
+    args = parser.parse_args()
+
+    timings = run_pipeline(
+        args.raw_dir,
+        args.output_dir,
+        args.from_year,
+        args.window_size,
+        args.last_train_year,
+        args.cache_dir,
+        args.pre_race,
+    )
+    print("Timings: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Prometheus-style metrics for the prediction servers.
+
+A small in-process registry rendered in the Prometheus text exposition format
+at ``GET /metrics``:
+
+    f1_requests_total               requests by endpoint and status code
+    f1_request_duration_seconds     end-to-end handler latency by endpoint
+    f1_stage_duration_seconds       latency by endpoint and stage: parse (JSON),
+                                    features (feature matrix), score (model),
+                                    calibrate, rank (sorting + formatting) and
+                                    serialize (JSON encoding)
+    f1_batch_races                  races per /predict/batch request
+    f1_race_drivers                 drivers per scored race
+    f1_model_load_seconds           time the last model load took
+
+Recording an observation is a bisect and two additions under a lock, so the
+instrumentation stays on in production (``F1_METRICS=0`` turns it off).
+Metrics are per process: under the preforked server each worker reports its
+own counters.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("F1_METRICS", "1") != "0"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+RACE_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+DRIVER_COUNT_BUCKETS = (1, 2, 5, 10, 15, 20, 22, 24, 26, 30, 40)
+
+
+class Histogram:
+    """
+    Histogram with fixed bucket upper bounds and an overflow bucket.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self):
+        """Return bucket counts keyed by upper bound, plus count and sum."""
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(bounds, self.counts, strict=True)),
+            "count": self.count,
+            "sum": self.total,
+        }
+
+    def samples(self):
+        """Yield ``(suffix, extra_labels, value)`` with cumulative buckets."""
+        cumulative = 0
+        bounds = [*self.buckets, "+Inf"]
+        for bound, count in zip(bounds, list(self.counts), strict=True):
+            cumulative += count
+            yield "_bucket", (("le", str(bound)),), cumulative
+        yield "_sum", (), self.total
+        yield "_count", (), self.count
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield "", (), self.value
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Family:
+    """
+    A metric name with one child metric per combination of label values.
+    """
+
+    def __init__(self, name, documentation, kind, factory, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Return the child for ``values``, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def expose(self):
+        """Render the family in the text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._children.items()):
+            labels = tuple(zip(self.labelnames, values, strict=True))
+            for suffix, extra, value in child.samples():
+                lines.append(
+                    f"{self.name}{suffix}{_format_labels(labels + extra)} {value}"
+                )
+        return lines
+
+
+class CallbackGauge:
+    """Gauge whose value is read from ``function`` at exposition time."""
+
+    def __init__(self, name, documentation, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def expose(self):
+        value = self.function()
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        if value is not None:
+            lines.append(f"{self.name} {float(value)}")
+        return lines
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(
+            Family(name, documentation, "counter", Counter, labelnames)
+        )
+
+    def histogram(self, name, documentation, buckets, labelnames=()):
+        return self._register(
+            Family(
+                name, documentation, "histogram", lambda: Histogram(buckets), labelnames
+            )
+        )
+
+    def gauge(self, name, documentation, function):
+        return self._register(CallbackGauge(name, documentation, function))
+
+    def add_histogram(self, name, documentation, histogram):
+        """Expose an existing unlabeled ``Histogram`` (e.g. the micro-batcher's)."""
+        family = Family(name, documentation, "histogram", lambda: histogram)
+        family.labels()
+        return self._register(family)
+
+    def expose(self):
+        """Return every metric in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    "f1_requests_total", "Requests by endpoint and status code.", ("endpoint", "status")
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "f1_request_duration_seconds",
+    "Request handling latency by endpoint.",
+    LATENCY_BUCKETS,
+    ("endpoint",),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "f1_stage_duration_seconds",
+    "Latency of each prediction stage by endpoint.",
+    LATENCY_BUCKETS,
+    ("endpoint", "stage"),
+)
+BATCH_RACES = REGISTRY.histogram(
+    "f1_batch_races", "Races per batch prediction request.", RACE_COUNT_BUCKETS
+)
+RACE_DRIVERS = REGISTRY.histogram(
+    "f1_race_drivers", "Drivers per scored race.", DRIVER_COUNT_BUCKETS
+)
+
+
+class StageTimer:
+    """
+    Time consecutive stages of one request.
+
+    Each ``stage(name)`` call records the time since the previous call (or
+    since the timer was created) as stage ``name`` of ``endpoint``.
+    """
+
+    __slots__ = ("endpoint", "last")
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.last = time.perf_counter()
+
+    def stage(self, name):
+        now = time.perf_counter()
+        STAGE_SECONDS.labels(self.endpoint, name).observe(now - self.last)
+        self.last = now
+
+
+class _DisabledTimer:
+    __slots__ = ()
+
+    def stage(self, name):
+        pass
+
+
+_DISABLED_TIMER = _DisabledTimer()
+
+
+def stage_timer(endpoint):
+    """Return a ``StageTimer``, or a no-op timer when metrics are disabled."""
+    return StageTimer(endpoint) if ENABLED else _DISABLED_TIMER
+
+
+def observe_request(endpoint, status, seconds):
+    """Count a finished request and record its latency."""
+    if ENABLED:
+        REQUESTS.labels(endpoint, str(status)).inc()
+        REQUEST_SECONDS.labels(endpoint).observe(seconds)
+
+
+def observe_races(driver_counts, batch=False):
+    """Record the driver count of every scored race (and the batch size)."""
+    if not ENABLED:
+        return
+    if batch:
+        BATCH_RACES.labels().observe(len(driver_counts))
+    histogram = RACE_DRIVERS.labels()
+    for count in driver_counts:
+        histogram.observe(count)
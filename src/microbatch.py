@@ -0,0 +1,148 @@
+"""
+Request coalescing for the async prediction server.
+
+Single-race requests that arrive within a short window are queued, scored
+together in one matmul and fanned back out to their callers.
+"""
+
+import asyncio
+
+import numpy as np
+
+try:
+    from .metrics import Histogram
+    from .scoring import segment_order
+except ImportError:
+    from metrics import Histogram
+    from scoring import segment_order
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring requests into micro-batches.
+
+    A batch is dispatched when ``max_batch_size`` races are queued or
+    ``max_wait_ms`` has passed since the first race of the batch arrived,
+    whichever comes first.
+    """
+
+    def __init__(self, score, max_batch_size=64, max_wait_ms=2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_depths = Histogram(QUEUE_DEPTH_BUCKETS)
+        self._queue = None
+        self._arrived = None
+        self._worker = None
+
+    @property
+    def queue_depth(self):
+        """Races waiting to be batched."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._arrived = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, features, engine=None):
+        """
+        Score one race's ``(n_drivers, n_features)`` matrix.
+
+        With ``engine`` the race is scored by ``engine.score`` instead of the
+        batcher's ``score`` function; races are only batched with others for
+        the same engine, so a model swap never mixes versions in one batch.
+
+        Returns ``(scores, order)`` where ``order`` ranks the drivers by
+        descending score.
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self.queue_depths.observe(self._queue.qsize())
+        self._queue.put_nowait((features, future, engine))
+        self._arrived.set()
+        return await future
+
+    async def stop(self):
+        """Cancel the batching worker."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            # Wait on an event rather than queue.get() so a timeout can never
+            # drop a request that arrived at the same moment.
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                break
+
+        self.batch_sizes.observe(len(batch))
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _dispatch(self, batch):
+        groups = {}
+        for request in batch:
+            groups.setdefault(id(request[2]), []).append(request)
+        for group in groups.values():
+            self._dispatch_group(group)
+
+    def _dispatch_group(self, batch):
+        matrices = [features for features, _, _ in batch]
+        offsets = np.zeros(len(batch) + 1, dtype=np.intp)
+        np.cumsum([len(features) for features in matrices], out=offsets[1:])
+
+        engine = batch[0][2]
+        score = self.score if engine is None else engine.score
+        scores = score(np.concatenate(matrices))
+        order = segment_order(scores, offsets)
+
+        for i, (_, future, _) in enumerate(batch):
+            if future.done():
+                continue
+            start, stop = offsets[i], offsets[i + 1]
+            future.set_result((scores[start:stop], order[start:stop] - start))
+
+    def stats(self):
+        """Return queue depth and batch-size histograms for tuning."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self.queue_depth,
+            "queue_depth_histogram": self.queue_depths.snapshot(),
+            "batch_size_histogram": self.batch_sizes.snapshot(),
+        }
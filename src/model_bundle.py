@@ -0,0 +1,194 @@
+"""
+Compact model bundle for fast cold starts.
+
+A bundle is one versioned file holding everything the serving path needs: the
+linear model coefficients, the folded scaler parameters, the fused weights and
+the feature names, plus a checksum. Loading it needs only NumPy, so the API can
+answer its first request without importing sklearn, pandas or joblib.
+
+Layout (little-endian):
+    magic           8 bytes   b"F1MODEL\\0"
+    format_version  uint32
+    header_length   uint32
+    header          JSON, space padded so the payload starts 64-byte aligned
+    payload         float64 arrays described by header["arrays"]
+
+Usage:
+    python -m src.model_bundle export [--output models/f1_winner_model.bundle]
+    python -m src.model_bundle info models/f1_winner_model.bundle
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+try:
+    from .scoring import ScoringEngine, affine_scaler_params, compile_scoring_engine
+except ImportError:
+    from scoring import ScoringEngine, affine_scaler_params, compile_scoring_engine
+
+MAGIC = b"F1MODEL\0"
+FORMAT_VERSION = 1
+BUNDLE_FILE = "f1_winner_model.bundle"
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+
+class BundleError(ValueError):
+    """Raised when a bundle is malformed, corrupt or of an unknown version."""
+
+
+def default_bundle_path():
+    """
+    Return the bundle path next to the joblib model in ``models/``.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "models", BUNDLE_FILE)
+
+
+def bundle_arrays(model, scalers, feature_names):
+    """
+    Collect the arrays stored in a bundle from a fitted model and scalers.
+    """
+    engine = compile_scoring_engine(model, scalers, feature_names)
+
+    offsets = np.zeros(len(feature_names))
+    scales = np.ones(len(feature_names))
+    for i, feature in enumerate(feature_names):
+        if scalers.get(feature) is not None:
+            offsets[i], scales[i] = affine_scaler_params(scalers[feature])
+
+    return {
+        "weights": engine.weights,
+        "intercept": np.array([engine.intercept]),
+        "coef": np.asarray(model.coef_, dtype=np.float64).reshape(-1),
+        "model_intercept": np.asarray(model.intercept_, dtype=np.float64).reshape(-1),
+        "scaler_offset": offsets,
+        "scaler_scale": scales,
+    }
+
+
+def write_bundle(path, arrays, feature_names, metadata=None):
+    """
+    Write ``arrays`` (name -> float64 array) and feature names to ``path``.
+
+    The file is written to a temporary name and renamed into place, so readers
+    never observe a partial bundle.
+    """
+    payload = b""
+    layout = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype="<f8")
+        layout[name] = {"offset": len(payload), "shape": list(array.shape)}
+        payload += array.tobytes()
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "feature_names": list(feature_names),
+        "arrays": layout,
+        "checksum": hashlib.sha256(payload).hexdigest(),
+        "metadata": metadata or {},
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode()
+    padding = -(_PREAMBLE.size + len(header_bytes)) % _ALIGNMENT
+    header_bytes += b" " * padding
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return header
+
+
+def export_bundle(model, scalers, feature_names, path=None, metadata=None):
+    """
+    Export a fitted model and its scalers as a bundle.
+    """
+    path = path or default_bundle_path()
+    metadata = {"model_type": type(model).__name__, **(metadata or {})}
+    arrays = bundle_arrays(model, scalers, feature_names)
+    write_bundle(path, arrays, feature_names, metadata)
+    return path
+
+
+def read_bundle(path, verify=True):
+    """
+    Memory-map a bundle and return ``(header, arrays)``.
+
+    Arrays are read-only views into the mapping, so workers forked after the
+    load (or processes mapping the same file) share the pages.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < _PREAMBLE.size:
+        raise BundleError(f"{path} is too small to be a model bundle")
+    magic, version, header_length = _PREAMBLE.unpack_from(mapped)
+    if magic != MAGIC:
+        raise BundleError(f"{path} is not a model bundle")
+    if version != FORMAT_VERSION:
+        raise BundleError(
+            f"Unsupported bundle format version {version} (expected {FORMAT_VERSION})"
+        )
+
+    header_end = _PREAMBLE.size + header_length
+    header = json.loads(mapped[_PREAMBLE.size : header_end])
+    payload = memoryview(mapped)[header_end:]
+    if verify and hashlib.sha256(payload).hexdigest() != header["checksum"]:
+        raise BundleError(f"{path} failed checksum verification")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            payload, dtype="<f8", count=count, offset=spec["offset"]
+        ).reshape(spec["shape"])
+    return header, arrays
+
+
+def load_model_bundle(path=None, verify=True):
+    """
+    Load a bundle into a ``ScoringEngine`` without importing sklearn.
+    """
+    header, arrays = read_bundle(path or default_bundle_path(), verify=verify)
+    return ScoringEngine(
+        arrays["weights"], arrays["intercept"][0], header["feature_names"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or inspect model bundles")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser(
+        "export", help="export the joblib/pickle/JSON artifacts as one bundle"
+    )
+    export.add_argument("--output", default=None, help=f"default: models/{BUNDLE_FILE}")
+
+    info = commands.add_parser("info", help="print a bundle's header")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        try:
+            from .predict_winner import load_model_and_scalers
+        except ImportError:
+            from predict_winner import load_model_and_scalers
+
+        model, scalers, feature_names = load_model_and_scalers()
+        path = export_bundle(model, scalers, feature_names, args.output)
+        print(f"Bundle written to {path}")
+    else:
+        header, _ = read_bundle(args.path)
+        print(json.dumps(header, indent=2))
+
+
+if __name__ == "__main__":
+    main()
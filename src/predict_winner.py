@@ -6,20 +6,34 @@ import json
 import pickle
 
 import joblib
-import pandas as pd
 
+try:
+    from .scoring import compile_scoring_engine
+except ImportError:
+    from scoring import compile_scoring_engine
 
-def load_model_and_scalers():
+MODEL_FILE = "f1_winner_model.joblib"
+# Written by the model notebook and by sweeps before the family-neutral name
+LEGACY_MODEL_FILE = "f1_winner_linear_regression.joblib"
+
+
+def load_model_and_scalers(project_root=None):
     """
     Load the trained model and scaler.
+
+    Artifacts are read from ``models/`` and ``data/processed/`` under
+    ``project_root`` (default: this checkout). The model is ``MODEL_FILE``, or
+    ``LEGACY_MODEL_FILE`` when only that exists.
     """
     import os
 
-    JOB_FILE = "f1_winner_linear_regression.joblib"
-
     # Get project root directory
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    model = joblib.load(os.path.join(project_root, "models", JOB_FILE))
+    if project_root is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    model_path = os.path.join(project_root, "models", MODEL_FILE)
+    if not os.path.exists(model_path):
+        model_path = os.path.join(project_root, "models", LEGACY_MODEL_FILE)
+    model = joblib.load(model_path)
 
     with open(
         os.path.join(project_root, "data", "processed", "scalers.pkl"), "rb"
@@ -32,9 +46,23 @@ def load_model_and_scalers():
     return model, scalers, metadata["feature_names"]
 
 
-def predict_race_winner(race_data, model, scalers, original_data=None):
+def load_scoring_engine():
+    """
+    Load the trained model and scalers and compile them into a scoring engine.
+    """
+    model, scalers, feature_names = load_model_and_scalers()
+    return compile_scoring_engine(model, scalers, feature_names)
+
+
+def predict_race_winner(
+    race_data, model, scalers, original_data=None, calibration=None, samples=0
+):
     """
     Predict race winner from race data using mixed scaling strategy.
+
+    With a ``Calibration``, the raw model output moves to ``score`` and
+    ``win_probability`` becomes the per-race softmax. ``samples > 0`` also adds
+    the Monte Carlo ``podium_probability`` (Plackett-Luce).
     """
     race_data_scaled = race_data.copy()
 
@@ -43,8 +71,14 @@ def predict_race_winner(race_data, model, scalers, original_data=None):
         if feature in race_data_scaled.columns:
             race_data_scaled[feature] = scaler.transform(race_data_scaled[[feature]])
 
-    # Make predictions
-    predictions = model.predict(race_data_scaled)
+    from sklearn.base import ClassifierMixin
+
+    # Make predictions; classifiers (logistic/ranking sweep models) expose a
+    # linear decision function instead of a regression output
+    if isinstance(model, ClassifierMixin):
+        predictions = model.decision_function(race_data_scaled)
+    else:
+        predictions = model.predict(race_data_scaled)
 
     # Use original data if provided, otherwise use race_data
     result_data = (
@@ -59,6 +93,17 @@ def predict_race_winner(race_data, model, scalers, original_data=None):
             p[0] if isinstance(p, list) else p for p in predictions
         ]
 
+    if calibration is not None:
+        result_data["score"] = result_data["win_probability"]
+        offsets = [0, len(result_data)]
+        method = "plackett_luce" if samples else "softmax"
+        outputs = calibration.calibrate(
+            result_data["score"].to_numpy(), offsets, method, samples
+        )
+        result_data["win_probability"] = outputs["win_probability"]
+        if samples:
+            result_data["podium_probability"] = outputs["podium_probability"]
+
     # Find most likely winner
     winner_idx = result_data["win_probability"].idxmax()
     predicted_winner = result_data.loc[winner_idx]
@@ -70,6 +115,8 @@ def example_prediction():
     """
     Example of how to use the prediction function.
     """
+    import pandas as pd
+
     # Load model
     model, scalers, feature_names = load_model_and_scalers()
 
@@ -0,0 +1,327 @@
+"""
+Typed columnar cache of the raw Kaggle CSVs.
+
+``ingest`` converts each CSV once into an uncompressed Arrow IPC file with
+explicit narrow dtypes (int16/int32 ids, categoricals for low-cardinality
+strings) and ``\\N`` parsed as null, and records source and cache SHA-256
+hashes in ``manifest.json``. ``load_tables`` then memory-maps the files and
+materializes only the requested columns, so the pipeline no longer re-parses
+and re-infers every CSV on each run.
+
+Usage:
+    python -m src.raw_cache ingest --raw-dir data/raw --cache-dir data/cache
+    python -m src.raw_cache verify --cache-dir data/cache
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+NULL_VALUES = ["\\N", ""]
+
+_DATE = "datetime"
+_SESSIONS = ["fp1", "fp2", "fp3", "quali", "sprint"]
+
+# Explicit dtypes for the Kaggle Formula 1 World Championship tables. Integer
+# columns that can be missing (``\N``) are stored as floats with NaN.
+SCHEMAS = {
+    "races": {
+        "raceId": "int32",
+        "year": "int16",
+        "round": "int16",
+        "circuitId": "int32",
+        "name": "category",
+        "date": _DATE,
+        "time": "string",
+        "url": "string",
+        **{f"{session}_date": _DATE for session in _SESSIONS},
+        **{f"{session}_time": "string" for session in _SESSIONS},
+    },
+    "results": {
+        "resultId": "int32",
+        "raceId": "int32",
+        "driverId": "int32",
+        "constructorId": "int32",
+        "number": "float32",
+        "grid": "int16",
+        "position": "float32",
+        "positionText": "category",
+        "positionOrder": "int16",
+        "points": "float32",
+        "laps": "int16",
+        "time": "string",
+        "milliseconds": "float64",
+        "fastestLap": "float32",
+        "rank": "float32",
+        "fastestLapTime": "string",
+        "fastestLapSpeed": "float32",
+        "statusId": "int16",
+    },
+    "drivers": {
+        "driverId": "int32",
+        "driverRef": "string",
+        "number": "float32",
+        "code": "category",
+        "forename": "string",
+        "surname": "string",
+        "dob": _DATE,
+        "nationality": "category",
+        "url": "string",
+    },
+    "constructors": {
+        "constructorId": "int32",
+        "constructorRef": "string",
+        "name": "string",
+        "nationality": "category",
+        "url": "string",
+    },
+    "circuits": {
+        "circuitId": "int32",
+        "circuitRef": "string",
+        "name": "string",
+        "location": "string",
+        "country": "category",
+        "lat": "float64",
+        "lng": "float64",
+        "alt": "float32",
+        "url": "string",
+    },
+    "qualifying": {
+        "qualifyId": "int32",
+        "raceId": "int32",
+        "driverId": "int32",
+        "constructorId": "int32",
+        "number": "int16",
+        "position": "int16",
+        "q1": "string",
+        "q2": "string",
+        "q3": "string",
+    },
+    "pit_stops": {
+        "raceId": "int32",
+        "driverId": "int32",
+        "stop": "int8",
+        "lap": "int16",
+        "time": "string",
+        "duration": "string",
+        "milliseconds": "int32",
+    },
+}
+
+
+class CacheError(ValueError):
+    """Raised when the cache is missing, stale or fails verification."""
+
+
+def default_cache_dir():
+    """
+    Return the cache directory next to ``data/raw``.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "cache")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cast(series, dtype):
+    """
+    Cast a parsed column to its schema dtype.
+
+    Integer columns that unexpectedly contain nulls fall back to a float type
+    wide enough for the values instead of failing the ingest.
+    """
+    import pandas as pd
+
+    if dtype == _DATE:
+        return pd.to_datetime(series, errors="coerce")
+    if dtype == "category":
+        return series.astype("category")
+    if dtype == "string":
+        return series.astype(object).where(series.notna(), None)
+    if dtype.startswith("int") and series.isna().any():
+        return pd.to_numeric(series, errors="coerce").astype(
+            "float64" if dtype in ("int32", "int64") else "float32"
+        )
+    return pd.to_numeric(series, errors="coerce").astype(dtype)
+
+
+def read_csv_typed(path, schema):
+    """
+    Parse a Kaggle CSV with ``\\N`` as null and cast columns to ``schema``.
+
+    Columns missing from the schema keep pandas' inferred dtype.
+    """
+    import pandas as pd
+
+    frame = pd.read_csv(
+        path,
+        na_values=NULL_VALUES,
+        keep_default_na=False,
+        dtype={column: str for column, dtype in schema.items() if dtype == "string"},
+    )
+    for column in frame.columns:
+        if column in schema:
+            frame[column] = _cast(frame[column], schema[column])
+    return frame
+
+
+def _write_arrow(frame, path):
+    """Write ``frame`` as an uncompressed Arrow IPC file, atomically."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(cache_dir):
+    """Return the cache manifest, or None when there is no cache."""
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise CacheError(
+            f"Unsupported cache format version {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def ingest(raw_dir, cache_dir, tables=None, force=False):
+    """
+    Convert the raw CSVs to the typed cache.
+
+    Tables whose CSV hash matches the manifest and whose cache file is intact
+    are skipped unless ``force`` is set. Returns the names of the tables that
+    were (re)converted.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = (None if force else read_manifest(cache_dir)) or {
+        "format_version": FORMAT_VERSION,
+        "tables": {},
+    }
+
+    converted = []
+    for name in tables or SCHEMAS:
+        csv_path = os.path.join(raw_dir, f"{name}.csv")
+        cache_path = os.path.join(cache_dir, f"{name}.arrow")
+        source_sha256 = file_sha256(csv_path)
+
+        entry = manifest["tables"].get(name)
+        if (
+            entry is not None
+            and entry["source_sha256"] == source_sha256
+            and os.path.exists(cache_path)
+            and file_sha256(cache_path) == entry["cache_sha256"]
+        ):
+            continue
+
+        frame = read_csv_typed(csv_path, SCHEMAS.get(name, {}))
+        _write_arrow(frame, cache_path)
+        manifest["tables"][name] = {
+            "source_sha256": source_sha256,
+            "cache_sha256": file_sha256(cache_path),
+            "cache_bytes": os.path.getsize(cache_path),
+            "rows": len(frame),
+            "columns": {column: str(dtype) for column, dtype in frame.dtypes.items()},
+        }
+        converted.append(name)
+
+    tmp_path = os.path.join(cache_dir, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_FILE))
+    return converted
+
+
+def verify(cache_dir):
+    """
+    Check every cached table against its manifest hash.
+
+    Returns a list of problems (empty when the cache is valid).
+    """
+    manifest = read_manifest(cache_dir)
+    if manifest is None:
+        return [f"No cache manifest in {cache_dir}"]
+
+    problems = []
+    for name, entry in manifest["tables"].items():
+        path = os.path.join(cache_dir, f"{name}.arrow")
+        if not os.path.exists(path):
+            problems.append(f"{name}: cache file missing")
+        elif file_sha256(path) != entry["cache_sha256"]:
+            problems.append(f"{name}: cache hash mismatch")
+    return problems
+
+
+def load_table(cache_dir, name, columns=None, manifest=None):
+    """
+    Memory-map one cached table and return the requested columns as a frame.
+    """
+    import pyarrow as pa
+
+    manifest = manifest or read_manifest(cache_dir)
+    if manifest is None or name not in manifest["tables"]:
+        raise CacheError(f"Table {name!r} is not in the cache at {cache_dir}")
+
+    path = os.path.join(cache_dir, f"{name}.arrow")
+    entry = manifest["tables"][name]
+    if not os.path.exists(path) or os.path.getsize(path) != entry["cache_bytes"]:
+        raise CacheError(f"Cache file for {name!r} is missing or was modified")
+
+    # Buffers keep the mapping alive; only the selected columns are paged in
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas()
+
+
+def load_tables(cache_dir, columns):
+    """
+    Load several tables; ``columns`` maps table name to the columns to read.
+    """
+    manifest = read_manifest(cache_dir)
+    if manifest is None:
+        raise CacheError(f"No cache manifest in {cache_dir}")
+    return {
+        name: load_table(cache_dir, name, table_columns, manifest)
+        for name, table_columns in columns.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typed cache of the raw CSVs")
+    parser.add_argument("command", choices=["ingest", "verify"])
+    parser.add_argument("--raw-dir", default="data/raw")
+    parser.add_argument("--cache-dir", default="data/cache")
+    parser.add_argument("--force", action="store_true", help="reconvert all tables")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        converted = ingest(args.raw_dir, args.cache_dir, force=args.force)
+        print(f"Converted: {', '.join(converted) or 'nothing (cache up to date)'}")
+    else:
+        problems = verify(args.cache_dir)
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("Cache OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Versioned model registry and hot-swap watcher for the serving process.
+
+The training Job publishes each exported model as a new version directory on
+the shared volume; the API picks it up without a restart:
+
+    <registry>/
+        20261017T030000Z/
+            f1_winner_model.bundle
+            calibration.json        optional, else temperature 1
+            parity.json             optional reference scores from training
+            drift_reference.json    optional training feature histograms
+        20261018T030000Z/
+        CURRENT                     optional: pins (or rolls back to) a version
+
+Without ``CURRENT`` the newest version is served (natural sort of the
+directory names). Versions are published by writing a hidden temporary
+directory and renaming it, so a half-written version is never seen.
+
+``ModelRegistry`` polls the directory in a background thread. A new version is
+loaded and warmed off the request path, checked for parity (finite scores on
+probe rows, and the training-time reference scores when ``parity.json`` is
+present), and only then handed to ``on_swap``. The API keeps one immutable
+``ModelHandle``; a request reads it once, so requests already running finish
+on the version they started with. A version that fails to load or fails the
+parity check is skipped and the current model keeps serving.
+
+Usage:
+    python -m src.registry list data/registry
+    python -m src.registry check data/registry [--version 20261017T030000Z]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from .calibration import CALIBRATION_FILE, Calibration
+    from .model_bundle import BUNDLE_FILE, load_model_bundle
+except ImportError:
+    from calibration import CALIBRATION_FILE, Calibration
+    from model_bundle import BUNDLE_FILE, load_model_bundle
+
+CURRENT_FILE = "CURRENT"
+PARITY_FILE = "parity.json"
+PARITY_RTOL = 1e-9
+PARITY_ATOL = 1e-9
+PROBE_ROWS = 64
+
+
+class ParityError(ValueError):
+    """Raised when a model version does not reproduce its expected scores."""
+
+
+class ModelHandle(
+    namedtuple(
+        "ModelHandle",
+        ["engine", "calibration", "version", "source", "load_seconds"],
+        defaults=[None, None, None, None],
+    )
+):
+    """
+    One loaded model version: the scoring engine, its calibration and where it
+    came from. Immutable, so swapping the API's handle is a single assignment.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def for_engine(cls, engine, calibration=None, version=None, **kwargs):
+        """Wrap an engine; the version defaults to the engine fingerprint."""
+        if version is None and engine is not None:
+            version = getattr(engine, "fingerprint", None)
+        return cls(engine, calibration or Calibration(), version, **kwargs)
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "source": self.source,
+            "load_seconds": self.load_seconds,
+        }
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def list_versions(root):
+    """Return the complete versions under ``root``, oldest first."""
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return []
+    versions = [
+        name
+        for name in names
+        if not name.startswith(".")
+        and os.path.isfile(os.path.join(root, name, BUNDLE_FILE))
+    ]
+    return sorted(versions, key=_natural_key)
+
+
+def target_version(root):
+    """Return the version to serve: the pinned ``CURRENT`` one, else the newest."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            pinned = f.read().strip()
+    except OSError:
+        pinned = ""
+    if pinned:
+        return pinned
+    versions = list_versions(root)
+    return versions[-1] if versions else None
+
+
+def write_parity_reference(path, features, scores):
+    """Write probe rows and the scores the serving engine must reproduce."""
+    features = np.asarray(features, dtype=np.float64)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(
+            {
+                "features": features.tolist(),
+                "scores": np.asarray(scores, dtype=np.float64).ravel().tolist(),
+            },
+            f,
+        )
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def check_parity(engine, version_dir=None):
+    """
+    Check a freshly loaded engine before it takes traffic.
+
+    Scores probe rows (the training-time reference rows when the version has
+    ``parity.json``, else synthetic rows) and raises ``ParityError`` for
+    non-finite weights or scores, or scores that differ from the reference.
+    Returns the number of reference rows compared.
+    """
+    if not (np.all(np.isfinite(engine.weights)) and np.isfinite(engine.intercept)):
+        raise ParityError("Model weights are not finite")
+
+    path = os.path.join(version_dir, PARITY_FILE) if version_dir else None
+    if path is None or not os.path.exists(path):
+        rng = np.random.default_rng(0)
+        scores = engine.score(rng.uniform(0, 25, (PROBE_ROWS, engine.n_features)))
+        if not np.all(np.isfinite(scores)):
+            raise ParityError("Model produced non-finite scores on probe rows")
+        return 0
+
+    with open(path) as f:
+        reference = json.load(f)
+    features = np.asarray(reference["features"], dtype=np.float64)
+    expected = np.asarray(reference["scores"], dtype=np.float64)
+    if features.ndim != 2 or features.shape[1] != engine.n_features:
+        raise ParityError(
+            f"Parity rows have shape {features.shape}, "
+            f"expected {engine.n_features} features"
+        )
+    scores = engine.score(features)
+    if not np.allclose(scores, expected, rtol=PARITY_RTOL, atol=PARITY_ATOL):
+        worst = float(np.max(np.abs(scores - expected)))
+        raise ParityError(f"Scores differ from the training reference by {worst:.3g}")
+    return len(expected)
+
+
+def load_version(root, version):
+    """Load, warm and parity-check one version; returns a ``ModelHandle``."""
+    start = time.perf_counter()
+    version_dir = os.path.join(root, version)
+    engine = load_model_bundle(os.path.join(version_dir, BUNDLE_FILE))
+    calibration = Calibration.load(os.path.join(version_dir, CALIBRATION_FILE))
+    # Warm the scoring path before the engine takes traffic
+    engine.score(np.zeros((1, engine.n_features)))
+    check_parity(engine, version_dir)
+    return ModelHandle(
+        engine, calibration, version, version_dir, time.perf_counter() - start
+    )
+
+
+def publish_version(root, version, files):
+    """
+    Copy ``files`` (bundle, calibration, parity reference) into a new version.
+
+    The version is assembled in a hidden directory and renamed into place, so
+    watchers only ever see complete versions.
+    """
+    if version.startswith(".") or os.sep in version:
+        raise ValueError(f"Invalid version name: {version!r}")
+    target = os.path.join(root, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"Version {version} already exists in {root}")
+    staging = os.path.join(root, f".{version}.tmp")
+    os.makedirs(staging)
+    try:
+        for path in files:
+            shutil.copy2(path, os.path.join(staging, os.path.basename(path)))
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+class ModelRegistry:
+    """
+    Watch a versioned models directory and hot-swap new versions.
+
+    ``poll`` checks the directory once; ``start`` runs it every
+    ``check_interval`` seconds in a daemon thread. ``on_swap(handle)`` is
+    called with each newly activated ``ModelHandle``.
+    """
+
+    def __init__(self, root, on_swap, check_interval=10.0):
+        self.root = root
+        self.on_swap = on_swap
+        self.check_interval = check_interval
+        self.active_version = None
+        self.swaps = 0
+        self.failed = {}
+        self.last_error = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """Activate the target version if it changed; returns the new handle."""
+        with self._lock:
+            version = target_version(self.root)
+            if version is None or version == self.active_version:
+                return None
+            if version in self.failed:
+                return None
+            try:
+                handle = load_version(self.root, version)
+            except Exception as e:
+                self.failed[version] = str(e)
+                self.last_error = f"{version}: {e}"
+                return None
+            self.on_swap(handle)
+            self.active_version = version
+            self.swaps += 1
+            self.last_error = None
+            return handle
+
+    def start(self):
+        """Start polling in a background thread (once per process)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="model-registry", daemon=True
+                )
+                self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.poll()
+
+    def stats(self):
+        return {
+            "root": self.root,
+            "active_version": self.active_version,
+            "versions": list_versions(self.root),
+            "swaps": self.swaps,
+            "failed_versions": sorted(self.failed),
+            "last_error": self.last_error,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a model registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="list versions and the target")
+    listing.add_argument("root")
+    check = commands.add_parser("check", help="load and parity-check a version")
+    check.add_argument("root")
+    check.add_argument("--version", default=None, help="default: the target")
+    args = parser.parse_args()
+
+    target = target_version(args.root)
+    if args.command == "list":
+        for version in list_versions(args.root):
+            print(f"{'*' if version == target else ' '} {version}")
+        return
+
+    handle = load_version(args.root, args.version or target)
+    print(
+        f"{handle.version}: {handle.engine.n_features} features, "
+        f"temperature {handle.calibration.temperature:g}, "
+        f"loaded in {handle.load_seconds * 1000:.1f} ms, parity ok"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Compiled scoring engine for the F1 winner model.
+
+The trained model is a ``LinearRegression`` and every scaler in the mixed
+scaling strategy is affine, so ``scale -> predict`` collapses to a single dot
+product. The engine folds the scalers into the model weights once at load time.
+"""
+
+import hashlib
+import warnings
+
+import numpy as np
+
+
+def _coerce_weights(model):
+    """
+    Return the model coefficients as a flat float64 vector and scalar intercept.
+    """
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    if coef.ndim == 2:
+        if coef.shape[0] != 1:
+            raise ValueError("Only single-output linear models can be compiled")
+        coef = coef[0]
+
+    intercept = np.asarray(getattr(model, "intercept_", 0.0), dtype=np.float64)
+    if intercept.size != 1:
+        raise ValueError("Only single-output linear models can be compiled")
+
+    return coef, float(intercept.reshape(-1)[0])
+
+
+def affine_scaler_params(scaler):
+    """
+    Return ``(offset, scale)`` such that ``scaler.transform(x) == offset + scale * x``.
+
+    The parameters are probed through ``transform`` so any affine scaler works
+    (MinMax, Standard, Robust, MaxAbs). Non-affine scalers are rejected.
+    """
+    if getattr(scaler, "clip", False):
+        raise ValueError(f"{type(scaler).__name__} with clip=True is not affine")
+
+    probe = np.array([[0.0], [1.0], [-3.5], [1000.0]])
+    with warnings.catch_warnings():
+        # Scalers fitted on DataFrames warn about the missing column name.
+        warnings.simplefilter("ignore", UserWarning)
+        transformed = np.asarray(scaler.transform(probe), dtype=np.float64)
+    transformed = transformed.reshape(-1)
+
+    offset = transformed[0]
+    scale = transformed[1] - transformed[0]
+    if not np.allclose(transformed, offset + scale * probe[:, 0], rtol=1e-9):
+        raise ValueError(f"{type(scaler).__name__} is not an affine transform")
+
+    return float(offset), float(scale)
+
+
+class ScoringEngine:
+    """
+    Linear scorer with the scalers folded into one weight vector and intercept.
+    """
+
+    def __init__(self, weights, intercept, feature_names):
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+        if weights.shape != (len(feature_names),):
+            raise ValueError(
+                f"Expected {len(feature_names)} weights, got shape {weights.shape}"
+            )
+
+        self.weights = weights
+        self.weights.setflags(write=False)
+        self.intercept = float(intercept)
+        self.feature_names = list(feature_names)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.fingerprint = self._fingerprint()
+
+    def _fingerprint(self):
+        digest = hashlib.sha256(self.weights.tobytes())
+        digest.update(np.float64(self.intercept).tobytes())
+        digest.update("\0".join(self.feature_names).encode())
+        return digest.hexdigest()[:16]
+
+    @property
+    def n_features(self):
+        """Number of input features expected by ``score``."""
+        return len(self.feature_names)
+
+    def score(self, features):
+        """
+        Score an ``(n_drivers, n_features)`` matrix in feature-name order.
+        """
+        features = np.ascontiguousarray(features, dtype=np.float64)
+        return features @ self.weights + self.intercept
+
+
+def compile_scoring_engine(model, scalers, feature_names):
+    """
+    Fold the per-feature scalers into the linear model's weights.
+
+    For a scaled feature ``x' = a + b * x`` the contribution ``w * x'`` becomes
+    ``(w * b) * x + w * a``, so the weights absorb ``b`` and the intercept
+    absorbs every ``w * a``.
+    """
+    coef, intercept = _coerce_weights(model)
+    if coef.shape[0] != len(feature_names):
+        raise ValueError(
+            f"Model has {coef.shape[0]} coefficients for {len(feature_names)} features"
+        )
+
+    weights = coef.copy()
+    for i, feature in enumerate(feature_names):
+        scaler = scalers.get(feature)
+        if scaler is None:
+            continue
+        offset, scale = affine_scaler_params(scaler)
+        weights[i] = coef[i] * scale
+        intercept += coef[i] * offset
+
+    return ScoringEngine(weights, intercept, feature_names)
+
+
+def segment_argmax(values, offsets):
+    """
+    Return the index of the first maximum in each segment.
+
+    ``offsets`` holds the ``n_segments + 1`` boundaries of contiguous,
+    non-empty segments of ``values`` (race ``i`` is
+    ``values[offsets[i]:offsets[i + 1]]``).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(offsets[:-1], dtype=np.intp)
+    lengths = np.diff(offsets)
+
+    maxima = np.maximum.reduceat(values, starts)
+    is_max = values == np.repeat(maxima, lengths)
+    positions = np.where(is_max, np.arange(len(values)), len(values))
+    return np.minimum.reduceat(positions, starts)
+
+
+def segment_order(values, offsets):
+    """
+    Return indices that sort ``values`` descending within each segment.
+
+    Segments stay in their original order and ties keep input order, matching
+    a stable per-race ``sort_values(ascending=False)``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    segment_ids = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return np.lexsort((-values, segment_ids))
+
+
+def segment_normalize(values, offsets, floor=0.0):
+    """
+    Scale ``values`` to sum to one within each segment.
+
+    Values are clipped below at ``floor`` first, so negative regression outputs
+    become small shares instead of negative probabilities.
+    """
+    values = np.maximum(np.asarray(values, dtype=np.float64), floor)
+    totals = np.add.reduceat(values, np.asarray(offsets[:-1], dtype=np.intp))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return values / np.repeat(totals, np.diff(offsets))
+
+
+def segment_softmax(values, offsets):
+    """
+    Softmax of ``values`` within each segment.
+
+    Each segment is shifted by its maximum first, so large scores do not
+    overflow.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(offsets[:-1], dtype=np.intp)
+    lengths = np.diff(offsets)
+
+    shifted = np.exp(values - np.repeat(np.maximum.reduceat(values, starts), lengths))
+    return shifted / np.repeat(np.add.reduceat(shifted, starts), lengths)
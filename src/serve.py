@@ -0,0 +1,131 @@
+"""
+Production server for the F1 prediction API.
+
+Runs the Flask app under gunicorn with preforked workers. The model is loaded
+once in the master before forking, so every worker shares the same read-only
+model pages copy-on-write instead of loading its own copy.
+
+With ``F1_MODEL_REGISTRY`` set, every worker also watches the versioned
+models directory and hot-swaps new versions without a restart (see
+``src.registry``).
+
+Signals (sent to the master):
+    HUP   graceful reload: reload the model in the master, fork new workers,
+          then drain and stop the old ones
+    TTIN  add one worker
+    TTOU  remove one worker
+    TERM  graceful shutdown
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+try:
+    from . import api
+except ImportError:
+    import api
+
+
+def default_workers():
+    """
+    Number of workers from ``WEB_CONCURRENCY``, defaulting to one per CPU.
+    """
+    return int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+
+def on_reload(server):
+    """Reload the model in the master so new workers fork with it."""
+    server.log.info("Reloading model before spawning new workers")
+    if not api.load_model():
+        server.log.warning("Model reload failed; keeping the current model")
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Start the model registry and feature table watchers in each worker."""
+    api.start_registry_watcher()
+    api.start_feature_table_watcher()
+
+
+def when_ready(server):
+    """Log readiness once the master is listening."""
+    state = "ready" if api.model_handle is not None else "NOT ready (model not loaded)"
+    server.log.info(f"Prediction server {state}")
+
+
+def build_options(
+    workers=None, bind=None, timeout=30, graceful_timeout=30, max_requests=0
+):
+    """
+    Build the gunicorn settings used by ``PredictionServer``.
+    """
+    return {
+        "bind": bind or f"0.0.0.0:{os.environ.get('PORT', '9010')}",
+        "workers": workers or default_workers(),
+        "worker_class": "sync",
+        "preload_app": True,
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests // 10,
+        "on_reload": on_reload,
+        "post_fork": post_fork,
+        "when_ready": when_ready,
+    }
+
+
+class PredictionServer(BaseApplication):
+    """
+    Gunicorn application serving ``api.app`` with the model preloaded.
+    """
+
+    def __init__(self, options=None):
+        self.options = options or build_options()
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Load in the master, before any worker is forked
+        api.load_model()
+        # Move the loaded model out of the collector's reach so its pages are
+        # not dirtied (and copied) in every worker by reference-cycle scans.
+        gc.freeze()
+        return api.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the F1 prediction API")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="default: $WEB_CONCURRENCY or CPUs"
+    )
+    parser.add_argument("--bind", default=None, help="default: 0.0.0.0:$PORT")
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=0,
+        help="recycle workers after this many requests (0 disables)",
+    )
+    args = parser.parse_args()
+
+    PredictionServer(
+        build_options(
+            workers=args.workers,
+            bind=args.bind,
+            timeout=args.timeout,
+            graceful_timeout=args.graceful_timeout,
+            max_requests=args.max_requests,
+        )
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Shadow scoring: compare candidate model versions with the live one on real
+traffic before promoting them.
+
+The primary model answers the request. The API then hands the already-parsed
+feature matrix, the race offsets and the primary scores to ``ShadowScorer``,
+which queues them without blocking. A background thread wakes at most every
+``LINGER_SECONDS`` and drains the queue in batches (so it takes the GIL for a
+few short, mostly vectorized passes rather than once per request). It scores
+each batch once per shadow model (one matmul, reusing the primary matrix;
+columns are reordered when the shadow uses a subset of the primary features)
+and aggregates agreement with the primary per
+``(primary version, shadow version)``:
+
+    winner_match_rate            share of races where both pick the same winner
+    mean/max_probability_delta   per-driver |p_shadow - p_primary| of the per-race
+                                 win probabilities (each model's own calibration)
+
+When the queue is full the request is dropped from the comparison (counted in
+``dropped``) rather than slowing the primary path.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+try:
+    from .scoring import segment_argmax
+except ImportError:
+    from scoring import segment_argmax
+
+MAX_PENDING = 4096
+MAX_BATCH = 1024
+LINGER_SECONDS = 0.25
+
+
+class AgreementStats:
+    """Running agreement between one shadow and one primary model version."""
+
+    def __init__(self, primary_version, shadow_version):
+        self.primary_version = primary_version
+        self.shadow_version = shadow_version
+        self.races = 0
+        self.rows = 0
+        self.winner_matches = 0
+        self.delta_sum = 0.0
+        self.max_delta = 0.0
+        self.score_seconds = 0.0
+        self.errors = 0
+        self.last_error = None
+
+    def update(self, primary_probabilities, shadow_probabilities, offsets, seconds):
+        starts = np.asarray(offsets[:-1], dtype=np.intp)
+        winners = segment_argmax(primary_probabilities, offsets)
+        shadow_winners = segment_argmax(shadow_probabilities, offsets)
+        deltas = np.abs(shadow_probabilities - primary_probabilities)
+
+        self.races += len(starts)
+        self.rows += len(deltas)
+        self.winner_matches += int(np.count_nonzero(winners == shadow_winners))
+        self.delta_sum += float(deltas.sum())
+        self.max_delta = max(self.max_delta, float(deltas.max(initial=0.0)))
+        self.score_seconds += seconds
+
+    def to_dict(self):
+        return {
+            "primary_version": self.primary_version,
+            "shadow_version": self.shadow_version,
+            "races": self.races,
+            "rows": self.rows,
+            "winner_match_rate": (
+                self.winner_matches / self.races if self.races else None
+            ),
+            "mean_probability_delta": (
+                self.delta_sum / self.rows if self.rows else None
+            ),
+            "max_probability_delta": self.max_delta,
+            "shadow_ms_per_race": (
+                self.score_seconds * 1000 / self.races if self.races else None
+            ),
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+def _column_index(primary_names, shadow_names):
+    """Return shadow columns as indices into the primary matrix (None: same)."""
+    if shadow_names == primary_names:
+        return None
+    position = {name: i for i, name in enumerate(primary_names)}
+    missing = [name for name in shadow_names if name not in position]
+    if missing:
+        raise KeyError(f"Primary features lack {missing}")
+    return np.array([position[name] for name in shadow_names], dtype=np.intp)
+
+
+class ShadowScorer:
+    """
+    Score requests with shadow models in a background thread.
+
+    ``set_shadows`` replaces the shadow ``ModelHandle``s; ``submit`` never
+    blocks the caller. ``join`` waits until everything queued is scored.
+    """
+
+    def __init__(
+        self, max_pending=MAX_PENDING, max_batch=MAX_BATCH, linger=LINGER_SECONDS
+    ):
+        self.max_batch = max_batch
+        self.linger = linger
+        self.handles = ()
+        self.submitted = 0
+        self.dropped = 0
+        self._agreement = {}
+        self._queue = queue.Queue(max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.handles)
+
+    def set_shadows(self, handles):
+        """Score future requests with ``handles`` (an empty list disables)."""
+        self.handles = tuple(handles)
+
+    def submit(self, primary, features, offsets, scores):
+        """
+        Queue one request's primary result for shadow scoring.
+
+        ``primary`` is the request's ``ModelHandle``, ``features`` the matrix
+        it scored, ``offsets`` the race boundaries and ``scores`` its output.
+        Returns False when shadowing is off or the queue is full.
+        """
+        handles = self.handles
+        if not handles:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((primary, handles, features, offsets, scores))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def join(self):
+        """Block until every queued request has been shadow-scored."""
+        self._queue.join()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so each server worker starts its own
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="shadow-scorer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Wake rarely and score many requests per pass, so the worker
+            # holds the GIL for few, mostly vectorized, stretches
+            time.sleep(self.linger)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            groups = {}
+            for item in batch:
+                key = (id(item[0]), tuple(id(handle) for handle in item[1]))
+                groups.setdefault(key, []).append(item)
+            for group in groups.values():
+                self._score_group(group)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _score_group(self, group):
+        """Score requests sharing one primary and shadow set in one pass."""
+        primary, handles = group[0][0], group[0][1]
+        features = np.concatenate([item[2] for item in group])
+        scores = np.concatenate([item[4] for item in group])
+        # Rebase each request's race offsets onto the concatenated matrix
+        offsets, base = [0], 0
+        for item in group:
+            offsets += [base + int(offset) for offset in item[3][1:]]
+            base += len(item[2])
+        offsets = np.asarray(offsets, dtype=np.intp)
+        primary_probabilities = primary.calibration.win_probabilities(scores, offsets)
+
+        for handle in handles:
+            if handle.version == primary.version:
+                continue
+            stats = self._stats(primary.version, handle.version)
+            start = time.perf_counter()
+            try:
+                columns = _column_index(
+                    primary.engine.feature_names, handle.engine.feature_names
+                )
+                shadow_scores = handle.engine.score(
+                    features if columns is None else features[:, columns]
+                )
+                shadow_probabilities = handle.calibration.win_probabilities(
+                    shadow_scores, offsets
+                )
+            except Exception as e:
+                stats.errors += 1
+                stats.last_error = str(e)
+                continue
+            stats.update(
+                primary_probabilities,
+                shadow_probabilities,
+                offsets,
+                time.perf_counter() - start,
+            )
+
+    def _stats(self, primary_version, shadow_version):
+        key = (primary_version, shadow_version)
+        with self._lock:
+            if key not in self._agreement:
+                self._agreement[key] = AgreementStats(primary_version, shadow_version)
+            return self._agreement[key]
+
+    def stats(self):
+        """Return agreement per version pair and the queue counters."""
+        with self._lock:
+            agreement = [stats.to_dict() for stats in self._agreement.values()]
+        return {
+            "shadow_versions": [handle.version for handle in self.handles],
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize(),
+            "agreement": agreement,
+        }
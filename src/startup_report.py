@@ -0,0 +1,163 @@
+"""
+Startup profiling for the prediction API.
+
+Imports ``src.api`` in a fresh interpreter under ``-X importtime``, summarizes
+where the import time goes and times the model warm-up. Budgets and forbidden
+modules turn the report into a regression check (non-zero exit on failure).
+
+Usage:
+    python -m src.startup_report
+    python -m src.startup_report --budget-ms 400 --forbid pandas,sklearn,joblib
+    python -m src.startup_report --with-model
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_FORBIDDEN = ("pandas", "sklearn", "joblib")
+
+_MARKER = "startup-report: model load"
+
+_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import src.api as api
+imported = time.perf_counter()
+sys.stderr.write("{marker}\\n")
+loaded = api.load_model() if {with_model} else False
+done = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000,
+                  "model_ms": (done - imported) * 1000,
+                  "model_loaded": loaded}}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output into ``{module: (self_us, cumulative_us)}``.
+
+    Modules imported more than once keep their first (real) import.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].strip()
+        modules.setdefault(name, (int(fields[0]), int(fields[1])))
+    return modules
+
+
+def profile_startup(with_model=False, python=sys.executable):
+    """
+    Run the startup snippet and return the parsed report.
+    """
+    result = subprocess.run(
+        [
+            python,
+            "-X",
+            "importtime",
+            "-c",
+            _SNIPPET.format(with_model=with_model, marker=_MARKER),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    import_phase, _, model_phase = result.stderr.partition(_MARKER)
+    return {
+        **timings,
+        "modules": parse_importtime(import_phase),
+        "model_modules": parse_importtime(model_phase),
+    }
+
+
+def top_level_packages(modules):
+    """
+    Aggregate self import time (microseconds) by top-level package.
+    """
+    totals = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def check_report(report, budget_ms=None, forbidden=()):
+    """
+    Return a list of regression messages for the report.
+    """
+    problems = []
+    if budget_ms is not None and report["import_ms"] > budget_ms:
+        problems.append(
+            f"import src.api took {report['import_ms']:.1f} ms "
+            f"(budget {budget_ms:.1f} ms)"
+        )
+
+    imported = set(top_level_packages(report["modules"]))
+    for package in sorted(imported & set(forbidden)):
+        problems.append(f"import src.api imported heavy module '{package}'")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile src.api startup")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument(
+        "--forbid",
+        default=",".join(DEFAULT_FORBIDDEN),
+        help="comma-separated packages that must not be imported by src.api",
+    )
+    parser.add_argument(
+        "--with-model", action="store_true", help="also time api.load_model()"
+    )
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    report = profile_startup(with_model=args.with_model)
+    packages = top_level_packages(report["modules"])
+    forbidden = [name for name in args.forbid.split(",") if name]
+    problems = check_report(report, args.budget_ms, forbidden)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "import_ms": report["import_ms"],
+                    "model_ms": report["model_ms"],
+                    "model_loaded": report["model_loaded"],
+                    "packages_ms": {k: v / 1000 for k, v in packages.items()},
+                    "problems": problems,
+                },
+                indent=2,
+            )
+        )
+    else:
+        print(f"import src.api: {report['import_ms']:.1f} ms")
+        if args.with_model:
+            state = "loaded" if report["model_loaded"] else "NOT loaded"
+            print(f"model warm-up:  {report['model_ms']:.1f} ms ({state})")
+            model_packages = top_level_packages(report["model_modules"])
+            if model_packages:
+                print(f"  imported during warm-up: {', '.join(model_packages)}")
+        print(f"\nTop {args.top} packages by self import time:")
+        for name, self_us in list(packages.items())[: args.top]:
+            print(f"  {self_us / 1000:8.1f} ms  {name}")
+        for problem in problems:
+            print(f"\nFAIL: {problem}")
+
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,662 @@
+"""
+Model-family and hyperparameter sweep for the training job.
+
+Every configuration in the grid (model family, its parameters and the rolling
+``window_size``) is scored with the walk-forward season folds from
+``src.backtest``: each season is predicted by a model fitted on the seasons
+before it. Folds only cover seasons up to ``last_train_year``, so later
+seasons stay a held-out test set as in the notebook.
+
+Model families:
+    linear      ``LinearRegression`` on ``is_winner`` (the notebook model)
+    logistic    ``LogisticRegression``
+    ranking     pairwise logistic loss on (winner - other driver) differences
+    gbm         ``HistGradientBoostingClassifier``
+
+Features are built once per window size and shared with the pool workers
+through shared memory. Each finished fold is written to
+``<output-dir>/folds/``, keyed by its configuration, season and a hash of the
+feature arrays, so an interrupted sweep resumes where it stopped.
+
+The sweep writes ``leaderboard.csv`` and refits the best linear-compatible
+configuration on the training seasons. It then writes the processed artifacts
+(``scalers.pkl``, ``metadata.json``, which records the model family, ...), the
+joblib model that ``load_model_and_scalers`` reads (``MODEL_FILE``) and the
+model bundle. With ``--registry-dir``
+the bundle, calibration and parity reference are also published as a new
+version that running API processes hot-swap to (see ``src.registry``).
+
+Usage:
+    python -m src.sweep --raw-dir data/raw --workers 4
+    python -m src.sweep --models-dir data/models --registry-dir data/registry
+    python -m src.sweep --grid sweep.json --rank-by top1 --no-export
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .backtest import (
+        MODEL_FEATURES,
+        PROBABILITY_FLOOR,
+        SharedArrays,
+        backtest_arrays,
+        column_medians,
+        race_metrics,
+    )
+    from .calibration import CALIBRATION_FILE, Calibration
+    from .drift import DRIFT_FILE, reference_histograms, write_reference
+    from .features import (
+        FROM_YEAR,
+        LAST_TRAIN_YEAR,
+        SCALING_STRATEGY,
+        build_features,
+        load_raw_tables,
+        make_scaler,
+        prepare_training_data,
+        race_feature_table,
+        save_processed,
+        select_model_data,
+    )
+    from .model_bundle import BUNDLE_FILE, export_bundle
+    from .predict_winner import MODEL_FILE, predict_race_winner
+    from .registry import (
+        PARITY_FILE,
+        PROBE_ROWS,
+        publish_version,
+        write_parity_reference,
+    )
+    from .scoring import (
+        affine_scaler_params,
+        compile_scoring_engine,
+        segment_normalize,
+        segment_softmax,
+    )
+except ImportError:
+    from backtest import (
+        MODEL_FEATURES,
+        PROBABILITY_FLOOR,
+        SharedArrays,
+        backtest_arrays,
+        column_medians,
+        race_metrics,
+    )
+    from calibration import CALIBRATION_FILE, Calibration
+    from drift import DRIFT_FILE, reference_histograms, write_reference
+    from features import (
+        FROM_YEAR,
+        LAST_TRAIN_YEAR,
+        SCALING_STRATEGY,
+        build_features,
+        load_raw_tables,
+        make_scaler,
+        prepare_training_data,
+        race_feature_table,
+        save_processed,
+        select_model_data,
+    )
+    from model_bundle import BUNDLE_FILE, export_bundle
+    from predict_winner import MODEL_FILE, predict_race_winner
+    from registry import (
+        PARITY_FILE,
+        PROBE_ROWS,
+        publish_version,
+        write_parity_reference,
+    )
+    from scoring import (
+        affine_scaler_params,
+        compile_scoring_engine,
+        segment_normalize,
+        segment_softmax,
+    )
+
+MODEL_FAMILIES = ("linear", "logistic", "ranking", "gbm")
+# Families with a linear scoring function, which the API can compile and serve
+EXPORTABLE_FAMILIES = ("linear", "logistic", "ranking")
+RANK_BY = {"log_loss": True, "top1": False, "top3": False}
+
+# Family -> parameter name -> values; every combination is a configuration
+DEFAULT_GRID = {
+    "window_sizes": [10, 25, 50],
+    "models": {
+        "linear": {},
+        "logistic": {"C": [0.1, 1.0, 10.0]},
+        "ranking": {"C": [0.1, 1.0]},
+        "gbm": {"learning_rate": [0.05, 0.1], "max_depth": [3], "max_iter": [200]},
+    },
+}
+
+
+def expand_grid(grid):
+    """
+    Return the list of configurations described by ``grid``.
+
+    A configuration is ``{"model", "params", "window_size"}``.
+    """
+    configs = []
+    for window_size in grid["window_sizes"]:
+        for family, space in grid["models"].items():
+            if family not in MODEL_FAMILIES:
+                raise ValueError(
+                    f"Unknown model family {family!r}, expected one of {MODEL_FAMILIES}"
+                )
+            names = sorted(space)
+            for values in itertools.product(*(space[name] for name in names)):
+                configs.append(
+                    {
+                        "model": family,
+                        "params": dict(zip(names, values, strict=True)),
+                        "window_size": int(window_size),
+                    }
+                )
+    return configs
+
+
+def config_id(config):
+    """Readable identifier, e.g. ``logistic(C=1.0)/w25``."""
+    params = ",".join(f"{k}={v}" for k, v in sorted(config["params"].items()))
+    return f"{config['model']}({params})/w{config['window_size']}"
+
+
+def winner_pairs(features, is_winner, offsets):
+    """
+    Pairwise ranking examples: ``winner - other`` (label 1) and its negation
+    (label 0) for every other driver in races with a recorded winner.
+    """
+    lengths = np.diff(offsets)
+    race_of_row = np.repeat(np.arange(len(lengths)), lengths)
+    winners = np.flatnonzero(is_winner == 1)
+    winner_row = np.full(len(lengths), -1)
+    winner_row[race_of_row[winners]] = winners
+
+    others = np.flatnonzero((is_winner == 0) & (winner_row[race_of_row] >= 0))
+    diffs = features[winner_row[race_of_row[others]]] - features[others]
+    labels = np.r_[np.ones(len(diffs)), np.zeros(len(diffs))]
+    return np.vstack([diffs, -diffs]), labels
+
+
+def fit_model(family, params, features, is_winner, offsets):
+    """
+    Fit one model family on scaled, imputed training rows.
+    """
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+
+    if family == "linear":
+        return LinearRegression(**params).fit(features, is_winner)
+    if family == "logistic":
+        return LogisticRegression(max_iter=1000, **params).fit(features, is_winner)
+    if family == "ranking":
+        pairs, labels = winner_pairs(np.asarray(features), is_winner, offsets)
+        model = LogisticRegression(fit_intercept=False, max_iter=1000, **params)
+        return model.fit(pairs, labels)
+    if family == "gbm":
+        model = HistGradientBoostingClassifier(random_state=0, **params)
+        return model.fit(features, is_winner)
+    raise ValueError(f"Unknown model family {family!r}")
+
+
+def race_probabilities(family, model, features, offsets):
+    """
+    Return ``(scores, win_probabilities)`` for the rows of whole races.
+
+    Classifier probabilities and clipped regression outputs are normalized
+    within each race; ranking scores go through a per-race softmax.
+    """
+    if family == "ranking":
+        scores = model.decision_function(features)
+        return scores, segment_softmax(scores, offsets)
+    if family == "linear":
+        scores = model.predict(features)
+    else:
+        scores = model.predict_proba(features)[:, 1]
+    return scores, segment_normalize(scores, offsets, floor=PROBABILITY_FLOOR)
+
+
+def fit_scaling(features, feature_names=MODEL_FEATURES):
+    """
+    Fit the ``SCALING_STRATEGY`` scalers on a fold and return their affine
+    ``(offset, scale)`` vectors.
+    """
+    offset = np.zeros(len(feature_names))
+    scale = np.ones(len(feature_names))
+    for i, name in enumerate(feature_names):
+        if SCALING_STRATEGY.get(name) is not None:
+            scaler = make_scaler(SCALING_STRATEGY[name]).fit(features[:, [i]])
+            offset[i], scale[i] = affine_scaler_params(scaler)
+    return offset, scale
+
+
+def evaluate_fold(arrays, config, season):
+    """
+    Fit ``config`` on the seasons before ``season`` and score ``season``.
+
+    Returns summed metrics, so folds can be added up per configuration.
+    """
+    offsets = arrays["offsets"]
+    races = np.flatnonzero(arrays["year"] == season)
+    first, last = offsets[races[0]], offsets[races[-1] + 1]
+
+    start = time.perf_counter()
+    train = arrays["features"][:first]
+    medians = column_medians(train)
+    train = np.where(np.isnan(train), medians, train)
+    offset, scale = fit_scaling(train)
+    model = fit_model(
+        config["model"],
+        config["params"],
+        offset + scale * train,
+        arrays["is_winner"][:first],
+        offsets[: races[0] + 1],
+    )
+
+    test = arrays["features"][first:last]
+    test = offset + scale * np.where(np.isnan(test), medians, test)
+    race_offsets = offsets[races[0] : races[-1] + 2] - first
+    scores, probabilities = race_probabilities(
+        config["model"], model, test, race_offsets
+    )
+    metrics = race_metrics(
+        scores, arrays["is_winner"][first:last], race_offsets, probabilities
+    )
+
+    scored = metrics["winner_rank"] >= 0
+    return {
+        "races": int(len(races)),
+        "scored": int(scored.sum()),
+        "top1": float(np.nansum(metrics["top1"])),
+        "top3": float(np.nansum(metrics["top3"])),
+        "log_loss": float(np.nansum(metrics["log_loss"])),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def arrays_fingerprint(arrays):
+    """Short hash of the fold inputs, part of every fold cache key."""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def fold_key(config, season, fingerprint):
+    """Cache key of one (configuration, season) fold."""
+    payload = json.dumps(
+        {"config": config, "season": season, "data": fingerprint}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class FoldCache:
+    """
+    One JSON file per finished fold, so a restarted sweep skips them.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except ValueError:
+            # A fold cut off mid-write is simply recomputed
+            return None
+
+    def put(self, key, result):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(result, f)
+        os.replace(f"{path}.tmp", path)
+
+
+_worker_blocks = []
+_worker_arrays = {}
+
+
+def _attach(specs):
+    """Pool initializer: map the shared feature arrays of every window size."""
+    from threadpoolctl import threadpool_limits
+
+    # One process per core already; nested BLAS/OpenMP threads oversubscribe
+    threadpool_limits(1)
+    blocks, arrays = SharedArrays.attach(specs)
+    _worker_blocks.extend(blocks)
+    for name, array in arrays.items():
+        window, _, key = name.partition("/")
+        _worker_arrays.setdefault(int(window), {})[key] = array
+
+
+def _run_shared_fold(config, season):
+    return evaluate_fold(_worker_arrays[config["window_size"]], config, season)
+
+
+def run_sweep(
+    race_data_by_window,
+    configs,
+    seasons,
+    workers=None,
+    cache_dir=None,
+):
+    """
+    Evaluate every configuration on every season fold.
+
+    ``race_data_by_window`` maps each window size to its feature frame. Returns
+    ``{config_id: [fold results]}``; cached folds are not recomputed.
+    """
+    arrays = {
+        window: backtest_arrays(race_data)
+        for window, race_data in race_data_by_window.items()
+    }
+    fingerprints = {window: arrays_fingerprint(a) for window, a in arrays.items()}
+    cache = FoldCache(cache_dir)
+
+    results = {config_id(config): [] for config in configs}
+    pending = []
+    for config in configs:
+        for season in seasons:
+            key = fold_key(config, season, fingerprints[config["window_size"]])
+            cached = cache.get(key)
+            if cached is None:
+                pending.append((config, season, key))
+            else:
+                results[config_id(config)].append(cached)
+
+    def record(config, key, result):
+        cache.put(key, result)
+        results[config_id(config)].append(result)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        for config, season, key in pending:
+            record(
+                config,
+                key,
+                evaluate_fold(arrays[config["window_size"]], config, season),
+            )
+        return results
+
+    flat = {
+        f"{window}/{name}": array
+        for window, window_arrays in arrays.items()
+        for name, array in window_arrays.items()
+    }
+    with (
+        SharedArrays(flat) as shared,
+        ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            initializer=_attach,
+            initargs=(shared.specs,),
+        ) as pool,
+    ):
+        futures = {
+            pool.submit(_run_shared_fold, config, season): (config, key)
+            for config, season, key in pending
+        }
+        for future in as_completed(futures):
+            config, key = futures[future]
+            record(config, key, future.result())
+    return results
+
+
+def leaderboard(configs, results, rank_by="log_loss"):
+    """
+    One row per configuration with race-weighted metrics, best first.
+    """
+    rows = []
+    for config in configs:
+        folds = results[config_id(config)]
+        scored = sum(fold["scored"] for fold in folds)
+        rows.append(
+            {
+                "config": config_id(config),
+                "model": config["model"],
+                "params": json.dumps(config["params"], sort_keys=True),
+                "window_size": config["window_size"],
+                "folds": len(folds),
+                "races": sum(fold["races"] for fold in folds),
+                "top1": sum(fold["top1"] for fold in folds) / scored,
+                "top3": sum(fold["top3"] for fold in folds) / scored,
+                "log_loss": sum(fold["log_loss"] for fold in folds) / scored,
+                "fit_seconds": sum(fold["seconds"] for fold in folds),
+            }
+        )
+    board = pd.DataFrame(rows).sort_values(
+        [rank_by, "config"], ascending=[RANK_BY[rank_by], True], kind="stable"
+    )
+    board.insert(0, "rank", np.arange(1, len(board) + 1))
+    return board.reset_index(drop=True)
+
+
+def export_best(
+    config,
+    tables,
+    processed_dir="data/processed",
+    models_dir="models",
+    from_year=FROM_YEAR,
+    last_train_year=LAST_TRAIN_YEAR,
+    pre_race=True,
+):
+    """
+    Refit ``config`` on the training seasons and write the serving artifacts.
+
+    Writes the processed files for the configuration's window size (so the
+    scalers, metadata and race feature table match the model), the joblib
+    model ``load_model_and_scalers`` reads, the model bundle, the win
+    probability calibration fitted on the training races, the parity
+    reference (sklearn-path scores the bundle must reproduce) and the drift
+    reference (histograms of the unscaled training features). Returns the
+    fitted model.
+    """
+    import joblib
+
+    if config["model"] not in EXPORTABLE_FAMILIES:
+        raise ValueError(f"{config['model']} models cannot be compiled for serving")
+
+    race_data = build_features(tables, from_year, config["window_size"], pre_race)
+    prepared = prepare_training_data(select_model_data(race_data), last_train_year)
+    prepared["race_features"] = race_feature_table(race_data, prepared)
+    prepared["metadata"] = {
+        "model": config_id(config),
+        "model_family": config["model"],
+        "window_size": config["window_size"],
+        "pre_race": pre_race,
+    }
+
+    train_ids = race_data.loc[race_data["year"] <= last_train_year, "raceId"]
+    train_ids = train_ids.to_numpy()
+    starts = np.flatnonzero(np.r_[True, train_ids[1:] != train_ids[:-1]])
+    offsets = np.append(starts, len(train_ids))
+    is_winner = prepared["y_train"].to_numpy().ravel()
+    model = fit_model(
+        config["model"], config["params"], prepared["X_train"], is_winner, offsets
+    )
+    engine = compile_scoring_engine(model, {}, prepared["feature_names"])
+    calibration = Calibration.fit(
+        engine.score(prepared["X_train"][prepared["feature_names"]].to_numpy()),
+        is_winner,
+        offsets,
+    )
+
+    save_processed(prepared, processed_dir)
+    os.makedirs(models_dir, exist_ok=True)
+    model_path = os.path.join(models_dir, MODEL_FILE)
+    joblib.dump(model, f"{model_path}.tmp")
+    os.replace(f"{model_path}.tmp", model_path)
+    export_bundle(
+        model,
+        prepared["scalers"],
+        prepared["feature_names"],
+        os.path.join(models_dir, BUNDLE_FILE),
+        metadata={"sweep_config": config_id(config), "model_family": config["model"]},
+    )
+    calibration.save(os.path.join(models_dir, CALIBRATION_FILE))
+
+    probe = prepared["race_features"][prepared["feature_names"]].iloc[:PROBE_ROWS]
+    ranked, _ = predict_race_winner(probe, model, prepared["scalers"])
+    write_parity_reference(
+        os.path.join(models_dir, PARITY_FILE),
+        probe.to_numpy(dtype=float),
+        ranked["win_probability"].loc[probe.index].to_numpy(),
+    )
+    write_reference(
+        os.path.join(models_dir, DRIFT_FILE),
+        reference_histograms(
+            prepared["train_features"].to_numpy(), prepared["feature_names"]
+        ),
+    )
+    return model
+
+
+def publish_export(models_dir, registry_dir, version=None):
+    """
+    Publish the exported bundle, calibration and parity reference (and the
+    drift reference, when exported) as a new registry version (default name:
+    the UTC time). Returns the version.
+    """
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    os.makedirs(registry_dir, exist_ok=True)
+    files = [
+        os.path.join(models_dir, name)
+        for name in (BUNDLE_FILE, CALIBRATION_FILE, PARITY_FILE)
+    ]
+    drift_path = os.path.join(models_dir, DRIFT_FILE)
+    if os.path.exists(drift_path):
+        files.append(drift_path)
+    publish_version(registry_dir, version, files)
+    return version
+
+
+def load_grid(path):
+    """Read a grid JSON file in the ``DEFAULT_GRID`` format."""
+    if path is None:
+        return DEFAULT_GRID
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep model families and windows")
+    parser.add_argument("--raw-dir", default="data/raw")
+    parser.add_argument("--cache-dir", default="data/cache")
+    parser.add_argument("--grid", default=None, help="grid JSON (default: built-in)")
+    parser.add_argument("--from-year", type=int, default=FROM_YEAR)
+    parser.add_argument("--first-season", type=int, default=None)
+    parser.add_argument("--last-train-year", type=int, default=LAST_TRAIN_YEAR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank-by", choices=sorted(RANK_BY), default="log_loss")
+    parser.add_argument("--output-dir", default="results/sweep")
+    parser.add_argument("--processed-dir", default="data/processed")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument(
+        "--notebook-features",
+        action="store_true",
+        help="keep the notebook's recent form windows, which include the race",
+    )
+    parser.add_argument("--no-export", action="store_true")
+    parser.add_argument(
+        "--registry-dir",
+        default=None,
+        help="also publish the export as a new version in this model registry",
+    )
+    parser.add_argument(
+        "--model-version",
+        default=None,
+        help="registry version name (default: UTC time)",
+    )
+    args = parser.parse_args()
+    first = args.first_season or args.from_year + 1
+    if first > args.last_train_year:
+        parser.error(
+            f"no season folds: --first-season {first} is after "
+            f"--last-train-year {args.last_train_year}"
+        )
+
+    configs = expand_grid(load_grid(args.grid))
+    pre_race = not args.notebook_features
+    tables = load_raw_tables(args.raw_dir, cache_dir=args.cache_dir)
+
+    start = time.perf_counter()
+    race_data_by_window = {
+        window: build_features(tables, args.from_year, window, pre_race)
+        for window in sorted({config["window_size"] for config in configs})
+    }
+    years = next(iter(race_data_by_window.values()))["year"].unique()
+    first_season = args.first_season or int(years.min()) + 1
+    seasons = [
+        int(year)
+        for year in sorted(years)
+        if first_season <= year <= args.last_train_year
+    ]
+    if not seasons:
+        parser.error(
+            f"no seasons with race data between {first_season} and "
+            f"{args.last_train_year}"
+        )
+    print(
+        f"{len(configs)} configurations x {len(seasons)} season folds "
+        f"({seasons[0]}-{seasons[-1]})"
+    )
+
+    results = run_sweep(
+        race_data_by_window,
+        configs,
+        seasons,
+        workers=args.workers,
+        cache_dir=os.path.join(args.output_dir, "folds"),
+    )
+    board = leaderboard(configs, results, args.rank_by)
+    os.makedirs(args.output_dir, exist_ok=True)
+    board.to_csv(os.path.join(args.output_dir, "leaderboard.csv"), index=False)
+    print(
+        board.drop(columns=["params"]).to_string(
+            index=False, float_format=lambda v: f"{v:.3f}"
+        )
+    )
+    print(f"\nSweep finished in {time.perf_counter() - start:.1f}s")
+
+    if args.no_export:
+        return
+    exportable = board[board["model"].isin(EXPORTABLE_FAMILIES)]
+    if exportable.empty:
+        print("No linear-compatible configuration in the grid; nothing exported")
+        return
+    best = next(c for c in configs if config_id(c) == exportable["config"].iloc[0])
+    if board["config"].iloc[0] != config_id(best):
+        print(f"{board['config'].iloc[0]} ranks first but cannot be served")
+    export_best(
+        best,
+        tables,
+        args.processed_dir,
+        args.models_dir,
+        args.from_year,
+        args.last_train_year,
+        pre_race,
+    )
+    print(f"Exported {config_id(best)} to {args.models_dir}/{MODEL_FILE}")
+    if args.registry_dir:
+        version = publish_export(args.models_dir, args.registry_dir, args.model_version)
+        print(f"Published version {version} to {args.registry_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Strict request validation compiled from ``openapi.yaml`` and the model.
+
+The ``Driver`` schema of the ``/predict`` request body (property types) and the
+``minItems``/``maxItems`` of the ``drivers`` and ``races`` arrays are read once
+and combined with the loaded model's ``feature_names`` and the bounds in
+``data_utils.FEATURE_RANGES`` (the one place feature ranges are defined, shared
+with batch scoring) into a ``RequestValidator``. Validating a race then takes one
+pass over the JSON rows, which checks types and builds the feature matrix, and
+one vectorized bounds check on the matrix:
+
+    - every model feature is required and must be a JSON number (strings,
+      booleans and nulls are rejected rather than coerced)
+    - NaN, infinite and out-of-range values are rejected
+    - name fields typed ``string`` in the schema must be strings when present
+    - the number of drivers per race and races per batch is capped
+
+The request body size is capped separately (``MAX_BODY_BYTES``), before the
+body is read or parsed. Without the spec file (or PyYAML), validators fall back
+to the ``DEFAULT_*`` caps and a warning is logged.
+"""
+
+import logging
+import os
+import threading
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+try:
+    from .data_utils import FEATURE_RANGES
+except ImportError:
+    from data_utils import FEATURE_RANGES
+
+logger = logging.getLogger(__name__)
+
+SPEC_FILE = "openapi.yaml"
+# Largest request body accepted, in bytes (F1_MAX_BODY_BYTES)
+MAX_BODY_BYTES = int(os.environ.get("F1_MAX_BODY_BYTES", str(1024 * 1024)))
+# Used when the spec cannot be loaded
+DEFAULT_MAX_DRIVERS = 100
+DEFAULT_MAX_RACES = 1000
+DEFAULT_STRING_FIELDS = ("driver_name", "forename", "surname")
+
+NUMBER_TYPES = {int, float}
+# Unbounded sides use the float extremes, so one pair of comparisons also
+# rejects NaN and infinite values
+FLOAT_MAX = np.finfo(np.float64).max
+
+_MISSING = object()
+
+
+def default_spec_path():
+    """
+    Return the path of ``openapi.yaml`` in the project root.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, SPEC_FILE)
+
+
+def load_spec(path=None):
+    """Read the OpenAPI spec (default ``F1_OPENAPI_SPEC`` or the project's)."""
+    import yaml
+
+    with open(path or os.environ.get("F1_OPENAPI_SPEC") or default_spec_path()) as f:
+        return yaml.safe_load(f)
+
+
+def _resolve(spec, schema):
+    """Follow local ``$ref``s (``#/components/...``) to the referenced schema."""
+    while "$ref" in schema:
+        node = spec
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            node = node[part]
+        schema = node
+    return schema
+
+
+def _body_schema(spec, path):
+    body = spec["paths"][path]["post"]["requestBody"]
+    return _resolve(spec, body["content"]["application/json"]["schema"])
+
+
+def _format_bound(value):
+    return f"{value:g}"
+
+
+class RequestValidator:
+    """
+    Validate request bodies for one model's features.
+
+    ``drivers`` checks one race and returns ``(features, error)`` like
+    ``api.feature_matrix``; ``races`` checks the ``/predict/batch`` array.
+    """
+
+    def __init__(self, feature_names, spec=None):
+        self.feature_names = list(feature_names)
+        self.source = "openapi" if spec is not None else "defaults"
+        properties = {}
+        self.min_drivers, self.max_drivers = 1, DEFAULT_MAX_DRIVERS
+        self.max_races = DEFAULT_MAX_RACES
+        self.string_fields = DEFAULT_STRING_FIELDS
+
+        if spec is not None:
+            drivers = _body_schema(spec, "/predict")["properties"]["drivers"]
+            self.min_drivers = max(1, drivers.get("minItems", 1))
+            self.max_drivers = drivers.get("maxItems")
+            races = _body_schema(spec, "/predict/batch")["properties"]["races"]
+            self.max_races = races.get("maxItems")
+            properties = _resolve(spec, drivers["items"]).get("properties", {})
+            self.string_fields = tuple(
+                name
+                for name, schema in properties.items()
+                if schema.get("type") == "string"
+            )
+
+        self.integer_features = []
+        low, high = [], []
+        for name in self.feature_names:
+            schema = properties.get(name, {})
+            if schema.get("type") not in (None, "number", "integer"):
+                raise ValueError(
+                    f"Model feature {name!r} has non-numeric type "
+                    f"{schema['type']!r} in the spec"
+                )
+            if schema.get("type") == "integer":
+                self.integer_features.append(name)
+            feature_low, feature_high = FEATURE_RANGES.get(name, (None, None))
+            low.append(-FLOAT_MAX if feature_low is None else feature_low)
+            high.append(FLOAT_MAX if feature_high is None else feature_high)
+        self.low = np.array(low, dtype=np.float64)
+        self.high = np.array(high, dtype=np.float64)
+
+        getter = itemgetter(*self.feature_names)
+        if len(self.feature_names) == 1:
+            self._values = lambda drivers: list(map(getter, drivers))
+        else:
+            self._values = lambda drivers: [*chain.from_iterable(map(getter, drivers))]
+
+    def drivers(self, drivers):
+        """
+        Validate one race's driver rows and build its feature matrix.
+
+        Returns ``(features, error)`` where ``error`` is None for a valid race.
+        """
+        if type(drivers) is not list:
+            return None, "Invalid input: 'drivers' field required"
+        if len(drivers) < self.min_drivers:
+            return None, "Invalid input: 'drivers' must not be empty"
+        if self.max_drivers is not None and len(drivers) > self.max_drivers:
+            return None, (f"Invalid input: at most {self.max_drivers} drivers per race")
+
+        # Feature values, row-major, in one flat list
+        try:
+            values = self._values(drivers)
+        except (KeyError, TypeError):
+            if not all(type(driver) is dict for driver in drivers):
+                return None, "Invalid input: each driver must be an object"
+            missing_features = [
+                f
+                for f in self.feature_names
+                if not all(f in driver for driver in drivers)
+            ]
+            return None, f"Missing features: {missing_features}"
+
+        # bool is an int subclass, so compare exact types
+        if not NUMBER_TYPES.issuperset(map(type, values)):
+            return None, self._type_error(values)
+        for field in self.string_fields:
+            for driver in drivers:
+                value = driver.get(field, _MISSING)
+                if value is not _MISSING and type(value) is not str:
+                    return None, f"Invalid input: '{field}' must be a string"
+
+        try:
+            features = np.fromiter(values, np.float64, len(values))
+        except OverflowError:
+            return None, "Invalid input: features must be finite numbers"
+        features = features.reshape(len(drivers), len(self.feature_names))
+        in_range = (features >= self.low) & (features <= self.high)
+        if not in_range.all():
+            return None, self._range_error(features, in_range)
+        if self.integer_features:
+            error = self._integer_error(values)
+            if error is not None:
+                return None, error
+        return features, None
+
+    def races(self, races):
+        """Check the ``/predict/batch`` races array; returns an error or None."""
+        if type(races) is not list:
+            return "Invalid input: 'races' field required"
+        if self.max_races is not None and len(races) > self.max_races:
+            return f"Invalid input: at most {self.max_races} races per batch"
+        return None
+
+    def _type_error(self, values):
+        for i, value in enumerate(values):
+            if type(value) not in NUMBER_TYPES:
+                name = self.feature_names[i % len(self.feature_names)]
+                return (
+                    f"Invalid input: features must be numeric "
+                    f"('{name}' is {type(value).__name__})"
+                )
+        return "Invalid input: features must be numeric"
+
+    def _range_error(self, features, in_range):
+        column = int(np.flatnonzero(~in_range.all(axis=0))[0])
+        name = self.feature_names[column]
+        values = features[:, column]
+        if not np.all(np.isfinite(values)):
+            return f"Invalid input: '{name}' must be a finite number"
+        low, high = self.low[column], self.high[column]
+        if high == FLOAT_MAX:
+            return f"Invalid input: '{name}' must be at least {_format_bound(low)}"
+        if low == -FLOAT_MAX:
+            return f"Invalid input: '{name}' must be at most {_format_bound(high)}"
+        return (
+            f"Invalid input: '{name}' must be between "
+            f"{_format_bound(low)} and {_format_bound(high)}"
+        )
+
+    def _integer_error(self, values):
+        n_features = len(self.feature_names)
+        for name in self.integer_features:
+            column = self.feature_names.index(name)
+            if any(type(value) is not int for value in values[column::n_features]):
+                return f"Invalid input: '{name}' must be an integer"
+        return None
+
+
+_spec, _spec_loaded = None, False
+_validators = {}
+_lock = threading.Lock()
+
+
+def validator_for(feature_names):
+    """
+    Return the (cached) validator for a model's ``feature_names``.
+
+    The spec is loaded on first use; call this when a model is loaded so the
+    request path never compiles.
+    """
+    key = tuple(feature_names)
+    validator = _validators.get(key)
+    if validator is None:
+        global _spec, _spec_loaded
+        with _lock:
+            if not _spec_loaded:
+                try:
+                    _spec = load_spec()
+                except (OSError, ImportError) as e:
+                    logger.warning(
+                        "Could not load the OpenAPI spec (%s); validating requests "
+                        "with the default caps",
+                        e,
+                    )
+                    _spec = None
+                _spec_loaded = True
+            validator = _validators.get(key)
+            if validator is None:
+                validator = RequestValidator(key, _spec)
+                _validators[key] = validator
+    return validator
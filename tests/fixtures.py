@@ -0,0 +1,134 @@
+"""
+Synthetic fixtures shared by the test modules.
+
+``make_raw_tables`` builds small raw Kaggle tables with the awkward cases the
+feature pipeline must handle (rounds out of calendar order, shuffled results,
+DNFs, team changes); ``benchmarks.fixtures.make_full_size_raw_tables`` builds
+clean, dataset-sized tables for timing instead. The feature list and scaling
+strategy are the benchmarks' (``benchmarks.fixtures``).
+"""
+
+import json
+import unittest.mock as mock
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from benchmarks.fixtures import FEATURE_NAMES, SCALING_STRATEGY
+from src import asgi
+from src.registry import ModelHandle
+
+
+def make_raw_tables(n_seasons=4, races_per_season=6, n_drivers=8, seed=0):
+    """Build small raw Kaggle tables with DNFs, team changes and gaps."""
+    rng = np.random.default_rng(seed)
+    races, results, qualifying, pit_stops = [], [], [], []
+    race_id = 0
+    for year in range(2017, 2017 + n_seasons):
+        constructors = 1 + rng.permutation(n_drivers) // 2
+        # Rounds arrive out of order, as results rows do not follow the calendar
+        for round_num in rng.permutation(races_per_season) + 1:
+            race_id += 1
+            races.append((race_id, year, int(round_num), 1))
+            finish = rng.permutation(n_drivers) + 1
+            for driver_id in range(1, n_drivers + 1):
+                position = float(finish[driver_id - 1])
+                if rng.random() < 0.2:
+                    position = np.nan
+                points = max(0.0, 10.0 - position) if position == position else 0.0
+                results.append(
+                    (
+                        race_id,
+                        driver_id,
+                        int(constructors[driver_id - 1]),
+                        int(rng.integers(1, n_drivers + 1)),
+                        position,
+                        points,
+                    )
+                )
+                if rng.random() < 0.8:
+                    qualifying.append((race_id, driver_id, int(rng.integers(1, 9))))
+                for stop in range(1, int(rng.integers(0, 3)) + 1):
+                    pit_stops.append(
+                        (race_id, driver_id, stop, int(rng.integers(20e3, 30e3)))
+                    )
+
+    results = pd.DataFrame(
+        results,
+        columns=["raceId", "driverId", "constructorId", "grid", "position", "points"],
+    )
+    return {
+        "races": pd.DataFrame(races, columns=["raceId", "year", "round", "circuitId"]),
+        "results": results.sample(frac=1, random_state=seed),
+        "drivers": pd.DataFrame(
+            {
+                "driverId": range(1, n_drivers + 1),
+                "forename": [f"First{i}" for i in range(1, n_drivers + 1)],
+                "surname": [f"Last{i}" for i in range(1, n_drivers + 1)],
+            }
+        ),
+        "constructors": pd.DataFrame({"constructorId": range(1, n_drivers + 1)}),
+        "circuits": pd.DataFrame({"circuitId": [1]}),
+        "qualifying": pd.DataFrame(
+            qualifying, columns=["raceId", "driverId", "position"]
+        ),
+        "pit_stops": pd.DataFrame(
+            pit_stops, columns=["raceId", "driverId", "stop", "milliseconds"]
+        ),
+    }
+
+
+def make_training_data(n_rows=400, seed=0):
+    """Build a synthetic training frame shaped like the processed dataset."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "driver_win_rate": rng.uniform(0, 0.5, n_rows),
+            "constructor_win_rate": rng.uniform(0, 0.5, n_rows),
+            "qualifying_position": rng.integers(1, 21, n_rows).astype(float),
+            "num_pit_stops": rng.integers(0, 4, n_rows).astype(float),
+            "grid": rng.integers(1, 21, n_rows).astype(float),
+            "year": rng.integers(2010, 2024, n_rows).astype(float),
+            "driver_constructor_interaction": rng.uniform(0, 0.25, n_rows),
+            "points_per_race": rng.uniform(0, 25, n_rows),
+            "recent_avg_position": rng.uniform(1, 20, n_rows),
+            "constructor_recent_wins": rng.integers(0, 6, n_rows).astype(float),
+        }
+    )[FEATURE_NAMES]
+
+
+def fit_model_and_scalers(train):
+    """Fit the mixed scaling strategy and a linear model on the training frame."""
+    rng = np.random.default_rng(1)
+    scaled = train.copy()
+    scalers = {}
+    for feature, scaler_cls in SCALING_STRATEGY.items():
+        scaler = scaler_cls()
+        scaled[feature] = scaler.fit_transform(train[[feature]])
+        scalers[feature] = scaler
+
+    target = pd.DataFrame({"is_winner": rng.integers(0, 2, len(train))})
+    model = LinearRegression().fit(scaled, target)
+    return model, scalers
+
+
+def serving(engine, calibration=None, version="test"):
+    """Patch the API's active model handle to serve ``engine`` (None: no model)."""
+    handle = engine and ModelHandle.for_engine(engine, calibration, version)
+    return mock.patch("src.api.model_handle", handle)
+
+
+async def call(method, path, body=b""):
+    """Send one HTTP request through the ASGI app."""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
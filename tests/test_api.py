@@ -4,9 +4,16 @@ import json
 import unittest.mock as mock
 from unittest import TestCase
 
+import numpy as np
 import pandas as pd
 
+from src import api
 from src.api import app
+from src.cache import PredictionCache
+from src.feature_table import FeatureTable
+from src.predict_winner import predict_race_winner
+from src.scoring import ScoringEngine
+from tests.fixtures import serving
 
 
 class TestAPI(TestCase):
@@ -27,14 +34,14 @@ class TestAPI(TestCase):
         self.assertIn("model_loaded", data)
         self.assertEqual(data["status"], "healthy")
 
-    @mock.patch("src.api.model", None)
+    @serving(None)
     def test_health_endpoint_no_model(self):
         """Test health endpoint when model is not loaded."""
         response = self.app.get("/health")
         data = json.loads(response.data)
         self.assertFalse(data["model_loaded"])
 
-    @mock.patch("src.api.model", None)
+    @serving(None)
     def test_predict_no_model(self):
         """Test predict endpoint when model is not loaded."""
         response = self.app.post("/predict", json={"drivers": []})
@@ -43,8 +50,7 @@ class TestAPI(TestCase):
         data = json.loads(response.data)
         self.assertEqual(data["error"], "Model not loaded")
 
-    @mock.patch("src.api.model", mock.MagicMock())
-    @mock.patch("src.api.feature_names", ["test_feature"])
+    @serving(ScoringEngine(np.zeros(1), 0.0, ["test_feature"]))
     def test_predict_invalid_input(self):
         """Test predict endpoint with invalid input."""
         # No drivers field
@@ -55,35 +61,37 @@ class TestAPI(TestCase):
         response = self.app.post("/predict", data="", content_type="application/json")
         self.assertEqual(response.status_code, 400)
 
-    @mock.patch("src.api.predict_race_winner")
-    @mock.patch("src.api.model", mock.MagicMock())
-    @mock.patch("src.api.scalers", {})
-    @mock.patch("src.api.feature_names", ["driver_win_rate", "constructor_win_rate"])
-    def test_predict_success(self, mock_predict):
-        """Test successful prediction."""
-        # Mock prediction results
-        mock_predictions = pd.DataFrame(
-            {
-                "forename": ["Lewis", "Max"],
-                "surname": ["Hamilton", "Verstappen"],
-                "win_probability": [0.7, 0.3],
-            }
+        # Empty drivers list
+        response = self.app.post("/predict", json={"drivers": []})
+        self.assertEqual(response.status_code, 400)
+
+        # Non-numeric feature
+        response = self.app.post(
+            "/predict", json={"drivers": [{"test_feature": "fast"}]}
         )
-        mock_winner = {
-            "forename": "Lewis",
-            "surname": "Hamilton",
-            "win_probability": 0.7,
-        }
-        mock_predict.return_value = (mock_predictions, mock_winner)
+        self.assertEqual(response.status_code, 400)
 
+    @serving(
+        ScoringEngine(
+            np.array([2.0, 0.4]), 0.0, ["driver_win_rate", "constructor_win_rate"]
+        ),
+    )
+    def test_predict_success(self):
+        """Test successful prediction."""
         test_data = {
             "drivers": [
+                {
+                    "forename": "Max",
+                    "surname": "Verstappen",
+                    "driver_win_rate": 0.1,
+                    "constructor_win_rate": 0.25,
+                },
                 {
                     "forename": "Lewis",
                     "surname": "Hamilton",
                     "driver_win_rate": 0.3,
                     "constructor_win_rate": 0.25,
-                }
+                },
             ]
         }
 
@@ -94,12 +102,41 @@ class TestAPI(TestCase):
         self.assertIn("predicted_winner", data)
         self.assertIn("all_predictions", data)
 
+        self.assertEqual(data["predicted_winner"]["full_name"], "Lewis Hamilton")
+        self.assertAlmostEqual(data["predicted_winner"]["win_probability"], 0.7)
+        self.assertEqual(
+            [p["full_name"] for p in data["all_predictions"]],
+            ["Lewis Hamilton", "Max Verstappen"],
+        )
+
+    def test_predict_matches_predict_race_winner(self):
+        """Test the array path ranks drivers like predict_race_winner."""
+        model = mock.MagicMock()
+        model.predict.side_effect = lambda X: X.to_numpy() @ np.array([1.0, -0.5])
+        engine = ScoringEngine(np.array([1.0, -0.5]), 0.0, ["driver_win_rate", "grid"])
+        drivers = [
+            {"forename": "A", "surname": "", "driver_win_rate": 0.2, "grid": 0.1},
+            {"forename": "B", "surname": "", "driver_win_rate": 0.4, "grid": 0.2},
+            {"forename": "C", "surname": "", "driver_win_rate": 0.4, "grid": 0.2},
+            {"forename": "D", "surname": "", "driver_win_rate": 0.1, "grid": 0.9},
+        ]
+        race_data = pd.DataFrame(drivers)
+        expected, _ = predict_race_winner(
+            race_data[engine.feature_names], model, {}, race_data
+        )
+
+        with serving(engine):
+            response = self.app.post("/predict", json={"drivers": drivers})
+
+        data = json.loads(response.data)
+        self.assertEqual(
+            [p["full_name"] for p in data["all_predictions"]],
+            (expected["forename"] + " Unknown").tolist(),
+        )
+
     def test_predict_missing_features(self):
         """Test predict endpoint with missing features."""
-        with (
-            mock.patch("src.api.model", mock.MagicMock()),
-            mock.patch("src.api.feature_names", ["required_feature"]),
-        ):
+        with serving(ScoringEngine(np.zeros(1), 0.0, ["required_feature"])):
             test_data = {"drivers": [{"forename": "Lewis", "surname": "Hamilton"}]}
 
             response = self.app.post("/predict", json=test_data)
@@ -107,3 +144,356 @@ class TestAPI(TestCase):
 
             data = json.loads(response.data)
             self.assertIn("Missing features", data["error"])
+
+
+class TestBatchAPI(TestCase):
+    """Test cases for the batch prediction endpoint."""
+
+    def setUp(self):
+        """Set up test client and a two-feature engine."""
+        self.app = app.test_client()
+        self.app.testing = True
+        self.engine = ScoringEngine(
+            np.array([1.0, 0.5]), 0.0, ["driver_win_rate", "constructor_win_rate"]
+        )
+
+    def _driver(self, forename, driver_win_rate, constructor_win_rate):
+        return {
+            "forename": forename,
+            "surname": "Driver",
+            "driver_win_rate": driver_win_rate,
+            "constructor_win_rate": constructor_win_rate,
+        }
+
+    def test_predict_batch_no_model(self):
+        """Test batch endpoint when model is not loaded."""
+        with serving(None):
+            response = self.app.post("/predict/batch", json={"races": []})
+
+        self.assertEqual(response.status_code, 500)
+
+    def test_predict_batch_invalid_input(self):
+        """Test batch endpoint without a races list."""
+        with serving(self.engine):
+            response = self.app.post("/predict/batch", json={"drivers": []})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_batch_per_race_winners(self):
+        """Test winners and rankings are computed per race."""
+        races = [
+            {
+                "race_id": 1001,
+                "drivers": [
+                    self._driver("A", 0.1, 0.1),
+                    self._driver("B", 0.4, 0.2),
+                    self._driver("C", 0.2, 0.1),
+                ],
+            },
+            {
+                "race_id": 1002,
+                "drivers": [self._driver("D", 0.5, 0.5), self._driver("E", 0.1, 0.0)],
+            },
+        ]
+
+        with serving(self.engine):
+            response = self.app.post("/predict/batch", json={"races": races})
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.data)
+        self.assertEqual(data["races_scored"], 2)
+        self.assertEqual(data["races_failed"], 0)
+
+        first, second = data["results"]
+        self.assertEqual(first["race_id"], 1001)
+        self.assertEqual(first["predicted_winner"]["full_name"], "B Driver")
+        self.assertAlmostEqual(first["predicted_winner"]["win_probability"], 0.5)
+        self.assertEqual(
+            [p["full_name"] for p in first["all_predictions"]],
+            ["B Driver", "C Driver", "A Driver"],
+        )
+        self.assertEqual(second["predicted_winner"]["full_name"], "D Driver")
+
+    def test_predict_batch_calibrated(self):
+        """Test calibrated batches get per-race probabilities and podiums."""
+        races = [
+            {
+                "race_id": 1,
+                "drivers": [
+                    self._driver("A", 0.1, 0.1),
+                    self._driver("B", 0.4, 0.2),
+                    self._driver("C", 0.2, 0.1),
+                    self._driver("D", 0.0, 0.0),
+                ],
+            },
+            {"race_id": 2, "drivers": [self._driver("E", 0.5, 0.5)]},
+        ]
+        payload = {"races": races, "calibrate": "plackett_luce", "samples": 2000}
+
+        with serving(self.engine):
+            response = self.app.post("/predict/batch", json=payload)
+        self.assertEqual(response.status_code, 200)
+
+        first, second = json.loads(response.data)["results"]
+        predictions = first["all_predictions"]
+        self.assertAlmostEqual(sum(p["win_probability"] for p in predictions), 1.0)
+        self.assertAlmostEqual(sum(p["podium_probability"] for p in predictions), 3.0)
+        self.assertEqual(predictions[0]["full_name"], "B Driver")
+        self.assertAlmostEqual(predictions[0]["score"], 0.5)
+        self.assertEqual(len(predictions[0]["position_probabilities"]), 4)
+        self.assertEqual(second["all_predictions"][0]["position_probabilities"], [1.0])
+
+    def test_predict_invalid_calibration(self):
+        """Test unknown methods and sample counts are rejected."""
+        races = [{"drivers": [self._driver("A", 0.1, 0.1)]}]
+
+        with serving(self.engine):
+            method = self.app.post(
+                "/predict/batch", json={"races": races, "calibrate": "sigmoid"}
+            )
+            samples = self.app.post(
+                "/predict/batch",
+                json={"races": races, "calibrate": "softmax", "samples": 0},
+            )
+
+        self.assertEqual(method.status_code, 400)
+        self.assertEqual(samples.status_code, 400)
+
+    def test_predict_batch_draw_budget(self):
+        """Test plackett_luce requests over the samples x drivers budget fail."""
+        races = [{"drivers": [self._driver("A", 0.1, 0.1)] * 4}] * 3
+        payload = {"races": races, "calibrate": "plackett_luce", "samples": 100}
+
+        with serving(self.engine), mock.patch("src.api.MAX_CALIBRATION_DRAWS", 1000):
+            over = self.app.post("/predict/batch", json=payload)
+            softmax = self.app.post(
+                "/predict/batch", json={**payload, "calibrate": "softmax"}
+            )
+            payload["samples"] = 80
+            within = self.app.post("/predict/batch", json=payload)
+
+        self.assertEqual(over.status_code, 400)
+        self.assertEqual(
+            json.loads(over.data)["error"],
+            "Invalid input: 100 samples over 12 drivers exceeds 1000 "
+            "plackett_luce draws per request",
+        )
+        self.assertEqual(softmax.status_code, 200)
+        self.assertEqual(within.status_code, 200)
+
+    def test_predict_batch_reports_race_errors(self):
+        """Test invalid races are reported without failing the batch."""
+        races = [
+            {"race_id": "ok", "drivers": [self._driver("A", 0.1, 0.1)]},
+            {"race_id": "missing", "drivers": [{"driver_win_rate": 0.3}]},
+            {"race_id": "empty", "drivers": []},
+            {"race_id": "text", "drivers": [self._driver("B", "fast", 0.1)]},
+        ]
+
+        with serving(self.engine):
+            response = self.app.post("/predict/batch", json={"races": races})
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.data)
+        self.assertEqual(data["races_scored"], 1)
+        self.assertEqual(data["races_failed"], 3)
+
+        ok, missing, empty, text = data["results"]
+        self.assertIn("predicted_winner", ok)
+        self.assertIn("Missing features", missing["error"])
+        self.assertIn("must not be empty", empty["error"])
+        self.assertIn("numeric", text["error"])
+
+
+class TestPredictionCacheAPI(TestCase):
+    """Test cases for /predict response caching."""
+
+    def setUp(self):
+        """Set up test client with a fresh cache."""
+        self.app = app.test_client()
+        self.engine = ScoringEngine(np.array([1.0]), 0.0, ["driver_win_rate"])
+        self.drivers = [
+            {"forename": "A", "surname": "", "driver_win_rate": 0.1},
+            {"forename": "B", "surname": "", "driver_win_rate": 0.4},
+        ]
+        patch = mock.patch("src.api.prediction_cache", PredictionCache())
+        self.cache = patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_reordered_payload_hits_cache(self):
+        """Test the same drivers in another order are served from cache."""
+        with serving(self.engine):
+            first = self.app.post("/predict", json={"drivers": self.drivers})
+            second = self.app.post("/predict", json={"drivers": self.drivers[::-1]})
+            health = json.loads(self.app.get("/health").data)
+
+        self.assertEqual(json.loads(first.data), json.loads(second.data))
+        self.assertEqual(health["cache"]["hits"], 1)
+        self.assertEqual(health["cache"]["misses"], 1)
+
+    def test_new_model_invalidates_cache(self):
+        """Test a reloaded model does not reuse cached scores."""
+        reloaded = ScoringEngine(np.array([-1.0]), 0.0, ["driver_win_rate"])
+
+        with serving(self.engine):
+            self.app.post("/predict", json={"drivers": self.drivers})
+        with serving(reloaded):
+            response = self.app.post("/predict", json={"drivers": self.drivers})
+
+        data = json.loads(response.data)
+        self.assertEqual(data["predicted_winner"]["full_name"], "A Unknown")
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+
+class TestRaceAPI(TestCase):
+    """Test cases for predictions from server-side features."""
+
+    def setUp(self):
+        """Set up test client, an engine and a two-race feature table."""
+        self.app = app.test_client()
+        self.engine = ScoringEngine(np.array([1.0]), 0.0, ["driver_win_rate"])
+        self.table = FeatureTable.from_frame(
+            pd.DataFrame(
+                {
+                    "raceId": [1, 1, 1, 2, 2],
+                    "driverId": [10, 20, 30, 10, 20],
+                    "year": [2023] * 5,
+                    "round": [1, 1, 1, 2, 2],
+                    "forename": ["A", "B", "C", "A", "B"],
+                    "surname": [""] * 5,
+                    "driver_win_rate": [0.1, 0.4, 0.2, 0.5, 0.3],
+                    "constructor_win_rate": [0.0] * 5,
+                }
+            )
+        )
+        patches = [
+            serving(self.engine),
+            mock.patch("src.api.feature_table.get", return_value=self.table),
+            mock.patch("src.api.prediction_cache", PredictionCache()),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_predict_race_by_ids(self):
+        """Test drivers are scored with their features for the race."""
+        response = self.app.post(
+            "/predict/race", json={"race_id": 1, "driver_ids": [10, 30]}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.data)
+        self.assertEqual(data["race_id"], 1)
+        self.assertEqual(data["predicted_winner"]["driver_id"], 30)
+        self.assertEqual(
+            [p["full_name"] for p in data["all_predictions"]],
+            ["C Unknown", "A Unknown"],
+        )
+        self.assertAlmostEqual(data["predicted_winner"]["win_probability"], 0.2)
+
+    def test_predict_race_all_drivers(self):
+        """Test omitting driver_ids scores the whole race."""
+        response = self.app.post("/predict/race", json={"race_id": 1})
+
+        data = json.loads(response.data)
+        self.assertEqual(len(data["all_predictions"]), 3)
+        self.assertEqual(data["predicted_winner"]["driver_id"], 20)
+
+    def test_predict_latest_features(self):
+        """Test driver_ids without a race use each driver's latest race."""
+        response = self.app.post("/predict/race", json={"driver_ids": [10, 20, 30]})
+
+        data = json.loads(response.data)
+        self.assertIsNone(data["race_id"])
+        self.assertEqual(data["predicted_winner"]["driver_id"], 10)
+        self.assertAlmostEqual(data["predicted_winner"]["win_probability"], 0.5)
+
+    def test_unknown_ids(self):
+        """Test unknown races and drivers are reported."""
+        response = self.app.post("/predict/race", json={"race_id": 99})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.app.post(
+            "/predict/race", json={"race_id": 2, "driver_ids": [10, 30]}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("[30]", json.loads(response.data)["error"])
+
+    def test_invalid_input(self):
+        """Test malformed race requests are rejected."""
+        for body in [{}, {"race_id": "1"}, {"driver_ids": []}, {"driver_ids": ["a"]}]:
+            response = self.app.post("/predict/race", json=body)
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_table_not_available(self):
+        """Test the endpoint answers 503 before a table is published."""
+        with mock.patch("src.api.feature_table.get", return_value=None):
+            response = self.app.post("/predict/race", json={"race_id": 1})
+
+        self.assertEqual(response.status_code, 503)
+
+
+class TestModelLoading(TestCase):
+    """Test cases for API model loading."""
+
+    def test_load_model_prefers_bundle(self):
+        """Test a model bundle is loaded without the joblib artifacts."""
+        engine = ScoringEngine(np.zeros(1), 0.0, ["driver_win_rate"])
+
+        with (
+            mock.patch("src.api.os.path.exists", return_value=True),
+            mock.patch("src.api.load_model_bundle", return_value=engine),
+            mock.patch("src.api._load_legacy_artifacts") as legacy,
+            serving(None),
+        ):
+            self.assertTrue(api.load_model())
+            self.assertIs(api.model_handle.engine, engine)
+            self.assertEqual(api.model_handle.version, engine.fingerprint)
+
+        legacy.assert_not_called()
+
+    def test_load_model_falls_back_to_joblib(self):
+        """Test the joblib model is compiled when no bundle exists."""
+        model = mock.MagicMock(coef_=np.array([[2.0]]), intercept_=np.array([0.5]))
+
+        with (
+            mock.patch("src.api.os.path.exists", return_value=False),
+            mock.patch(
+                "src.api._load_legacy_artifacts",
+                return_value=(model, {}, ["driver_win_rate"]),
+            ),
+            serving(None),
+        ):
+            self.assertTrue(api.load_model())
+            np.testing.assert_allclose(api.model_handle.engine.score([[1.0]]), [2.5])
+
+    def test_background_warmup_reports_state(self):
+        """Test warm-up loads in a thread and /health reports the state."""
+        engine = ScoringEngine(np.zeros(1), 0.0, ["driver_win_rate"])
+        client = app.test_client()
+
+        with (
+            mock.patch("src.api._load_engine", return_value=(None, None, [], engine)),
+            mock.patch("src.api._warmup_thread", None),
+            serving(None),
+            mock.patch("src.api.model_state", "not loaded"),
+        ):
+            self.assertEqual(client.get("/ready").status_code, 503)
+
+            api.start_model_warmup().join(timeout=5)
+
+            health = json.loads(client.get("/health").data)
+            self.assertEqual(health["model_state"], "ready")
+            self.assertEqual(client.get("/ready").status_code, 200)
+
+    def test_failed_load_reports_state(self):
+        """Test a failed load leaves the API unready with state 'failed'."""
+        with (
+            mock.patch("src.api._load_engine", side_effect=OSError("missing")),
+            serving(None),
+            mock.patch("src.api.model_state", "not loaded"),
+        ):
+            self.assertFalse(api.load_model())
+
+            data = json.loads(app.test_client().get("/ready").data)
+            self.assertEqual(data["model_state"], "failed")
@@ -0,0 +1,151 @@
+"""Tests for asgi module."""
+
+import asyncio
+import json
+import unittest.mock as mock
+from unittest import IsolatedAsyncioTestCase
+
+import numpy as np
+
+from src import asgi
+from src.drift import DriftMonitor, reference_histograms
+from src.microbatch import MicroBatcher
+from src.scoring import ScoringEngine
+from tests.fixtures import call, serving
+
+
+class TestASGI(IsolatedAsyncioTestCase):
+    """Test cases for the async serving mode."""
+
+    def setUp(self):
+        """Use a fresh batcher and a two-feature engine."""
+        self.engine = ScoringEngine(
+            np.array([1.0, 0.5]), 0.0, ["driver_win_rate", "constructor_win_rate"]
+        )
+        self.batcher = MicroBatcher(asgi._score, max_batch_size=8, max_wait_ms=20)
+        patches = [
+            mock.patch("src.asgi.batcher", self.batcher),
+            serving(self.engine),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def asyncTearDown(self):
+        await self.batcher.stop()
+
+    def _payload(self, *rates):
+        return json.dumps(
+            {
+                "drivers": [
+                    {
+                        "forename": f"D{i}",
+                        "surname": "",
+                        "driver_win_rate": rate,
+                        "constructor_win_rate": 0.1,
+                    }
+                    for i, rate in enumerate(rates)
+                ]
+            }
+        ).encode()
+
+    async def test_predict_coalesced(self):
+        """Test concurrent predictions are batched and answered per race."""
+        (status_a, race_a), (status_b, race_b) = await asyncio.gather(
+            call("POST", "/predict", self._payload(0.1, 0.3)),
+            call("POST", "/predict", self._payload(0.5, 0.2, 0.4)),
+        )
+
+        self.assertEqual((status_a, status_b), (200, 200))
+        self.assertEqual(race_a["predicted_winner"]["full_name"], "D1 Unknown")
+        self.assertEqual(
+            [p["full_name"] for p in race_b["all_predictions"]],
+            ["D0 Unknown", "D2 Unknown", "D1 Unknown"],
+        )
+
+        status, stats = await call("GET", "/metrics/batching")
+        self.assertEqual(status, 200)
+        self.assertEqual(stats["batch_size_histogram"]["buckets"]["2"], 1)
+
+    async def test_predict_invalid_input(self):
+        """Test invalid payloads are rejected before batching."""
+        status, _ = await call("POST", "/predict", b"not json")
+        self.assertEqual(status, 400)
+
+        status, data = await call("POST", "/predict", b'{"drivers": [{}]}')
+        self.assertEqual(status, 400)
+        self.assertIn("Missing features", data["error"])
+
+    async def test_predict_plackett_luce(self):
+        """Test sampled calibration runs within the draw budget and is capped."""
+        payload = json.loads(self._payload(0.1, 0.3, 0.2))
+        payload.update(calibrate="plackett_luce", samples=500, seed=0)
+        status, data = await call("POST", "/predict", json.dumps(payload).encode())
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(
+            sum(p["podium_probability"] for p in data["all_predictions"]), 3.0
+        )
+
+        with mock.patch("src.api.MAX_CALIBRATION_DRAWS", 1000):
+            status, data = await call("POST", "/predict", json.dumps(payload).encode())
+        self.assertEqual(status, 400)
+        self.assertIn("plackett_luce draws", data["error"])
+
+    async def test_predict_no_model(self):
+        """Test predict fails cleanly without a model."""
+        with serving(None):
+            status, data = await call("POST", "/predict", self._payload(0.1))
+
+        self.assertEqual(status, 500)
+        self.assertEqual(data["error"], "Model not loaded")
+
+    async def test_health_and_unknown_route(self):
+        """Test health answers and unknown routes 404."""
+        status, data = await call("GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["status"], "healthy")
+
+        status, _ = await call("GET", "/missing")
+        self.assertEqual(status, 404)
+
+    async def test_metrics(self):
+        """Test /metrics serves the text exposition with batching histograms."""
+        await call("POST", "/predict", self._payload(0.2, 0.4))
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi.app(
+            {"type": "http", "method": "GET", "path": "/metrics"}, receive, send
+        )
+
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn((b"content-type", asgi.CONTENT_TYPE.encode()), sent[0]["headers"])
+        text = sent[1]["body"].decode()
+        self.assertIn('f1_requests_total{endpoint="/predict",status="200"}', text)
+        self.assertIn('stage="serialize"', text)
+        self.assertIn("# TYPE f1_microbatch_races histogram", text)
+
+    async def test_drift(self):
+        """Test predictions are counted by the drift monitor."""
+        monitor = DriftMonitor()
+        monitor.set_reference(
+            reference_histograms(
+                np.random.default_rng(0).uniform(0, 0.5, (1000, 2)),
+                self.engine.feature_names,
+            ),
+            self.engine.feature_names,
+        )
+        with mock.patch("src.api.drift", monitor):
+            await call("POST", "/predict", self._payload(0.2, 0.4, 0.1))
+            status, data = await call("GET", "/drift")
+
+        self.assertEqual(status, 200)
+        self.assertTrue(data["enabled"])
+        self.assertEqual(data["rows"], 3)
+        self.assertEqual(data["model_version"], "test")
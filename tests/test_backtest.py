@@ -0,0 +1,89 @@
+"""Tests for backtest module."""
+
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import (
+    backtest_arrays,
+    evaluate_season,
+    race_metrics,
+    run_backtest,
+    season_report,
+)
+from src.features import build_features
+from tests.fixtures import make_raw_tables
+
+
+class TestBacktest(TestCase):
+    """Test cases for the walk-forward backtest."""
+
+    def setUp(self):
+        """Build pre-race features for four synthetic seasons."""
+        self.race_data = build_features(
+            make_raw_tables(), from_year=2017, pre_race=True
+        )
+
+    def test_race_metrics(self):
+        """Test winner rank, hits and log-loss per race."""
+        scores = np.array([0.2, 0.6, 0.2, 0.5, -1.0, 0.1])
+        is_winner = np.array([1, 0, 0, 0, 0, 0])
+        offsets = np.array([0, 3, 6])
+
+        metrics = race_metrics(scores, is_winner, offsets)
+
+        np.testing.assert_array_equal(metrics["winner_rank"], [1, -1])
+        np.testing.assert_array_equal(metrics["top1"], [0.0, np.nan])
+        np.testing.assert_array_equal(metrics["top3"], [1.0, np.nan])
+        self.assertAlmostEqual(metrics["log_loss"][0], -np.log(0.2))
+
+    def test_training_rows_precede_race(self):
+        """Test each race is scored by a model fitted on earlier races only."""
+        results = run_backtest(self.race_data, workers=1)
+        race_sizes = self.race_data.groupby("raceId").size()
+        race_order = self.race_data.drop_duplicates("raceId").sort_values(
+            ["year", "round"]
+        )["raceId"]
+        earlier_rows = race_sizes[race_order].cumsum().shift(fill_value=0)
+
+        np.testing.assert_array_equal(
+            results["train_rows"], earlier_rows[results["race_id"]]
+        )
+        self.assertEqual(sorted(results["year"].unique()), [2018, 2019, 2020])
+
+    def test_future_races_do_not_change_results(self):
+        """Test rewriting a later season leaves earlier folds untouched."""
+        arrays = backtest_arrays(self.race_data)
+        before = evaluate_season(arrays, 2019)
+
+        future = arrays["offsets"][np.argmax(arrays["year"] == 2020)]
+        arrays["features"][future:] = 0.0
+        arrays["is_winner"][future:] = 1
+        after = evaluate_season(arrays, 2019)
+
+        np.testing.assert_array_equal(after["log_loss"], before["log_loss"])
+        np.testing.assert_array_equal(after["winner_rank"], before["winner_rank"])
+
+    def test_pool_matches_in_process(self):
+        """Test folds run in worker processes match the in-process run."""
+        serial = run_backtest(self.race_data, refit="season", workers=1)
+        pooled = run_backtest(self.race_data, refit="season", workers=2)
+
+        pd.testing.assert_frame_equal(pooled, serial)
+
+    def test_season_report(self):
+        """Test the report has one row per season plus the overall row."""
+        results = run_backtest(self.race_data, first_season=2019, workers=1)
+
+        report = season_report(results)
+
+        self.assertEqual(list(report.index), ["2019", "2020", "all"])
+        self.assertEqual(report.loc["all", "races"], len(results))
+        scored = results[results["winner_rank"] >= 0]
+        self.assertAlmostEqual(report.loc["all", "top3"], scored["top3"].mean())
+
+    def test_invalid_refit(self):
+        """Test unknown refit modes are rejected."""
+        with self.assertRaises(ValueError):
+            run_backtest(self.race_data, refit="weekly")
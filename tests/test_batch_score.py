@@ -0,0 +1,193 @@
+"""Tests for batch_score module."""
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.batch_score import read_parquet_chunks, run_batch
+from src.scoring import ScoringEngine
+
+
+def _driver(forename, driver_win_rate, constructor_win_rate):
+    return {
+        "forename": forename,
+        "surname": "Driver",
+        "driver_win_rate": driver_win_rate,
+        "constructor_win_rate": constructor_win_rate,
+    }
+
+
+class TestBatchScore(TestCase):
+    """Test cases for offline streaming scoring."""
+
+    def setUp(self):
+        """Create a two-feature engine and a temporary directory."""
+        self.engine = ScoringEngine(
+            np.array([1.0, 0.5]), 0.0, ["driver_win_rate", "constructor_win_rate"]
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def _race_frame(self, n_races=25, seed=0):
+        rng = np.random.default_rng(seed)
+        sizes = rng.integers(1, 6, size=n_races)
+        return pd.DataFrame(
+            {
+                "race_id": np.repeat(np.arange(100, 100 + n_races), sizes),
+                "forename": [f"D{i}" for i in range(sizes.sum())],
+                "surname": "Driver",
+                "driver_win_rate": rng.random(sizes.sum()),
+                "constructor_win_rate": rng.random(sizes.sum()),
+            }
+        )
+
+    def test_jsonl_requests(self):
+        """Test /predict and /predict/batch lines are scored and errors kept."""
+        lines = [
+            {"drivers": [_driver("A", 0.1, 0.1), _driver("B", 0.4, 0.2)]},
+            {
+                "races": [
+                    {"race_id": "monza", "drivers": [_driver("C", 0.3, 0.0)]},
+                    {"drivers": [{"forename": "D"}]},
+                ]
+            },
+        ]
+        input_path = self._path("requests.jsonl")
+        with open(input_path, "w") as f:
+            f.write("".join(json.dumps(line) + "\n" for line in lines))
+            f.write("not json\n")
+
+        stats = run_batch(
+            self.engine, input_path, self._path("out.jsonl"), chunk_size=2
+        )
+
+        with open(self._path("out.jsonl")) as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual([r["race_id"] for r in results], ["1", "monza", "2:1", "3"])
+        self.assertEqual(results[0]["predicted_winner"]["full_name"], "B Driver")
+        self.assertAlmostEqual(
+            results[0]["all_predictions"][1]["win_probability"], 0.15
+        )
+        self.assertIn("Missing features", results[2]["error"])
+        self.assertEqual(results[3]["error"], "Invalid JSON data")
+        self.assertEqual((stats["rows"], stats["races"], stats["failed"]), (3, 2, 2))
+
+    def test_jsonl_ranges_checked_by_validator(self):
+        """Test out-of-range JSONL races fail with the API's validation error."""
+        input_path = self._path("requests.jsonl")
+        with open(input_path, "w") as f:
+            f.write(json.dumps({"drivers": [_driver("A", 1.5, 0.1)]}) + "\n")
+            f.write(json.dumps({"drivers": [_driver("B", 0.5, 0.1)]}) + "\n")
+
+        stats = run_batch(self.engine, input_path, self._path("out.jsonl"))
+
+        with open(self._path("out.jsonl")) as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual(
+            results[0]["error"],
+            "Invalid input: 'driver_win_rate' must be between 0 and 1",
+        )
+        self.assertEqual((stats["races"], stats["failed"]), (1, 1))
+
+    def test_parquet_chunks_keep_races_whole(self):
+        """Test races split across record batches are carried to the next chunk."""
+        frame = self._race_frame()
+        input_path = self._path("races.parquet")
+        frame.to_parquet(input_path, index=False)
+
+        chunks = list(
+            read_parquet_chunks(input_path, self.engine.feature_names, "race_id", 4)
+        )
+
+        ids = [chunk.column("race_id").to_pylist() for _, chunk in chunks]
+        self.assertEqual(sum(len(chunk_ids) for chunk_ids in ids), len(frame))
+        for earlier, later in zip(ids[:-1], ids[1:], strict=True):
+            self.assertNotEqual(earlier[-1], later[0])
+
+    def test_parquet_output_matches_engine(self):
+        """Test streamed Parquet scores and ranks, in process and in workers."""
+        frame = self._race_frame()
+        input_path = self._path("races.parquet")
+        frame.to_parquet(input_path, index=False)
+
+        stats = run_batch(
+            self.engine, input_path, self._path("serial.parquet"), chunk_size=7
+        )
+        run_batch(
+            self.engine,
+            input_path,
+            self._path("pooled.parquet"),
+            workers=2,
+            chunk_size=7,
+        )
+
+        serial = pd.read_parquet(self._path("serial.parquet"))
+        pooled = pd.read_parquet(self._path("pooled.parquet"))
+        pd.testing.assert_frame_equal(serial, pooled)
+        self.assertEqual(stats["rows"], len(frame))
+        self.assertEqual(stats["races"], frame["race_id"].nunique())
+        self.assertGreater(stats["rows_per_second"], 0)
+
+        expected = frame.assign(
+            race_id=frame["race_id"].astype(str),
+            full_name=frame["forename"] + " " + frame["surname"],
+            win_probability=self.engine.score(frame[self.engine.feature_names]),
+        )
+        expected["rank"] = (
+            expected.groupby("race_id")["win_probability"]
+            .rank(ascending=False, method="first")
+            .astype("int32")
+        )
+        merged = serial.merge(expected, on=["race_id", "full_name"])
+        self.assertEqual(len(merged), len(frame))
+        np.testing.assert_allclose(
+            merged["win_probability_x"], merged["win_probability_y"]
+        )
+        np.testing.assert_array_equal(merged["rank_x"], merged["rank_y"])
+
+    def test_invalid_values_and_race_stats(self):
+        """Test races with NaN or out-of-range features fail; stats cover the rest."""
+        frame = self._race_frame(n_races=6)
+        first_rows = frame.groupby("race_id").head(1).index
+        frame.loc[first_rows[1], "driver_win_rate"] = np.nan
+        frame.loc[first_rows[4], "constructor_win_rate"] = 1.5
+        input_path = self._path("races.parquet")
+        frame.to_parquet(input_path, index=False)
+
+        stats = run_batch(
+            self.engine,
+            input_path,
+            self._path("out.jsonl"),
+            chunk_size=7,
+            stats_path=self._path("races.csv"),
+        )
+
+        with open(self._path("out.jsonl")) as f:
+            results = {r["race_id"]: r for r in map(json.loads, f)}
+        self.assertEqual(
+            results[101]["error"], "Non-finite features: ['driver_win_rate']"
+        )
+        self.assertEqual(
+            results[104]["error"], "Features out of range: ['constructor_win_rate']"
+        )
+        self.assertEqual((stats["races"], stats["failed"]), (4, 2))
+
+        race_stats = pd.read_csv(self._path("races.csv"), index_col="race_id")
+        self.assertEqual(race_stats.index.tolist(), [100, 102, 103, 105])
+        scores = frame.assign(
+            win_probability=self.engine.score(frame[self.engine.feature_names])
+        )
+        expected = scores.groupby("race_id")["win_probability"]
+        np.testing.assert_allclose(
+            race_stats["max_probability"], expected.max().loc[race_stats.index]
+        )
+        np.testing.assert_array_equal(
+            race_stats["total_drivers"], expected.size().loc[race_stats.index]
+        )
@@ -0,0 +1,48 @@
+"""Tests for the benchmark suite."""
+
+from unittest import TestCase
+
+from benchmarks.suite import compare, run_suite
+
+
+def results(**best_ms):
+    return {
+        "version": 1,
+        "benchmarks": {name: {"best_ms": ms} for name, ms in best_ms.items()},
+    }
+
+
+class TestBenchmarkSuite(TestCase):
+    """Test cases for running and comparing benchmark results."""
+
+    def test_compare(self):
+        """Test slowdowns beyond the tolerance are regressions."""
+        baseline = results(a=10.0, b=10.0, c=10.0)
+        current = results(a=12.0, b=13.0, c=7.0, d=1.0)
+
+        rows = {row[0]: row for row in compare(current, baseline, tolerance=0.25)}
+
+        self.assertEqual(rows["a"][4], "ok")
+        self.assertEqual(rows["b"][4], "regression")
+        self.assertAlmostEqual(rows["b"][3], 1.3)
+        self.assertEqual(rows["c"][4], "faster")
+        self.assertEqual(rows["d"][4], "new")
+
+    def test_run_suite_selects_cases(self):
+        """Test ``only`` filters cases and results are machine-readable."""
+        output = run_suite(only="win_probability_stats", quick=True)
+
+        self.assertEqual(
+            list(output["benchmarks"]), ["calculate_win_probability_stats"]
+        )
+        entry = output["benchmarks"]["calculate_win_probability_stats"]
+        self.assertGreater(entry["best_ms"], 0)
+        self.assertLessEqual(entry["best_ms"], entry["median_ms"])
+        self.assertEqual(entry["runs"], 3)
+
+    def test_api_predict_smoke(self):
+        """Test the /predict case still drives the API (catches API refactors)."""
+        output = run_suite(only=r"^api_predict", quick=True)
+
+        self.assertEqual(list(output["benchmarks"]), ["api_predict[20]"])
+        self.assertGreater(output["benchmarks"]["api_predict[20]"]["best_ms"], 0)
@@ -0,0 +1,95 @@
+"""Tests for cache module."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from src.cache import PredictionCache, canonical_key
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCanonicalKey(TestCase):
+    """Test cases for payload canonicalization."""
+
+    def test_row_order_does_not_change_key(self):
+        """Test permuted drivers produce the same key."""
+        features = np.array([[0.3, 2.0], [0.1, 5.0], [0.3, 1.0]])
+
+        key, order = canonical_key(features)
+        permuted_key, permuted_order = canonical_key(features[[2, 0, 1]])
+
+        self.assertEqual(key, permuted_key)
+        np.testing.assert_array_equal(
+            features[order], features[[2, 0, 1]][permuted_order]
+        )
+
+    def test_different_values_change_key(self):
+        """Test a changed feature value changes the key."""
+        features = np.array([[0.3, 2.0], [0.1, 5.0]])
+        changed = features.copy()
+        changed[1, 1] = 5.5
+
+        self.assertNotEqual(canonical_key(features)[0], canonical_key(changed)[0])
+
+
+class TestPredictionCache(TestCase):
+    """Test cases for the LRU/TTL prediction cache."""
+
+    def setUp(self):
+        """Set up a small cache on a fake clock."""
+        self.clock = FakeClock()
+        self.cache = PredictionCache(max_entries=2, ttl_seconds=10, clock=self.clock)
+
+    def test_hit_and_miss(self):
+        """Test stored values are returned and counted."""
+        self.assertIsNone(self.cache.get("a", "v1"))
+        self.cache.put("a", "v1", 1)
+
+        self.assertEqual(self.cache.get("a", "v1"), 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted."""
+        self.cache.put("a", "v1", 1)
+        self.cache.put("b", "v1", 2)
+        self.cache.get("a", "v1")
+        self.cache.put("c", "v1", 3)
+
+        self.assertIsNone(self.cache.get("b", "v1"))
+        self.assertEqual(self.cache.get("a", "v1"), 1)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        self.cache.put("a", "v1", 1)
+        self.clock.now = 10.0
+
+        self.assertIsNone(self.cache.get("a", "v1"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_model_version_change_invalidates(self):
+        """Test a new model version drops every cached entry."""
+        self.cache.put("a", "v1", 1)
+
+        self.assertIsNone(self.cache.get("a", "v2"))
+        stats = self.cache.stats()
+        self.assertEqual(stats["invalidations"], 1)
+        self.assertEqual(stats["size"], 0)
+
+    def test_disabled_cache_stores_nothing(self):
+        """Test a zero-size cache never stores entries."""
+        cache = PredictionCache(max_entries=0)
+        cache.put("a", "v1", 1)
+
+        self.assertFalse(cache.stats()["enabled"])
+        self.assertIsNone(cache.get("a", "v1"))
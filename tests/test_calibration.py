@@ -0,0 +1,96 @@
+"""Tests for calibration module."""
+
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.calibration import (
+    Calibration,
+    fit_temperature,
+    position_probabilities,
+    segment_log_likelihood,
+)
+from src.scoring import segment_softmax
+
+
+class TestCalibration(TestCase):
+    """Test cases for race-aware probability calibration."""
+
+    def setUp(self):
+        """Two races of different sizes."""
+        self.scores = np.array([1.0, 0.5, 0.0, 2.0, -1.0])
+        self.offsets = np.array([0, 3, 5])
+
+    def test_win_probabilities_sum_per_race(self):
+        """Test softmax probabilities are computed per race with a temperature."""
+        probabilities = Calibration(temperature=0.5).win_probabilities(
+            self.scores, self.offsets
+        )
+
+        np.testing.assert_allclose(
+            probabilities, segment_softmax(self.scores * 2, self.offsets)
+        )
+        np.testing.assert_allclose(
+            np.add.reduceat(probabilities, self.offsets[:-1]), [1.0, 1.0]
+        )
+
+    def test_position_distribution(self):
+        """Test sampled positions match Plackett-Luce and pad short races."""
+        positions = position_probabilities(
+            self.scores, self.offsets, n_samples=100_000, seed=0
+        )
+
+        self.assertEqual(positions.shape, (5, 3))
+        np.testing.assert_allclose(positions.sum(axis=1), 1.0)
+        np.testing.assert_array_equal(positions[3:, 2], [0.0, 0.0])
+        # First place is the softmax; exact second place for the top driver
+        np.testing.assert_allclose(
+            positions[:, 0], segment_softmax(self.scores, self.offsets), atol=0.01
+        )
+        p = np.exp([1.0, 0.5, 0.0])
+        second = p[1] / p.sum() * p[0] / (p[0] + p[2]) + p[2] / p.sum() * p[0] / (
+            p[0] + p[1]
+        )
+        self.assertAlmostEqual(positions[0, 1], second, delta=0.01)
+
+    def test_seeded_sampling_is_reproducible(self):
+        """Test the same seed gives the same distribution."""
+        first = position_probabilities(self.scores, self.offsets, n_samples=500, seed=3)
+        second = position_probabilities(
+            self.scores, self.offsets, n_samples=500, seed=3
+        )
+
+        np.testing.assert_array_equal(first, second)
+
+    def test_fit_temperature_recovers_truth(self):
+        """Test the fitted temperature is close to the one used to draw winners."""
+        rng = np.random.default_rng(0)
+        scores = rng.normal(size=(3000, 10))
+        winners = np.argmax(scores / 0.4 + rng.gumbel(size=scores.shape), axis=1)
+        is_winner = np.zeros(scores.shape, dtype=int)
+        is_winner[np.arange(3000), winners] = 1
+        offsets = np.arange(0, scores.size + 1, 10)
+
+        temperature = fit_temperature(scores.ravel(), is_winner.ravel(), offsets)
+
+        self.assertAlmostEqual(temperature, 0.4, delta=0.03)
+        best = segment_log_likelihood(scores.ravel(), is_winner.ravel(), offsets, 0.4)
+        worse = segment_log_likelihood(scores.ravel(), is_winner.ravel(), offsets, 1)
+        self.assertGreater(best, worse)
+
+    def test_save_and_load(self):
+        """Test a saved calibration round-trips and a missing file defaults."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "calibration.json")
+            Calibration(0.25, fitted=True, races=120).save(path)
+
+            loaded = Calibration.load(path)
+            default = Calibration.load(os.path.join(tmp_dir, "missing.json"))
+
+        self.assertEqual(loaded.to_dict(), Calibration(0.25, True, 120).to_dict())
+        self.assertFalse(default.fitted)
+        self.assertEqual(default.temperature, 1.0)
+        with self.assertRaises(ValueError):
+            Calibration(temperature=0.0)
@@ -0,0 +1,160 @@
+"""Tests for championship module."""
+
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import MODEL_FEATURES
+from src.calibration import Calibration
+from src.championship import (
+    POINTS,
+    RollingWindows,
+    season_plan,
+    simulate_chunk,
+    simulate_season,
+)
+from src.feature_store import FeatureStore, RollingWindow
+from src.features import build_features
+from src.scoring import ScoringEngine
+from tests.fixtures import make_raw_tables
+
+
+def make_season(remaining=3):
+    """A store up to mid-2020 and the entries of the remaining rounds."""
+    tables = make_raw_tables()
+    race_data = build_features(tables, from_year=2017)
+    done = (race_data["year"] < 2020) | (race_data["round"] <= 6 - remaining)
+    store = FeatureStore.from_race_data(race_data[done])
+
+    races = []
+    for (year, round_num), entries in race_data[~done].groupby(["year", "round"]):
+        entries = entries[
+            [
+                "driverId",
+                "constructorId",
+                "grid",
+                "qualifying_position",
+                "num_pit_stops",
+            ]
+        ]
+        entries = entries.fillna({"num_pit_stops": 0}).reset_index(drop=True)
+        races.append((year, round_num, entries))
+    return store, races
+
+
+class TestRollingWindows(TestCase):
+    """Test cases for the vectorized ring buffers."""
+
+    def test_matches_rolling_window(self):
+        """Test every simulation's window matches a RollingWindow."""
+        histories = [[1.0, np.nan, 3.0], [], [2.0]]
+        windows = RollingWindows(2, histories, size=3)
+        expected = [RollingWindow(3, history) for history in histories]
+
+        for value in [4.0, 5.0]:
+            windows.push(np.array([0, 1]), np.full((2, 2), value, np.float32))
+            expected[0].push(value)
+            expected[1].push(value)
+
+        np.testing.assert_allclose(
+            windows.mean(np.arange(3)),
+            np.tile([[window.mean()] for window in expected], (1, 2)),
+        )
+
+
+class TestChampionship(TestCase):
+    """Test cases for the season simulator."""
+
+    def setUp(self):
+        """Build the store, the remaining races and a linear engine."""
+        self.store, self.races = make_season()
+        rng = np.random.default_rng(1)
+        self.engine = ScoringEngine(
+            rng.normal(size=len(MODEL_FEATURES)), 0.1, MODEL_FEATURES
+        )
+
+    def test_feedback_matches_feature_store(self):
+        """Test a near-deterministic season matches replaying the store."""
+        calibration = Calibration(temperature=1e-9)
+        plan = season_plan(self.engine, self.store, self.races, calibration)
+
+        # Reference: score each race from the store, ingest the argmax order
+        store = FeatureStore.from_dict(self.store.to_dict())
+        for year, round_num, entries in self.races:
+            frame = store.features_for_race(year, round_num, entries)
+            for name, value in plan["dynamic_fill"].items():
+                frame[name] = frame[name].fillna(value)
+            scores = self.engine.score(frame[MODEL_FEATURES].to_numpy(dtype=float))
+            finish = np.empty(len(scores), dtype=int)
+            finish[np.argsort(-scores)] = np.arange(1, len(scores) + 1)
+            points = [POINTS[p - 1] if p <= len(POINTS) else 0 for p in finish]
+            results = entries.assign(position=finish, points=points)
+            store.ingest_race(year, round_num, results)
+        expected = [store.drivers[d].season_points for d in plan["drivers"]]
+
+        result = simulate_chunk(plan, 4, seed=0)
+
+        np.testing.assert_allclose(result["points"], np.multiply(expected, 4))
+        self.assertEqual(result["titles"].max(), 4)
+        self.assertEqual(
+            plan["drivers"][int(np.argmax(result["titles"]))],
+            max(plan["drivers"], key=lambda d: store.drivers[d].season_points),
+        )
+
+    def test_simulate_season(self):
+        """Test title probabilities and points add up across workers."""
+        plan = season_plan(self.engine, self.store, self.races)
+
+        drivers, constructors = simulate_season(plan, 5000, seed=3, chunk_size=2000)
+        pooled, _ = simulate_season(plan, 5000, workers=2, seed=3, chunk_size=2000)
+
+        self.assertAlmostEqual(drivers["title_probability"].sum(), 1.0)
+        self.assertAlmostEqual(constructors["title_probability"].sum(), 1.0)
+        race_points = sum(sum(POINTS[: len(entries)]) for _, _, entries in self.races)
+        self.assertAlmostEqual(
+            drivers["expected_points"].sum(),
+            drivers["current_points"].sum() + race_points,
+        )
+        self.assertAlmostEqual(
+            drivers["expected_position"].mean(), (len(drivers) + 1) / 2
+        )
+        self.assertTrue((drivers["expected_points"] >= drivers["current_points"]).all())
+        pd.testing.assert_frame_equal(drivers, pooled)
+
+    def test_constructors_start_from_season_points(self):
+        """Test the constructors' standings carry this season's points."""
+        plan = season_plan(self.engine, self.store, self.races)
+
+        _, constructors = simulate_season(plan, 2000, seed=3)
+
+        current = constructors["current_points"].sum()
+        race_points = sum(sum(POINTS[: len(entries)]) for _, _, entries in self.races)
+        self.assertEqual(current, 132)
+        self.assertEqual(race_points, 294)
+        self.assertAlmostEqual(constructors["expected_points"].sum(), 426)
+        self.assertTrue(
+            (constructors["expected_points"] >= constructors["current_points"]).all()
+        )
+        # Teams' points are their drivers' points (nobody changed teams)
+        self.assertEqual(
+            current,
+            sum(
+                state.season_points
+                for state in self.store.drivers.values()
+                if state.season == 2020
+            ),
+        )
+
+    def test_invalid_calendar(self):
+        """Test races before the store's last race or across seasons fail."""
+        year, round_num, entries = self.races[0]
+
+        with self.assertRaises(ValueError):
+            season_plan(self.engine, self.store, [(year, 1, entries)])
+        with self.assertRaises(ValueError):
+            season_plan(
+                self.engine,
+                self.store,
+                [(year, round_num, entries), (year + 1, 1, entries)],
+            )
@@ -0,0 +1,171 @@
+"""Tests for data_sync module."""
+
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from src.data_sync import MANIFEST_FILE, SyncError, fetch, sync
+from src.raw_cache import load_table
+
+
+def make_archive(files):
+    """Zip ``{name: text}`` the way the Kaggle dataset is packaged."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """Serve one archive with ETag, If-None-Match, Range and If-Range support."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") in (None, server.etag):
+            start = int(range_header.split("=")[1].rstrip("-"))
+        body = server.archive[start:]
+
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        if start:
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{len(server.archive) - 1}/{len(server.archive)}",
+            )
+        self.end_headers()
+
+        if server.cut_after is not None:
+            # Simulate a dropped connection part-way through the body
+            self.wfile.write(body[: server.cut_after])
+            server.cut_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDataSync(TestCase):
+    """Test cases for the incremental dataset sync."""
+
+    def setUp(self):
+        """Start a local file server holding a two-table archive."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+        self.server.requests = []
+        self.server.cut_after = None
+        self.publish(
+            {
+                "circuits.csv": "circuitId,name\n1,Monza\n",
+                "status.csv": "statusId,status\n1,Finished\n",
+            },
+            etag='"v1"',
+        )
+        thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.url = f"http://127.0.0.1:{self.server.server_port}/f1.zip"
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.raw_dir = os.path.join(self.tmp_dir.name, "raw")
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+
+    def publish(self, files, etag):
+        """Replace the archive served by the stand-in."""
+        self.server.archive = make_archive(files)
+        self.server.etag = etag
+
+    def test_first_sync_extracts_and_converts(self):
+        """Test an empty directory gets every file and the typed cache."""
+        summary = sync(self.url, self.raw_dir, self.cache_dir)
+
+        self.assertEqual(sorted(summary["changed"]), ["circuits.csv", "status.csv"])
+        self.assertEqual(summary["converted"], ["circuits"])
+        self.assertEqual(load_table(self.cache_dir, "circuits")["name"][0], "Monza")
+        with open(os.path.join(self.raw_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["etag"], '"v1"')
+        self.assertIn("sha256", manifest["files"]["circuits.csv"])
+        self.assertFalse(os.path.exists(os.path.join(self.raw_dir, ".dataset.zip")))
+
+    def test_unchanged_archive_not_downloaded(self):
+        """Test a second sync answers from the ETag without a transfer."""
+        sync(self.url, self.raw_dir, self.cache_dir)
+
+        summary = sync(self.url, self.raw_dir, self.cache_dir)
+
+        self.assertFalse(summary["downloaded"])
+        self.assertEqual(self.server.requests[-1]["If-None-Match"], '"v1"')
+
+    def test_only_changed_tables_extracted(self):
+        """Test a new archive only rewrites and converts the changed tables."""
+        sync(self.url, self.raw_dir, self.cache_dir)
+        self.publish(
+            {
+                "circuits.csv": "circuitId,name\n1,Monza\n2,Spa\n",
+                "status.csv": "statusId,status\n1,Finished\n",
+            },
+            etag='"v2"',
+        )
+
+        summary = sync(self.url, self.raw_dir, self.cache_dir)
+
+        self.assertEqual(summary["changed"], ["circuits.csv"])
+        self.assertEqual(summary["converted"], ["circuits"])
+        self.assertEqual(len(load_table(self.cache_dir, "circuits")), 2)
+
+    def test_interrupted_transfer_resumes(self):
+        """Test a dropped download continues with a Range request."""
+        self.server.cut_after = 40
+        dest = os.path.join(self.tmp_dir.name, "f1.zip")
+
+        with self.assertRaises(SyncError):
+            fetch(self.url, dest)
+        self.assertEqual(os.path.getsize(f"{dest}.part"), 40)
+
+        fetch(self.url, dest)
+
+        self.assertEqual(self.server.requests[-1]["Range"], "bytes=40-")
+        self.assertEqual(self.server.requests[-1]["If-Range"], '"v1"')
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), self.server.archive)
+
+    def test_resume_restarts_when_archive_changed(self):
+        """Test If-Range restarts the transfer if the archive was republished."""
+        self.server.cut_after = 40
+        dest = os.path.join(self.tmp_dir.name, "f1.zip")
+        with self.assertRaises(SyncError):
+            fetch(self.url, dest)
+
+        self.publish({"circuits.csv": "circuitId,name\n3,Suzuka\n"}, etag='"v2"')
+        fetch(self.url, dest)
+
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), self.server.archive)
+
+    def test_rejects_non_http_urls(self):
+        """Test file:// and other schemes are refused before any request."""
+        dest = os.path.join(self.tmp_dir.name, "f1.zip")
+        for url in ("file:///etc/passwd", "ftp://example.com/f1.zip", "f1.zip"):
+            with self.assertRaises(SyncError):
+                fetch(url, dest)
+        self.assertFalse(os.path.exists(f"{dest}.part"))
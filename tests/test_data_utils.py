@@ -2,12 +2,16 @@
 
 from unittest import TestCase
 
+import numpy as np
 import pandas as pd
 
 from src.data_utils import (
+    calculate_race_win_probability_stats,
     calculate_win_probability_stats,
     format_driver_name,
+    format_driver_names,
     validate_race_data,
+    validate_races,
 )
 
 
@@ -149,3 +153,86 @@ class TestDataUtils(TestCase):
         self.assertEqual(stats["avg_probability"], 1.0)
         self.assertEqual(stats["max_probability"], 1.0)
         self.assertEqual(stats["min_probability"], 1.0)
+
+
+class TestBatchDataUtils(TestCase):
+    """Test cases for the multi-race data utility functions."""
+
+    def test_validate_races(self):
+        """Test NaN and range checks are reported per race and feature."""
+        features = ["driver_win_rate", "grid", "grid_qualifying_diff"]
+        race_data = pd.DataFrame(
+            {
+                "race_id": [1, 1, 2, 2, 3],
+                "driver_win_rate": [0.1, 0.2, np.nan, 1.5, 0.3],
+                "grid": [1, 2, 3, -1, 5],
+                "grid_qualifying_diff": [-3, 0, 2, np.inf, -20],
+            }
+        )
+
+        missing, errors = validate_races(race_data, features, race_data["race_id"])
+
+        self.assertEqual(missing, [])
+        self.assertEqual(list(errors), [2])
+        self.assertEqual(
+            errors[2],
+            "Non-finite features: ['driver_win_rate', 'grid_qualifying_diff']; "
+            "Features out of range: ['driver_win_rate', 'grid']",
+        )
+
+        # Arrays work too, with custom ranges
+        _, errors = validate_races(
+            race_data[features].to_numpy(),
+            features,
+            race_data["race_id"].to_numpy(),
+            feature_ranges={"grid_qualifying_diff": (-10, 10)},
+        )
+        self.assertEqual(list(errors), [2, 3])
+        self.assertEqual(errors[3], "Features out of range: ['grid_qualifying_diff']")
+
+    def test_validate_races_missing_features(self):
+        """Test missing columns are reported before any value checks."""
+        missing, errors = validate_races(
+            pd.DataFrame({"grid": [np.nan]}), ["grid", "year"], [1]
+        )
+        self.assertEqual((missing, errors), (["year"], {}))
+
+    def test_format_driver_names(self):
+        """Test vectorized names match format_driver_name row by row."""
+        forenames = ["Lewis", " Max ", "", None, "Lando"]
+        surnames = ["Hamilton", "Verstappen", "Leclerc", None, "Norris"]
+
+        names = format_driver_names(np.array(forenames), pd.Series(surnames))
+
+        self.assertEqual(
+            names.tolist(),
+            [
+                format_driver_name({"forename": forename, "surname": surname})
+                for forename, surname in zip(forenames, surnames, strict=True)
+            ],
+        )
+        self.assertEqual(
+            format_driver_names([np.nan], [None]).tolist(), ["Unknown Unknown"]
+        )
+        self.assertEqual(names[1], "Max Verstappen")
+        self.assertEqual(names[3], "Unknown Unknown")
+
+    def test_calculate_race_win_probability_stats(self):
+        """Test grouped stats match the single-race stats for each race."""
+        predictions = pd.DataFrame(
+            {
+                "race_id": [7, 7, 3, 7, 3],
+                "win_probability": [0.6, 0.3, 0.9, 0.1, 0.1],
+            }
+        )
+
+        stats = calculate_race_win_probability_stats(predictions)
+
+        self.assertEqual(stats.index.tolist(), [7, 3])
+        for race_id, race in predictions.groupby("race_id"):
+            self.assertEqual(
+                stats.loc[race_id].to_dict(), calculate_win_probability_stats(race)
+            )
+        empty = calculate_race_win_probability_stats(predictions.iloc[:0])
+        self.assertEqual(len(empty), 0)
+        self.assertIn("avg_probability", empty.columns)
@@ -0,0 +1,226 @@
+"""Tests for drift module."""
+
+import json
+import os
+import tempfile
+import unittest.mock as mock
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src import api
+from src.drift import (
+    DRIFT_FILE,
+    MIN_ROWS,
+    DriftMonitor,
+    ks_statistic,
+    psi,
+    reference_histograms,
+    score_log,
+    training_features,
+    write_reference,
+)
+from src.registry import ModelHandle
+from src.scoring import ScoringEngine
+
+NAMES = ["driver_win_rate", "grid"]
+
+
+def training_rows(n_rows, seed=0, shift=0.0):
+    """Rows of a rate in [0, 0.5] and an integer grid position."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack(
+        [rng.uniform(0, 0.5, n_rows) + shift, rng.integers(1, 21, n_rows)]
+    ).astype(float)
+
+
+class TestDriftScores(TestCase):
+    """Test cases for the reference histograms and drift statistics."""
+
+    def test_reference_histograms(self):
+        """Test quantile edges and training counts per feature."""
+        reference = reference_histograms(training_rows(5000), NAMES, bins=10)
+
+        self.assertEqual(reference["rows"], 5000)
+        rate, grid = (
+            reference["features"]["driver_win_rate"],
+            reference["features"]["grid"],
+        )
+        self.assertEqual(len(rate["edges"]), 9)
+        self.assertEqual(sum(rate["counts"]), 5000)
+        # Roughly equal-frequency bins
+        self.assertLess(max(rate["counts"]) - min(rate["counts"]), 5)
+        # Repeated quantiles of the discrete feature collapse into one edge
+        self.assertEqual(grid["edges"], sorted(set(grid["edges"])))
+        self.assertEqual(len(grid["counts"]), len(grid["edges"]) + 1)
+
+    def test_psi_and_ks(self):
+        """Test identical distributions score zero and known shifts score high."""
+        expected = np.array([[50.0, 50.0], [50.0, 50.0]])
+        actual = np.array([[50.0, 50.0], [90.0, 10.0]])
+
+        np.testing.assert_allclose(psi(expected, actual), [0.0, 0.4 * np.log(9)])
+        np.testing.assert_allclose(ks_statistic(expected, actual), [0.0, 0.4])
+
+    def test_training_features_undo_scaling(self):
+        """Test processed X_train columns are mapped back to their raw values."""
+        raw = pd.DataFrame(training_rows(100), columns=NAMES)
+        scaler = StandardScaler().fit(raw[["grid"]])
+        scaled = raw.assign(grid=scaler.transform(raw[["grid"]]).ravel())
+
+        unscaled = training_features(scaled, {"grid": scaler})
+
+        pd.testing.assert_frame_equal(unscaled, raw)
+
+
+class TestDriftMonitor(TestCase):
+    """Test cases for the streaming drift monitor."""
+
+    def setUp(self):
+        """Reference histograms of the training rows."""
+        self.reference = reference_histograms(training_rows(20000), NAMES)
+
+    def test_same_distribution_is_stable(self):
+        """Test live rows from the training distribution do not drift."""
+        monitor = DriftMonitor()
+        monitor.set_reference(self.reference, NAMES)
+        for seed in range(1, 11):
+            monitor.update(training_rows(200, seed), NAMES)
+
+        stats = monitor.stats()
+        self.assertEqual(stats["rows"], 2000)
+        self.assertEqual(stats["drifted_features"], [])
+        for scores in stats["features"].values():
+            self.assertEqual(scores["status"], "stable")
+            self.assertLess(scores["ks"], stats["ks_critical"])
+
+    def test_shifted_feature_drifts(self):
+        """Test a shifted feature is flagged and the others are not."""
+        monitor = DriftMonitor()
+        monitor.set_reference(self.reference, NAMES)
+        monitor.update(training_rows(1000, 1, shift=0.3), NAMES)
+
+        stats = monitor.stats()
+        self.assertEqual(stats["drifted_features"], ["driver_win_rate"])
+        self.assertEqual(stats["features"]["driver_win_rate"]["status"], "drift")
+        self.assertGreater(stats["features"]["driver_win_rate"]["ks"], 0.5)
+        self.assertEqual(stats["features"]["grid"]["status"], "stable")
+        self.assertEqual(stats["max_psi"], stats["features"]["driver_win_rate"]["psi"])
+
+    def test_window_rolls_over(self):
+        """Test counts cover at most two windows of recent rows."""
+        monitor = DriftMonitor(window=500)
+        monitor.set_reference(self.reference, NAMES)
+        monitor.update(training_rows(500, 1, shift=0.3), NAMES)
+        for seed in range(2, 6):
+            monitor.update(training_rows(250, seed), NAMES)
+
+        stats = monitor.stats()
+        # The shifted window has rolled out of the counts
+        self.assertEqual(stats["rows"], 500)
+        self.assertEqual(stats["rows_seen"], 1500)
+        self.assertEqual(stats["drifted_features"], [])
+
+    def test_feature_mapping(self):
+        """Test columns are matched by name and other feature lists are ignored."""
+        monitor = DriftMonitor()
+        # The model has an extra feature the reference does not cover
+        monitor.set_reference(self.reference, ["grid", "year", "driver_win_rate"])
+        rows = training_rows(MIN_ROWS, 1)
+        monitor.update(
+            np.column_stack([rows[:, 1], np.full(MIN_ROWS, 2024.0), rows[:, 0]]),
+            ["grid", "year", "driver_win_rate"],
+        )
+        monitor.update(rows, NAMES)
+
+        stats = monitor.stats()
+        self.assertEqual(stats["rows"], MIN_ROWS)
+        self.assertEqual(stats["unmonitored_features"], ["year"])
+        self.assertEqual(list(stats["features"]), ["grid", "driver_win_rate"])
+        self.assertEqual(stats["features"]["grid"]["status"], "stable")
+
+    def test_status_needs_rows(self):
+        """Test statuses are withheld until enough rows are counted."""
+        monitor = DriftMonitor()
+        self.assertEqual(monitor.stats(), {"enabled": False})
+        monitor.update(training_rows(10), NAMES)
+
+        monitor.set_reference(self.reference, NAMES)
+        self.assertIsNone(monitor.stats()["max_psi"])
+        monitor.update(training_rows(10, 1, shift=0.3), NAMES)
+        stats = monitor.stats()
+        self.assertIsNone(stats["features"]["driver_win_rate"]["status"])
+        self.assertEqual(stats["drifted_features"], [])
+
+    def test_score_log(self):
+        """Test the offline scores over a JSONL log match the live monitor."""
+        live = DriftMonitor(window=None)
+        live.set_reference(self.reference, NAMES)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "requests.jsonl")
+            with open(path, "w") as f:
+                for seed in range(1, 61):
+                    rows = training_rows(20, seed, shift=0.3 * (seed % 2))
+                    live.update(rows, NAMES)
+                    drivers = [dict(zip(NAMES, row, strict=True)) for row in rows]
+                    f.write(json.dumps({"drivers": drivers}) + "\n")
+                f.write(json.dumps({"drivers": [{"grid": 1}]}) + "\n")
+
+            stats, skipped = score_log(path, self.reference)
+
+        self.assertEqual(skipped, 1)
+        self.assertEqual(stats["rows"], 1200)
+        self.assertEqual(stats["features"], live.stats()["features"])
+        self.assertEqual(stats["drifted_features"], ["driver_win_rate"])
+
+
+class TestAPIDrift(TestCase):
+    """Test cases for drift monitoring behind the prediction endpoints."""
+
+    def setUp(self):
+        """Serve a model version whose registry directory has a reference."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        write_reference(
+            os.path.join(self.tmp_dir.name, DRIFT_FILE),
+            reference_histograms(training_rows(5000), NAMES),
+        )
+        engine = ScoringEngine(np.array([1.0, -0.01]), 0.0, NAMES)
+        self.handle = ModelHandle.for_engine(
+            engine, version="v1", source=self.tmp_dir.name
+        )
+        self.app = api.app.test_client()
+        self.drift = DriftMonitor()
+        patches = [
+            mock.patch("src.api.model_handle", None),
+            mock.patch("src.api.drift", self.drift),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_predictions_are_counted(self):
+        """Test the version's reference is loaded and requests are counted."""
+        api.activate_model(self.handle)
+        rows = training_rows(MIN_ROWS, 1)
+        drivers = [dict(zip(NAMES, row, strict=True)) for row in rows]
+        for start in range(0, MIN_ROWS, 20):
+            self.app.post(
+                "/predict", json={"drivers": drivers[start : start + 20]}
+            ).close()
+
+        stats = json.loads(self.app.get("/drift").data)
+        self.assertTrue(stats["enabled"])
+        self.assertEqual(stats["model_version"], "v1")
+        self.assertEqual(stats["rows"], MIN_ROWS)
+        self.assertEqual(stats["features"]["grid"]["status"], "stable")
+
+    def test_no_reference(self):
+        """Test the monitor is off when the version has no reference."""
+        os.remove(os.path.join(self.tmp_dir.name, DRIFT_FILE))
+        api.activate_model(self.handle)
+
+        stats = json.loads(self.app.get("/drift").data)
+        self.assertEqual(stats, {"model_version": "v1", "enabled": False})
@@ -0,0 +1,118 @@
+"""Tests for feature_table module."""
+
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.feature_table import FeatureTable, FeatureTableLoader
+
+
+def make_table_frame(win_rate=0.1):
+    """Build a small frame laid out like race_features.parquet."""
+    return pd.DataFrame(
+        {
+            "raceId": [1, 1, 2],
+            "driverId": [10, 20, 10],
+            "year": [2023, 2023, 2023],
+            "round": [1, 1, 2],
+            "forename": ["A", "B", "A"],
+            "surname": ["X", "Y", "X"],
+            "driver_win_rate": [win_rate, 0.2, 0.3],
+            "grid": [1.0, 2.0, 3.0],
+        }
+    )
+
+
+class TestFeatureTable(TestCase):
+    """Test cases for the indexed feature table."""
+
+    def setUp(self):
+        """Build a table snapshot."""
+        self.table = FeatureTable.from_frame(make_table_frame())
+
+    def test_race_rows(self):
+        """Test lookups by race and driver."""
+        self.assertEqual(self.table.race_rows(1, [20, 10]), ([1, 0], []))
+        self.assertEqual(self.table.race_rows(2, [10, 20]), ([2], [20]))
+        self.assertEqual(self.table.race_rows(1), ([0, 1], []))
+        with self.assertRaises(KeyError):
+            self.table.race_rows(3)
+
+    def test_latest_rows(self):
+        """Test each driver maps to their latest race."""
+        self.assertEqual(self.table.latest_rows([10, 20, 30]), ([2, 1], [30]))
+
+    def test_matrix_follows_feature_order(self):
+        """Test the matrix uses the requested feature order."""
+        matrix = self.table.matrix([2, 0], ["grid", "driver_win_rate"])
+
+        np.testing.assert_array_equal(matrix, [[3.0, 0.3], [1.0, 0.1]])
+        with self.assertRaises(KeyError):
+            self.table.matrix([0], ["points_per_race"])
+
+
+class TestFeatureTableLoader(TestCase):
+    """Test cases for snapshot reloading."""
+
+    def setUp(self):
+        """Publish a table file."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "race_features.parquet")
+        make_table_frame().to_parquet(self.path, index=False)
+        self.loader = FeatureTableLoader(self.path, check_interval=0.01)
+        self.loader.poll()
+
+    def publish(self, frame, mtime_ns):
+        """Replace the table file and set its modification time."""
+        frame.to_parquet(self.path, index=False)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_reload_after_publish(self):
+        """Test a republished file is picked up by the next poll, not by get."""
+        first = self.loader.get()
+        self.publish(make_table_frame(win_rate=0.9), mtime_ns=10**18)
+
+        self.assertIs(self.loader.get(), first)
+        second = self.loader.poll()
+
+        self.assertIsNot(second, first)
+        self.assertIs(self.loader.get(), second)
+        self.assertEqual(second.matrix([0], ["driver_win_rate"])[0, 0], 0.9)
+        self.assertEqual(self.loader.stats()["reloads"], 2)
+
+    def test_background_reload(self):
+        """Test the watcher thread swaps in a republished file."""
+        first = self.loader.get()
+        self.publish(make_table_frame(win_rate=0.9), mtime_ns=10**18)
+
+        thread = self.loader.start()
+        self.addCleanup(self.loader.stop)
+        self.assertIs(self.loader.start(), thread)
+        for _ in range(500):
+            if self.loader.get() is not first:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(self.loader.get().matrix([0], ["driver_win_rate"])[0, 0], 0.9)
+
+    def test_failed_reload_keeps_snapshot(self):
+        """Test a corrupt file does not replace the current table."""
+        first = self.loader.get()
+        with open(self.path, "w") as f:
+            f.write("not parquet")
+        os.utime(self.path, ns=(10**18, 10**18))
+
+        self.assertIs(self.loader.poll(), first)
+        self.assertIsNotNone(self.loader.stats()["last_error"])
+
+    def test_missing_file(self):
+        """Test a missing file leaves the loader empty."""
+        loader = FeatureTableLoader(os.path.join(self.tmp_dir.name, "missing"))
+
+        self.assertIsNone(loader.poll())
+        self.assertFalse(loader.stats()["loaded"])
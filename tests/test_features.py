@@ -0,0 +1,203 @@
+"""Tests for features module."""
+
+import json
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.feature_table import TABLE_FILE, FeatureTable
+from src.features import (
+    FEATURE_COLUMNS,
+    LOW_IMPACT_FEATURES,
+    GroupIndex,
+    build_features,
+    load_raw_tables,
+    prepare_training_data,
+    run_pipeline,
+    select_model_data,
+)
+from tests.fixtures import make_raw_tables
+
+
+def notebook_rolling_features(race_data, window_size):
+    """Rolling features exactly as computed in the preprocessing notebook."""
+    df = race_data.sort_values(["year", "round"]).reset_index(drop=True)
+    df["is_winner"] = (df["position"] == 1).astype(int)
+    df["driver_win_rate"] = df.groupby("driverId")["is_winner"].transform(
+        lambda x: x.rolling(window_size, min_periods=1).mean().shift(1)
+    )
+    df["constructor_win_rate"] = df.groupby("constructorId")["is_winner"].transform(
+        lambda x: x.rolling(window_size, min_periods=1).mean().shift(1)
+    )
+    df["driver_season_points"] = df.groupby(["driverId", "year"])["points"].transform(
+        lambda x: x.expanding().sum().shift(1)
+    )
+    df["recent_avg_position"] = (
+        df.groupby("driverId")["position"]
+        .rolling(5, min_periods=1)
+        .mean()
+        .reset_index(0, drop=True)
+    )
+    df["constructor_recent_wins"] = (
+        df.groupby("constructorId")["is_winner"]
+        .rolling(5, min_periods=1)
+        .sum()
+        .reset_index(0, drop=True)
+    )
+    return df
+
+
+class TestGroupIndex(TestCase):
+    """Test cases for grouped window operations."""
+
+    def test_window_sum_excludes_current(self):
+        """Test shifted windows only see earlier rows of the same group."""
+        groups = GroupIndex(np.array([1, 2, 1, 1, 2]))
+
+        sums, counts = groups.window_sum(
+            np.array([1.0, 5.0, 2.0, 3.0, 7.0]), window=2, include_current=False
+        )
+
+        np.testing.assert_array_equal(sums, [0, 0, 1, 3, 5])
+        np.testing.assert_array_equal(counts, [0, 0, 1, 2, 1])
+
+    def test_window_sum_excludes_block(self):
+        """Test block windows skip earlier rows of the same block (race)."""
+        groups = GroupIndex(np.array([1, 1, 1, 1]))
+
+        sums, counts = groups.window_sum(
+            np.array([1.0, 2.0, 4.0, 8.0]),
+            include_current=False,
+            block=np.array([10, 10, 11, 11]),
+        )
+
+        np.testing.assert_array_equal(sums, [0, 0, 3, 3])
+        np.testing.assert_array_equal(counts, [0, 0, 2, 2])
+
+    def test_window_mean_skips_nan(self):
+        """Test NaN values do not count towards the window mean."""
+        groups = GroupIndex(np.zeros(3, dtype=int))
+
+        means = groups.window_mean(np.array([np.nan, 4.0, 2.0]), window=3)
+
+        np.testing.assert_array_equal(means, [np.nan, 4.0, 3.0])
+
+    def test_multiple_keys(self):
+        """Test groups split on every key."""
+        groups = GroupIndex(np.array([1, 1, 1]), np.array([2020, 2021, 2020]))
+
+        sums, _ = groups.window_sum(np.array([1.0, 2.0, 4.0]))
+
+        np.testing.assert_array_equal(sums, [1, 2, 5])
+
+
+class TestFeaturePipeline(TestCase):
+    """Test cases for the feature engineering pipeline."""
+
+    def setUp(self):
+        """Build synthetic raw tables."""
+        self.tables = make_raw_tables()
+
+    def test_parity_with_notebook(self):
+        """Test vectorized features match the notebook's groupby lambdas."""
+        features = build_features(self.tables, from_year=2017, window_size=4)
+
+        race_data = self.tables["results"].merge(self.tables["races"], on="raceId")
+        expected = notebook_rolling_features(race_data, window_size=4)
+
+        for column in [
+            "driver_win_rate",
+            "constructor_win_rate",
+            "driver_season_points",
+            "recent_avg_position",
+            "constructor_recent_wins",
+        ]:
+            np.testing.assert_allclose(
+                features[column].to_numpy(), expected[column].to_numpy(), err_msg=column
+            )
+        np.testing.assert_array_equal(features["raceId"], expected["raceId"])
+
+    def test_pre_race_recent_form(self):
+        """Test pre-race recent form only looks at earlier races."""
+        notebook = build_features(self.tables, from_year=2017)
+        pre_race = build_features(self.tables, from_year=2017, pre_race=True)
+
+        first_race = pre_race["raceId"] == pre_race["raceId"].iloc[0]
+        self.assertTrue(pre_race.loc[first_race, "recent_avg_position"].isna().all())
+        self.assertTrue(pre_race.loc[first_race, "constructor_win_rate"].isna().all())
+        self.assertTrue(
+            (pre_race.loc[first_race, "constructor_recent_wins"] == 0).all()
+        )
+        np.testing.assert_array_equal(
+            pre_race["driver_win_rate"], notebook["driver_win_rate"]
+        )
+
+    def test_race_features(self):
+        """Test qualifying falls back to grid and pit stops are aggregated."""
+        features = build_features(self.tables, from_year=2017)
+        qualifying = self.tables["qualifying"].set_index(["raceId", "driverId"])
+
+        row = features.iloc[0]
+        key = (row["raceId"], row["driverId"])
+        expected = qualifying.loc[key, "position"] if key in qualifying.index else None
+        self.assertEqual(row["qualifying_position"], expected or row["grid"])
+        self.assertFalse(features["qualifying_position"].isna().any())
+        self.assertAlmostEqual(
+            features["points_per_race"].iloc[-1],
+            features["driver_season_points"].iloc[-1] / features["round"].iloc[-1],
+        )
+
+    def test_from_year_filter(self):
+        """Test earlier seasons are dropped before rolling."""
+        features = build_features(self.tables, from_year=2019)
+
+        self.assertEqual(features["year"].min(), 2019)
+        self.assertTrue(np.isnan(features["driver_win_rate"].iloc[0]))
+
+    def test_prepare_training_data(self):
+        """Test low-impact features are dropped and splits are imputed."""
+        ml_data = select_model_data(build_features(self.tables, from_year=2017))
+
+        prepared = prepare_training_data(ml_data, last_train_year=2019)
+
+        self.assertEqual(
+            prepared["feature_names"],
+            [f for f in FEATURE_COLUMNS if f not in LOW_IMPACT_FEATURES],
+        )
+        self.assertFalse(prepared["X_train"].isna().any().any())
+        self.assertFalse(prepared["X_test"].isna().any().any())
+        self.assertEqual(prepared["X_test"]["year"].count(), len(prepared["y_test"]))
+        self.assertNotIn("driver_win_rate", prepared["scalers"])
+        self.assertAlmostEqual(prepared["X_train"]["grid"].min(), 0.0)
+
+    def test_run_pipeline_from_csv(self):
+        """Test the pipeline reads raw CSVs and writes the processed artifacts."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            raw_dir = os.path.join(tmp_dir, "raw")
+            output_dir = os.path.join(tmp_dir, "processed")
+            os.makedirs(raw_dir)
+            for name, table in self.tables.items():
+                table.to_csv(
+                    os.path.join(raw_dir, f"{name}.csv"), index=False, na_rep="\\N"
+                )
+
+            loaded = load_raw_tables(raw_dir)
+            run_pipeline(raw_dir, output_dir, from_year=2017, last_train_year=2019)
+
+            with open(os.path.join(output_dir, "metadata.json")) as f:
+                metadata = json.load(f)
+            with open(os.path.join(output_dir, "scalers.pkl"), "rb") as f:
+                scalers = pickle.load(f)
+            X_test = pd.read_parquet(os.path.join(output_dir, "X_test.parquet"))
+            table = FeatureTable.read(os.path.join(output_dir, TABLE_FILE))
+
+        self.assertTrue(loaded["results"]["position"].isna().any())
+        self.assertEqual(metadata["test_samples"], len(X_test))
+        self.assertEqual(list(X_test.columns), metadata["feature_names"])
+        self.assertIn("year", scalers)
+        self.assertEqual(len(table), len(loaded["results"]))
+        self.assertFalse(np.isnan(table.matrix([0], metadata["feature_names"])).any())
@@ -0,0 +1,171 @@
+"""Tests for metrics module."""
+
+import time
+import unittest.mock as mock
+from unittest import TestCase
+
+import numpy as np
+
+from src import metrics
+from src.api import app
+from src.metrics import Histogram, Registry, StageTimer
+from src.scoring import ScoringEngine
+from tests.fixtures import serving
+
+STAGES = ("parse", "features", "score", "calibrate", "rank", "serialize")
+
+
+def sample_value(text, line_prefix):
+    """Return the value of the exposition line starting with ``line_prefix``."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestRegistry(TestCase):
+    """Test cases for the metric types and text exposition."""
+
+    def test_histogram_exposition(self):
+        """Test buckets are cumulative and end with +Inf, _sum and _count."""
+        registry = Registry()
+        family = registry.histogram("latency", "Latency.", (0.1, 1.0), ("route",))
+        for value in [0.05, 0.1, 0.5, 3.0]:
+            family.labels("/predict").observe(value)
+
+        text = registry.expose()
+
+        self.assertIn("# TYPE latency histogram", text)
+        self.assertEqual(
+            sample_value(text, 'latency_bucket{route="/predict",le="0.1"}'), 2
+        )
+        self.assertEqual(
+            sample_value(text, 'latency_bucket{route="/predict",le="1.0"}'), 3
+        )
+        self.assertEqual(
+            sample_value(text, 'latency_bucket{route="/predict",le="+Inf"}'), 4
+        )
+        self.assertAlmostEqual(
+            sample_value(text, 'latency_sum{route="/predict"}'), 3.65
+        )
+        self.assertEqual(sample_value(text, 'latency_count{route="/predict"}'), 4)
+
+    def test_counters_gauges_and_labels(self):
+        """Test counters, callback gauges, label escaping and label arity."""
+        registry = Registry()
+        counter = registry.counter("requests_total", "Requests.", ("path",))
+        registry.gauge("load_seconds", "Load time.", lambda: 1.5)
+        registry.gauge("unset", "Not yet known.", lambda: None)
+        counter.labels('a"b\\c').inc()
+        counter.labels('a"b\\c').inc(2)
+
+        text = registry.expose()
+
+        self.assertEqual(sample_value(text, 'requests_total{path="a\\"b\\\\c"}'), 3)
+        self.assertEqual(sample_value(text, "load_seconds"), 1.5)
+        self.assertIn("# TYPE unset gauge", text)
+        self.assertIsNone(sample_value(text, "unset"))
+        with self.assertRaises(ValueError):
+            counter.labels()
+        with self.assertRaises(ValueError):
+            registry.counter("requests_total", "Again.")
+
+    def test_histogram_snapshot(self):
+        """Test the JSON snapshot keeps per-bucket (non-cumulative) counts."""
+        histogram = Histogram((1, 2))
+        for value in [1, 2, 2, 5]:
+            histogram.observe(value)
+        self.assertEqual(
+            histogram.snapshot(),
+            {"buckets": {"1": 1, "2": 2, "+Inf": 1}, "count": 4, "sum": 10},
+        )
+
+
+class TestAPIMetrics(TestCase):
+    """Test cases for the Flask /metrics endpoint."""
+
+    def setUp(self):
+        """Set up test client."""
+        self.app = app.test_client()
+
+    @mock.patch("src.api.model_load_seconds", 0.25)
+    @serving(
+        ScoringEngine(np.array([1.0]), 0.0, ["driver_win_rate"]),
+    )
+    def test_metrics_after_predictions(self):
+        """Test request counters, stage histograms and distributions update."""
+        before = self.app.get("/metrics").get_data(as_text=True)
+        drivers = [{"forename": "A", "surname": "B", "driver_win_rate": 0.5}] * 3
+
+        self.app.post("/predict", json={"drivers": drivers})
+        self.app.post("/predict", json={})
+        self.app.post(
+            "/predict/batch", json={"races": [{"drivers": drivers}, {"drivers": []}]}
+        )
+        response = self.app.get("/metrics")
+        after = response.get_data(as_text=True)
+
+        def delta(prefix):
+            return (sample_value(after, prefix) or 0) - (
+                sample_value(before, prefix) or 0
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        self.assertEqual(
+            delta('f1_requests_total{endpoint="/predict",status="200"}'), 1
+        )
+        self.assertEqual(
+            delta('f1_requests_total{endpoint="/predict",status="400"}'), 1
+        )
+        self.assertEqual(
+            delta('f1_request_duration_seconds_count{endpoint="/predict"}'), 2
+        )
+        # The invalid request stops after parsing
+        for stage in STAGES:
+            self.assertEqual(
+                delta(
+                    "f1_stage_duration_seconds_count"
+                    f'{{endpoint="/predict",stage="{stage}"}}'
+                ),
+                2 if stage == "parse" else 1,
+            )
+        self.assertEqual(delta("f1_batch_races_count"), 1)
+        self.assertEqual(delta('f1_race_drivers_bucket{le="5"}'), 2)
+        self.assertEqual(sample_value(after, "f1_model_load_seconds"), 0.25)
+        self.assertEqual(sample_value(after, "f1_model_loaded"), 1.0)
+
+    def test_unmatched_route(self):
+        """Test requests to unknown paths share one endpoint label."""
+        self.app.get("/missing")
+        text = self.app.get("/metrics").get_data(as_text=True)
+        self.assertIsNotNone(
+            sample_value(text, 'f1_requests_total{endpoint="unmatched",status="404"}')
+        )
+
+
+class TestOverhead(TestCase):
+    """Test the instrumentation is cheap enough to leave on in production."""
+
+    def test_per_request_overhead(self):
+        """Test request counting plus six stage timings cost well under 50us."""
+        self.assertTrue(metrics.ENABLED)
+        n_requests = 2000
+
+        def instrumented_requests():
+            start = time.perf_counter()
+            for _ in range(n_requests):
+                request_start = time.perf_counter()
+                timer = StageTimer("/overhead-test")
+                for stage in STAGES:
+                    timer.stage(stage)
+                metrics.observe_races([20])
+                metrics.observe_request(
+                    "/overhead-test", 200, time.perf_counter() - request_start
+                )
+            return (time.perf_counter() - start) / n_requests
+
+        per_request = min(instrumented_requests() for _ in range(5))
+
+        # A /predict round trip through Flask alone takes hundreds of microseconds
+        self.assertLess(per_request, 50e-6)
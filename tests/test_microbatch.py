@@ -0,0 +1,114 @@
+"""Tests for microbatch module."""
+
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import numpy as np
+
+from src.microbatch import Histogram, MicroBatcher
+from src.scoring import ScoringEngine
+
+
+class TestHistogram(TestCase):
+    """Test cases for the bucket histogram."""
+
+    def test_observe_buckets(self):
+        """Test values land in the first bucket whose bound covers them."""
+        histogram = Histogram((1, 4, 16))
+        for value in (1, 2, 4, 5, 100):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot["buckets"], {"1": 1, "4": 2, "16": 1, "+Inf": 1})
+        self.assertEqual(snapshot["count"], 5)
+        self.assertEqual(snapshot["sum"], 112)
+
+
+class TestMicroBatcher(IsolatedAsyncioTestCase):
+    """Test cases for request coalescing."""
+
+    def setUp(self):
+        """Set up an engine that counts score calls."""
+        self.engine = ScoringEngine(np.array([1.0, -1.0]), 0.5, ["a", "b"])
+        self.calls = []
+
+    def _score(self, features):
+        self.calls.append(len(features))
+        return self.engine.score(features)
+
+    def _race(self, n_drivers, seed):
+        return np.random.default_rng(seed).random((n_drivers, 2))
+
+    async def test_concurrent_requests_coalesce(self):
+        """Test concurrent races are scored in one call and fanned back out."""
+        batcher = MicroBatcher(self._score, max_batch_size=16, max_wait_ms=50)
+        races = [self._race(n, seed) for seed, n in enumerate((3, 5, 2))]
+
+        results = await asyncio.gather(*(batcher.submit(race) for race in races))
+        await batcher.stop()
+
+        self.assertEqual(self.calls, [10])
+        for race, (scores, order) in zip(races, results, strict=True):
+            expected = self.engine.score(race)
+            np.testing.assert_allclose(scores, expected)
+            np.testing.assert_array_equal(order, np.argsort(-expected, kind="stable"))
+
+    async def test_max_batch_size_splits_batches(self):
+        """Test batches never exceed max_batch_size races."""
+        batcher = MicroBatcher(self._score, max_batch_size=2, max_wait_ms=50)
+        races = [self._race(1, seed) for seed in range(5)]
+
+        await asyncio.gather(*(batcher.submit(race) for race in races))
+        await batcher.stop()
+
+        self.assertEqual(self.calls, [2, 2, 1])
+        stats = batcher.stats()
+        self.assertEqual(stats["batch_size_histogram"]["count"], 3)
+        self.assertEqual(stats["batch_size_histogram"]["buckets"]["2"], 2)
+        self.assertEqual(stats["queue_depth"], 0)
+        # One observation per request of the races queued ahead of it
+        self.assertEqual(stats["queue_depth_histogram"]["count"], 5)
+        self.assertEqual(stats["queue_depth_histogram"]["sum"], 0 + 1 + 2 + 3 + 4)
+
+    async def test_engines_are_not_mixed(self):
+        """Test races for different engines are scored by their own engine."""
+        other = ScoringEngine(np.array([-1.0, 1.0]), 0.0, ["a", "b"])
+        batcher = MicroBatcher(self._score, max_batch_size=16, max_wait_ms=50)
+        races = [self._race(3, seed) for seed in range(3)]
+
+        results = await asyncio.gather(
+            batcher.submit(races[0], self.engine),
+            batcher.submit(races[1], other),
+            batcher.submit(races[2], self.engine),
+        )
+        await batcher.stop()
+
+        self.assertEqual(self.calls, [])
+        self.assertEqual(batcher.stats()["batch_size_histogram"]["count"], 1)
+        for race, engine, (scores, _) in zip(
+            races, [self.engine, other, self.engine], results, strict=True
+        ):
+            np.testing.assert_allclose(scores, engine.score(race))
+
+    async def test_scoring_error_propagates(self):
+        """Test a failing batch raises in every waiting caller."""
+
+        def fail(features):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batcher.submit(self._race(2, 0)),
+            batcher.submit(self._race(2, 1)),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_invalid_batch_size(self):
+        """Test a zero batch size is rejected."""
+        with self.assertRaises(ValueError):
+            MicroBatcher(self._score, max_batch_size=0)
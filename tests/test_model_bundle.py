@@ -0,0 +1,93 @@
+"""Tests for model_bundle module."""
+
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.model_bundle import (
+    BundleError,
+    export_bundle,
+    load_model_bundle,
+    read_bundle,
+)
+from src.scoring import compile_scoring_engine
+from tests.fixtures import (
+    FEATURE_NAMES,
+    fit_model_and_scalers,
+    make_training_data,
+)
+
+
+class TestModelBundle(TestCase):
+    """Test cases for the compact model bundle."""
+
+    def setUp(self):
+        """Export a bundle for a synthetic model."""
+        self.model, self.scalers = fit_model_and_scalers(make_training_data())
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "model.bundle")
+        export_bundle(self.model, self.scalers, FEATURE_NAMES, self.path)
+
+    def test_round_trip_matches_compiled_engine(self):
+        """Test the loaded bundle scores like the compiled sklearn model."""
+        expected = compile_scoring_engine(self.model, self.scalers, FEATURE_NAMES)
+        race = make_training_data(n_rows=20, seed=3).to_numpy()
+
+        engine = load_model_bundle(self.path)
+
+        self.assertEqual(engine.feature_names, FEATURE_NAMES)
+        self.assertEqual(engine.fingerprint, expected.fingerprint)
+        np.testing.assert_allclose(engine.score(race), expected.score(race))
+
+    def test_header_and_arrays(self):
+        """Test the bundle stores coefficients and folded scaler parameters."""
+        header, arrays = read_bundle(self.path)
+
+        self.assertEqual(header["metadata"]["model_type"], "LinearRegression")
+        np.testing.assert_array_equal(arrays["coef"], self.model.coef_.reshape(-1))
+        grid = FEATURE_NAMES.index("grid")
+        self.assertAlmostEqual(
+            arrays["scaler_scale"][grid], self.scalers["grid"].scale_[0]
+        )
+        self.assertEqual(arrays["scaler_scale"][0], 1.0)
+        self.assertFalse(arrays["weights"].flags.writeable)
+
+    def test_corrupt_payload_rejected(self):
+        """Test a flipped payload byte fails the checksum."""
+        with open(self.path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+
+        with self.assertRaises(BundleError):
+            load_model_bundle(self.path)
+
+    def test_not_a_bundle_rejected(self):
+        """Test files without the bundle magic are rejected."""
+        with open(self.path, "wb") as f:
+            f.write(b"definitely not a model bundle")
+
+        with self.assertRaises(BundleError):
+            load_model_bundle(self.path)
+
+    def test_load_does_not_import_sklearn(self):
+        """Test the serving load path avoids sklearn, pandas and joblib."""
+        code = (
+            "import sys\n"
+            "from src.model_bundle import load_model_bundle\n"
+            f"load_model_bundle({self.path!r}).score([[0.0] * {len(FEATURE_NAMES)}])\n"
+            "heavy = {'sklearn', 'pandas', 'joblib'} & set(sys.modules)\n"
+            "assert not heavy, heavy\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
@@ -1,12 +1,20 @@
 """Tests for predict_winner module."""
 
+import json
+import os
+import pickle
+import tempfile
 import unittest.mock as mock
 from unittest import TestCase
 
+import joblib
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 
+from src.calibration import Calibration
 from src.predict_winner import (
+    LEGACY_MODEL_FILE,
+    MODEL_FILE,
     example_prediction,
     load_model_and_scalers,
     predict_race_winner,
@@ -65,6 +73,24 @@ class TestPredictWinner(TestCase):
         self.assertIsInstance(winner, pd.Series)
         self.assertEqual(winner["win_probability"], 0.7)
 
+    def test_predict_race_winner_calibrated(self):
+        """Test calibrated predictions keep the score and sum to one."""
+        mock_model = mock.MagicMock()
+        mock_model.predict.return_value = [[0.7], [-0.2]]
+
+        predictions, winner = predict_race_winner(
+            self.sample_race_data,
+            mock_model,
+            {},
+            calibration=Calibration(temperature=0.5),
+            samples=1000,
+        )
+
+        self.assertAlmostEqual(predictions["win_probability"].sum(), 1.0)
+        self.assertEqual(list(predictions["score"]), [0.7, -0.2])
+        self.assertEqual(list(predictions["podium_probability"]), [1.0, 1.0])
+        self.assertEqual(winner["score"], 0.7)
+
     def test_predict_race_winner_without_original_data(self):
         """Test prediction without original data."""
         mock_model = mock.MagicMock()
@@ -111,6 +137,27 @@ class TestPredictWinner(TestCase):
         self.assertEqual(scalers, mock_scalers)
         self.assertEqual(feature_names, ["feature1", "feature2"])
 
+    def test_load_model_file_names(self):
+        """Test the family-neutral model file wins over the legacy name."""
+        with tempfile.TemporaryDirectory() as project_root:
+            os.makedirs(os.path.join(project_root, "models"))
+            processed_dir = os.path.join(project_root, "data", "processed")
+            os.makedirs(processed_dir)
+            with open(os.path.join(processed_dir, "scalers.pkl"), "wb") as f:
+                pickle.dump({}, f)
+            with open(os.path.join(processed_dir, "metadata.json"), "w") as f:
+                json.dump({"feature_names": ["feature1"]}, f)
+
+            legacy = LinearRegression().fit([[0.0], [1.0]], [0.0, 1.0])
+            joblib.dump(legacy, os.path.join(project_root, "models", LEGACY_MODEL_FILE))
+            model, _, _ = load_model_and_scalers(project_root)
+            self.assertAlmostEqual(model.coef_[0], 1.0)
+
+            current = LinearRegression().fit([[0.0], [1.0]], [0.0, 2.0])
+            joblib.dump(current, os.path.join(project_root, "models", MODEL_FILE))
+            model, _, _ = load_model_and_scalers(project_root)
+            self.assertAlmostEqual(model.coef_[0], 2.0)
+
     @mock.patch("src.predict_winner.load_model_and_scalers")
     @mock.patch("src.predict_winner.predict_race_winner")
     def test_example_prediction(self, mock_predict, mock_load):
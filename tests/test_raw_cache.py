@@ -0,0 +1,93 @@
+"""Tests for raw_cache module."""
+
+import os
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from src.features import FEATURE_COLUMNS, build_features, load_raw_tables
+from src.raw_cache import CacheError, ingest, load_table, verify
+from tests.fixtures import make_raw_tables
+
+
+class TestRawCache(TestCase):
+    """Test cases for the typed raw-data cache."""
+
+    def setUp(self):
+        """Write synthetic Kaggle CSVs with \\N nulls."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.raw_dir = os.path.join(self.tmp_dir.name, "raw")
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        os.makedirs(self.raw_dir)
+
+        self.tables = make_raw_tables()
+        self.tables["drivers"]["code"] = ["HAM", "\\N"] * 4
+        for name, table in self.tables.items():
+            table.to_csv(
+                os.path.join(self.raw_dir, f"{name}.csv"), index=False, na_rep="\\N"
+            )
+
+    def test_ingest_uses_narrow_dtypes(self):
+        """Test cached columns get the schema dtypes and real nulls."""
+        converted = ingest(self.raw_dir, self.cache_dir)
+
+        results = load_table(self.cache_dir, "results")
+        drivers = load_table(self.cache_dir, "drivers")
+
+        self.assertEqual(len(converted), 7)
+        self.assertEqual(results["raceId"].dtype, "int32")
+        self.assertEqual(results["grid"].dtype, "int16")
+        self.assertEqual(results["position"].dtype, "float32")
+        self.assertTrue(results["position"].isna().any())
+        self.assertEqual(drivers["code"].dtype, "category")
+        self.assertEqual(drivers["code"].isna().sum(), 4)
+
+    def test_column_projection(self):
+        """Test only the requested columns are materialized."""
+        ingest(self.raw_dir, self.cache_dir)
+
+        races = load_table(self.cache_dir, "races", ["raceId", "year"])
+
+        self.assertEqual(list(races.columns), ["raceId", "year"])
+
+    def test_unchanged_tables_skipped(self):
+        """Test re-ingesting only converts tables whose CSV changed."""
+        ingest(self.raw_dir, self.cache_dir)
+        self.tables["circuits"].assign(circuitId=[2]).to_csv(
+            os.path.join(self.raw_dir, "circuits.csv"), index=False
+        )
+
+        self.assertEqual(ingest(self.raw_dir, self.cache_dir), ["circuits"])
+        self.assertEqual(load_table(self.cache_dir, "circuits")["circuitId"][0], 2)
+
+    def test_corrupt_cache_detected(self):
+        """Test verification catches a modified cache file."""
+        ingest(self.raw_dir, self.cache_dir)
+        path = os.path.join(self.cache_dir, "results.arrow")
+        with open(path, "r+b") as f:
+            f.seek(-16, os.SEEK_END)
+            f.write(b"\0" * 16)
+
+        self.assertEqual(verify(self.cache_dir), ["results: cache hash mismatch"])
+        self.assertEqual(ingest(self.raw_dir, self.cache_dir), ["results"])
+        self.assertEqual(verify(self.cache_dir), [])
+
+    def test_missing_cache(self):
+        """Test loading without a cache fails clearly."""
+        with self.assertRaises(CacheError):
+            load_table(self.cache_dir, "results")
+
+    def test_pipeline_parity_with_csv(self):
+        """Test features built from the cache match the CSV path."""
+        ingest(self.raw_dir, self.cache_dir)
+
+        from_csv = build_features(load_raw_tables(self.raw_dir), from_year=2017)
+        from_cache = build_features(
+            load_raw_tables(self.raw_dir, cache_dir=self.cache_dir), from_year=2017
+        )
+
+        pd.testing.assert_frame_equal(
+            from_cache[FEATURE_COLUMNS], from_csv[FEATURE_COLUMNS], check_dtype=False
+        )
@@ -0,0 +1,192 @@
+"""Tests for registry module."""
+
+import json
+import os
+import tempfile
+import unittest.mock as mock
+from unittest import TestCase
+
+import numpy as np
+
+from src import api
+from src.calibration import Calibration
+from src.model_bundle import BUNDLE_FILE, export_bundle
+from src.registry import (
+    CURRENT_FILE,
+    PARITY_FILE,
+    ModelHandle,
+    ModelRegistry,
+    ParityError,
+    check_parity,
+    list_versions,
+    load_version,
+    publish_version,
+    target_version,
+    write_parity_reference,
+)
+from src.scoring import ScoringEngine, compile_scoring_engine
+from tests.fixtures import (
+    FEATURE_NAMES,
+    fit_model_and_scalers,
+    make_training_data,
+    serving,
+)
+
+
+class TestRegistry(TestCase):
+    """Test cases for versioned model directories and hot-swapping."""
+
+    def setUp(self):
+        """Fit a model and create an empty registry directory."""
+        self.train = make_training_data()
+        self.model, self.scalers = fit_model_and_scalers(self.train)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = os.path.join(self.tmp_dir.name, "registry")
+        self.staging = os.path.join(self.tmp_dir.name, "export")
+        os.makedirs(self.root)
+        os.makedirs(self.staging)
+
+    def _publish(self, version, temperature=1.0, parity_offset=0.0):
+        """Export the model with a parity reference and publish it."""
+        bundle = os.path.join(self.staging, BUNDLE_FILE)
+        export_bundle(self.model, self.scalers, FEATURE_NAMES, bundle)
+        calibration = Calibration(temperature, fitted=True).save(
+            os.path.join(self.staging, "calibration.json")
+        )
+        engine = compile_scoring_engine(self.model, self.scalers, FEATURE_NAMES)
+        probe = self.train[FEATURE_NAMES].to_numpy()[:16]
+        parity = write_parity_reference(
+            os.path.join(self.staging, PARITY_FILE),
+            probe,
+            engine.score(probe) + parity_offset,
+        )
+        return publish_version(self.root, version, [bundle, calibration, parity])
+
+    def test_versions_and_pinning(self):
+        """Test versions sort naturally, staging dirs are hidden, CURRENT pins."""
+        for version in ["v2", "v10", "v9"]:
+            self._publish(version)
+        os.makedirs(os.path.join(self.root, ".v11.tmp"))
+        os.makedirs(os.path.join(self.root, "v12"))  # no bundle yet
+
+        self.assertEqual(list_versions(self.root), ["v2", "v9", "v10"])
+        self.assertEqual(target_version(self.root), "v10")
+
+        with open(os.path.join(self.root, CURRENT_FILE), "w") as f:
+            f.write("v9\n")
+        self.assertEqual(target_version(self.root), "v9")
+        with self.assertRaises(FileExistsError):
+            self._publish("v9")
+
+    def test_load_version_checks_parity(self):
+        """Test a version loads with its calibration and must match its reference."""
+        self._publish("v1", temperature=2.0)
+        self._publish("v2", parity_offset=1e-3)
+
+        handle = load_version(self.root, "v1")
+        self.assertEqual(handle.version, "v1")
+        self.assertEqual(handle.calibration.temperature, 2.0)
+        self.assertGreater(handle.load_seconds, 0)
+        with self.assertRaises(ParityError):
+            load_version(self.root, "v2")
+
+        broken = ScoringEngine(np.array([np.nan]), 0.0, ["driver_win_rate"])
+        with self.assertRaises(ParityError):
+            check_parity(broken)
+
+    def test_poll_swaps_and_skips_bad_versions(self):
+        """Test new versions are activated and failed ones keep the old model."""
+        swapped = []
+        registry = ModelRegistry(self.root, swapped.append)
+
+        self.assertIsNone(registry.poll())
+        self._publish("v1")
+        self.assertEqual(registry.poll().version, "v1")
+        self.assertIsNone(registry.poll())
+
+        self._publish("v2", parity_offset=1.0)
+        self.assertIsNone(registry.poll())
+        self.assertEqual(registry.active_version, "v1")
+        self.assertEqual(registry.stats()["failed_versions"], ["v2"])
+
+        self._publish("v3")
+        registry.poll()
+        self.assertEqual([handle.version for handle in swapped], ["v1", "v3"])
+        self.assertEqual(registry.swaps, 2)
+        self.assertIsNone(registry.last_error)
+
+
+class TestAPIHotSwap(TestCase):
+    """Test cases for serving through a swapped model handle."""
+
+    def setUp(self):
+        """Set up the test client and two model versions."""
+        self.app = api.app.test_client()
+        self.old = ModelHandle.for_engine(
+            ScoringEngine(np.array([1.0]), 0.0, ["driver_win_rate"]), version="v1"
+        )
+        self.new = ModelHandle.for_engine(
+            ScoringEngine(np.array([-1.0]), 0.0, ["driver_win_rate"]), version="v2"
+        )
+        self.drivers = [
+            {"forename": "A", "surname": "", "driver_win_rate": 0.1},
+            {"forename": "B", "surname": "", "driver_win_rate": 0.4},
+        ]
+        # activate_model updates these globals too
+        patches = [
+            serving(None),
+            mock.patch("src.api.model_state", "not loaded"),
+            mock.patch("src.api.model_load_seconds", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_responses_report_version(self):
+        """Test predictions, /health and the response header carry the version."""
+        api.activate_model(self.old)
+        response = self.app.post("/predict", json={"drivers": self.drivers})
+        api.activate_model(self.new)
+        health = json.loads(self.app.get("/health").data)
+        swapped = self.app.post("/predict", json={"drivers": self.drivers})
+
+        self.assertEqual(json.loads(response.data)["model_version"], "v1")
+        self.assertEqual(response.headers["X-Model-Version"], "v1")
+        self.assertEqual(
+            json.loads(swapped.data)["predicted_winner"]["full_name"], "A Unknown"
+        )
+        self.assertEqual(health["model_version"], "v2")
+
+    def test_running_request_keeps_its_version(self):
+        """Test a swap during a request does not change the request's model."""
+        with api.app.test_request_context("/predict"):
+            api.activate_model(self.old)
+            self.assertIs(api.request_model(), self.old)
+            api.activate_model(self.new)
+            self.assertIs(api.request_model(), self.old)
+            self.assertIs(api.model_handle, self.new)
+
+    def test_empty_registry_serves_packaged_model(self):
+        """Test an empty registry falls back to the bundle and is still watched."""
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root, api.activate_model)
+            engine = ScoringEngine(np.array([2.0]), 0.0, ["driver_win_rate"])
+            with (
+                mock.patch("src.api.model_registry", registry),
+                mock.patch(
+                    "src.api._load_engine", return_value=(None, None, [], engine)
+                ),
+                mock.patch("src.api.feature_table.poll"),
+            ):
+                self.assertTrue(api.load_model())
+                self.assertIs(api.model_handle.engine, engine)
+                self.assertEqual(api.model_state, "ready")
+                self.assertEqual(self.app.get("/ready").status_code, 200)
+
+                # A version published later is swapped in by the watcher
+                os.makedirs(os.path.join(root, "v2"))
+                open(os.path.join(root, "v2", BUNDLE_FILE), "wb").close()
+                with mock.patch("src.registry.load_version", return_value=self.new):
+                    registry.poll()
+                self.assertIs(api.model_handle, self.new)
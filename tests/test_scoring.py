@@ -0,0 +1,112 @@
+"""Tests for scoring module."""
+
+from unittest import TestCase
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from src.predict_winner import predict_race_winner
+from src.scoring import (
+    ScoringEngine,
+    affine_scaler_params,
+    compile_scoring_engine,
+    segment_argmax,
+    segment_normalize,
+    segment_order,
+    segment_softmax,
+)
+from tests.fixtures import FEATURE_NAMES, fit_model_and_scalers, make_training_data
+
+
+class TestScoring(TestCase):
+    """Test cases for the compiled scoring engine."""
+
+    def setUp(self):
+        """Fit a model and scalers on synthetic data."""
+        self.train = make_training_data()
+        self.model, self.scalers = fit_model_and_scalers(self.train)
+        self.race = make_training_data(n_rows=20, seed=7)
+
+    def test_parity_with_predict_race_winner(self):
+        """Test compiled scores match the pandas scaling path."""
+        engine = compile_scoring_engine(self.model, self.scalers, FEATURE_NAMES)
+
+        predictions, winner = predict_race_winner(self.race, self.model, self.scalers)
+        scores = engine.score(self.race.to_numpy())
+
+        np.testing.assert_allclose(
+            scores, predictions.sort_index()["win_probability"].to_numpy(), rtol=1e-10
+        )
+        self.assertEqual(int(np.argmax(scores)), winner.name)
+
+    def test_affine_scaler_params(self):
+        """Test probed scaler parameters reproduce transform."""
+        values = self.train[["year"]]
+        scaler = StandardScaler().fit(values)
+
+        offset, scale = affine_scaler_params(scaler)
+
+        np.testing.assert_allclose(
+            offset + scale * values.to_numpy()[:, 0],
+            scaler.transform(values)[:, 0],
+        )
+
+    def test_clipping_scaler_rejected(self):
+        """Test clipping MinMaxScaler cannot be folded."""
+        scaler = MinMaxScaler(clip=True).fit(self.train[["grid"]])
+
+        with self.assertRaises(ValueError):
+            affine_scaler_params(scaler)
+
+    def test_feature_count_mismatch(self):
+        """Test compiling with the wrong feature list fails."""
+        with self.assertRaises(ValueError):
+            compile_scoring_engine(self.model, self.scalers, FEATURE_NAMES[:-1])
+
+    def test_engine_feature_index(self):
+        """Test feature index map follows feature order."""
+        engine = ScoringEngine(np.zeros(3), 0.5, ["a", "b", "c"])
+
+        self.assertEqual(engine.feature_index, {"a": 0, "b": 1, "c": 2})
+        self.assertEqual(engine.n_features, 3)
+        np.testing.assert_array_equal(engine.score(np.ones((2, 3))), [0.5, 0.5])
+
+
+class TestSegmentOps(TestCase):
+    """Test cases for per-race segment operations."""
+
+    def test_segment_argmax_first_maximum(self):
+        """Test grouped argmax picks the first maximum in each race."""
+        values = np.array([0.1, 0.9, 0.9, 0.5, 0.2, 0.7])
+        offsets = np.array([0, 3, 4, 6])
+
+        np.testing.assert_array_equal(segment_argmax(values, offsets), [1, 3, 5])
+
+    def test_segment_order_descending_per_race(self):
+        """Test ordering sorts within races and keeps races in place."""
+        values = np.array([0.1, 0.9, 0.5, 0.2, 0.7])
+        offsets = np.array([0, 3, 5])
+
+        np.testing.assert_array_equal(segment_order(values, offsets), [1, 2, 0, 4, 3])
+
+    def test_segment_normalize_sums_to_one(self):
+        """Test per-race shares sum to one and clip negative scores."""
+        values = np.array([0.6, 0.2, -0.4, 0.5, 0.5])
+        offsets = np.array([0, 3, 5])
+
+        shares = segment_normalize(values, offsets, floor=0.0)
+
+        np.testing.assert_allclose(shares, [0.75, 0.25, 0.0, 0.5, 0.5])
+
+    def test_segment_softmax_matches_per_race(self):
+        """Test grouped softmax equals a softmax of each race on its own."""
+        values = np.array([1.0, 2.0, 3.0, 1000.0, 1001.0])
+        offsets = np.array([0, 3, 5])
+
+        probabilities = segment_softmax(values, offsets)
+
+        first = np.exp([1.0, 2.0, 3.0]) / np.exp([1.0, 2.0, 3.0]).sum()
+        np.testing.assert_allclose(probabilities[:3], first)
+        np.testing.assert_allclose(
+            probabilities[3:], [1 / (1 + np.e), np.e / (1 + np.e)]
+        )
@@ -0,0 +1,81 @@
+"""Tests for serve module."""
+
+import json
+import os
+import unittest.mock as mock
+from unittest import TestCase
+
+from src import api
+from src.serve import PredictionServer, build_options, default_workers, on_reload
+from tests.fixtures import serving
+
+
+class TestServe(TestCase):
+    """Test cases for the production server entry point."""
+
+    @mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "3"})
+    def test_default_workers_from_env(self):
+        """Test worker count follows WEB_CONCURRENCY."""
+        self.assertEqual(default_workers(), 3)
+
+    @mock.patch.dict(os.environ, {"PORT": "8080"}, clear=True)
+    def test_build_options_preloads_model(self):
+        """Test options preload the app and bind to $PORT."""
+        options = build_options(workers=2)
+
+        self.assertTrue(options["preload_app"])
+        self.assertEqual(options["workers"], 2)
+        self.assertEqual(options["bind"], "0.0.0.0:8080")
+
+    @mock.patch("src.serve.gc.freeze")
+    @mock.patch("src.serve.api.load_model", return_value=True)
+    def test_application_loads_model_in_master(self, mock_load, mock_freeze):
+        """Test the gunicorn application loads the model before serving."""
+        server = PredictionServer(build_options(workers=4, bind="127.0.0.1:0"))
+
+        self.assertEqual(server.cfg.workers, 4)
+        self.assertTrue(server.cfg.preload_app)
+        self.assertIs(server.load(), api.app)
+        mock_load.assert_called_once()
+        mock_freeze.assert_called_once()
+
+    @mock.patch("src.serve.gc.freeze")
+    @mock.patch("src.serve.api.load_model", return_value=True)
+    def test_on_reload_reloads_model_in_master(self, mock_load, mock_freeze):
+        """Test graceful reload loads the model before workers are forked."""
+        on_reload(mock.MagicMock())
+
+        mock_load.assert_called_once()
+
+    @mock.patch("src.serve.gc.freeze")
+    @mock.patch("src.serve.api.load_model", return_value=False)
+    def test_on_reload_failure_keeps_serving(self, mock_load, mock_freeze):
+        """Test a failed reload only logs a warning."""
+        server = mock.MagicMock()
+
+        on_reload(server)
+
+        server.log.warning.assert_called_once()
+
+
+class TestReadiness(TestCase):
+    """Test cases for the readiness endpoint."""
+
+    def setUp(self):
+        """Set up test client."""
+        self.app = api.app.test_client()
+
+    @serving(None)
+    def test_ready_without_model(self):
+        """Test readiness fails until the model is loaded."""
+        response = self.app.get("/ready")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(json.loads(response.data)["model_loaded"])
+
+    @serving(mock.MagicMock())
+    def test_ready_with_model(self):
+        """Test readiness succeeds once the engine is available."""
+        response = self.app.get("/ready")
+
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,157 @@
+"""Tests for shadow module."""
+
+import json
+import unittest.mock as mock
+from unittest import TestCase
+
+import numpy as np
+
+from src import api
+from src.calibration import Calibration
+from src.registry import ModelHandle
+from src.scoring import ScoringEngine
+from src.shadow import ShadowScorer
+from tests.fixtures import serving
+
+NAMES = ["driver_win_rate", "constructor_win_rate"]
+
+
+def handle(weights, version, names=NAMES):
+    return ModelHandle.for_engine(
+        ScoringEngine(np.array(weights, dtype=float), 0.0, names), version=version
+    )
+
+
+class TestShadowScorer(TestCase):
+    """Test cases for background agreement scoring."""
+
+    def setUp(self):
+        """Create a primary model and two races."""
+        self.primary = handle([1.0, 0.5], "v1")
+        self.features = np.array([[0.1, 0.0], [0.4, 0.2], [0.3, 0.9], [0.2, 0.1]])
+        self.offsets = [0, 2, 4]
+        self.scores = self.primary.engine.score(self.features)
+
+    def _agreement(self, scorer):
+        return {row["shadow_version"]: row for row in scorer.stats()["agreement"]}
+
+    def test_agreement_per_version(self):
+        """Test winner match rates and probability deltas per shadow version."""
+        scorer = ShadowScorer()
+        scorer.set_shadows(
+            [
+                handle([1.0, 0.5], "same"),
+                handle([-1.0, -0.5], "reversed"),
+                # Subset of the primary features, in another order
+                handle([1.0], "subset", names=["constructor_win_rate"]),
+                handle([1.0], "incompatible", names=["grid"]),
+            ]
+        )
+
+        for _ in range(3):
+            scorer.submit(self.primary, self.features, self.offsets, self.scores)
+        scorer.join()
+        agreement = self._agreement(scorer)
+
+        self.assertEqual(agreement["same"]["races"], 6)
+        self.assertEqual(agreement["same"]["winner_match_rate"], 1.0)
+        self.assertEqual(agreement["same"]["max_probability_delta"], 0.0)
+        self.assertEqual(agreement["reversed"]["winner_match_rate"], 0.0)
+        self.assertGreater(agreement["reversed"]["mean_probability_delta"], 0.0)
+        # Constructor rate alone picks the same winners in both races
+        self.assertEqual(agreement["subset"]["winner_match_rate"], 1.0)
+        # Queued requests are scored in batches, so errors count scoring passes
+        self.assertGreaterEqual(agreement["incompatible"]["errors"], 1)
+        self.assertIn("grid", agreement["incompatible"]["last_error"])
+        self.assertEqual(agreement["incompatible"]["races"], 0)
+        self.assertEqual(scorer.stats()["submitted"], 3)
+
+    def test_calibrated_probabilities(self):
+        """Test deltas compare each model's own calibrated probabilities."""
+        scorer = ShadowScorer()
+        scorer.set_shadows(
+            [handle([1.0, 0.5], "v2")._replace(calibration=Calibration(1e-9))]
+        )
+
+        scorer.submit(self.primary, self.features, self.offsets, self.scores)
+        scorer.join()
+
+        row = self._agreement(scorer)["v2"]
+        self.assertEqual(row["winner_match_rate"], 1.0)
+        self.assertGreater(row["max_probability_delta"], 0.4)
+
+    def test_full_queue_drops(self):
+        """Test submit never blocks: a full queue drops the comparison."""
+        scorer = ShadowScorer(max_pending=1)
+        scorer.set_shadows([handle([1.0, 0.5], "v2")])
+
+        with mock.patch.object(scorer, "_ensure_worker"):
+            results = [
+                scorer.submit(self.primary, self.features, self.offsets, self.scores)
+                for _ in range(3)
+            ]
+
+        self.assertEqual(results, [True, False, False])
+        self.assertEqual(scorer.stats()["dropped"], 2)
+        self.assertFalse(ShadowScorer().submit(self.primary, None, None, None))
+
+
+class TestAPIShadow(TestCase):
+    """Test cases for shadow scoring behind the prediction endpoints."""
+
+    def setUp(self):
+        """Serve the primary model with one shadow model."""
+        self.app = api.app.test_client()
+        self.primary = handle([1.0, 0.5], "v1")
+        self.shadow = ShadowScorer()
+        self.shadow.set_shadows([handle([-1.0, 0.0], "v2")])
+        patches = [
+            mock.patch("src.api.model_handle", self.primary),
+            mock.patch("src.api.shadow", self.shadow),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _driver(self, forename, driver_win_rate):
+        return {
+            "forename": forename,
+            "surname": "",
+            "driver_win_rate": driver_win_rate,
+            "constructor_win_rate": 0.1,
+        }
+
+    def test_predictions_are_shadowed(self):
+        """Test primary responses are unchanged and shadow agreement is reported."""
+        drivers = [self._driver("A", 0.1), self._driver("B", 0.4)]
+
+        response = self.app.post("/predict", json={"drivers": drivers})
+        response.close()
+        batch = self.app.post(
+            "/predict/batch",
+            json={"races": [{"drivers": drivers}, {"drivers": drivers[:1]}]},
+        )
+        batch.close()
+        self.shadow.join()
+        stats = json.loads(self.app.get("/shadow").data)
+
+        self.assertEqual(
+            json.loads(response.data)["predicted_winner"]["full_name"], "B Unknown"
+        )
+        self.assertEqual(stats["primary_version"], "v1")
+        self.assertEqual(stats["shadow_versions"], ["v2"])
+        (row,) = stats["agreement"]
+        self.assertEqual((row["primary_version"], row["shadow_version"]), ("v1", "v2"))
+        self.assertEqual(row["races"], 3)
+        # The shadow picks A in both two-driver races; one-driver races agree
+        self.assertAlmostEqual(row["winner_match_rate"], 1 / 3)
+
+    def test_no_shadow_without_versions(self):
+        """Test nothing is queued when no shadow models are configured."""
+        self.shadow.set_shadows([])
+        with serving(self.primary.engine):
+            self.app.post(
+                "/predict", json={"drivers": [self._driver("A", 0.1)]}
+            ).close()
+
+        self.assertEqual(self.shadow.stats()["submitted"], 0)
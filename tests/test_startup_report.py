@@ -0,0 +1,56 @@
+"""Tests for startup_report module."""
+
+from unittest import TestCase
+
+from src.startup_report import (
+    check_report,
+    parse_importtime,
+    profile_startup,
+    top_level_packages,
+)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 | numpy.core
+import time:      3000 |       8000 | numpy
+import time:       400 |        400 | flask
+import time:        10 |         10 | numpy
+"""
+
+
+class TestStartupReport(TestCase):
+    """Test cases for the startup profiling report."""
+
+    def test_parse_importtime(self):
+        """Test importtime lines are parsed and the header skipped."""
+        modules = parse_importtime(SAMPLE)
+
+        self.assertEqual(modules["numpy"], (3000, 8000))
+        self.assertEqual(modules["_io"], (120, 120))
+        self.assertEqual(len(modules), 4)
+
+    def test_top_level_packages(self):
+        """Test self time is aggregated per top-level package."""
+        packages = top_level_packages(parse_importtime(SAMPLE))
+
+        self.assertEqual(list(packages)[0], "numpy")
+        self.assertEqual(packages["numpy"], 5000)
+
+    def test_check_report_flags_regressions(self):
+        """Test budget overruns and forbidden modules are reported."""
+        report = {"import_ms": 500.0, "modules": parse_importtime(SAMPLE)}
+
+        problems = check_report(report, budget_ms=100, forbidden=["flask"])
+
+        self.assertEqual(len(problems), 2)
+        self.assertEqual(check_report(report, budget_ms=1000, forbidden=["x"]), [])
+
+    def test_api_import_stays_light(self):
+        """Test importing src.api neither loads the model nor heavy modules."""
+        report = profile_startup()
+
+        self.assertFalse(report["model_loaded"])
+        self.assertEqual(
+            check_report(report, forbidden=["pandas", "sklearn", "joblib"]), []
+        )
@@ -0,0 +1,179 @@
+"""Tests for sweep module."""
+
+import json
+import os
+import pickle
+import tempfile
+import unittest.mock as mock
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from src.calibration import Calibration
+from src.drift import DRIFT_FILE, load_reference, processed_reference
+from src.features import build_features
+from src.model_bundle import BUNDLE_FILE, read_bundle
+from src.predict_winner import MODEL_FILE, predict_race_winner
+from src.registry import load_version
+from src.scoring import compile_scoring_engine
+from src.sweep import (
+    config_id,
+    evaluate_fold,
+    expand_grid,
+    export_best,
+    leaderboard,
+    main,
+    publish_export,
+    run_sweep,
+    winner_pairs,
+)
+from tests.fixtures import make_raw_tables
+
+GRID = {
+    "window_sizes": [3, 6],
+    "models": {"linear": {}, "logistic": {"C": [0.1, 1.0]}},
+}
+
+
+class TestSweep(TestCase):
+    """Test cases for the model sweep."""
+
+    def setUp(self):
+        """Build the raw tables and a temporary output directory."""
+        self.tables = make_raw_tables()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.race_data = {
+            window: build_features(self.tables, 2017, window, pre_race=True)
+            for window in GRID["window_sizes"]
+        }
+
+    def test_expand_grid(self):
+        """Test every family/parameter/window combination is listed."""
+        configs = expand_grid(GRID)
+
+        self.assertEqual(len(configs), 6)
+        self.assertEqual(config_id(configs[1]), "logistic(C=0.1)/w3")
+        with self.assertRaises(ValueError):
+            expand_grid({"window_sizes": [3], "models": {"svm": {}}})
+
+    def test_winner_pairs(self):
+        """Test pairs are winner minus each rival, in both directions."""
+        features = np.array([[1.0], [4.0], [2.0], [0.0], [5.0]])
+        is_winner = np.array([0, 1, 0, 0, 0])
+        offsets = np.array([0, 3, 5])
+
+        pairs, labels = winner_pairs(features, is_winner, offsets)
+
+        np.testing.assert_array_equal(pairs[:, 0], [3.0, 2.0, -3.0, -2.0])
+        np.testing.assert_array_equal(labels, [1, 1, 0, 0])
+
+    def test_folds_cached_and_resumed(self):
+        """Test a rerun only computes folds missing from the cache."""
+        configs = expand_grid(GRID)
+        cache_dir = os.path.join(self.tmp_dir.name, "folds")
+        first = run_sweep(self.race_data, configs, [2019, 2020], 1, cache_dir)
+        os.remove(os.path.join(cache_dir, sorted(os.listdir(cache_dir))[0]))
+
+        with mock.patch("src.sweep.evaluate_fold", wraps=evaluate_fold) as fold:
+            second = run_sweep(self.race_data, configs, [2019, 2020], 1, cache_dir)
+
+        self.assertEqual(fold.call_count, 1)
+        self.assertEqual(len(os.listdir(cache_dir)), 12)
+        pd.testing.assert_frame_equal(
+            leaderboard(configs, second).drop(columns="fit_seconds"),
+            leaderboard(configs, first).drop(columns="fit_seconds"),
+        )
+
+    def test_pool_matches_in_process(self):
+        """Test the leaderboard is the same with worker processes."""
+        configs = expand_grid(GRID)
+        serial = leaderboard(configs, run_sweep(self.race_data, configs, [2020], 1))
+        pooled = leaderboard(configs, run_sweep(self.race_data, configs, [2020], 2))
+
+        self.assertEqual(list(pooled["config"]), list(serial["config"]))
+        np.testing.assert_allclose(pooled["log_loss"], serial["log_loss"])
+        self.assertEqual(list(serial["rank"]), [1, 2, 3, 4, 5, 6])
+        self.assertTrue(serial["log_loss"].is_monotonic_increasing)
+
+    def test_empty_season_range_rejected(self):
+        """Test the CLI exits with a usage error when no season is selected."""
+        for argv in (
+            ["--first-season", "2020", "--last-train-year", "2019"],
+            # The tables end in 2020
+            [
+                "--from-year",
+                "2017",
+                "--first-season",
+                "2024",
+                "--last-train-year",
+                "2030",
+            ],
+        ):
+            with (
+                mock.patch("sys.argv", ["sweep", *argv]),
+                mock.patch("src.sweep.load_raw_tables", return_value=self.tables),
+                mock.patch("src.sweep.run_sweep") as run,
+                mock.patch("sys.stderr"),
+                self.assertRaises(SystemExit) as exit_,
+            ):
+                main()
+            self.assertEqual(exit_.exception.code, 2)
+            run.assert_not_called()
+
+    def test_export_best(self):
+        """Test the exported artifacts load like the notebook model."""
+        processed_dir = os.path.join(self.tmp_dir.name, "processed")
+        models_dir = os.path.join(self.tmp_dir.name, "models")
+        config = {"model": "logistic", "params": {"C": 1.0}, "window_size": 6}
+
+        model = export_best(
+            config, self.tables, processed_dir, models_dir, 2017, last_train_year=2019
+        )
+
+        with open(os.path.join(processed_dir, "metadata.json")) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata["window_size"], 6)
+        self.assertEqual(metadata["model"], "logistic(C=1.0)/w6")
+        self.assertEqual(metadata["model_family"], "logistic")
+        self.assertTrue(os.path.exists(os.path.join(models_dir, MODEL_FILE)))
+        header, _ = read_bundle(os.path.join(models_dir, BUNDLE_FILE))
+        self.assertEqual(header["metadata"]["model_family"], "logistic")
+
+        calibration = Calibration.load(os.path.join(models_dir, "calibration.json"))
+        self.assertTrue(calibration.fitted)
+
+        X_test = pd.read_parquet(os.path.join(processed_dir, "X_test.parquet"))
+        with open(os.path.join(processed_dir, "scalers.pkl"), "rb") as f:
+            scalers = pickle.load(f)
+        ranked, _ = predict_race_winner(X_test.iloc[:8], model, {})
+        np.testing.assert_allclose(
+            ranked["win_probability"].sort_index(),
+            model.decision_function(X_test.iloc[:8]),
+        )
+        # The API folds the scalers into the weights of the same linear score
+        engine = compile_scoring_engine(model, scalers, metadata["feature_names"])
+        unscaled = pd.read_parquet(os.path.join(processed_dir, "race_features.parquet"))
+        self.assertEqual(engine.n_features, len(metadata["feature_names"]))
+        self.assertFalse(
+            np.isnan(engine.score(unscaled[metadata["feature_names"]])).any()
+        )
+
+        # The published version passes the serving parity check
+        registry_dir = os.path.join(self.tmp_dir.name, "registry")
+        version = publish_export(models_dir, registry_dir, "v1")
+        handle = load_version(registry_dir, version)
+        self.assertEqual(handle.version, "v1")
+        self.assertEqual(handle.calibration.temperature, calibration.temperature)
+
+        # The drift reference describes the unscaled training features
+        reference = load_reference(os.path.join(handle.source, DRIFT_FILE))
+        self.assertEqual(reference["feature_names"], metadata["feature_names"])
+        self.assertEqual(reference["rows"], metadata["train_samples"])
+        from_processed = processed_reference(processed_dir)
+        self.assertEqual(from_processed["rows"], reference["rows"])
+        np.testing.assert_allclose(
+            from_processed["features"]["year"]["edges"],
+            reference["features"]["year"]["edges"],
+        )
@@ -0,0 +1,231 @@
+"""Tests for validation module."""
+
+import json
+import unittest.mock as mock
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import numpy as np
+
+from src import validation
+from src.api import app
+from src.data_utils import FEATURE_RANGES
+from src.scoring import ScoringEngine
+from src.validation import RequestValidator, load_spec, validator_for
+from tests.fixtures import call, serving
+
+FEATURES = ["driver_win_rate", "grid", "year"]
+
+
+def driver(**overrides):
+    """A valid driver row, with some fields overridden."""
+    row = {
+        "forename": "Lewis",
+        "surname": "Hamilton",
+        "driver_win_rate": 0.2,
+        "grid": 3,
+        "year": 2024,
+    }
+    row.update(overrides)
+    return row
+
+
+class TestRequestValidator(TestCase):
+    """Test cases for the schema-compiled request validator."""
+
+    def setUp(self):
+        """Compile a validator from the project's spec."""
+        self.validator = RequestValidator(FEATURES, load_spec())
+
+    def test_valid_race_builds_matrix(self):
+        """Test that a valid race yields its float feature matrix."""
+        features, error = self.validator.drivers([driver(), driver(grid=1)])
+        self.assertIsNone(error)
+        self.assertEqual(features.dtype, np.float64)
+        np.testing.assert_array_equal(
+            features, [[0.2, 3.0, 2024.0], [0.2, 1.0, 2024.0]]
+        )
+
+    def test_rejects_non_numeric_features(self):
+        """Test that strings, booleans and nulls are not coerced."""
+        for value, type_name in (("0.2", "str"), (True, "bool"), (None, "NoneType")):
+            _, error = self.validator.drivers([driver(), driver(grid=value)])
+            self.assertEqual(
+                error,
+                f"Invalid input: features must be numeric ('grid' is {type_name})",
+            )
+
+    def test_rejects_non_finite_and_out_of_range(self):
+        """Test NaN, infinite and out-of-range values."""
+        cases = {
+            float("nan"): "'grid' must be a finite number",
+            float("inf"): "'grid' must be a finite number",
+            -1: "'grid' must be at least 0",
+        }
+        for value, message in cases.items():
+            _, error = self.validator.drivers([driver(grid=value)])
+            self.assertEqual(error, f"Invalid input: {message}")
+
+        _, error = self.validator.drivers([driver(driver_win_rate=1.5)])
+        self.assertEqual(
+            error, "Invalid input: 'driver_win_rate' must be between 0 and 1"
+        )
+        _, error = self.validator.drivers([driver(year=10**400)])
+        self.assertEqual(error, "Invalid input: features must be finite numbers")
+
+    def test_rejects_bad_shapes(self):
+        """Test missing features, non-object drivers, names and counts."""
+        row = driver()
+        del row["grid"]
+        self.assertEqual(
+            self.validator.drivers([driver(), row])[1], "Missing features: ['grid']"
+        )
+        self.assertEqual(
+            self.validator.drivers([driver(), [1, 2, 3]])[1],
+            "Invalid input: each driver must be an object",
+        )
+        self.assertEqual(
+            self.validator.drivers([driver(surname=7)])[1],
+            "Invalid input: 'surname' must be a string",
+        )
+        self.assertEqual(
+            self.validator.drivers({"driver_win_rate": 0.2})[1],
+            "Invalid input: 'drivers' field required",
+        )
+        self.assertEqual(
+            self.validator.drivers([])[1],
+            "Invalid input: 'drivers' must not be empty",
+        )
+        self.assertEqual(
+            self.validator.drivers([driver()] * 101)[1],
+            "Invalid input: at most 100 drivers per race",
+        )
+
+    def test_races_cap(self):
+        """Test the /predict/batch races check."""
+        self.assertIsNone(self.validator.races([{"drivers": []}]))
+        self.assertEqual(
+            self.validator.races({}), "Invalid input: 'races' field required"
+        )
+        self.assertEqual(
+            self.validator.races([{}] * 1001),
+            "Invalid input: at most 1000 races per batch",
+        )
+
+    def test_ranges_come_from_feature_ranges(self):
+        """Test bounds are data_utils.FEATURE_RANGES, not copies in the spec."""
+        spec = load_spec()
+        properties = spec["components"]["schemas"]["Driver"]["properties"]
+        for name in FEATURE_RANGES:
+            self.assertNotIn("minimum", properties[name], name)
+            self.assertNotIn("maximum", properties[name], name)
+
+        for validator in (
+            RequestValidator(list(FEATURE_RANGES), spec),
+            RequestValidator(list(FEATURE_RANGES)),
+        ):
+            for name, low, high in zip(
+                validator.feature_names, validator.low, validator.high, strict=True
+            ):
+                expected_low, expected_high = FEATURE_RANGES[name]
+                self.assertEqual(low, expected_low, name)
+                self.assertEqual(
+                    high,
+                    validation.FLOAT_MAX if expected_high is None else expected_high,
+                    name,
+                )
+
+    def test_defaults_without_spec(self):
+        """Test that without a spec the default caps and the ranges apply."""
+        validator = RequestValidator(FEATURES)
+        self.assertEqual(validator.source, "defaults")
+        self.assertIsNone(validator.drivers([driver()])[1])
+        self.assertEqual(
+            validator.drivers([driver(grid=-1)])[1],
+            "Invalid input: 'grid' must be at least 0",
+        )
+        self.assertEqual(
+            validator.drivers([driver(grid=float("nan"))])[1],
+            "Invalid input: 'grid' must be a finite number",
+        )
+        self.assertEqual(
+            validator.drivers([driver()] * 101)[1],
+            "Invalid input: at most 100 drivers per race",
+        )
+
+    def test_missing_spec_warns(self):
+        """Test the fallback to the defaults is logged."""
+        patches = [
+            mock.patch.dict(validation._validators, clear=True),
+            mock.patch.object(validation, "_spec_loaded", False),
+            mock.patch.object(validation, "_spec", None),
+            mock.patch.dict("os.environ", {"F1_OPENAPI_SPEC": "missing.yaml"}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        with self.assertLogs("src.validation", "WARNING") as logs:
+            validator = validator_for(FEATURES)
+
+        self.assertEqual(validator.source, "defaults")
+        self.assertIn("missing.yaml", logs.output[0])
+
+    def test_validator_for_is_cached(self):
+        """Test that validators are compiled once per feature list."""
+        self.assertIs(validator_for(FEATURES), validator_for(tuple(FEATURES)))
+        self.assertEqual(validator_for(FEATURES).source, "openapi")
+
+
+class TestBodySizeLimit(TestCase):
+    """Test cases for the Flask request body cap."""
+
+    def setUp(self):
+        """Serve a small engine with a 256-byte body cap."""
+        self.app = app.test_client()
+        patches = [
+            serving(ScoringEngine(np.zeros(1), 0.0, ["grid"])),
+            mock.patch.dict(app.config, {"MAX_CONTENT_LENGTH": 256}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_oversized_body_rejected(self):
+        """Test that an oversized body gets a JSON 413."""
+        response = self.app.post("/predict", json={"drivers": [{"grid": 1}] * 50})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()["error"], "Request body exceeds 256 bytes")
+
+        response = self.app.post("/predict", json={"drivers": [{"grid": 1}]})
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_json_and_values(self):
+        """Test malformed JSON and bad values are 400s, not 500s."""
+        response = self.app.post(
+            "/predict", data="{not json", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.app.post("/predict", json={"drivers": [{"grid": "3"}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("must be numeric", response.get_json()["error"])
+
+
+class TestASGIBodySizeLimit(IsolatedAsyncioTestCase):
+    """Test cases for the ASGI request body cap."""
+
+    def setUp(self):
+        """Serve a small engine with a 256-byte body cap."""
+        patches = [
+            serving(ScoringEngine(np.zeros(1), 0.0, ["grid"])),
+            mock.patch("src.asgi.MAX_BODY_BYTES", 256),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_oversized_body_rejected(self):
+        """Test that an oversized body gets a JSON 413."""
+        body = json.dumps({"drivers": [{"grid": 1}] * 50}).encode()
+        status, data = await call("POST", "/predict", body)
+        self.assertEqual(status, 413)
+        self.assertEqual(data["error"], "Request body exceeds 256 bytes")